@@ -2,17 +2,23 @@
 
 __version__ = "0.2.10"
 
-from .client import ONVIFClient
-from .operator import CacheMode
-from .utils import (
-    ONVIFWSDL,
-    ONVIFOperationException,
-    ONVIFErrorHandler,
-    ZeepPatcher,
-    ONVIFDiscovery,
-    ONVIFParser,
-)
-from .cli import main as ONVIFCLI
+import importlib
+
+# Public names are resolved lazily on first access (PEP 562), so that
+# lightweight consumers (e.g. discovery-only tools) don't pay the import
+# cost of zeep, requests and all service modules.
+# Format: name -> (module, attribute)
+_LAZY_ATTRS = {
+    "ONVIFClient": (".client", "ONVIFClient"),
+    "CacheMode": (".operator", "CacheMode"),
+    "ONVIFWSDL": (".utils.wsdl", "ONVIFWSDL"),
+    "ONVIFOperationException": (".utils.exceptions", "ONVIFOperationException"),
+    "ONVIFErrorHandler": (".utils.error_handlers", "ONVIFErrorHandler"),
+    "ZeepPatcher": (".utils.zeep", "ZeepPatcher"),
+    "ONVIFCLI": (".cli.main", "main"),
+    "ONVIFDiscovery": (".utils.discovery", "ONVIFDiscovery"),
+    "ONVIFParser": (".utils.parser", "ONVIFParser"),
+}
 
 __all__ = [
     "ONVIFClient",
@@ -26,3 +32,18 @@ __all__ = [
     "ONVIFParser",
     "__version__",
 ]
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), attr)
+    globals()[name] = value  # Cache for subsequent lookups
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,13 +2,11 @@
 
 import cmd
 import sys
-import socket
-import ssl
 import os
-import threading
 import textwrap
 from datetime import datetime
 from typing import List
+from urllib.parse import urlsplit
 
 from zeep.exceptions import TransportError, Fault
 from requests.exceptions import RequestException
@@ -16,6 +14,7 @@ from requests.exceptions import RequestException
 from .. import __version__
 from ..client import ONVIFClient
 from ..utils.exceptions import ONVIFOperationException
+from ..utils.health_monitor import ONVIFHealthMonitor
 from .utils import (
     parse_json_params,
     get_service_methods,
@@ -69,10 +68,21 @@ class InteractiveShell(cmd.Cmd):
             "type",
         ]
 
-        # For background health check
-        self._stop_health_check = threading.Event()
-        self._health_check_thread = threading.Thread(
-            target=self._periodic_health_check, daemon=True
+        # For background health check (TCP/TLS connect + GetSystemDateAndTime)
+        health_check_interval = getattr(args, "health_check_interval", 10)
+        self._health_monitor = ONVIFHealthMonitor(
+            interval=health_check_interval,
+            timeout=5.0,
+            workers=1,
+            on_change=self._on_health_change,
+        )
+        self._health_monitor.add(
+            args.host,
+            args.port,
+            use_https=getattr(args, "https", False),
+            path=self._device_service_path(),
+            name="device",
+            delay=health_check_interval,  # Let the intro finish first
         )
 
         # Enable tab completion
@@ -231,73 +241,45 @@ class InteractiveShell(cmd.Cmd):
         )
 
         # Start background health check after successful initialization
-        self._health_check_thread.start()
-
-    def _periodic_health_check(self):
-        """Periodically checks device connection using TCP or TLS depending on mode."""
-        # Get health check interval from args, default to 10 seconds
-        health_check_interval = getattr(self.args, "health_check_interval", 10)
-
-        # Wait before first check to allow intro to finish
-        self._stop_health_check.wait(health_check_interval)
-
-        while not self._stop_health_check.is_set():
-            sock = None
-            try:
-                # For HTTPS, use ssl.create_connection for proper TLS handling
-                if getattr(self.args, "https", False):
-                    context = ssl.create_default_context()
-                    context.minimum_version = ssl.TLSVersion.TLSv1_2
-                    context.check_hostname = False
-                    context.verify_mode = ssl.CERT_NONE
-
-                    # Use ssl.create_connection instead of wrapping existing socket
-                    sock = context.wrap_socket(
-                        socket.socket(socket.AF_INET, socket.SOCK_STREAM),
-                        server_hostname=self.args.host,
-                    )
-                    sock.settimeout(5.0)
-                    sock.connect((self.args.host, self.args.port))
-                else:
-                    # For HTTP, simple TCP connection check
-                    sock = socket.create_connection(
-                        (self.args.host, self.args.port), timeout=5.0
-                    )
-
-                # Connection successful
-                pass
+        self._health_monitor.start()
 
-            except (
-                socket.timeout,
-                ConnectionRefusedError,
-                socket.gaierror,
-                ssl.SSLError,
-                ssl.SSLEOFError,
-                OSError,
-            ) as e:
-                # Connection failed, trigger exit
-                print(
-                    f"\n{colorize('Connection to device lost.', 'red')}",
-                    file=sys.stderr,
-                )
-                print(
-                    f"{colorize('Error:', 'red')} Health check failed: {e}",
-                    file=sys.stderr,
-                )
-                print(
-                    colorize("Exiting ONVIF interactive shell...", "yellow"),
-                    file=sys.stderr,
-                )
-                # Forcibly exit the entire process. This is necessary to interrupt
-                # the blocking input() call in the main thread.
-                os._exit(1)
-            finally:
-                # Ensure the socket is always closed
-                if sock:
-                    sock.close()
+    def _device_service_path(self) -> str:
+        """Path of the device service XAddr (for health checks)."""
+        try:
+            path = urlsplit(self.client.devicemgmt().operator.address).path
+        except Exception:
+            path = None
+        return path or "/onvif/device_service"
 
-            # Wait before next check or stop signal
-            self._stop_health_check.wait(health_check_interval)
+    def _on_health_change(self, check, previous):
+        """React to device health changes reported by the health monitor."""
+        if check.state == ONVIFHealthMonitor.DOWN:
+            print(
+                f"\n{colorize('Connection to device lost.', 'red')}",
+                file=sys.stderr,
+            )
+            print(
+                f"{colorize('Error:', 'red')} Health check failed: {check.error}",
+                file=sys.stderr,
+            )
+            print(
+                colorize("Exiting ONVIF interactive shell...", "yellow"),
+                file=sys.stderr,
+            )
+            # Forcibly exit the entire process. This is necessary to interrupt
+            # the blocking input() call in the main thread.
+            os._exit(1)
+        elif check.state == ONVIFHealthMonitor.DEGRADED:
+            print(
+                f"\n{colorize('Warning:', 'yellow')} Device is reachable but not "
+                f"answering ONVIF requests: {check.error}",
+                file=sys.stderr,
+            )
+        elif previous == ONVIFHealthMonitor.DEGRADED:
+            print(
+                f"\n{colorize('Device is answering ONVIF requests again.', 'green')}",
+                file=sys.stderr,
+            )
 
     def _handle_connection_error(self, e):
         """Handle connection errors by notifying the user and exiting."""
@@ -1383,7 +1365,7 @@ class InteractiveShell(cmd.Cmd):
 
     def do_quit(self, line):
         """Exit the shell"""
-        self._stop_health_check.set()
+        self._health_monitor.stop()
         print(colorize("Goodbye!", "cyan"))
         return True
 
@@ -1475,5 +1457,5 @@ class InteractiveShell(cmd.Cmd):
             self.cmdloop()
         except KeyboardInterrupt:
             print(f"\n{colorize('Goodbye!', 'cyan')}")
-            self._stop_health_check.set()
+            self._health_monitor.stop()
             sys.exit(0)
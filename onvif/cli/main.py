@@ -1,20 +1,29 @@
 # onvif/cli/main.py
 
 import argparse
+import csv
+import io
+import re
+import socket
 import sys
+import time
 import warnings
 import getpass
 import sqlite3
 import os
 import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Any, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
 
 from .. import __version__
 from ..client import ONVIFClient
 from ..operator import CacheMode
 from ..utils.discovery import ONVIFDiscovery
+from ..utils.discovery_cache import ONVIFDiscoveryCache
+from ..utils.onboarding import ONVIFOnboarding
+from ..utils.scanner import ONVIFScanner
 from .interactive import InteractiveShell
 from .utils import parse_json_params, colorize
 
@@ -37,11 +46,18 @@ Examples:
   {colorize('onvif', 'yellow')} media GetProfiles --discover --username admin
   {colorize('onvif', 'yellow')} -d -i
 
+  # Scan a subnet by unicast (where multicast is blocked)
+  {colorize('onvif', 'yellow')} --scan 192.168.10.0/24 --interactive
+
   # Discover with filtering
   {colorize('onvif', 'yellow')} --discover --filter ptz --interactive
   {colorize('onvif', 'yellow')} -d -f "C210" -i
   {colorize('onvif', 'yellow')} -d -f "audio_encoder" -u admin -p admin123 -i
 
+  # Run a command on many devices (hosts file, CSV or discovery JSON)
+  {colorize('onvif', 'yellow')} devicemgmt GetDeviceInformation --fleet cameras.txt -u admin -p admin123
+  {colorize('onvif', 'yellow')} media GetProfiles --fleet cameras.csv --workers 64 --format csv --output profiles.csv
+
   # Direct command execution
   {colorize('onvif', 'yellow')} devicemgmt GetCapabilities Category=All --host 192.168.1.17 --port 8000 --username admin --password admin123
   {colorize('onvif', 'yellow')} ptz ContinuousMove ProfileToken=Profile_1 Velocity={{'PanTilt': {{'x': -0.1, 'y': 0}}}} -H 192.168.1.17 -P 8000 -u admin -p admin123
@@ -82,6 +98,34 @@ Examples:
         action="store_true",
         help="Discover ONVIF devices on the network using WS-Discovery",
     )
+    parser.add_argument(
+        "--discovery-cache",
+        metavar="FILE",
+        help="Reuse discovery results from FILE; only stale devices are re-probed",
+    )
+    parser.add_argument(
+        "--scan",
+        metavar="SUBNET",
+        help="Scan a subnet for ONVIF devices by unicast (e.g., 192.168.1.0/24)",
+    )
+    parser.add_argument(
+        "--fleet",
+        metavar="FILE",
+        help="Run the command on every device in FILE: hosts file, CSV with a "
+        "host column, or discovery JSON ('-' reads stdin)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Devices processed concurrently in --fleet mode (default: 16)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        default="ndjson",
+        help="Result format in --fleet mode (default: ndjson)",
+    )
     parser.add_argument(
         "--filter",
         "-f",
@@ -214,17 +258,94 @@ def main():
             f"{colorize('--output', 'white')} cannot be used with {colorize('--interactive', 'white')} mode"
         )
 
+    # Handle fleet mode
+    if args.fleet:
+        for option, value in (
+            ("--host", args.host),
+            ("--discover", args.discover),
+            ("--scan", args.scan),
+            ("--interactive", args.interactive),
+        ):
+            if value:
+                parser.error(
+                    f"{colorize('--fleet', 'white')} cannot be used with {colorize(option, 'white')}"
+                )
+        try:
+            devices = load_fleet(
+                args.fleet, default_port=args.port, use_https=args.https
+            )
+        except (OSError, ValueError) as e:
+            print(f"{colorize('Error:', 'red')} {e}", file=sys.stderr)
+            sys.exit(1)
+
+        # Prompt once for credentials the file doesn't provide
+        if not args.username and any(not d["username"] for d in devices):
+            try:
+                args.username = input("Enter username: ")
+            except (EOFError, KeyboardInterrupt):
+                print("\nUsername entry cancelled.")
+                sys.exit(1)
+        if not args.password and any(not d["password"] for d in devices):
+            try:
+                args.password = getpass.getpass(
+                    f"Enter password for {colorize(args.username or 'devices', 'yellow')}: "
+                )
+            except (EOFError, KeyboardInterrupt):
+                print("\nPassword entry cancelled.")
+                sys.exit(1)
+
+        output = (
+            open(args.output, "w", newline="", encoding="utf-8")
+            if args.output
+            else sys.stdout
+        )
+        try:
+            ok, failed = run_fleet(
+                devices,
+                args.service,
+                args.method,
+                " ".join(args.params) if args.params else None,
+                username=args.username,
+                password=args.password,
+                workers=args.workers,
+                output_format=args.format,
+                output=output,
+                timeout=args.timeout,
+                cache=CacheMode(args.cache),
+                verify_ssl=not args.no_verify,
+                apply_patch=not args.no_patch,
+                wsdl_dir=args.wsdl,
+            )
+        except KeyboardInterrupt:
+            print("\nOperation cancelled by user", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        sys.exit(1 if failed else 0)
+
     # Handle discovery mode
-    if args.discover:
+    if args.discover or args.scan:
         if args.host:
+            option = "--discover" if args.discover else "--scan"
             parser.error(
-                f"{colorize('--discover', 'white')} cannot be used with {colorize('--host', 'white')}"
+                f"{colorize(option, 'white')} cannot be used with {colorize('--host', 'white')}"
+            )
+        if args.discover and args.scan:
+            parser.error(
+                f"{colorize('--discover', 'white')} cannot be used with {colorize('--scan', 'white')}"
             )
 
-        # Discover devices (pass --https flag to prioritize HTTPS XAddrs and filter term)
-        devices = discover_devices(
-            timeout=4, prefer_https=args.https, filter_term=args.filter
-        )
+        if args.scan:
+            devices = scan_devices(args.scan, filter_term=args.filter)
+        else:
+            # Discover devices (pass --https flag to prioritize HTTPS XAddrs and filter term)
+            devices = discover_devices(
+                timeout=4,
+                prefer_https=args.https,
+                filter_term=args.filter,
+                cache_path=args.discovery_cache,
+            )
 
         if not devices:
             if args.filter:
@@ -235,6 +356,17 @@ def main():
                 print(colorize("No ONVIF devices discovered. Exiting.", "red"))
             sys.exit(1)
 
+        # With credentials given, check every device before asking
+        if args.username and args.password:
+            check_devices(
+                devices,
+                args.username,
+                args.password,
+                timeout=args.timeout,
+                cache=CacheMode(args.cache),
+                verify_ssl=not args.no_verify,
+            )
+
         # Let user select a device
         selected = select_device_interactive(devices)
 
@@ -248,10 +380,10 @@ def main():
         # Use device's detected protocol (already filtered by prefer_https in discover_devices)
         # No need to override - device info already has correct protocol based on --https flag
 
-    # Validate that host is provided (either via --host or --discover) unless using --search
+    # Validate that host is provided (either via --host, --discover or --scan) unless using --search
     if not args.search and not args.host:
         parser.error(
-            f"Either {colorize('--host', 'white')} or {colorize('--discover', 'white')} must be specified"
+            f"Either {colorize('--host', 'white')}, {colorize('--discover', 'white')} or {colorize('--scan', 'white')} must be specified"
         )
 
     # Handle username prompt (skip for search mode)
@@ -547,7 +679,10 @@ def _serialize_for_json(obj: Any) -> Any:
 
 
 def discover_devices(
-    timeout: int = 4, prefer_https: bool = False, filter_term: Optional[str] = None
+    timeout: int = 4,
+    prefer_https: bool = False,
+    filter_term: Optional[str] = None,
+    cache_path: Optional[str] = None,
 ) -> list:
     """Discover ONVIF devices on the network using WS-Discovery.
 
@@ -555,6 +690,8 @@ def discover_devices(
         timeout: Discovery timeout in seconds
         prefer_https: If True, prioritize HTTPS XAddrs when available
         filter_term: Optional search term to filter devices by types or scopes
+        cache_path: Optional discovery cache file; cached devices are reused and
+            only stale ones re-probed
 
     Returns:
         List of discovered devices with connection info
@@ -566,15 +703,315 @@ def discover_devices(
     print(f"\n{colorize('Discovering ONVIF devices on network...', 'yellow')}")
     print(f"Network interface: {colorize(discovery._get_local_ip(), 'white')}")
     print(f"Timeout: {timeout}s")
+    if cache_path:
+        print(f"Cache: {colorize(cache_path, 'white')}")
     if filter_term:
         print(f"Filter: {colorize(filter_term, 'yellow')}")
     print()
 
-    devices = discovery.discover(prefer_https=prefer_https, search=filter_term)
+    if not cache_path:
+        return discovery.discover(prefer_https=prefer_https, search=filter_term)
 
+    cache = ONVIFDiscoveryCache(cache_path, discovery=discovery)
+    diff = cache.refresh()
+    for device in diff.new:
+        print(f"  {colorize('+', 'green')} {device['host']}:{device['port']}")
+    for device in diff.gone:
+        print(f"  {colorize('-', 'red')} {device['host']}:{device['port']}")
+    for before, after in diff.changed:
+        print(
+            f"  {colorize('~', 'yellow')} {before['host']}:{before['port']} -> "
+            f"{after['host']}:{after['port']}"
+        )
+    if diff.new or diff.gone or diff.changed:
+        print()
+
+    devices = cache.devices()
+    for device in devices:
+        # Cached entries keep all XAddrs; pick the one matching --https
+        discovery._parse_xaddr(device, prefer_https)
+    if filter_term:
+        devices = discovery._filter_devices(devices, filter_term)
     return devices
 
 
+def scan_devices(
+    network: str, timeout: float = 1.0, filter_term: Optional[str] = None
+) -> list:
+    """Scan a subnet for ONVIF devices by unicast (TCP ports and WS-Discovery).
+
+    Args:
+        network: CIDR network, address or hostname to scan
+        timeout: Per-connection timeout in seconds
+        filter_term: Optional search term to filter devices by types or scopes
+
+    Returns:
+        List of found devices with connection info
+    """
+    scanner = ONVIFScanner(timeout=timeout)
+
+    print(f"\n{colorize('Scanning for ONVIF devices...', 'yellow')}")
+    print(f"Network: {colorize(network, 'white')}")
+    print(f"Ports: {', '.join(str(port) for port in scanner.ports)}, WS-Discovery")
+    if filter_term:
+        print(f"Filter: {colorize(filter_term, 'yellow')}")
+    print()
+
+    devices = []
+    try:
+        for device in scanner.iter_scan(network):
+            host_port = f"{device['host']}:{device['port']}"
+            print(f"  {colorize(host_port, 'white')} ({device['source']})")
+            devices.append(device)
+    except KeyboardInterrupt:
+        print(colorize("Scan interrupted.", "cyan"))
+    print()
+
+    if filter_term:
+        # Devices found by TCP only have no types/scopes to match
+        devices = ONVIFDiscovery()._filter_devices(devices, filter_term)
+    return devices
+
+
+def check_devices(
+    devices: list, username: str, password: str, timeout: int = 10, **client_kwargs
+) -> list:
+    """Connect to all devices concurrently and record whether the credentials work.
+
+    Each device dictionary gets a "status" entry: (True, "Manufacturer Model")
+    if the device accepted the credentials, or (False, reason).
+
+    Args:
+        devices: Devices as returned by discover_devices() or scan_devices()
+        username: Username to check
+        password: Password to check
+        timeout: Request timeout in seconds
+        **client_kwargs: Other ONVIFClient arguments
+
+    Returns:
+        The same list of devices
+    """
+    print(
+        f"{colorize(f'Checking {len(devices)} device(s) as {username}...', 'yellow')}"
+    )
+    onboarding = ONVIFOnboarding(
+        [(username, password)], timeout=timeout, **client_kwargs
+    )
+    try:
+        for result in onboarding.run(devices):
+            if result.client is not None:
+                info = result.info
+                result.device["status"] = (True, f"{info.Manufacturer} {info.Model}")
+            else:
+                result.device["status"] = (False, result.error)
+    except KeyboardInterrupt:
+        print(colorize("Check interrupted.", "cyan"))
+    print()
+    return devices
+
+
+_FLEET_FIELDS = ["host", "port", "status", "latency", "elapsed", "error", "result"]
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def load_fleet(
+    path: str, default_port: int = 80, use_https: bool = False
+) -> List[Dict[str, Any]]:
+    """Read the devices of a fleet file.
+
+    Three formats are accepted:
+        - Hosts file: one host, host:port or [IPv6]:port per line ('#' comments)
+        - CSV with a header row: host, and optionally port, use_https,
+          username, password (per-device credentials override --username and
+          --password)
+        - JSON: a list of device dictionaries (discovery or scan results), a
+          discovery cache file, or NDJSON (e.g. a previous --fleet run)
+
+    Args:
+        path: File path, or '-' for stdin
+        default_port: Port for devices that don't specify one
+        use_https: Default protocol for devices that don't specify one
+
+    Returns:
+        List of devices (host, port, use_https, username, password)
+
+    Raises:
+        OSError: The file can't be read
+        ValueError: The file is malformed or lists no devices
+    """
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding="utf-8-sig") as f:
+            text = f.read()
+
+    lines = [
+        line.strip()
+        for line in text.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+    if not lines:
+        raise ValueError(f"No devices in {path}")
+
+    if lines[0].startswith(("[", "{")) and not re.match(
+        r"\[[0-9a-fA-F:.]+\]", lines[0]
+    ):
+        try:
+            rows = json.loads(text)
+        except ValueError:
+            rows = [json.loads(line) for line in lines]  # NDJSON
+        if isinstance(rows, dict):
+            rows = rows.get("devices", [rows])
+    elif "," in lines[0]:
+        rows = list(csv.DictReader(io.StringIO("\n".join(lines))))
+        if rows and "host" not in rows[0]:
+            raise ValueError(f"CSV fleet file {path} has no 'host' column")
+    else:
+        rows = [_split_host_port(line) for line in lines]
+
+    devices = []
+    for row in rows:
+        if not isinstance(row, dict) or not row.get("host"):
+            raise ValueError(f"Invalid device entry in {path}: {row!r}")
+        https = row.get("use_https")
+        if isinstance(https, str):
+            https = https.strip().lower() in ("1", "true", "yes", "https")
+        devices.append(
+            {
+                "host": row["host"],
+                "port": int(row.get("port") or default_port),
+                "use_https": use_https if https is None or https == "" else https,
+                "username": row.get("username") or None,
+                "password": row.get("password") or None,
+            }
+        )
+    return devices
+
+
+def _split_host_port(line: str) -> Dict[str, Any]:
+    """Parse host, host:port or [IPv6]:port."""
+    if line.startswith("["):
+        host, _, rest = line[1:].partition("]")
+        return {"host": host, "port": rest.lstrip(":") or None}
+    if line.count(":") == 1:
+        host, port = line.split(":")
+        return {"host": host, "port": port}
+    return {"host": line, "port": None}
+
+
+def run_fleet(
+    devices: Iterable[Dict[str, Any]],
+    service_name: str,
+    method_name: str,
+    params_str: Optional[str] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    workers: int = 16,
+    output_format: str = "ndjson",
+    output: TextIO = sys.stdout,
+    timeout: int = 10,
+    **client_kwargs,
+) -> Tuple[int, int]:
+    """Run one command on many devices concurrently, streaming results.
+
+    Every device is handled on a worker pool: a TCP reachability check, an
+    ONVIFClient sharing compiled WSDLs with all others (share_wsdl=True), and
+    the command. One record per device is written as soon as it completes,
+    with host, port, status ("ok" or "error"), latency (command round trip in
+    seconds), elapsed (including connecting), error and result.
+
+    Args:
+        devices: Devices as returned by load_fleet()
+        service_name: Service accessor (e.g., devicemgmt)
+        method_name: Method name (e.g., GetDeviceInformation)
+        params_str: Method parameters (as on the command line)
+        username: Username for devices without their own
+        password: Password for devices without their own
+        workers: Devices processed concurrently
+        output_format: "ndjson" or "csv"
+        output: Stream to write records to
+        timeout: Request timeout in seconds
+        **client_kwargs: Other ONVIFClient arguments
+
+    Returns:
+        Tuple of (succeeded, failed) device counts
+    """
+    devices = list(devices)
+    writer = None
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=_FLEET_FIELDS)
+        writer.writeheader()
+
+    def run(device):
+        start = time.monotonic()
+        record = {"host": device["host"], "port": device["port"]}
+        latency = None
+        try:
+            try:
+                socket.create_connection(
+                    (device["host"], device["port"]), timeout=min(timeout, 5)
+                ).close()
+            except OSError as e:
+                raise ConnectionError(f"unreachable: {e}") from e
+
+            client = ONVIFClient(
+                device["host"],
+                device["port"],
+                device.get("username") or username,
+                device.get("password") or password,
+                timeout=timeout,
+                use_https=device.get("use_https", False),
+                share_wsdl=True,
+                **client_kwargs,
+            )
+            command_start = time.monotonic()
+            result = execute_command(client, service_name, method_name, params_str)
+            latency = time.monotonic() - command_start
+            record.update(status="ok", error=None, result=_serialize_for_json(result))
+        except Exception as e:
+            record.update(
+                status="error", error=_ANSI_ESCAPE.sub("", str(e)), result=None
+            )
+        record["latency"] = round(latency, 4) if latency is not None else None
+        record["elapsed"] = round(time.monotonic() - start, 4)
+        return record
+
+    print(
+        f"Running {service_name}.{method_name} on {len(devices)} device(s) "
+        f"with {workers} workers",
+        file=sys.stderr,
+    )
+    started = time.monotonic()
+    succeeded = failed = 0
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for future in as_completed([pool.submit(run, device) for device in devices]):
+            record = future.result()
+            if record["status"] == "ok":
+                succeeded += 1
+            else:
+                failed += 1
+
+            if writer is not None:
+                row = dict(record)
+                if row["result"] is not None:
+                    row["result"] = json.dumps(row["result"], ensure_ascii=False)
+                writer.writerow(row)
+            else:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    print(
+        f"{colorize(f'{succeeded} ok', 'green')}, "
+        f"{colorize(f'{failed} failed', 'red' if failed else 'white')} "
+        f"in {time.monotonic() - started:.1f}s",
+        file=sys.stderr,
+    )
+    return succeeded, failed
+
+
 def select_device_interactive(devices: list) -> Optional[Tuple[str, int, bool]]:
     """Display devices and allow user to select one interactively.
 
@@ -598,13 +1035,19 @@ def select_device_interactive(devices: list) -> Optional[Tuple[str, int, bool]]:
         )
         print(f"\n{idx_str} {colorize(host_port, 'yellow')} ({protocol_indicator})")
 
+        if "status" in device:
+            ok, detail = device["status"]
+            mark = colorize("✓", "green") if ok else colorize("✗", "red")
+            print(f"    [status] {mark} {detail}")
+
         # Remove uuid: or urn:uuid: prefix from EPR
         epr_display = device["epr"]
         if epr_display.startswith("urn:uuid:"):
             epr_display = epr_display.replace("urn:uuid:", "")
         elif epr_display.startswith("uuid:"):
             epr_display = epr_display.replace("uuid:", "")
-        print(f"    [id] {epr_display}")
+        if epr_display:
+            print(f"    [id] {epr_display}")
 
         if device["xaddrs"]:
             xaddrs_parts = [f"[{xaddr}]" for xaddr in device["xaddrs"]]
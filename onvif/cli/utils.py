@@ -7,6 +7,7 @@ from typing import Any, Dict, Optional
 from lxml import etree
 import re
 
+from ..utils.codegen import format_documentation, get_operation_metadata
 
 # ONVIF namespace to service name mapping (used globally)
 # Format: namespace -> list of (service_name, binding_pattern)
@@ -236,92 +237,41 @@ def get_method_documentation(service_obj, method_name: str) -> Optional[Dict[str
     optional_args = []
 
     try:
-        # 1. Get documentation from WSDL (existing logic)
-        wsdl_path = service_obj.operator.wsdl_path
-
-        # Use secure lxml parser
-        parser = etree.XMLParser(
-            resolve_entities=False,
-            no_network=True,
-            remove_blank_text=True,
+        # 1. Get documentation from prebuilt metadata, falling back to the WSDL
+        operator = service_obj.operator
+        wsdl_path = operator.wsdl_path
+        op_meta = get_operation_metadata(
+            getattr(operator, "binding", None), method_name, wsdl_path
         )
-        tree = etree.parse(wsdl_path, parser)
-        root = tree.getroot()
-        namespaces = {
-            node[0]: node[1] for node in etree.iterparse(wsdl_path, events=["start-ns"])
-        }
-        namespaces["wsdl"] = "http://schemas.xmlsoap.org/wsdl/"
-        namespaces["xs"] = "http://www.w3.org/2001/XMLSchema"
 
-        # Find the operation
-        operation = root.find(f".//wsdl:operation[@name='{method_name}']", namespaces)
-        if operation is None:
-            return None
+        if op_meta is not None:
+            doc_text = op_meta["doc"] or colorize("No description available.", "reset")
+        else:
+            # Use secure lxml parser
+            parser = etree.XMLParser(
+                resolve_entities=False,
+                no_network=True,
+                remove_blank_text=True,
+            )
+            tree = etree.parse(wsdl_path, parser)
+            root = tree.getroot()
+            namespaces = {
+                node[0]: node[1]
+                for node in etree.iterparse(wsdl_path, events=["start-ns"])
+            }
+            namespaces["wsdl"] = "http://schemas.xmlsoap.org/wsdl/"
+            namespaces["xs"] = "http://www.w3.org/2001/XMLSchema"
 
-        # 1. Get documentation
-        doc_element = operation.find("wsdl:documentation", namespaces)
-        if doc_element is not None:
-            # Handle mixed content (text and tags like <br/>, <ul>, <li>)
-            text_parts = []
-            if doc_element.text:
-                text_parts.append(doc_element.text)
-
-            for child in doc_element:
-                if child.tag.endswith("ul") or child.tag.endswith("ol"):
-                    text_parts.append("\n")
-                    if child.text:
-                        text_parts.append(child.text.strip())
-                    for i, li in enumerate(child):
-                        if li.tag.endswith("li"):
-                            # Join all text within the <li> tag, then strip and prepend '- '
-                            li_text = (
-                                ("".join(li.itertext()))
-                                .strip()
-                                .replace("\n", " ")
-                                .replace("\r", "")
-                            )
-                            li_text = " ".join(li_text.split())
-                            text_parts.append(
-                                f"\n  - {i+1}. {li_text}"
-                                if child.tag.endswith("ol")
-                                else f"\n  - {li_text}"
-                            )
-                    if child.tail:
-                        if not child.tag.endswith("ol"):
-                            text_parts.append("\n\n")  # Add paragraph break after list
-                        text_parts.append(child.tail)
-                elif child.tag.endswith("br"):
-                    text_parts.append("\n\n")  # Paragraph break
-                    if child.tail:
-                        text_parts.append(child.tail)
-                else:  # Other tags, just get text
-                    if child.text:
-                        text_parts.append(child.text)
-                    if child.tail:
-                        text_parts.append(child.tail)
-
-            # Join all parts into a single string
-            full_text = "".join(text_parts)
-
-            # Normalize whitespace while preserving paragraph and list structures
-            paragraphs = full_text.split("\n\n")
-            cleaned_paragraphs = []
-            for para in paragraphs:
-                # Check if the paragraph is a list
-                if "- " in para:
-                    list_lines = para.strip().split("\n")
-                    cleaned_list_lines = [
-                        " ".join(line.split()) for line in list_lines if line.strip()
-                    ]
-                    cleaned_paragraphs.append("\n".join(cleaned_list_lines))
-                else:
-                    # It's a normal paragraph, collapse all whitespace
-                    cleaned_para = " ".join(para.split())
-                    cleaned_paragraphs.append(cleaned_para)
+            # Find the operation
+            operation = root.find(
+                f".//wsdl:operation[@name='{method_name}']", namespaces
+            )
+            if operation is None:
+                return None
 
-            doc_text = "\n\n".join(cleaned_paragraphs)
-        else:
-            doc_text = colorize("No description available.", "reset")
+            doc_text = format_documentation(
+                operation.find("wsdl:documentation", namespaces)
+            ) or colorize("No description available.", "reset")
 
         # 2. Get parameters from Python method signature using inspect
         # Use object.__getattribute__ to bypass ONVIFService wrapper and get original method
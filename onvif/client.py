@@ -1,55 +1,39 @@
 # onvif/client.py
 
 from urllib.parse import urlparse, urlunparse
-from functools import wraps
+from functools import partial, wraps
 import logging
+import sys
 
-from .services import (
-    Device,
-    Events,
-    PullPoint,
-    Notification,
-    Subscription,
-    PausableSubscription,
-    Imaging,
-    Media,
-    Media2,
-    PTZ,
-    DeviceIO,
-    AccessControl,
-    AccessRules,
-    ActionEngine,
-    Analytics,
-    RuleEngine,
-    AnalyticsDevice,
-    AppManagement,
-    AuthenticationBehavior,
-    Credential,
-    Recording,
-    Replay,
-    Display,
-    DoorControl,
-    Provisioning,
-    Receiver,
-    Schedule,
-    Search,
-    Thermal,
-    Uplink,
-    AdvancedSecurity,
-    JWT,
-    Keystore,
-    TLSServer,
-    Dot1X,
-    AuthorizationServer,
-    MediaSigning,
-)
 from .operator import CacheMode
 from .utils import ONVIFWSDL, ZeepPatcher, XMLCapturePlugin, ONVIFOperationException
+from .utils.service_cache import ServiceCache, remaining_lifetime
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
+def __getattr__(name):
+    # Service classes (Device, Media, PTZ, ...) are imported on first use
+    from . import services
+
+    if name not in services.__all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(services, name)
+    globals()[name] = value  # Cache for subsequent lookups
+    return value
+
+
+def _service_class(name: str):
+    """Resolve a service class by name, importing its module on first use.
+
+    Looked up through the module object so that module attributes (including
+    ones replaced by unittest.mock.patch) take precedence.
+    """
+    return getattr(sys.modules[__name__], name)
+
+
 def service(func):
     """Decorator to wrap service accessor methods with ONVIFOperationException handling.
 
@@ -113,6 +97,8 @@ class ONVIFClient:
         capture_xml: bool = False,
         wsdl_dir: str = None,
         plugins: list = None,
+        max_subscriptions: int = 64,
+        share_wsdl: bool = False,
     ):
         logger.info(f"Initializing ONVIF client for {host}:{port}")
         logger.debug(
@@ -160,6 +146,7 @@ class ONVIFClient:
             "verify_ssl": verify_ssl,
             "apply_patch": apply_patch,
             "plugins": all_plugins if all_plugins else None,
+            "share_wsdl": share_wsdl,
         }
 
         # Device Management (Core) service is always available
@@ -211,12 +198,12 @@ class ONVIFClient:
         # Lazy init for other services
 
         self._events = None
-        self._pullpoints = {}  # Dictionary for multiple PullPoint instances
+        # Per-subscription services, keyed by XAddr (bounded, see ServiceCache)
+        self._pullpoints = ServiceCache(max_subscriptions)
         self._notification = None
-        self._subscriptions = {}  # Dictionary for multiple Subscription instances
-        self._pausable_subscriptions = (
-            {}
-        )  # Dictionary for multiple PausableSubscription instances
+        self._subscriptions = ServiceCache(max_subscriptions)
+        self._pausable_subscriptions = ServiceCache(max_subscriptions)
+        self._topic_index = None  # Parsed GetEventProperties TopicSet
 
         self._imaging = None
 
@@ -400,7 +387,7 @@ class ONVIFClient:
     def devicemgmt(self):
         if self._devicemgmt is None:
             logger.debug("Initializing Device Management service")
-            self._devicemgmt = Device(**self.common_args)
+            self._devicemgmt = _service_class("Device")(**self.common_args)
         return self._devicemgmt
 
     # Core (Events)
@@ -409,7 +396,7 @@ class ONVIFClient:
     def events(self):
         if self._events is None:
             logger.debug("Initializing Events service")
-            self._events = Events(
+            self._events = _service_class("Events")(
                 xaddr=self._get_xaddr("events", "Events"), **self.common_args
             )
         return self._events
@@ -431,16 +418,15 @@ class ONVIFClient:
                 "SubscriptionReference.Address missing in subscription response"
             )
 
-        if xaddr not in self._pullpoints:
-            self._pullpoints[xaddr] = PullPoint(xaddr=xaddr, **self.common_args)
-
-        return self._pullpoints[xaddr]
+        return self._cached_subscription_service(
+            self._pullpoints, "PullPoint", xaddr, SubscriptionRef
+        )
 
     @service
     def notification(self):
         if self._notification is None:
             logger.debug("Initializing Notification service")
-            self._notification = Notification(
+            self._notification = _service_class("Notification")(
                 xaddr=self._get_xaddr("notification", "Events"), **self.common_args
             )
         return self._notification
@@ -462,10 +448,9 @@ class ONVIFClient:
                 "SubscriptionReference.Address missing in subscription response"
             )
 
-        if xaddr not in self._subscriptions:
-            self._subscriptions[xaddr] = Subscription(xaddr=xaddr, **self.common_args)
-
-        return self._subscriptions[xaddr]
+        return self._cached_subscription_service(
+            self._subscriptions, "Subscription", xaddr, SubscriptionRef
+        )
 
     @service
     def pausable_subscription(self, SubscriptionRef):
@@ -484,12 +469,99 @@ class ONVIFClient:
                 "SubscriptionReference.Address missing in subscription response"
             )
 
-        if xaddr not in self._pausable_subscriptions:
-            self._pausable_subscriptions[xaddr] = PausableSubscription(
-                xaddr=xaddr, **self.common_args
-            )
+        return self._cached_subscription_service(
+            self._pausable_subscriptions, "PausableSubscription", xaddr, SubscriptionRef
+        )
+
+    def _cached_subscription_service(self, cache, class_name, xaddr, SubscriptionRef):
+        """Get or create a per-subscription service in its bounded cache.
+
+        The entry expires at the reference's TerminationTime (plus grace); Renew
+        extends it and Unsubscribe evicts it from all caches.
+        """
+        instance = cache.get(xaddr)
+        expires_in = remaining_lifetime(SubscriptionRef)
+        if instance is None:
+            instance = _service_class(class_name)(xaddr=xaddr, **self.common_args)
+            instance._lifecycle = partial(self._subscription_lifecycle, xaddr)
+            cache.put(xaddr, instance, expires_in)
+        elif expires_in is not None:
+            cache.extend(xaddr, expires_in)
+        return instance
+
+    def _subscription_lifecycle(self, xaddr, operation, response=None):
+        """Keep the subscription caches in sync with Renew/Unsubscribe."""
+        caches = (self._pullpoints, self._subscriptions, self._pausable_subscriptions)
+        if operation == "Unsubscribe":
+            for cache in caches:
+                cache.evict(xaddr, reason="unsubscribed")
+        elif operation == "Renew":
+            expires_in = remaining_lifetime(response)
+            if expires_in is not None:
+                for cache in caches:
+                    cache.extend(xaddr, expires_in)
+
+    def subscription_cache_stats(self):
+        """Counters of the per-subscription service caches.
+
+        Returns:
+            dict: {"pullpoints", "subscriptions", "pausable_subscriptions"}, each
+                with size, hits, misses, evicted_lru, evicted_expired and
+                evicted_unsubscribed
+        """
+        return {
+            "pullpoints": self._pullpoints.metrics(),
+            "subscriptions": self._subscriptions.metrics(),
+            "pausable_subscriptions": self._pausable_subscriptions.metrics(),
+        }
 
-        return self._pausable_subscriptions[xaddr]
+    def event_stream(self, **kwargs):
+        """Create a background event stream with an auto-renewing PullPoint.
+
+        Args:
+            **kwargs: Passed to ONVIFEventStream (Filter, pull_timeout, ...)
+
+        Returns:
+            ONVIFEventStream: Stream (not started; use start() or a with block)
+        """
+        from .utils.event_stream import ONVIFEventStream
+
+        return ONVIFEventStream(self, **kwargs)
+
+    def topic_index(self, refresh: bool = False):
+        """Parsed topic tree of the device (Events.GetEventProperties).
+
+        The index is fetched once and cached on the client.
+
+        Args:
+            refresh: Fetch GetEventProperties again instead of using the cache
+
+        Returns:
+            ONVIFTopicIndex: Topic lookup, wildcard matching and filter builder
+        """
+        if self._topic_index is None or refresh:
+            from .utils.topic_index import ONVIFTopicIndex
+
+            logger.debug("Building event topic index")
+            self._topic_index = ONVIFTopicIndex.from_client(self)
+        return self._topic_index
+
+    def inventory(self, max_concurrency: int = 4, sections=None):
+        """Collect a serializable inventory record of the device.
+
+        Independent calls run concurrently (at most max_concurrency in flight);
+        per-profile and per-video-source calls fan out as their inputs arrive.
+
+        Args:
+            max_concurrency: Requests in flight to the device (default: 4)
+            sections: Sections to collect (default: device, media, imaging, ptz)
+
+        Returns:
+            dict: Inventory record (see ONVIFInventory)
+        """
+        from .utils.inventory import ONVIFInventory, SECTIONS
+
+        return ONVIFInventory(self, max_concurrency, sections or SECTIONS).collect()
 
     # Imaging
 
@@ -497,7 +569,7 @@ class ONVIFClient:
     def imaging(self):
         if self._imaging is None:
             logger.debug("Initializing Imaging service")
-            self._imaging = Imaging(
+            self._imaging = _service_class("Imaging")(
                 xaddr=self._get_xaddr("imaging", "Imaging"), **self.common_args
             )
         return self._imaging
@@ -508,7 +580,7 @@ class ONVIFClient:
     def media(self):
         if self._media is None:
             logger.debug("Initializing Media service")
-            self._media = Media(
+            self._media = _service_class("Media")(
                 xaddr=self._get_xaddr("media", "Media"), **self.common_args
             )
         return self._media
@@ -517,7 +589,7 @@ class ONVIFClient:
     def media2(self):
         if self._media2 is None:
             logger.debug("Initializing Media2 service")
-            self._media2 = Media2(
+            self._media2 = _service_class("Media2")(
                 xaddr=self._get_xaddr("media2", "Media2"), **self.common_args
             )
         return self._media2
@@ -528,7 +600,9 @@ class ONVIFClient:
     def ptz(self):
         if self._ptz is None:
             logger.debug("Initializing PTZ service")
-            self._ptz = PTZ(xaddr=self._get_xaddr("ptz", "PTZ"), **self.common_args)
+            self._ptz = _service_class("PTZ")(
+                xaddr=self._get_xaddr("ptz", "PTZ"), **self.common_args
+            )
         return self._ptz
 
     # DeviceIO
@@ -537,7 +611,7 @@ class ONVIFClient:
     def deviceio(self):
         if self._deviceio is None:
             logger.debug("Initializing DeviceIO service")
-            self._deviceio = DeviceIO(
+            self._deviceio = _service_class("DeviceIO")(
                 xaddr=self._get_xaddr("deviceio", "DeviceIO"), **self.common_args
             )
         return self._deviceio
@@ -548,7 +622,7 @@ class ONVIFClient:
     def display(self):
         if self._display is None:
             logger.debug("Initializing Display service")
-            self._display = Display(
+            self._display = _service_class("Display")(
                 xaddr=self._get_xaddr("display", "Display"), **self.common_args
             )
         return self._display
@@ -559,7 +633,7 @@ class ONVIFClient:
     def analytics(self):
         if self._analytics is None:
             logger.debug("Initializing Analytics service")
-            self._analytics = Analytics(
+            self._analytics = _service_class("Analytics")(
                 xaddr=self._get_xaddr("analytics", "Analytics"), **self.common_args
             )
         return self._analytics
@@ -568,7 +642,7 @@ class ONVIFClient:
     def ruleengine(self):
         if self._ruleengine is None:
             logger.debug("Initializing RuleEngine service")
-            self._ruleengine = RuleEngine(
+            self._ruleengine = _service_class("RuleEngine")(
                 xaddr=self._get_xaddr("ruleengine", "Analytics"), **self.common_args
             )
         return self._ruleengine
@@ -577,7 +651,7 @@ class ONVIFClient:
     def analyticsdevice(self):
         if self._analyticsdevice is None:
             logger.debug("Initializing AnalyticsDevice service")
-            self._analyticsdevice = AnalyticsDevice(
+            self._analyticsdevice = _service_class("AnalyticsDevice")(
                 xaddr=self._get_xaddr("analyticsdevice", "AnalyticsDevice"),
                 **self.common_args,
             )
@@ -589,7 +663,7 @@ class ONVIFClient:
     def accesscontrol(self):
         if self._accesscontrol is None:
             logger.debug("Initializing AccessControl service")
-            self._accesscontrol = AccessControl(
+            self._accesscontrol = _service_class("AccessControl")(
                 xaddr=self._get_xaddr("accesscontrol", "AccessControl"),
                 **self.common_args,
             )
@@ -599,7 +673,7 @@ class ONVIFClient:
     def doorcontrol(self):
         if self._doorcontrol is None:
             logger.debug("Initializing DoorControl service")
-            self._doorcontrol = DoorControl(
+            self._doorcontrol = _service_class("DoorControl")(
                 xaddr=self._get_xaddr("doorcontrol", "DoorControl"), **self.common_args
             )
         return self._doorcontrol
@@ -610,7 +684,7 @@ class ONVIFClient:
     def accessrules(self):
         if self._accessrules is None:
             logger.debug("Initializing AccessRules service")
-            self._accessrules = AccessRules(
+            self._accessrules = _service_class("AccessRules")(
                 xaddr=self._get_xaddr("accessrules", "AccessRules"), **self.common_args
             )
         return self._accessrules
@@ -621,7 +695,7 @@ class ONVIFClient:
     def actionengine(self):
         if self._actionengine is None:
             logger.debug("Initializing ActionEngine service")
-            self._actionengine = ActionEngine(
+            self._actionengine = _service_class("ActionEngine")(
                 xaddr=self._get_xaddr("actionengine", "ActionEngine"),
                 **self.common_args,
             )
@@ -633,7 +707,7 @@ class ONVIFClient:
     def appmanagement(self):
         if self._appmanagement is None:
             logger.debug("Initializing AppManagement service")
-            self._appmanagement = AppManagement(
+            self._appmanagement = _service_class("AppManagement")(
                 xaddr=self._get_xaddr("appmgmt", "AppManagement"),
                 **self.common_args,
             )
@@ -645,7 +719,7 @@ class ONVIFClient:
     def authenticationbehavior(self):
         if self._authenticationbehavior is None:
             logger.debug("Initializing AuthenticationBehavior service")
-            self._authenticationbehavior = AuthenticationBehavior(
+            self._authenticationbehavior = _service_class("AuthenticationBehavior")(
                 xaddr=self._get_xaddr(
                     "authenticationbehavior", "AuthenticationBehavior"
                 ),
@@ -659,7 +733,7 @@ class ONVIFClient:
     def credential(self):
         if self._credential is None:
             logger.debug("Initializing Credential service")
-            self._credential = Credential(
+            self._credential = _service_class("Credential")(
                 xaddr=self._get_xaddr("credential", "Credential"),
                 **self.common_args,
             )
@@ -671,7 +745,7 @@ class ONVIFClient:
     def recording(self):
         if self._recording is None:
             logger.debug("Initializing Recording service")
-            self._recording = Recording(
+            self._recording = _service_class("Recording")(
                 xaddr=self._get_xaddr("recording", "Recording"),
                 **self.common_args,
             )
@@ -683,7 +757,7 @@ class ONVIFClient:
     def replay(self):
         if self._replay is None:
             logger.debug("Initializing Replay service")
-            self._replay = Replay(
+            self._replay = _service_class("Replay")(
                 xaddr=self._get_xaddr("replay", "Replay"),
                 **self.common_args,
             )
@@ -695,7 +769,7 @@ class ONVIFClient:
     def provisioning(self):
         if self._provisioning is None:
             logger.debug("Initializing Provisioning service")
-            self._provisioning = Provisioning(
+            self._provisioning = _service_class("Provisioning")(
                 xaddr=self._get_xaddr("provisioning", "Provisioning"),
                 **self.common_args,
             )
@@ -707,7 +781,7 @@ class ONVIFClient:
     def receiver(self):
         if self._receiver is None:
             logger.debug("Initializing Receiver service")
-            self._receiver = Receiver(
+            self._receiver = _service_class("Receiver")(
                 xaddr=self._get_xaddr("receiver", "Receiver"),
                 **self.common_args,
             )
@@ -719,7 +793,7 @@ class ONVIFClient:
     def schedule(self):
         if self._schedule is None:
             logger.debug("Initializing Schedule service")
-            self._schedule = Schedule(
+            self._schedule = _service_class("Schedule")(
                 xaddr=self._get_xaddr("schedule", "Schedule"),
                 **self.common_args,
             )
@@ -731,7 +805,7 @@ class ONVIFClient:
     def search(self):
         if self._search is None:
             logger.debug("Initializing Search service")
-            self._search = Search(
+            self._search = _service_class("Search")(
                 xaddr=self._get_xaddr("search", "Search"),
                 **self.common_args,
             )
@@ -743,7 +817,7 @@ class ONVIFClient:
     def thermal(self):
         if self._thermal is None:
             logger.debug("Initializing Thermal service")
-            self._thermal = Thermal(
+            self._thermal = _service_class("Thermal")(
                 xaddr=self._get_xaddr("thermal", "Thermal"),
                 **self.common_args,
             )
@@ -755,7 +829,7 @@ class ONVIFClient:
     def uplink(self):
         if self._uplink is None:
             logger.debug("Initializing Uplink service")
-            self._uplink = Uplink(
+            self._uplink = _service_class("Uplink")(
                 xaddr=self._get_xaddr("uplink", "Uplink"),
                 **self.common_args,
             )
@@ -767,7 +841,7 @@ class ONVIFClient:
     def security(self):
         if self._security is None:
             logger.debug("Initializing Security service")
-            self._security = AdvancedSecurity(
+            self._security = _service_class("AdvancedSecurity")(
                 **self.common_args,
             )
         return self._security
@@ -776,7 +850,7 @@ class ONVIFClient:
     def jwt(self):
         if self._jwt is None:
             logger.debug("Initializing JWT service")
-            self._jwt = JWT(**self.common_args)
+            self._jwt = _service_class("JWT")(**self.common_args)
         return self._jwt
 
     @service
@@ -784,7 +858,7 @@ class ONVIFClient:
         if self._keystore is None:
             logger.debug("Initializing Keystore service")
             xaddr = self._rewrite_xaddr_if_needed(xaddr)
-            self._keystore = Keystore(xaddr=xaddr, **self.common_args)
+            self._keystore = _service_class("Keystore")(xaddr=xaddr, **self.common_args)
         return self._keystore
 
     @service
@@ -792,7 +866,9 @@ class ONVIFClient:
         if self._tlsserver is None:
             logger.debug("Initializing TLSServer service")
             xaddr = self._rewrite_xaddr_if_needed(xaddr)
-            self._tlsserver = TLSServer(xaddr=xaddr, **self.common_args)
+            self._tlsserver = _service_class("TLSServer")(
+                xaddr=xaddr, **self.common_args
+            )
         return self._tlsserver
 
     @service
@@ -800,7 +876,7 @@ class ONVIFClient:
         if self._dot1x is None:
             logger.debug("Initializing Dot1X service")
             xaddr = self._rewrite_xaddr_if_needed(xaddr)
-            self._dot1x = Dot1X(xaddr=xaddr, **self.common_args)
+            self._dot1x = _service_class("Dot1X")(xaddr=xaddr, **self.common_args)
         return self._dot1x
 
     @service
@@ -808,7 +884,7 @@ class ONVIFClient:
         if self._authorizationserver is None:
             logger.debug("Initializing AuthorizationServer service")
             xaddr = self._rewrite_xaddr_if_needed(xaddr)
-            self._authorizationserver = AuthorizationServer(
+            self._authorizationserver = _service_class("AuthorizationServer")(
                 xaddr=xaddr, **self.common_args
             )
         return self._authorizationserver
@@ -818,5 +894,7 @@ class ONVIFClient:
         if self._mediasigning is None:
             logger.debug("Initializing MediaSigning service")
             xaddr = self._rewrite_xaddr_if_needed(xaddr)
-            self._mediasigning = MediaSigning(xaddr=xaddr, **self.common_args)
+            self._mediasigning = _service_class("MediaSigning")(
+                xaddr=xaddr, **self.common_args
+            )
         return self._mediasigning
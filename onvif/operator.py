@@ -5,11 +5,14 @@ import warnings
 import logging
 import requests
 import urllib3
+import threading
+import weakref
 
 from enum import Enum
 from zeep import Settings, Transport, Client, CachingClient
 from zeep.cache import SqliteCache
 from zeep.exceptions import Fault
+from zeep.wsdl import Document
 from zeep.wsse.username import UsernameToken
 
 from .utils import ONVIFOperationException, ZeepPatcher
@@ -17,6 +20,64 @@ from .utils import ONVIFOperationException, ZeepPatcher
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# Memoized create_type() lookups, in two levels:
+# - Where each type name resolves, shared by every operator of the same WSDL
+#   and binding even when each compiles its own Document (share_wsdl=False):
+#   {(wsdl_path, binding): {type_name: (qname, is_element) | _TYPE_NOT_FOUND}}
+# - Factories and nested-initialization plans, keyed weakly by the compiled
+#   Document they belong to (objects built from another Document's types are
+#   serialized with an xsi:type attribute): {wsdl: {type_name: (factory, plan)}}
+_TYPE_NAMES = {}
+_TYPE_CACHE = weakref.WeakKeyDictionary()
+_TYPE_CACHE_LOCK = threading.Lock()
+_TYPE_NOT_FOUND = object()
+
+# Compiled WSDL documents shared by operators created with share_wsdl=True,
+# keyed by WSDL path: {wsdl_path: Document}. Parsing a WSDL and its schemas is
+# most of the cost of creating a service, so onboarding many devices of a
+# fleet compiles each WSDL once per process instead of once per device. The
+# map holds documents weakly: a document lives as long as a zeep client built
+# from it, and is compiled again once every such client is gone.
+_DOCUMENT_CACHE = weakref.WeakValueDictionary()
+_DOCUMENT_LOCKS = {}
+_DOCUMENT_CACHE_LOCK = threading.Lock()
+
+
+def _shared_document(wsdl_path: str, transport: Transport, settings: Settings):
+    """Return the process-wide compiled Document for wsdl_path.
+
+    The document is compiled with the first caller's transport settings (WSDL
+    cache, load timeout, certificate verification) and zeep settings; later
+    callers reuse it as is. It gets its own Transport and session so it doesn't
+    keep the first caller's session alive.
+    """
+    document = _DOCUMENT_CACHE.get(wsdl_path)
+    if document is not None:
+        return document
+
+    with _DOCUMENT_CACHE_LOCK:
+        lock = _DOCUMENT_LOCKS.setdefault(wsdl_path, threading.Lock())
+
+    # One lock per WSDL: concurrent operators wait for the first parse instead
+    # of all compiling the same document
+    with lock:
+        document = _DOCUMENT_CACHE.get(wsdl_path)
+        if document is None:
+            logger.debug(f"Compiling shared WSDL document: {wsdl_path}")
+            session = requests.Session()
+            session.verify = transport.session.verify
+            document = Document(
+                wsdl_path,
+                Transport(
+                    cache=transport.cache,
+                    timeout=transport.load_timeout,
+                    session=session,
+                ),
+                settings=settings,
+            )
+            _DOCUMENT_CACHE[wsdl_path] = document
+    return document
+
 
 class CacheMode(Enum):
     """WSDL caching strategies for ONVIF client performance optimization.
@@ -69,10 +130,13 @@ class ONVIFOperator:
         password (str): ONVIF password
         timeout (int): Request timeout in seconds
         apply_patch (bool): Whether to apply xsd:any flattening patch
+        share_wsdl (bool): Whether the compiled WSDL document is shared process-wide
+            (compiled with the first sharing operator's cache mode and settings)
         address (str): Service endpoint URL (XAddr)
         client: Zeep SOAP client instance
         service: Zeep service proxy for making SOAP calls
         service_name (str): Name of the ONVIF service (e.g., "Device", "Media")
+        binding (str): Binding QName the service was created from
     """
 
     def __init__(
@@ -92,6 +156,7 @@ class ONVIFOperator:
         verify_ssl: bool = True,
         apply_patch: bool = True,
         plugins: list = None,
+        share_wsdl: bool = False,
     ):
         logger.debug(f"Creating ONVIFOperator for {host}:{port} with WSDL: {wsdl_path}")
 
@@ -102,6 +167,7 @@ class ONVIFOperator:
         self.password = password
         self.timeout = timeout
         self.apply_patch = apply_patch
+        self.share_wsdl = share_wsdl
 
         if xaddr:
             self.address = xaddr
@@ -155,8 +221,16 @@ class ONVIFOperator:
 
         logger.debug(f"Using cache mode: {cache.value}")
 
+        # The session, timeout and credentials stay per operator; only the parsed
+        # WSDL is shared (the cache modes still apply to the first parse)
+        wsdl = (
+            _shared_document(self.wsdl_path, transport, settings)
+            if share_wsdl
+            else self.wsdl_path
+        )
+
         self.client = ClientType(
-            wsdl=self.wsdl_path,
+            wsdl=wsdl,
             transport=transport,
             settings=settings,
             wsse=wsse,
@@ -166,7 +240,13 @@ class ONVIFOperator:
         if not binding:
             raise ValueError("Bindings must be set according to the WSDL service")
 
+        self.binding = binding
         self.service = self.client.create_service(binding, self.address)
+
+        # Precompute operation handles (zeep OperationProxy) so that call() does a
+        # plain dict lookup instead of going through ServiceProxy.__getattr__
+        self._operations = dict(getattr(self.service, "_operations", None) or {})
+
         self.service_name = binding.split("}")[-1].replace(
             "Binding", ""
         )  # Store cleaned service name for logging context
@@ -192,10 +272,7 @@ class ONVIFOperator:
         """
         logger.debug(f"Calling ONVIF method: {self.service_name}.{method}")
 
-        try:
-            func = getattr(self.service, method)
-        except AttributeError as e:
-            raise ONVIFOperationException(operation=method, original_exception=e)
+        func = self._get_operation(method)
 
         try:
             result = func(*args, **kwargs)
@@ -211,6 +288,53 @@ class ONVIFOperator:
         except Exception as e:
             raise ONVIFOperationException(operation=method, original_exception=e)
 
+    def call_raw(self, method: str, *args, **kwargs) -> bytes:
+        """Call an ONVIF service operation and return the raw SOAP response.
+
+        The request is built by zeep as usual, but the response envelope is returned
+        unparsed, so hot paths (e.g. PullMessages on event-heavy devices) can decode
+        it with a purpose-built parser. Plugins' ingress() hooks are not called.
+
+        Args:
+            method: Name of the ONVIF operation to call (e.g., "PullMessages")
+            *args: Positional arguments to pass to the operation
+            **kwargs: Keyword arguments to pass to the operation
+
+        Returns:
+            bytes: Response envelope
+
+        Raises:
+            ONVIFOperationException: If the operation fails or returns a SOAP fault
+        """
+        logger.debug(f"Calling ONVIF method (raw): {self.service_name}.{method}")
+
+        func = self._get_operation(method)
+
+        try:
+            with self.client.settings(raw_response=True):
+                response = func(*args, **kwargs)
+
+            if response.status_code != 200:
+                # Let zeep turn the error response into a Fault (or TransportError)
+                binding = self.service._binding
+                binding.process_reply(self.client, binding.get(method), response)
+            return response.content
+
+        except Fault as e:
+            raise ONVIFOperationException(operation=method, original_exception=e)
+        except Exception as e:
+            raise ONVIFOperationException(operation=method, original_exception=e)
+
+    def _get_operation(self, method: str):
+        """Return the bound operation handle for a method name."""
+        func = self._operations.get(method)
+        if func is None:
+            try:
+                func = getattr(self.service, method)
+            except AttributeError as e:
+                raise ONVIFOperationException(operation=method, original_exception=e)
+        return func
+
     def create_type(self, type_name: str):
         """
         Create a type instance from WSDL schema for the given type name.
@@ -218,6 +342,10 @@ class ONVIFOperator:
         Recursively initializes nested complex types so that fields like TimeZone, DateTime,
         Date, and Time are properly instantiated as objects rather than None.
 
+        The resolved element/type and its nested-initialization plan are memoized per
+        compiled WSDL, so repeated calls (e.g. building SetImagingSettings for many
+        devices) skip the namespace lookups and the XSD tree walk and only instantiate.
+
         Args:
             type_name (str): Name of the type to create (e.g., 'SetHostname', 'SetIPAddressFilter')
 
@@ -229,68 +357,157 @@ class ONVIFOperator:
         """
         logger.debug(f"Creating type instance for: {type_name}")
 
-        # Method 1: Try to get element from WSDL (works for operation parameters)
+        cache = self._get_type_cache()
+        entry = cache.get(type_name)
+        if entry is not None:
+            factory, plan = entry
+            return self._apply_init_plan(factory(), plan)
+
+        names = self._get_type_names()
+        resolved = names.get(type_name)
+        if resolved is None:
+            resolved = self._resolve_type_name(type_name) or _TYPE_NOT_FOUND
+            names[type_name] = resolved
+        if resolved is not _TYPE_NOT_FOUND:
+            qname, is_element = resolved
+            factory = (
+                self.client.get_element(qname)
+                if is_element
+                else self.client.get_type(qname)
+            )
+            instance = factory()
+            plan = self._build_init_plan(getattr(instance.__class__, "_xsd_type", None))
+            cache[type_name] = (factory, plan)
+            return self._apply_init_plan(instance, plan)
+
+        # If all methods fail, log the error and raise
+        logger.error(f"Type '{type_name}' not found in WSDL schema using any method")
+        raise AttributeError(f"Type '{type_name}' not found in WSDL schema.")
+
+    def _get_type_cache(self) -> dict:
+        """Get the factory cache shared by all operators of this compiled WSDL."""
+        wsdl = self.client.wsdl
+        cache = _TYPE_CACHE.get(wsdl)
+        if cache is None:
+            with _TYPE_CACHE_LOCK:
+                cache = _TYPE_CACHE.setdefault(wsdl, {})
+        return cache
+
+    def _get_type_names(self) -> dict:
+        """Get the resolved type names shared by all operators of this WSDL and binding."""
+        key = (self.wsdl_path, self.binding)
+        names = _TYPE_NAMES.get(key)
+        if names is None:
+            with _TYPE_CACHE_LOCK:
+                names = _TYPE_NAMES.setdefault(key, {})
+        return names
+
+    def _resolve_type_name(self, type_name: str):
+        """
+        Find the qualified name a type name resolves to.
+
+        Tries elements with common ONVIF namespace prefixes, then without prefix,
+        then complex types with and without prefix.
+
+        Args:
+            type_name (str): Name of the type to resolve
+
+        Returns:
+            tuple: (qname, is_element), or None if not found
+        """
         # Common namespace prefixes for ONVIF services
         namespaces_to_try = [
             "ns0",  # Default namespace
             "tt",  # Common types (User, NetworkInterface, etc.)
         ]
 
-        # Try to get element with namespace prefix
-        for ns in namespaces_to_try:
+        # Method 1: Try to get element with namespace prefix (works for operation parameters)
+        # Method 2: Try without namespace prefix
+        for qname in [f"{ns}:{type_name}" for ns in namespaces_to_try] + [type_name]:
             try:
-                element = self.client.get_element(f"{ns}:{type_name}")
-                instance = element()
-                logger.debug(
-                    f"Successfully created type {type_name} using namespace {ns}"
-                )
-                return self._initialize_nested_types(instance)
+                self.client.get_element(qname)
+                logger.debug(f"Resolved element {type_name} as {qname}")
+                return qname, True
             except Exception as e:
-                logger.debug(
-                    f"Failed to create type {type_name} with namespace {ns}: {e}"
-                )
-                continue
-
-        # Method 2: Try without namespace prefix
-        try:
-            element = self.client.get_element(type_name)
-            instance = element()
-            logger.debug(f"Successfully created type {type_name} without namespace")
-            return self._initialize_nested_types(instance)
-        except Exception as e:
-            logger.debug(f"Failed to create element {type_name} without namespace: {e}")
+                logger.debug(f"Failed to resolve element {qname}: {e}")
 
         # Method 3: Try to get type from schema (for complex types)
+        for qname in [f"{ns}:{type_name}" for ns in namespaces_to_try] + [type_name]:
+            try:
+                self.client.get_type(qname)
+                logger.debug(f"Resolved complex type {type_name} as {qname}")
+                return qname, False
+            except Exception as e:
+                logger.debug(f"Failed to resolve complex type {qname}: {e}")
+
+        return None
+
+    def _build_init_plan(self, xsd_type, _seen=None) -> tuple:
+        """
+        Build a nested-initialization plan for an XSD type.
+
+        The plan is a tuple of (element_name, complex_type, sub_plan) entries describing
+        which None-valued child elements should be instantiated. Recursive types are
+        only expanded once per path to avoid infinite recursion.
+
+        Args:
+            xsd_type: zeep XSD type (the instance's ``_xsd_type``)
+
+        Returns:
+            tuple: Initialization plan
+        """
+        if xsd_type is None or not hasattr(xsd_type, "elements"):
+            return ()
+
+        seen = (_seen or frozenset()) | {id(xsd_type)}
+        plan = []
         try:
-            for ns in namespaces_to_try:
-                try:
-                    type_obj = self.client.get_type(f"{ns}:{type_name}")
-                    instance = type_obj()
-                    logger.debug(
-                        f"Successfully created complex type {type_name} using namespace {ns}"
-                    )
-                    return self._initialize_nested_types(instance)
-                except Exception as e:
-                    logger.debug(
-                        f"Failed to create complex type {type_name} with namespace {ns}: {e}"
-                    )
+            for element_name, element_obj in xsd_type.elements:
+                element_type = getattr(element_obj, "type", None)
+
+                # Only complex types (with elements) are initialized
+                if element_type is None or not hasattr(element_type, "elements"):
+                    continue
+                if id(element_type) in seen:
                     continue
 
-            # Try without namespace
-            type_obj = self.client.get_type(type_name)
-            instance = type_obj()
-            logger.debug(
-                f"Successfully created complex type {type_name} without namespace"
-            )
-            return self._initialize_nested_types(instance)
+                plan.append(
+                    (
+                        element_name,
+                        element_type,
+                        self._build_init_plan(element_type, seen),
+                    )
+                )
         except Exception as e:
-            logger.debug(
-                f"Failed to create complex type {type_name} without namespace: {e}"
-            )
+            # Log the error but don't fail - the top-level object is still usable
+            logger.debug(f"Error during nested type plan construction: {e}")
 
-        # If all methods fail, log the error and raise
-        logger.error(f"Type '{type_name}' not found in WSDL schema using any method")
-        raise AttributeError(f"Type '{type_name}' not found in WSDL schema.")
+        return tuple(plan)
+
+    def _apply_init_plan(self, instance, plan: tuple):
+        """
+        Instantiate nested complex types in a Zeep object according to a plan.
+
+        Args:
+            instance: A Zeep object instance to initialize
+            plan: Plan built by _build_init_plan()
+
+        Returns:
+            The instance with all nested complex types initialized
+        """
+        for element_name, element_type, sub_plan in plan:
+            # Only initialize if the value is None
+            if getattr(instance, element_name, None) is not None:
+                continue
+            try:
+                nested_instance = self._apply_init_plan(element_type(), sub_plan)
+                setattr(instance, element_name, nested_instance)
+            except Exception as e:
+                # Continue with other elements instead of failing completely
+                logger.debug(
+                    f"Failed to initialize nested type for {element_name}: {e}"
+                )
+        return instance
 
     def _initialize_nested_types(self, instance):
         """
@@ -305,42 +522,5 @@ class ONVIFOperator:
         Returns:
             The instance with all nested complex types initialized
         """
-        try:
-            # Get the XSD type from the instance's class
-            if hasattr(instance.__class__, "_xsd_type"):
-                xsd_type = instance.__class__._xsd_type
-
-                # Iterate through elements defined in the XSD type
-                if hasattr(xsd_type, "elements"):
-                    for element_name, element_obj in xsd_type.elements:
-                        current_value = getattr(instance, element_name, None)
-
-                        # Only initialize if the value is None and the element has a type
-                        if current_value is None and hasattr(element_obj, "type"):
-                            element_type = element_obj.type
-
-                            # Check if this is a complex type (has elements)
-                            if hasattr(element_type, "elements"):
-                                try:
-                                    # Complex type - instantiate it and recursively initialize
-                                    nested_instance = element_type()
-                                    nested_instance = self._initialize_nested_types(
-                                        nested_instance
-                                    )
-                                    setattr(instance, element_name, nested_instance)
-                                    logger.debug(
-                                        f"Initialized nested type for element: {element_name}"
-                                    )
-                                except Exception as e:
-                                    # Log specific nested type initialization failures
-                                    logger.debug(
-                                        f"Failed to initialize nested type for {element_name}: {e}"
-                                    )
-                                    # Continue with other elements instead of failing completely
-                                    continue
-        except Exception as e:
-            # Log the error but don't fail - the top-level object is still usable
-            logger.debug(f"Error during nested type initialization: {e}")
-            # The important thing is that the top-level object is created
-
-        return instance
+        plan = self._build_init_plan(getattr(instance.__class__, "_xsd_type", None))
+        return self._apply_init_plan(instance, plan)
@@ -1,42 +1,50 @@
 # onvif/services/__init__.py
 
-from .devicemgmt import Device
-from .events.events import Events
-from .events.pullpoint import PullPoint
-from .events.notification import Notification
-from .events.subscription import Subscription
-from .events.pausable_subscription import PausableSubscription
-from .imaging import Imaging
-from .media import Media
-from .media2 import Media2
-from .ptz import PTZ
-from .accesscontrol import AccessControl
-from .accessrules import AccessRules
-from .actionengine import ActionEngine
-from .analytics.analytics import Analytics
-from .analytics.ruleengine import RuleEngine
-from .analyticsdevice import AnalyticsDevice
-from .appmgmt import AppManagement
-from .authenticationbehavior import AuthenticationBehavior
-from .credential import Credential
-from .deviceio import DeviceIO
-from .display import Display
-from .doorcontrol import DoorControl
-from .provisioning import Provisioning
-from .receiver import Receiver
-from .recording import Recording
-from .replay import Replay
-from .schedule import Schedule
-from .search import Search
-from .thermal import Thermal
-from .uplink import Uplink
-from .security.advancedsecurity import AdvancedSecurity
-from .security.jwt import JWT
-from .security.keystore import Keystore
-from .security.tlsserver import TLSServer
-from .security.dot1x import Dot1X
-from .security.authorizationserver import AuthorizationServer
-from .security.mediasigning import MediaSigning
+import importlib
+
+# Service classes are imported lazily on first access (PEP 562), so only the
+# services that are actually used get imported.
+# Format: class name -> submodule
+_LAZY_ATTRS = {
+    "Device": ".devicemgmt",
+    "Events": ".events.events",
+    "PullPoint": ".events.pullpoint",
+    "Notification": ".events.notification",
+    "Subscription": ".events.subscription",
+    "PausableSubscription": ".events.pausable_subscription",
+    "Imaging": ".imaging",
+    "Media": ".media",
+    "Media2": ".media2",
+    "PTZ": ".ptz",
+    "AccessControl": ".accesscontrol",
+    "AccessRules": ".accessrules",
+    "ActionEngine": ".actionengine",
+    "Analytics": ".analytics.analytics",
+    "RuleEngine": ".analytics.ruleengine",
+    "AnalyticsDevice": ".analyticsdevice",
+    "AppManagement": ".appmgmt",
+    "AuthenticationBehavior": ".authenticationbehavior",
+    "Credential": ".credential",
+    "DeviceIO": ".deviceio",
+    "Display": ".display",
+    "DoorControl": ".doorcontrol",
+    "Provisioning": ".provisioning",
+    "Receiver": ".receiver",
+    "Recording": ".recording",
+    "Replay": ".replay",
+    "Schedule": ".schedule",
+    "Search": ".search",
+    "Thermal": ".thermal",
+    "Uplink": ".uplink",
+    "AdvancedSecurity": ".security.advancedsecurity",
+    "JWT": ".security.jwt",
+    "Keystore": ".security.keystore",
+    "TLSServer": ".security.tlsserver",
+    "Dot1X": ".security.dot1x",
+    "AuthorizationServer": ".security.authorizationserver",
+    "MediaSigning": ".security.mediasigning",
+}
+
 
 __all__ = [
     "Device",
@@ -77,3 +85,18 @@ __all__ = [
     "AuthorizationServer",
     "MediaSigning",
 ]
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache for subsequent lookups
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
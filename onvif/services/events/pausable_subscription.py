@@ -5,6 +5,10 @@ from ...utils import ONVIFWSDL, ONVIFService
 
 
 class PausableSubscription(ONVIFService):
+    # Set by ONVIFClient to keep its subscription cache in sync:
+    # called as _lifecycle(operation, response) after Renew/Unsubscribe
+    _lifecycle = None
+
     def __init__(self, xaddr=None, **kwargs):
         # References:
         # - PausableSubscriptionManagerBinding (ver10/events/wsdl/event-vs.wsdl)
@@ -19,10 +23,16 @@ class PausableSubscription(ONVIFService):
         )
 
     def Renew(self, TerminationTime=None):
-        return self.operator.call("Renew", TerminationTime=TerminationTime)
+        response = self.operator.call("Renew", TerminationTime=TerminationTime)
+        if self._lifecycle is not None:
+            self._lifecycle("Renew", response)
+        return response
 
     def Unsubscribe(self):
-        return self.operator.call("Unsubscribe")
+        response = self.operator.call("Unsubscribe")
+        if self._lifecycle is not None:
+            self._lifecycle("Unsubscribe", response)
+        return response
 
     def PauseSubscription(self):
         return self.operator.call("PauseSubscription")
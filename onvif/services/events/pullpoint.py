@@ -2,9 +2,18 @@
 
 from ...operator import ONVIFOperator
 from ...utils import ONVIFWSDL, ONVIFService
+from ...utils.event_decoder import decode_pull_messages
 
 
 class PullPoint(ONVIFService):
+    # Response mode: when True, PullMessages skips zeep parsing and returns a
+    # PullMessagesResult of compact EventRecord objects (see utils.event_decoder)
+    decode_events = False
+
+    # Set by ONVIFClient to keep its subscription cache in sync:
+    # called as _lifecycle(operation, response) after Unsubscribe
+    _lifecycle = None
+
     def __init__(self, xaddr=None, **kwargs):
         # References:
         # - PullPointSubscriptionBinding (ver10/events/wsdl/event-vs.wsdl)
@@ -19,6 +28,12 @@ class PullPoint(ONVIFService):
         )
 
     def PullMessages(self, Timeout, MessageLimit):
+        if self.decode_events:
+            return decode_pull_messages(
+                self.operator.call_raw(
+                    "PullMessages", Timeout=Timeout, MessageLimit=MessageLimit
+                )
+            )
         return self.operator.call(
             "PullMessages", Timeout=Timeout, MessageLimit=MessageLimit
         )
@@ -30,4 +45,7 @@ class PullPoint(ONVIFService):
         return self.operator.call("SetSynchronizationPoint")
 
     def Unsubscribe(self):
-        return self.operator.call("Unsubscribe")
+        response = self.operator.call("Unsubscribe")
+        if self._lifecycle is not None:
+            self._lifecycle("Unsubscribe", response)
+        return response
@@ -5,6 +5,10 @@ from ...utils import ONVIFWSDL, ONVIFService
 
 
 class Subscription(ONVIFService):
+    # Set by ONVIFClient to keep its subscription cache in sync:
+    # called as _lifecycle(operation, response) after Renew/Unsubscribe
+    _lifecycle = None
+
     def __init__(self, xaddr=None, **kwargs):
         # References:
         # - SubscriptionManagerBinding (ver10/events/wsdl/event-vs.wsdl)
@@ -19,7 +23,13 @@ class Subscription(ONVIFService):
         )
 
     def Renew(self, TerminationTime=None):
-        return self.operator.call("Renew", TerminationTime=TerminationTime)
+        response = self.operator.call("Renew", TerminationTime=TerminationTime)
+        if self._lifecycle is not None:
+            self._lifecycle("Renew", response)
+        return response
 
     def Unsubscribe(self):
-        return self.operator.call("Unsubscribe")
+        response = self.operator.call("Unsubscribe")
+        if self._lifecycle is not None:
+            self._lifecycle("Unsubscribe", response)
+        return response
@@ -1,14 +1,36 @@
 # onvif/utils/__init__.py
 
-from .wsdl import ONVIFWSDL
-from .exceptions import ONVIFOperationException
-from .zeep import ZeepPatcher
-from .xml_capture import XMLCapturePlugin
-from .error_handlers import ONVIFErrorHandler
-from .discovery import ONVIFDiscovery
-from .service import ONVIFService
-from .parser import ONVIFParser
+import importlib
 
+# Utilities are imported lazily on first access (PEP 562) so that, e.g.,
+# ONVIFDiscovery can be used without importing zeep.
+# Format: name -> submodule
+_LAZY_ATTRS = {
+    "ONVIFWSDL": ".wsdl",
+    "ONVIFOperationException": ".exceptions",
+    "ZeepPatcher": ".zeep",
+    "XMLCapturePlugin": ".xml_capture",
+    "ONVIFErrorHandler": ".error_handlers",
+    "ONVIFDiscovery": ".discovery",
+    "ONVIFDiscoveryListener": ".discovery",
+    "ONVIFScanner": ".scanner",
+    "ONVIFDiscoveryCache": ".discovery_cache",
+    "ONVIFOnboarding": ".onboarding",
+    "ONVIFHealthMonitor": ".health_monitor",
+    "ONVIFInventory": ".inventory",
+    "ONVIFDriftDetector": ".drift",
+    "ONVIFSnapshotFetcher": ".snapshot",
+    "ONVIFService": ".service",
+    "ONVIFParser": ".parser",
+    "ONVIFCodeGenerator": ".codegen",
+    "ONVIFEventStream": ".event_stream",
+    "ONVIFEventAggregator": ".event_aggregator",
+    "ONVIFNotificationConsumer": ".notification_consumer",
+    "ONVIFTopicIndex": ".topic_index",
+    "ONVIFEventLog": ".event_log",
+    "ONVIFRenewalManager": ".renewal_manager",
+    "ONVIFPullTuner": ".pull_tuner",
+}
 
 __all__ = [
     "ONVIFWSDL",
@@ -17,6 +39,37 @@ __all__ = [
     "XMLCapturePlugin",
     "ONVIFErrorHandler",
     "ONVIFDiscovery",
+    "ONVIFDiscoveryListener",
+    "ONVIFScanner",
+    "ONVIFDiscoveryCache",
+    "ONVIFOnboarding",
+    "ONVIFHealthMonitor",
+    "ONVIFInventory",
+    "ONVIFDriftDetector",
+    "ONVIFSnapshotFetcher",
     "ONVIFService",
     "ONVIFParser",
+    "ONVIFCodeGenerator",
+    "ONVIFEventStream",
+    "ONVIFEventAggregator",
+    "ONVIFNotificationConsumer",
+    "ONVIFTopicIndex",
+    "ONVIFEventLog",
+    "ONVIFRenewalManager",
+    "ONVIFPullTuner",
 ]
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache for subsequent lookups
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
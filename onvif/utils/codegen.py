@@ -0,0 +1,507 @@
+# onvif/utils/codegen.py
+
+import os
+import json
+import logging
+import argparse
+import textwrap
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from lxml import etree
+
+from .wsdl import ONVIFWSDL
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+# Prebuilt operation metadata, generated from the bundled WSDLs
+METADATA_PATH = os.path.join(ONVIFWSDL.BASE_DIR, "metadata.json")
+
+WSDL_NS = "http://schemas.xmlsoap.org/wsdl/"
+
+# Python builtins that are safe to emit as plain annotations
+_BUILTIN_ANNOTATIONS = {"str", "bool", "int", "float", "bytes"}
+
+
+def format_documentation(doc_element) -> Optional[str]:
+    """Convert a wsdl:documentation element into readable plain text.
+
+    Handles mixed content (text plus tags like <br/>, <ul>, <ol> and <li>) and
+    normalizes whitespace while preserving paragraph and list structures.
+
+    Args:
+        doc_element: lxml element for wsdl:documentation (or None)
+
+    Returns:
+        Cleaned documentation text, or None if no documentation is present
+    """
+    if doc_element is None:
+        return None
+
+    text_parts = []
+    if doc_element.text:
+        text_parts.append(doc_element.text)
+
+    for child in doc_element:
+        if not isinstance(child.tag, str):
+            # Comments and processing instructions
+            if child.tail:
+                text_parts.append(child.tail)
+            continue
+
+        if child.tag.endswith("ul") or child.tag.endswith("ol"):
+            text_parts.append("\n")
+            if child.text:
+                text_parts.append(child.text.strip())
+            for i, li in enumerate(child):
+                if isinstance(li.tag, str) and li.tag.endswith("li"):
+                    # Join all text within the <li> tag, then strip and prepend '- '
+                    li_text = (
+                        ("".join(li.itertext()))
+                        .strip()
+                        .replace("\n", " ")
+                        .replace("\r", "")
+                    )
+                    li_text = " ".join(li_text.split())
+                    text_parts.append(
+                        f"\n  - {i+1}. {li_text}"
+                        if child.tag.endswith("ol")
+                        else f"\n  - {li_text}"
+                    )
+            if child.tail:
+                if not child.tag.endswith("ol"):
+                    text_parts.append("\n\n")  # Add paragraph break after list
+                text_parts.append(child.tail)
+        elif child.tag.endswith("br"):
+            text_parts.append("\n\n")  # Paragraph break
+            if child.tail:
+                text_parts.append(child.tail)
+        else:  # Other tags, just get text
+            if child.text:
+                text_parts.append(child.text)
+            if child.tail:
+                text_parts.append(child.tail)
+
+    full_text = "".join(text_parts)
+
+    # Normalize whitespace while preserving paragraph and list structures
+    cleaned_paragraphs = []
+    for para in full_text.split("\n\n"):
+        if "- " in para:
+            list_lines = para.strip().split("\n")
+            cleaned_paragraphs.append(
+                "\n".join(" ".join(line.split()) for line in list_lines if line.strip())
+            )
+        else:
+            cleaned_paragraphs.append(" ".join(para.split()))
+
+    doc_text = "\n\n".join(p for p in cleaned_paragraphs if p)
+    return doc_text or None
+
+
+@lru_cache(maxsize=None)
+def load_metadata(path: str = None) -> Dict[str, Any]:
+    """Load prebuilt operation metadata.
+
+    The result is cached for the lifetime of the process, so callers such as the
+    CLI can look up documentation without re-parsing WSDL files.
+
+    Args:
+        path: Metadata file path (default: bundled ``wsdl/metadata.json``)
+
+    Returns:
+        dict: Mapping of binding QName to binding metadata, or an empty dict if
+        the metadata file is missing or unreadable
+    """
+    path = path or METADATA_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Prebuilt metadata not available at {path}: {e}")
+        return {}
+
+
+def get_operation_metadata(
+    binding: str, operation: str, wsdl_path: str = None
+) -> Optional[Dict[str, Any]]:
+    """Get prebuilt metadata for a single operation.
+
+    Args:
+        binding: Binding QName (e.g., "{http://www.onvif.org/ver10/device/wsdl}DeviceBinding")
+        operation: Operation name (e.g., "GetDeviceInformation")
+        wsdl_path: WSDL path used by the caller. Metadata is only returned when it
+            was generated from the same (built-in) WSDL file.
+
+    Returns:
+        dict with a 'doc' key, or None if not available
+    """
+    entry = load_metadata().get(binding)
+    if not entry:
+        return None
+
+    if wsdl_path is not None:
+        expected = os.path.normpath(os.path.join(ONVIFWSDL.BASE_DIR, entry["wsdl"]))
+        if os.path.normpath(os.path.abspath(wsdl_path)) != expected:
+            return None
+
+    return entry["operations"].get(operation)
+
+
+class ONVIFCodeGenerator:
+    """Generate service classes and operation metadata from the bundled WSDLs.
+
+    The generator loads a WSDL binding with zeep to resolve operation signatures
+    (parameter names, XSD types, occurrence constraints) and reads the
+    ``wsdl:documentation`` of each operation from the defining portType.
+
+    It produces two artifacts:
+        - Operation metadata (``wsdl/metadata.json``): the documentation of each
+          operation, read at runtime by ``cli.utils.get_method_documentation()``
+          (which ``ONVIFService.desc()`` also calls for its doc text), so
+          documentation lookups don't re-parse WSDL files. Parameters are not
+          included; both take them from the service method signatures
+        - Python source for service classes in the same shape as the modules
+          under ``onvif/services``, with typed signatures (from the parsed
+          parameters) and docstrings
+
+    Example:
+        >>> from onvif.utils.codegen import ONVIFCodeGenerator
+        >>> gen = ONVIFCodeGenerator()
+        >>> ops = gen.parse_binding("imaging", "ver20")
+        >>> print(ops["GetImagingSettings"]["params"])
+        >>> print(gen.render_service("imaging", "ver20", class_name="Imaging"))
+
+    Command line:
+        python -m onvif.utils.codegen metadata
+        python -m onvif.utils.codegen service imaging --version ver20 --class-name Imaging
+    """
+
+    def __init__(self, wsdl_dir: str = None):
+        """Initialize the generator.
+
+        Args:
+            wsdl_dir: WSDL base directory (default: built-in WSDLs)
+        """
+        self.wsdl_dir = wsdl_dir
+        self._clients = {}
+        self._doc_trees = {}
+
+    def _get_client(self, wsdl_path: str):
+        """Load (and cache) a zeep client for a WSDL file."""
+        if wsdl_path not in self._clients:
+            from zeep import Client, Settings
+
+            logger.debug(f"Loading WSDL for code generation: {wsdl_path}")
+            self._clients[wsdl_path] = Client(
+                wsdl_path, settings=Settings(strict=False, xml_huge_tree=True)
+            )
+        return self._clients[wsdl_path]
+
+    def _get_doc_tree(self, location: str):
+        """Parse (and cache) a WSDL document for documentation lookups."""
+        if location not in self._doc_trees:
+            # Use secure lxml parser
+            parser = etree.XMLParser(
+                resolve_entities=False,
+                no_network=True,
+                remove_blank_text=True,
+            )
+            self._doc_trees[location] = etree.parse(location, parser).getroot()
+        return self._doc_trees[location]
+
+    def _find_port_type_location(self, client, port_type_name) -> Optional[str]:
+        """Find the WSDL document that defines the given portType."""
+        for definition in client.wsdl._definitions.values():
+            if port_type_name in definition.port_types:
+                return definition.location
+        return None
+
+    @staticmethod
+    def _annotation(element) -> str:
+        """Map a zeep element to a Python type annotation string."""
+        try:
+            accepted = element.type.accepted_types
+            py_type = accepted[0] if accepted else None
+        except Exception:
+            py_type = None
+
+        name = getattr(py_type, "__name__", None)
+        annotation = name if name in _BUILTIN_ANNOTATIONS else "Any"
+
+        if element.max_occurs == "unbounded" or (
+            isinstance(element.max_occurs, int) and element.max_occurs > 1
+        ):
+            annotation = f"List[{annotation}]"
+        return annotation
+
+    def parse_binding(self, service: str, version: str = "ver10") -> Dict[str, Any]:
+        """Parse all operations of a service binding.
+
+        Args:
+            service: Service name in ONVIFWSDL (e.g., "devicemgmt", "imaging")
+            version: ONVIF version (e.g., "ver10", "ver20")
+
+        Returns:
+            dict: Mapping of operation name to {'doc': str, 'params': [...]} where
+            each parameter has 'name', 'type', 'annotation' and 'required' keys
+        """
+        definition = ONVIFWSDL.get_definition(service, version, self.wsdl_dir)
+        client = self._get_client(definition["path"])
+        binding_qname = f"{{{definition['namespace']}}}{definition['binding']}"
+        binding = client.wsdl.bindings[binding_qname]
+
+        port_type = binding.port_type
+        location = self._find_port_type_location(client, port_type.name)
+        port_type_elem = None
+        if location:
+            root = self._get_doc_tree(location)
+            local_name = etree.QName(port_type.name).localname
+            port_type_elem = root.find(f"{{{WSDL_NS}}}portType[@name='{local_name}']")
+
+        operations = {}
+        for op_name, operation in binding._operations.items():
+            doc = None
+            if port_type_elem is not None:
+                op_elem = port_type_elem.find(
+                    f"{{{WSDL_NS}}}operation[@name='{op_name}']"
+                )
+                if op_elem is not None:
+                    doc = format_documentation(
+                        op_elem.find(f"{{{WSDL_NS}}}documentation")
+                    )
+
+            params = []
+            body_type = getattr(getattr(operation.input, "body", None), "type", None)
+            for param_name, element in getattr(body_type, "elements", []):
+                # Skip xsd:any placeholders (_value_1, ...)
+                if param_name.startswith("_"):
+                    continue
+                type_qname = getattr(element.type, "qname", None)
+                params.append(
+                    {
+                        "name": param_name,
+                        "type": (
+                            etree.QName(type_qname).localname if type_qname else None
+                        ),
+                        "annotation": self._annotation(element),
+                        "required": bool(element.min_occurs),
+                    }
+                )
+
+            operations[op_name] = {"doc": doc, "params": params}
+
+        logger.debug(f"Parsed {len(operations)} operations from {binding_qname}")
+        return operations
+
+    def build_metadata(self) -> Dict[str, Any]:
+        """Build operation metadata for every service known to ONVIFWSDL.
+
+        Returns:
+            dict: Mapping of binding QName to {'wsdl': relative path,
+            'operations': {name: {'doc': str}}}
+        """
+        ONVIFWSDL._ensure_wsdl_map_initialized()
+        base_dir = ONVIFWSDL._get_base_dir(self.wsdl_dir)
+
+        metadata = {}
+        for service, versions in ONVIFWSDL.WSDL_MAP.items():
+            for version in versions:
+                definition = ONVIFWSDL.get_definition(service, version, self.wsdl_dir)
+                binding_qname = f"{{{definition['namespace']}}}{definition['binding']}"
+                metadata[binding_qname] = {
+                    "wsdl": os.path.relpath(definition["path"], base_dir).replace(
+                        os.sep, "/"
+                    ),
+                    "operations": {
+                        name: {"doc": operation["doc"]}
+                        for name, operation in self.parse_binding(
+                            service, version
+                        ).items()
+                    },
+                }
+        return metadata
+
+    def write_metadata(self, path: str = None) -> str:
+        """Generate metadata and write it as JSON.
+
+        Args:
+            path: Output file (default: bundled ``wsdl/metadata.json``)
+
+        Returns:
+            str: Path of the written file
+        """
+        path = path or METADATA_PATH
+        metadata = self.build_metadata()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=1, sort_keys=True, ensure_ascii=False)
+            f.write("\n")
+        load_metadata.cache_clear()
+        logger.info(f"Wrote metadata for {len(metadata)} bindings to {path}")
+        return path
+
+    def render_service(
+        self,
+        service: str,
+        version: str = "ver10",
+        class_name: str = None,
+        service_path: str = None,
+        module_path: str = None,
+    ) -> str:
+        """Render Python source for a service class.
+
+        The emitted class follows the layout of the modules in ``onvif/services``:
+        an ONVIFService subclass whose methods forward keyword arguments to
+        ``self.operator.call()``, now with type hints and WSDL docstrings.
+
+        Args:
+            service: Service name in ONVIFWSDL (e.g., "imaging")
+            version: ONVIF version (e.g., "ver20")
+            class_name: Generated class name (default: capitalized service name)
+            service_path: Default XAddr path used as fallback (e.g., "Imaging")
+            module_path: Module path relative to ``onvif`` (default: services/<service>.py)
+
+        Returns:
+            str: Python source code
+        """
+        definition = ONVIFWSDL.get_definition(service, version, self.wsdl_dir)
+        operations = self.parse_binding(service, version)
+        class_name = class_name or service.capitalize()
+        module_path = module_path or f"services/{service}.py"
+        depth = module_path.count("/")
+        rel = "." * (depth + 1)
+
+        base_dir = ONVIFWSDL._get_base_dir(self.wsdl_dir)
+        wsdl_rel = os.path.relpath(definition["path"], base_dir).replace(os.sep, "/")
+        version_arg = f', "{version}"' if version != "ver10" else ""
+
+        lines = [
+            f"# onvif/{module_path}",
+            "",
+            "from typing import Any, List, Optional  # noqa: F401",
+            "",
+            f"from {rel}operator import ONVIFOperator",
+            f"from {rel}utils import ONVIFWSDL, ONVIFService",
+            "",
+            "",
+            f"class {class_name}(ONVIFService):",
+            "    def __init__(self, xaddr=None, **kwargs):",
+            "        # References:",
+            f"        # - {definition['binding']} ({wsdl_rel})",
+            "        # - Operations: https://developer.onvif.org/pub/specs/branches/"
+            f"development/wsdl/{wsdl_rel}",
+            "",
+            f'        definition = ONVIFWSDL.get_definition("{service}"{version_arg})',
+            "        self.operator = ONVIFOperator(",
+            '            definition["path"],',
+            "            binding=f\"{{{definition['namespace']}}}{definition['binding']}\",",
+        ]
+        if service_path:
+            lines.append(f'            service_path="{service_path}",  # fallback')
+        lines += [
+            "            xaddr=xaddr,",
+            "            **kwargs,",
+            "        )",
+        ]
+
+        for op_name, op in operations.items():
+            lines.append("")
+            lines.extend(self._render_method(op_name, op))
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_method(op_name: str, op: Dict[str, Any]) -> List[str]:
+        """Render a single service method."""
+        # Python requires parameters without defaults to come first
+        params = [p for p in op["params"] if p["required"]] + [
+            p for p in op["params"] if not p["required"]
+        ]
+
+        signature = ["self"]
+        for p in params:
+            if p["required"]:
+                signature.append(f"{p['name']}: {p['annotation']}")
+            else:
+                signature.append(f"{p['name']}: Optional[{p['annotation']}] = None")
+
+        header = f"    def {op_name}({', '.join(signature)}) -> Any:"
+        if len(header) > 88:
+            lines = [f"    def {op_name}("]
+            lines += [f"        {s}," for s in signature]
+            lines.append("    ) -> Any:")
+        else:
+            lines = [header]
+
+        doc = op.get("doc")
+        if doc:
+            doc = doc.replace("\\", "\\\\").replace('"""', '\\"\\"\\"')
+            lines.append('        """')
+            for paragraph in doc.split("\n"):
+                if not paragraph.strip():
+                    lines.append("")
+                    continue
+                lines.extend(
+                    textwrap.wrap(
+                        paragraph,
+                        width=88,
+                        initial_indent="        ",
+                        subsequent_indent="        ",
+                        break_long_words=False,
+                        break_on_hyphens=False,
+                    )
+                )
+            lines.append('        """')
+
+        if params:
+            lines.append("        return self.operator.call(")
+            lines.append(f'            "{op_name}",')
+            lines += [f"            {p['name']}={p['name']}," for p in op["params"]]
+            lines.append("        )")
+        else:
+            lines.append(f'        return self.operator.call("{op_name}")')
+        return lines
+
+
+def main(argv=None):
+    """Command line entry point for the code generator."""
+    parser = argparse.ArgumentParser(
+        prog="python -m onvif.utils.codegen",
+        description="Generate ONVIF service classes and metadata from WSDLs",
+    )
+    parser.add_argument("--wsdl-dir", help="Custom WSDL directory (flat structure)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    meta = sub.add_parser("metadata", help="Write prebuilt operation metadata")
+    meta.add_argument("--output", "-o", help="Output JSON file")
+
+    svc = sub.add_parser("service", help="Print or write a generated service class")
+    svc.add_argument("service", help="Service name (e.g., imaging, devicemgmt)")
+    svc.add_argument("--version", default="ver10", help="ONVIF version")
+    svc.add_argument("--class-name", help="Generated class name")
+    svc.add_argument("--service-path", help="Fallback XAddr path (e.g., Imaging)")
+    svc.add_argument("--output", "-o", help="Output .py file (default: stdout)")
+
+    args = parser.parse_args(argv)
+    generator = ONVIFCodeGenerator(wsdl_dir=args.wsdl_dir)
+
+    if args.command == "metadata":
+        print(generator.write_metadata(args.output))
+    elif args.command == "service":
+        source = generator.render_service(
+            args.service,
+            args.version,
+            class_name=args.class_name,
+            service_path=args.service_path,
+        )
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(source)
+        else:
+            print(source, end="")
+
+
+if __name__ == "__main__":
+    main()
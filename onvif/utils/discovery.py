@@ -1,15 +1,189 @@
 # onvif/utils/discovery.py
 
-import socket
+import time
 import uuid
+import random
+import socket
+import sys
 import struct
+import asyncio
 import logging
+import selectors
+import threading
 from lxml import etree
-from typing import List, Dict, Any, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+_WSA_NS = "http://schemas.xmlsoap.org/ws/2004/08/addressing"
+_WSD_NS = "http://schemas.xmlsoap.org/ws/2005/04/discovery"
+_XPATH_NS = {"wsa": _WSA_NS, "d": _WSD_NS}
+
+
+def _xpath(path: str) -> etree.XPath:
+    return etree.XPath(path, namespaces=_XPATH_NS, smart_strings=False)
+
+
+# Compiled once: message bodies (any SOAP envelope version) and ProbeMatch/Hello
+# fields (direct children per WS-Discovery; string() yields "" when missing)
+_PROBE_MATCH = _xpath("/*/*/d:ProbeMatches/d:ProbeMatch[1]")
+_HELLO = _xpath("/*/*/d:Hello")
+_BYE = _xpath("/*/*/d:Bye")
+_EPR = _xpath("normalize-space(wsa:EndpointReference/wsa:Address)")
+_TYPES = _xpath("string(d:Types)")
+_SCOPES = _xpath("string(d:Scopes)")
+_XADDRS = _xpath("string(d:XAddrs)")
+
+# lxml parsers must not be used by several threads at once (listener, scanner
+# and discovery may run concurrently), so one secure parser is kept per thread
+_parsers = threading.local()
+
+
+def _secure_parser() -> etree.XMLParser:
+    parser = getattr(_parsers, "parser", None)
+    if parser is None:
+        # Use lxml's secure parser that prevents XXE attacks
+        parser = _parsers.parser = etree.XMLParser(
+            resolve_entities=False,  # Disable entity resolution
+            no_network=True,  # Disable network access
+            remove_blank_text=True,
+        )
+    return parser
+
+
+_SIOCGIFADDR = 0x8915  # Linux ioctl: IPv4 address of an interface
+
+
+def _interface_ipv4(name: str) -> Optional[str]:
+    """IPv4 address of a network interface by name (Linux), or None.
+
+    Other platforms (no fcntl on Windows, other ioctl codes on macOS/BSD)
+    always get None; callers fall back to the default-route address.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        request = struct.pack("256s", name[:15].encode("utf-8"))
+        return socket.inet_ntoa(
+            fcntl.ioctl(sock.fileno(), _SIOCGIFADDR, request)[20:24]
+        )
+    except OSError:
+        return None  # Interface has no IPv4 address (or is down)
+    finally:
+        sock.close()
+
+
+def _list_interfaces() -> List[Dict[str, Any]]:
+    """Non-loopback interfaces as dictionaries with name, index and ipv4."""
+    try:
+        names = socket.if_nameindex()
+    except (AttributeError, OSError):
+        return []
+
+    interfaces = []
+    for index, name in names:
+        ipv4 = _interface_ipv4(name)
+        if name == "lo" or (ipv4 or "").startswith("127."):
+            continue
+        interfaces.append({"name": name, "index": index, "ipv4": ipv4})
+    return interfaces
+
+
+def _is_ipv4(value: str) -> bool:
+    try:
+        socket.inet_aton(value)
+        return value.count(".") == 3
+    except OSError:
+        return False
+
+
+class _ProbeRun:
+    """Retransmission schedule and termination conditions of one discovery run.
+
+    Probe retransmissions follow SOAP-over-UDP: the first repeat is sent after a
+    random delay in [min_delay, max_delay], each further delay doubles up to
+    upper_delay, and every repeat carries the same MessageID so devices answer
+    a probe they already saw at most once.
+    """
+
+    def __init__(self, discovery, expected=None, quiet=None):
+        now = time.monotonic()
+        self.deadline = now + discovery.timeout
+        self.quiet = quiet
+        self.last_activity = now
+
+        if isinstance(expected, int) and not isinstance(expected, bool):
+            self.expected_count, self.expected_eprs = expected, None
+        elif expected is not None:
+            self.expected_count, self.expected_eprs = None, set(expected)
+        else:
+            self.expected_count = self.expected_eprs = None
+        self.found = 0
+
+        self.resends = []
+        delay = random.uniform(discovery.PROBE_MIN_DELAY, discovery.PROBE_MAX_DELAY)
+        at = now
+        for _ in range(discovery.repeat):
+            at += delay
+            if at < self.deadline:
+                self.resends.append(at)
+            delay = min(delay * 2, discovery.PROBE_UPPER_DELAY)
+
+    def resend_due(self, now: float) -> bool:
+        """True (and the repeat is consumed) if a retransmission is due."""
+        if self.resends and self.resends[0] <= now:
+            self.resends.pop(0)
+            self.last_activity = now
+            return True
+        return False
+
+    def wait(self, now: float) -> float:
+        """Seconds until the next retransmission, quiet exit or timeout."""
+        wake = self.deadline
+        if self.resends:
+            wake = min(wake, self.resends[0])
+        elif self.quiet is not None:
+            wake = min(wake, self.last_activity + self.quiet)
+        return max(wake - now, 0)
+
+    def finished(self, now: float, seen: set) -> Optional[str]:
+        """Reason to stop discovery, or None to keep listening."""
+        if self.expected_count is not None and self.found >= self.expected_count:
+            return "expected device count reached"
+        if self.expected_eprs is not None and self.expected_eprs <= seen:
+            return "all expected devices found"
+        if now >= self.deadline:
+            return "timeout reached"
+        if (
+            self.quiet is not None
+            and not self.resends
+            and now - self.last_activity >= self.quiet
+        ):
+            return f"no new devices for {self.quiet}s"
+        return None
+
+    def record(self, now: float):
+        self.found += 1
+        self.last_activity = now
+
 
 class ONVIFDiscovery:
     """ONVIF Device Discovery using WS-Discovery protocol.
@@ -21,16 +195,30 @@ class ONVIFDiscovery:
         WS_DISCOVERY_PORT (int): Default WS-Discovery port (3702)
         WS_DISCOVERY_ADDRESS_IPv4 (str): Multicast address for IPv4 discovery
 
+        WS_DISCOVERY_ADDRESS_IPv6 (str): Link-local multicast address for IPv6 discovery
+
     Example:
         >>> from onvif import ONVIFDiscovery
         >>> discovery = ONVIFDiscovery(timeout=5)
         >>> devices = discovery.discover()
         >>> for device in devices:
         ...     print(f"Found device at {device['host']}:{device['port']}")
+
+        >>> # Probe every interface (IPv4 and IPv6) at once
+        >>> devices = ONVIFDiscovery(interfaces="all", ipv6=True).discover()
+
+        >>> # Or only the camera VLANs
+        >>> devices = ONVIFDiscovery(interfaces=["vlan20", "192.168.30.1"]).discover()
     """
 
     WS_DISCOVERY_PORT = 3702
     WS_DISCOVERY_ADDRESS_IPv4 = "239.255.255.250"
+    WS_DISCOVERY_ADDRESS_IPv6 = "ff02::c"
+
+    # SOAP-over-UDP retransmission delays (UDP_MIN_DELAY, UDP_MAX_DELAY, UDP_UPPER_DELAY)
+    PROBE_MIN_DELAY = 0.05
+    PROBE_MAX_DELAY = 0.25
+    PROBE_UPPER_DELAY = 0.5
 
     WS_DISCOVERY_PROBE_MESSAGE = (
         '<?xml version="1.0" encoding="UTF-8"?>'
@@ -62,16 +250,47 @@ class ONVIFDiscovery:
         self,
         timeout: int = 4,
         interface: Optional[str] = None,
+        interfaces: Union[str, Sequence[str], None] = None,
+        ipv6: bool = False,
+        repeat: int = 2,
     ):
         """Initialize ONVIF Discovery.
 
         Args:
             timeout: Discovery timeout in seconds (default: 4)
             interface: Network interface IP to bind to (default: auto-detect)
+            interfaces: Probe several interfaces concurrently: "all", or a list
+                of interface names and/or local IPv4 addresses (default: only
+                the single interface above)
+            ipv6: Also probe FF02::C on each named interface (all interfaces
+                when interfaces is None or "all")
+            repeat: Probe retransmissions after the first send, with jittered
+                exponential backoff, for lossy networks (default: 2)
         """
         self.timeout = timeout
         self.interface = interface
+        self.interfaces = interfaces
+        self.ipv6 = ipv6
+        self.repeat = repeat
         self._local_ip = None
+        # Lowercased types/scopes per device for search filtering:
+        # key -> (types list, scopes list, text)
+        self._search_index: Dict[str, Tuple[list, list, str]] = {}
+
+    @staticmethod
+    def list_interfaces() -> List[Dict[str, Any]]:
+        """List the host's network interfaces usable for discovery.
+
+        Returns:
+            List of dictionaries with name, index and ipv4 (None if the interface
+            has no IPv4 address or it can't be determined on this platform).
+            Loopback interfaces are excluded.
+
+        Example:
+            >>> [i["name"] for i in ONVIFDiscovery.list_interfaces()]
+            ['eth0', 'eth1', 'vlan20']
+        """
+        return _list_interfaces()
 
     def _get_local_ip(self) -> Optional[str]:
         """Get local network interface IP address.
@@ -113,109 +332,359 @@ class ONVIFDiscovery:
             self._local_ip = ""
             return self._local_ip
 
-    def discover(
-        self, prefer_https: bool = False, search: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """Discover ONVIF devices on the network.
+    def _open_probe_socket(self, local_ip: str) -> socket.socket:
+        """Create the UDP socket used to send probes and receive ProbeMatches."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        # Bind to specific interface if available, otherwise use empty string
+        # Empty string lets the OS choose the appropriate interface for multicast
+        # This avoids the security issue of explicitly using "0.0.0.0"
+        bind_address = local_ip if local_ip else ""
+        sock.bind((bind_address, 0))
+
+        ttl = struct.pack("b", 1)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        if bind_address:
+            # Send multicast out of this interface rather than the default route
+            sock.setsockopt(
+                socket.IPPROTO_IP,
+                socket.IP_MULTICAST_IF,
+                socket.inet_aton(bind_address),
+            )
+        return sock
+
+    def _open_probe_socket_ipv6(self, index: int) -> socket.socket:
+        """Create an IPv6 probe socket sending FF02::C out of one interface."""
+        sock = socket.socket(socket.AF_INET6, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_MULTICAST_IF, index)
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_MULTICAST_HOPS, 1)
+        sock.bind(("", 0))
+        return sock
+
+    def _probe_targets(self) -> List[Tuple[str, Any, Any]]:
+        """Resolve the configured interfaces into probe targets.
+
+        Returns:
+            List of (label, local IPv4 address or IPv6 interface index, destination)
+        """
+        ipv4_destination = (self.WS_DISCOVERY_ADDRESS_IPv4, self.WS_DISCOVERY_PORT)
+
+        def ipv6_destination(index):
+            return (self.WS_DISCOVERY_ADDRESS_IPv6, self.WS_DISCOVERY_PORT, 0, index)
+
+        if self.interfaces is None:
+            targets = [("default", self._get_local_ip(), ipv4_destination)]
+            if self.ipv6:
+                targets += [
+                    (i["name"], i["index"], ipv6_destination(i["index"]))
+                    for i in self.list_interfaces()
+                ]
+            return targets
+
+        if self.interfaces == "all":
+            selected = self.list_interfaces()
+        else:
+            known = {i["name"]: i for i in self.list_interfaces()}
+            selected = []
+            for entry in self.interfaces:
+                if _is_ipv4(entry):
+                    selected.append({"name": entry, "index": None, "ipv4": entry})
+                elif entry in known:
+                    selected.append(known[entry])
+                else:
+                    logger.warning(f"Unknown network interface: {entry}")
+
+        targets, addresses = [], set()
+        for interface in selected:
+            ipv4 = interface["ipv4"]
+            if ipv4 and ipv4 not in addresses:
+                addresses.add(ipv4)
+                targets.append((interface["name"], ipv4, ipv4_destination))
+            if self.ipv6 and interface["index"] is not None:
+                targets.append(
+                    (
+                        f"{interface['name']} (IPv6)",
+                        interface["index"],
+                        ipv6_destination(interface["index"]),
+                    )
+                )
+
+        if self.interfaces == "all" and not addresses:
+            # Interface addresses can't be read on this platform (or none has
+            # one): probe IPv4 from the default-route address instead of not
+            # at all
+            local_ip = self._get_local_ip()
+            logger.warning(
+                "No IPv4 address found for any network interface; probing "
+                f"IPv4 from the default interface ({local_ip or 'any'})"
+            )
+            targets.insert(0, ("default", local_ip, ipv4_destination))
+        return targets
+
+    def _open_probe_sockets(self) -> List[Tuple[socket.socket, Any, str]]:
+        """Open one non-blocking probe socket per target.
+
+        Interfaces that fail (no address, no multicast route, IPv6 disabled) are
+        logged and skipped so the remaining ones are still probed.
+
+        Returns:
+            List of (socket, destination, label)
+        """
+        sockets = []
+        for label, local, destination in self._probe_targets():
+            try:
+                if len(destination) == 4:
+                    sock = self._open_probe_socket_ipv6(local)
+                else:
+                    sock = self._open_probe_socket(local)
+            except OSError as e:
+                logger.warning(f"Skipping interface {label}: {e}")
+                continue
+            sock.setblocking(False)
+            sockets.append((sock, destination, label))
+        return sockets
+
+    def _probe_message(self) -> bytes:
+        return self.WS_DISCOVERY_PROBE_MESSAGE.format(uuid=str(uuid.uuid4())).encode(
+            "utf-8"
+        )
+
+    def iter_discover(
+        self,
+        prefer_https: bool = False,
+        search: Optional[str] = None,
+        expected: Union[int, Iterable[str], None] = None,
+        quiet: Optional[float] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Discover ONVIF devices, yielding each device as soon as it answers.
+
+        Unlike discover(), which returns after the full timeout, the generator
+        yields a parsed device (same dictionary as discover()) for every new
+        ProbeMatch, so callers can act on the first camera immediately. With
+        several interfaces, all probes go out at once and their non-blocking
+        sockets are multiplexed with selectors; results are merged and
+        deduplicated by EPR. The generator ends when the timeout expires, or
+        earlier once the expected devices were found or the network went quiet;
+        stop iterating to end discovery early.
 
         Args:
             prefer_https: If True, prioritize HTTPS XAddrs when available
             search: Optional search term to filter devices by types or scopes (case-insensitive)
+            expected: Stop once this many (matching) devices, or all of these
+                EPRs, have answered
+            quiet: Stop once no new device has answered for this many seconds
+                after the last retransmission
 
-        Returns:
-            List of discovered devices with connection information.
-            Each device is a dictionary containing:
-            - host (str): Device IP address or hostname
-            - port (int): Device port number
-            - use_https (bool): Whether device supports HTTPS
-            - epr (str): Endpoint reference
-            - types (list): Device types
-            - scopes (list): Device scopes
-            - xaddrs (list): All available XAddrs
+        Yields:
+            dict: Discovered device (host, port, use_https, epr, types, scopes, xaddrs)
 
         Example:
-            >>> discovery = ONVIFDiscovery(timeout=5)
-            >>> devices = discovery.discover()
-            >>> for device in devices:
+            >>> for device in ONVIFDiscovery(timeout=5).iter_discover():
             ...     print(f"{device['host']}:{device['port']}")
-
-            >>> # Filter devices by search term
-            >>> devices = discovery.discover(search="ptz")
-            >>> devices = discovery.discover(search="Hong Kong")
         """
-        local_ip = self._get_local_ip()
         logger.info(f"Starting ONVIF device discovery (timeout: {self.timeout}s)")
-        logger.debug(f"Local IP: {local_ip or 'auto-detect'}")
         if prefer_https:
             logger.debug("Prefer HTTPS endpoints enabled")
         if search:
             logger.debug(f"Search filter: {search}")
 
-        probe_uuid = str(uuid.uuid4())
-        probe = self.WS_DISCOVERY_PROBE_MESSAGE.format(uuid=probe_uuid)
+        message = self._probe_message()
+        run = _ProbeRun(self, expected, quiet)
+        sockets = self._send_probes(message)
+        if not sockets:
+            return
 
-        responses = []
+        # All interfaces share one deadline and one EPR set: total time is one
+        # timeout regardless of how many interfaces are probed
+        selector = selectors.DefaultSelector()
+        for sock, _, label in sockets:
+            selector.register(sock, selectors.EVENT_READ, label)
 
+        seen = set()
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            while True:
+                now = time.monotonic()
+                if run.resend_due(now):
+                    self._resend(sockets, message)
+                    continue
+                reason = run.finished(now, seen)
+                if reason:
+                    logger.debug(f"Discovery finished: {reason}")
+                    break
+                for key, _ in selector.select(run.wait(now)):
+                    try:
+                        data, addr = key.fileobj.recvfrom(8192)
+                    except (BlockingIOError, InterruptedError):
+                        continue
+                    except Exception as e:
+                        # Ignore individual packet errors and continue
+                        logger.debug(f"Error receiving packet on {key.data}: {e}")
+                        continue
+
+                    device = self._accept(data, addr, seen, prefer_https, search)
+                    if device is not None:
+                        run.record(time.monotonic())
+                        yield device
+        finally:
+            selector.close()
+            for sock, _, _ in sockets:
+                sock.close()
+
+    def _send_probes(self, message: bytes) -> List[Tuple[socket.socket, Any, str]]:
+        """Open the probe sockets and send the Probe on each.
 
-            # Bind to specific interface if available, otherwise use empty string
-            # Empty string lets the OS choose the appropriate interface for multicast
-            # This avoids the security issue of explicitly using "0.0.0.0"
-            bind_address = local_ip if local_ip else ""
-            sock.bind((bind_address, 0))
-            sock.settimeout(self.timeout)
+        Returns:
+            List of (socket, destination, label) that sent a probe
+        """
+        sockets = []
+        for sock, destination, label in self._open_probe_sockets():
+            try:
+                logger.debug(
+                    f"Sending WS-Discovery probe on {label} to "
+                    f"{destination[0]}:{destination[1]}"
+                )
+                sock.sendto(message, destination)
+            except OSError as e:
+                logger.warning(f"Failed to send probe on {label}: {e}")
+                sock.close()
+                continue
+            sockets.append((sock, destination, label))
 
-            ttl = struct.pack("b", 1)
-            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        if not sockets:
+            logger.error("Discovery failed: no usable network interface")
+        return sockets
 
-            logger.debug(
-                f"Sending WS-Discovery probe to {self.WS_DISCOVERY_ADDRESS_IPv4}:{self.WS_DISCOVERY_PORT}"
-            )
-            sock.sendto(
-                probe.encode("utf-8"),
-                (self.WS_DISCOVERY_ADDRESS_IPv4, self.WS_DISCOVERY_PORT),
-            )
+    @staticmethod
+    def _resend(endpoints, message: bytes):
+        """Retransmit the Probe on every socket (or datagram transport)."""
+        for endpoint, destination, label in endpoints:
+            try:
+                endpoint.sendto(message, destination)
+            except OSError as e:
+                logger.debug(f"Failed to retransmit probe on {label}: {e}")
+        logger.debug("Retransmitted WS-Discovery probe")
+
+    def _accept(self, data, addr, seen, prefer_https, search):
+        """Parse one datagram; return a new (unseen, matching) device or None."""
+        device = self._parse_single_response(data, prefer_https)
+        if not device or not device.get("host"):
+            return None
 
-            while True:
-                try:
-                    data, addr = sock.recvfrom(8192)
-                    response = data.decode("utf-8", errors="ignore").strip()
+        key = device["epr"] or device["host"]
+        if key in seen:
+            return None
+        seen.add(key)
+
+        logger.debug(f"Parsed device from {addr[0]}: {device['host']}:{device['port']}")
+        if search and not self._filter_devices([device], search):
+            return None
+        return device
+
+    async def aiter_discover(
+        self,
+        prefer_https: bool = False,
+        search: Optional[str] = None,
+        expected: Union[int, Iterable[str], None] = None,
+        quiet: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of iter_discover() for asyncio applications.
 
-                    if response and len(response) > 10:
-                        if response.startswith("<?xml") or response.startswith("<"):
-                            logger.debug(f"Received response from {addr[0]}")
-                            responses.append({"xml": response, "address": addr[0]})
+        Example:
+            >>> async for device in ONVIFDiscovery(timeout=5).aiter_discover():
+            ...     print(device["host"])
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        class _Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                queue.put_nowait((data, addr))
+
+        message = self._probe_message()
+        run = _ProbeRun(self, expected, quiet)
+        transports = []
+        for sock, destination, label in self._send_probes(message):
+            try:
+                transport, _ = await loop.create_datagram_endpoint(_Protocol, sock=sock)
+            except OSError as e:
+                logger.warning(f"Skipping interface {label}: {e}")
+                sock.close()
+                continue
+            transports.append((transport, destination, label))
+        if not transports:
+            return
 
-                except socket.timeout:
-                    logger.debug("Discovery timeout reached")
+        seen = set()
+        try:
+            while True:
+                now = time.monotonic()
+                if run.resend_due(now):
+                    self._resend(transports, message)
+                    continue
+                reason = run.finished(now, seen)
+                if reason:
+                    logger.debug(f"Discovery finished: {reason}")
                     break
-                except Exception as e:
-                    # Ignore individual packet errors and continue
-                    logger.debug(f"Error receiving packet: {e}")
+                try:
+                    data, addr = await asyncio.wait_for(queue.get(), run.wait(now))
+                except asyncio.TimeoutError:
                     continue
+                device = self._accept(data, addr, seen, prefer_https, search)
+                if device is not None:
+                    run.record(time.monotonic())
+                    yield device
+        finally:
+            for transport, _, _ in transports:
+                transport.close()
 
-            sock.close()
+    def discover(
+        self,
+        prefer_https: bool = False,
+        search: Optional[str] = None,
+        expected: Union[int, Iterable[str], None] = None,
+        quiet: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Discover ONVIF devices on the network.
 
-        except Exception as e:
-            # Socket creation or binding failed
-            logger.error(f"Discovery failed: {e}")
-            return []
+        Args:
+            prefer_https: If True, prioritize HTTPS XAddrs when available
+            search: Optional search term to filter devices by types or scopes (case-insensitive)
+            expected: Return as soon as this many (matching) devices, or all of
+                these EPRs, have answered
+            quiet: Return once no new device has answered for this many seconds
+                after the last retransmission
 
-        logger.info(f"Received {len(responses)} responses")
+        Returns:
+            List of discovered devices with connection information.
+            Each device is a dictionary containing:
+            - host (str): Device IP address or hostname
+            - port (int): Device port number
+            - use_https (bool): Whether device supports HTTPS
+            - epr (str): Endpoint reference
+            - types (list): Device types
+            - scopes (list): Device scopes
+            - xaddrs (list): All available XAddrs
 
-        # Parse responses
-        devices = self._parse_responses(responses, prefer_https)
+        Example:
+            >>> discovery = ONVIFDiscovery(timeout=5)
+            >>> devices = discovery.discover()
+            >>> for device in devices:
+            ...     print(f"{device['host']}:{device['port']}")
 
-        # Apply search filter if provided
-        if search:
-            unfiltered_count = len(devices)
-            devices = self._filter_devices(devices, search)
-            logger.info(
-                f"Search filter '{search}' matched {len(devices)}/{unfiltered_count} devices"
-            )
+            >>> # Filter devices by search term
+            >>> devices = discovery.discover(search="ptz")
+            >>> devices = discovery.discover(search="Hong Kong")
 
+            >>> # Return early: known fleet size, or one quiet second
+            >>> devices = discovery.discover(expected=12)
+            >>> devices = discovery.discover(quiet=1.0)
+        """
+        devices = list(
+            self.iter_discover(
+                prefer_https=prefer_https, search=search, expected=expected, quiet=quiet
+            )
+        )
         logger.info(f"Discovery completed: found {len(devices)} ONVIF devices")
         return devices
 
@@ -266,27 +735,37 @@ class ONVIFDiscovery:
             return devices
 
         search_lower = search_term.lower()
-        filtered = []
-
-        for device in devices:
-            # Check types
-            types_match = any(
-                search_lower in t.lower() for t in device.get("types", [])
-            )
-
-            # Check scopes
-            scopes_match = any(
-                search_lower in s.lower() for s in device.get("scopes", [])
-            )
-
-            # Include device if match found in types or scopes
-            if types_match or scopes_match:
-                filtered.append(device)
-
-        return filtered
+        if "\n" in search_lower:
+            return []  # Types and scopes are whitespace-separated tokens
+        return [
+            device for device in devices if search_lower in self._search_text(device)
+        ]
+
+    def _search_text(self, device: Dict[str, Any]) -> str:
+        """Lowercased types and scopes of a device, one per line (cached).
+
+        The text is computed on a device's first search instead of lowercasing
+        every type and scope on every search (parsing doesn't pay for it); an
+        entry is reused only while the device still holds the same types/scopes
+        lists.
+        """
+        types = device.get("types", [])
+        scopes = device.get("scopes", [])
+        key = device.get("epr") or device.get("host")
+        cached = self._search_index.get(key)
+        if cached is not None and cached[0] is types and cached[1] is scopes:
+            return cached[2]
+
+        # Newlines keep matches within a single type or scope
+        text = "\n".join(types + scopes).lower()
+        if key:
+            if len(self._search_index) >= 10000:
+                self._search_index.clear()
+            self._search_index[key] = (types, scopes, text)
+        return text
 
     def _parse_single_response(
-        self, xml_data: str, prefer_https: bool = False
+        self, xml_data: Union[str, bytes], prefer_https: bool = False
     ) -> Optional[Dict[str, Any]]:
         """Parse a single WS-Discovery response.
 
@@ -298,68 +777,37 @@ class ONVIFDiscovery:
             Device information dictionary or None if parsing fails
         """
         try:
-            # Use lxml's secure parser that prevents XXE attacks
-            parser = etree.XMLParser(
-                resolve_entities=False,  # Disable entity resolution
-                no_network=True,  # Disable network access
-                remove_blank_text=True,
-            )
-            root = etree.fromstring(xml_data.encode("utf-8"), parser)
-
-            probe_match = probe_match = root.find(".//d:ProbeMatch", self.NAMESPACES)
-            if probe_match is None:
-                probe_match = root.find(".//wsd:ProbeMatch", self.NAMESPACES)
-
-            if probe_match is None:
+            matches = _PROBE_MATCH(self._parse_xml(xml_data))
+            if not matches:
                 return None
-
-            device_info = {
-                "epr": "",
-                "types": [],
-                "scopes": [],
-                "xaddrs": [],
-                "host": None,
-                "port": 80,
-                "use_https": False,
-            }
-
-            # Extract EPR
-            epr = probe_match.find(
-                ".//wsa:EndpointReference/wsa:Address", self.NAMESPACES
-            )
-            if epr is not None and epr.text:
-                device_info["epr"] = epr.text
-
-            # Extract Types
-            types_elem = probe_match.find(".//d:Types", self.NAMESPACES)
-            if types_elem is None:
-                types_elem = probe_match.find(".//wsd:Types", self.NAMESPACES)
-            if types_elem is not None and types_elem.text:
-                device_info["types"] = types_elem.text.split()
-
-            # Extract Scopes
-            scopes_elem = probe_match.find(".//d:Scopes", self.NAMESPACES)
-            if scopes_elem is None:
-                scopes_elem = probe_match.find(".//wsd:Scopes", self.NAMESPACES)
-            if scopes_elem is not None and scopes_elem.text:
-                device_info["scopes"] = scopes_elem.text.split()
-
-            # Extract XAddrs
-            xaddrs_elem = probe_match.find(".//d:XAddrs", self.NAMESPACES)
-            if xaddrs_elem is None:
-                xaddrs_elem = probe_match.find(".//wsd:XAddrs", self.NAMESPACES)
-            if xaddrs_elem is not None and xaddrs_elem.text:
-                device_info["xaddrs"] = xaddrs_elem.text.split()
-
-                # Parse host, port, and protocol from XAddrs
-                if device_info["xaddrs"]:
-                    self._parse_xaddr(device_info, prefer_https)
-
-            return device_info
-
+            return self._parse_match(matches[0], prefer_https)
         except Exception:
             return None
 
+    @staticmethod
+    def _parse_xml(xml_data: Union[str, bytes]):
+        if isinstance(xml_data, str):
+            xml_data = xml_data.encode("utf-8")
+        return etree.fromstring(xml_data, _secure_parser())
+
+    def _parse_match(self, match, prefer_https: bool = False) -> Dict[str, Any]:
+        """Parse a ProbeMatch or Hello element into device information."""
+        device_info = {
+            "epr": _EPR(match),
+            "types": _TYPES(match).split(),
+            "scopes": _SCOPES(match).split(),
+            "xaddrs": _XADDRS(match).split(),
+            "host": None,
+            "port": 80,
+            "use_https": False,
+        }
+
+        # Parse host, port, and protocol from XAddrs
+        if device_info["xaddrs"]:
+            self._parse_xaddr(device_info, prefer_https)
+
+        return device_info
+
     def _parse_xaddr(
         self, device_info: Dict[str, Any], prefer_https: bool = False
     ) -> None:
@@ -387,18 +835,213 @@ class ONVIFDiscovery:
 
         try:
             # Detect protocol
-            protocol = xaddr.split("://")[0]
+            protocol, _, rest = xaddr.partition("://")
             device_info["use_https"] = protocol == "https"
 
-            # Extract host and port
-            parts = xaddr.split("://")[1].split("/")[0]
-            if ":" in parts:
-                device_info["host"] = parts.split(":")[0]
-                device_info["port"] = int(parts.split(":")[1])
+            # Extract host and port (IPv6 literals are bracketed: http://[fe80::1]:80/)
+            netloc = rest.split("/", 1)[0]
+            if netloc.startswith("["):
+                host, _, port = netloc[1:].partition("]")
+                port = port[1:]
             else:
-                device_info["host"] = parts
-                # Set default port based on protocol
-                device_info["port"] = 443 if protocol == "https" else 80
-        except (ValueError, IndexError):
+                host, _, port = netloc.partition(":")
+            device_info["host"] = host
+            # Set default port based on protocol
+            device_info["port"] = (
+                int(port) if port else (443 if protocol == "https" else 80)
+            )
+        except ValueError:
             # Failed to parse XAddr
             pass
+
+
+class ONVIFDiscoveryListener:
+    """Long-running WS-Discovery listener tracking Hello/Bye announcements.
+
+    Joins the 239.255.255.250:3702 multicast group and keeps a device table keyed
+    by EPR up to date from the Hello (device joins or changes) and Bye (device
+    leaves) messages devices announce on their own, so no periodic probe storms
+    are needed. An optional initial probe (seed=True) fills the table with the
+    devices that are already online.
+
+    Attributes:
+        devices (dict): EPR -> device dictionary (as returned by discover(), plus
+            "last_seen" as a time.time() timestamp)
+
+    Example:
+        >>> from onvif.utils import ONVIFDiscoveryListener
+        >>> listener = ONVIFDiscoveryListener(
+        ...     on_hello=lambda d: print("joined", d["host"]),
+        ...     on_bye=lambda d: print("left", d["epr"]),
+        ... ).start()
+        >>> listener.devices
+        >>> listener.close()
+
+    Notes:
+        - Binding to port 3702 may require that no other WS-Discovery service
+          (e.g. wsdd) holds the port exclusively
+        - Hello messages without XAddrs are tracked with host None until a
+          ProbeMatch or a later Hello carries the address
+    """
+
+    def __init__(
+        self,
+        interface: Optional[str] = None,
+        on_hello: Callable[[Dict[str, Any]], None] = None,
+        on_bye: Callable[[Dict[str, Any]], None] = None,
+        prefer_https: bool = False,
+        seed: bool = True,
+        port: int = ONVIFDiscovery.WS_DISCOVERY_PORT,
+    ):
+        """Initialize the listener.
+
+        Args:
+            interface: Local interface IP joining the multicast group (default: any)
+            on_hello: Called with the device dictionary on every Hello
+            on_bye: Called with the (last known) device dictionary on every Bye
+            prefer_https: If True, prioritize HTTPS XAddrs
+            seed: Send one Probe on start to learn devices that are already online
+            port: UDP port to listen on (default: 3702)
+        """
+        self.interface = interface
+        self.on_hello = on_hello
+        self.on_bye = on_bye
+        self.prefer_https = prefer_https
+        self.seed = seed
+        self.port = port
+
+        self.devices: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._parser = ONVIFDiscovery(interface=interface)
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Join the multicast group and start the listener thread (idempotent).
+
+        Returns:
+            self
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            except OSError:
+                pass
+        sock.bind(("", self.port))
+        self.port = sock.getsockname()[1]
+
+        try:
+            membership = socket.inet_aton(
+                ONVIFDiscovery.WS_DISCOVERY_ADDRESS_IPv4
+            ) + socket.inet_aton(self.interface or "0.0.0.0")
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        except OSError as e:
+            # No multicast route (e.g. isolated host); unicast still works
+            logger.warning(f"Failed to join WS-Discovery multicast group: {e}")
+
+        sock.settimeout(0.5)
+        self._sock = sock
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="onvif-discovery-listener", daemon=True
+        )
+        self._thread.start()
+
+        if self.seed:
+            self.probe()
+        return self
+
+    def probe(self):
+        """Send a Probe from the listening socket; ProbeMatches update the table."""
+        try:
+            self._sock.sendto(
+                self._parser._probe_message(),
+                (
+                    ONVIFDiscovery.WS_DISCOVERY_ADDRESS_IPv4,
+                    ONVIFDiscovery.WS_DISCOVERY_PORT,
+                ),
+            )
+        except OSError as e:
+            logger.warning(f"Failed to send WS-Discovery probe: {e}")
+
+    def close(self, timeout: float = 2):
+        """Stop listening and leave the multicast group."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self._sock.recvfrom(8192)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            try:
+                self._handle(data, addr)
+            except Exception as e:
+                logger.debug(f"Ignoring WS-Discovery message from {addr[0]}: {e}")
+
+    def _handle(self, data: bytes, addr) -> Optional[str]:
+        """Apply one WS-Discovery message to the device table.
+
+        Returns:
+            str: "hello", "bye" or "match" if the message changed the table
+        """
+        root = self._parser._parse_xml(data)
+
+        bye = _BYE(root)
+        if bye:
+            epr = _EPR(bye[0])
+            if not epr:
+                return None
+            with self._lock:
+                device = self.devices.pop(epr, None)
+            logger.info(f"WS-Discovery Bye from {addr[0]}")
+            if self.on_bye is not None:
+                self._callback(self.on_bye, device or {"epr": epr})
+            return "bye"
+
+        hello = _HELLO(root)
+        kind = "hello"
+        if not hello:
+            hello = _PROBE_MATCH(root)
+            kind = "match"
+        if not hello:
+            return None
+
+        device = self._parser._parse_match(hello[0], self.prefer_https)
+        if not device["epr"]:
+            return None
+        device["last_seen"] = time.time()
+        with self._lock:
+            self.devices[device["epr"]] = device
+
+        if kind == "hello":
+            logger.info(f"WS-Discovery Hello from {addr[0]}")
+            if self.on_hello is not None:
+                self._callback(self.on_hello, device)
+        return kind
+
+    @staticmethod
+    def _callback(callback, device):
+        try:
+            callback(device)
+        except Exception as e:
+            logger.error(f"Discovery listener callback failed: {e}")
@@ -0,0 +1,312 @@
+# onvif/utils/discovery_cache.py
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from .discovery import ONVIFDiscovery
+from .scanner import ONVIFScanner, get_system_date_and_time
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Result of a cache update: new and gone are lists of device dictionaries,
+# changed is a list of (before, after) pairs whose XAddrs differ.
+DiscoveryDiff = namedtuple("DiscoveryDiff", ["new", "gone", "changed"])
+
+# Device fields persisted in the cache
+_FIELDS = ("epr", "host", "port", "use_https", "xaddrs", "scopes", "types")
+
+
+class ONVIFDiscoveryCache:
+    """Discovery results keyed by EPR, with TTL-based incremental refresh.
+
+    A full multicast sweep is the expensive part of discovery: it waits a whole
+    timeout and makes every device on the segment answer. The cache keeps the
+    last known XAddrs, scopes and types of every device together with when it
+    was last seen, so periodic reconciliation only has to look at entries that
+    went stale:
+
+        - Entries younger than ttl are trusted as-is
+        - refresh() re-probes stale entries only, with a directed (unicast)
+          WS-Discovery Probe to each stale host, falling back to an
+          unauthenticated GetSystemDateAndTime on the cached XAddr for devices
+          that don't answer unicast probes; entries that fail both are gone
+        - A full sweep (ONVIFDiscovery.discover()) runs on the first refresh and
+          then every sweep_interval seconds to pick up new devices
+
+    Every update returns a DiscoveryDiff(new, gone, changed). Devices can also be
+    merged in from other sources (ONVIFScanner results, ONVIFDiscoveryListener
+    Hello callbacks) with update().
+
+    Example:
+        >>> from onvif.utils import ONVIFDiscoveryCache
+        >>> cache = ONVIFDiscoveryCache("/var/lib/onvif/discovery.json", ttl=300)
+        >>> diff = cache.refresh()  # Run every minute: cheap unless entries are stale
+        >>> for device in diff.new:
+        ...     print("new", device["host"])
+        >>> for before, after in diff.changed:
+        ...     print("moved", before["xaddrs"], "->", after["xaddrs"])
+        >>> cache.devices()
+
+        >>> # Keep the cache current from Hello announcements as well
+        >>> listener = ONVIFDiscoveryListener(on_hello=lambda d: cache.update([d]))
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 300,
+        sweep_interval: float = 3600,
+        discovery: Optional[ONVIFDiscovery] = None,
+        timeout: float = 2.0,
+        workers: int = 32,
+    ):
+        """Initialize the cache (loading path if it exists).
+
+        Args:
+            path: JSON file to persist the cache to (default: memory only)
+            ttl: Seconds an entry is trusted without re-validation (default: 300)
+            sweep_interval: Seconds between full multicast sweeps (default: 3600)
+            discovery: ONVIFDiscovery used for full sweeps (default: ONVIFDiscovery())
+            timeout: Validation timeout per stale device in seconds (default: 2)
+            workers: Concurrent validations (default: 32)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.discovery = discovery or ONVIFDiscovery()
+        self.timeout = timeout
+        self.workers = workers
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.last_sweep: Optional[float] = None
+        self._lock = threading.RLock()
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def devices(self, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Cached devices, optionally only those seen within max_age seconds."""
+        now = time.time()
+        with self._lock:
+            return [
+                dict(entry)
+                for entry in self.entries.values()
+                if max_age is None or now - entry["last_seen"] <= max_age
+            ]
+
+    def stale(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Entries not seen within ttl."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return [
+                dict(entry)
+                for entry in self.entries.values()
+                if now - entry["last_seen"] > self.ttl
+            ]
+
+    def update(
+        self,
+        devices: Iterable[Dict[str, Any]],
+        gone: Iterable[str] = (),
+        now: Optional[float] = None,
+    ) -> DiscoveryDiff:
+        """Merge devices that were just seen, and drop gone EPRs.
+
+        Args:
+            devices: Device dictionaries (as returned by discover() or a scan);
+                devices without an EPR are keyed by their first XAddr
+            gone: EPRs of devices known to have left
+            now: Timestamp of the observation (default: time.time())
+
+        Returns:
+            DiscoveryDiff: What changed in the cache
+        """
+        now = time.time() if now is None else now
+        diff = DiscoveryDiff([], [], [])
+        with self._lock:
+            for device in devices:
+                key = self._key(device)
+                if not key:
+                    continue
+                entry = {field: device.get(field) for field in _FIELDS}
+                entry["epr"] = key
+                entry["xaddrs"] = list(entry["xaddrs"] or [])
+                entry["scopes"] = list(entry["scopes"] or [])
+                entry["types"] = list(entry["types"] or [])
+                entry["last_seen"] = now
+
+                previous = self.entries.get(key)
+                if previous is None:
+                    entry["first_seen"] = now
+                    diff.new.append(dict(entry))
+                else:
+                    entry["first_seen"] = previous.get("first_seen", now)
+                    if entry["host"] is None:
+                        # Hello without XAddrs: keep the known address
+                        for field in ("host", "port", "use_https", "xaddrs"):
+                            entry[field] = previous[field]
+                    elif sorted(previous["xaddrs"]) != sorted(entry["xaddrs"]):
+                        diff.changed.append((dict(previous), dict(entry)))
+                self.entries[key] = entry
+
+            for key in gone:
+                entry = self.entries.pop(key, None)
+                if entry is not None:
+                    diff.gone.append(entry)
+
+        self._log(diff)
+        return diff
+
+    def refresh(self, full: bool = False) -> DiscoveryDiff:
+        """Bring the cache up to date, re-probing only what is needed.
+
+        Args:
+            full: Force a full multicast sweep
+
+        Returns:
+            DiscoveryDiff: Changes since the previous state
+        """
+        now = time.time()
+        full = (
+            full
+            or self.last_sweep is None
+            or now - self.last_sweep >= self.sweep_interval
+        )
+
+        if full:
+            diff = self._sweep(now)
+        else:
+            diff = self._revalidate(self.stale(now))
+
+        if self.path:
+            self.save()
+        return diff
+
+    def _sweep(self, now: float) -> DiscoveryDiff:
+        """Full multicast discovery; stale entries that didn't answer are revalidated."""
+        logger.info("Discovery cache: full sweep")
+        found = self.discovery.discover()
+        self.last_sweep = now
+        diff = self.update(found, now=now)
+
+        # Not answering a single multicast probe isn't proof a device left
+        answered = {self._key(device) for device in found}
+        missing = [entry for entry in self.stale(now) if entry["epr"] not in answered]
+        more = self._revalidate(missing)
+        return DiscoveryDiff(
+            diff.new + more.new, diff.gone + more.gone, diff.changed + more.changed
+        )
+
+    def _revalidate(self, entries: List[Dict[str, Any]]) -> DiscoveryDiff:
+        """Re-probe stale entries; update the ones that answer, drop the rest."""
+        if not entries:
+            return DiscoveryDiff([], [], [])
+        logger.info(f"Discovery cache: revalidating {len(entries)} stale entries")
+
+        # Directed WS-Discovery Probe to every stale host at once
+        matches = {}
+        scanner = ONVIFScanner(ports=(), timeout=self.timeout)
+        for device in scanner.probe_hosts(
+            sorted({entry["host"] for entry in entries if entry["host"]})
+        ):
+            key = self._key(device)
+            if key:
+                matches.setdefault(key, device)
+
+        # A different device now answers at the host: the cached one is gone
+        replaced = {device["host"] for device in matches.values()}
+        gone = [
+            entry["epr"]
+            for entry in entries
+            if entry["epr"] not in matches and entry["host"] in replaced
+        ]
+
+        # Devices that didn't answer the probe: is the cached XAddr still alive?
+        unanswered = [
+            entry
+            for entry in entries
+            if entry["epr"] not in matches and entry["host"] not in replaced
+        ]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            alive = list(pool.map(self._alive, unanswered))
+
+        seen = list(matches.values())
+        seen += [entry for entry, ok in zip(unanswered, alive) if ok]
+        gone += [entry["epr"] for entry, ok in zip(unanswered, alive) if not ok]
+        return self.update(seen, gone=gone)
+
+    def _alive(self, entry: Dict[str, Any]) -> bool:
+        if not entry["host"]:
+            return False
+        path = "/onvif/device_service"
+        for xaddr in entry["xaddrs"]:
+            url = urlsplit(xaddr)
+            if url.hostname == entry["host"] and url.path:
+                path = url.path
+                break
+        try:
+            get_system_date_and_time(
+                entry["host"],
+                entry["port"],
+                entry["use_https"],
+                timeout=self.timeout,
+                path=path,
+            )
+            return True
+        except (OSError, ValueError) as e:
+            logger.debug(f"Cached device {entry['epr']} did not answer: {e}")
+            return False
+
+    @staticmethod
+    def _key(device: Dict[str, Any]) -> Optional[str]:
+        return device.get("epr") or next(iter(device.get("xaddrs") or []), None)
+
+    @staticmethod
+    def _log(diff: DiscoveryDiff):
+        if diff.new or diff.gone or diff.changed:
+            logger.info(
+                f"Discovery cache: {len(diff.new)} new, {len(diff.gone)} gone, "
+                f"{len(diff.changed)} changed"
+            )
+
+    def save(self):
+        """Write the cache to path (atomically)."""
+        with self._lock:
+            data = {
+                "last_sweep": self.last_sweep,
+                "devices": list(self.entries.values()),
+            }
+        temporary = f"{self.path}.tmp"
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temporary, self.path)
+
+    def load(self):
+        """Read the cache from path (a corrupt file is logged and ignored)."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            entries = {entry["epr"]: entry for entry in data.get("devices", [])}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable discovery cache {self.path}: {e}")
+            return
+        with self._lock:
+            self.entries = entries
+            self.last_sweep = data.get("last_sweep")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, epr) -> bool:
+        return epr in self.entries
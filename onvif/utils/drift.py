@@ -0,0 +1,377 @@
+# onvif/utils/drift.py
+
+import time
+import json
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .inventory import serialize
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Devices sharing one configuration. digest is the hash of the normalized
+# result, devices the device names (sorted) and value the normalized result.
+DriftCluster = namedtuple("DriftCluster", ["digest", "devices", "value"])
+
+# Drift report of one check. clusters are sorted largest first; baseline is
+# the digest devices are compared with (the largest cluster unless a baseline
+# device was given); deviations maps each device outside the baseline to
+# [(path, expected, actual), ...] (path "" is the whole result); changed lists
+# devices whose result changed since the previous run; errors maps devices
+# whose call failed to the message.
+DriftReport = namedtuple(
+    "DriftReport", ["check", "baseline", "clusters", "deviations", "changed", "errors"]
+)
+
+# Default checks: the settings a homogeneous fleet is expected to share
+DEFAULT_CHECKS = {
+    "ntp": {"operation": "devicemgmt.GetNTP"},
+    "dns": {"operation": "devicemgmt.GetDNS"},
+    "users": {"operation": "devicemgmt.GetUsers", "unordered": True},
+    "video_encoders": {
+        "operation": "media.GetVideoEncoderConfigurations",
+        "ignore": ["UseCount"],
+    },
+}
+
+_MISSING = "<missing>"
+
+
+class _Node:
+    """Hash of a normalized value, with the hashes of its children."""
+
+    __slots__ = ("digest", "children")
+
+    def __init__(self, digest: bytes, children=None):
+        self.digest = digest
+        self.children = children  # dict for objects, list for lists, None for leaves
+
+
+def _hash_tree(
+    value: Any, ignore=frozenset(), unordered: bool = False
+) -> Tuple[Any, _Node]:
+    """Hash a normalized value bottom-up (Merkle tree).
+
+    Equal subtrees get equal digests, so two results are compared by their
+    root digest and a diff only descends into subtrees whose digests differ.
+
+    Args:
+        value: Normalized value (from serialize())
+        ignore: Field names dropped at any depth
+        unordered: Sort top-level list items, so the order the device returns
+            them in doesn't count as drift
+
+    Returns:
+        (value, node): The value with ignored fields dropped, and its hash tree
+    """
+    if isinstance(value, dict):
+        keys = sorted(key for key in value if key not in ignore)
+        result, children = {}, {}
+        h = hashlib.blake2b(b"d", digest_size=16)
+        for key in keys:
+            result[key], children[key] = _hash_tree(value[key], ignore)
+            h.update(key.encode("utf-8", "surrogatepass"))
+            h.update(children[key].digest)
+        return result, _Node(h.digest(), children)
+
+    if isinstance(value, list):
+        items = [_hash_tree(item, ignore) for item in value]
+        if unordered:
+            items.sort(key=lambda item: item[1].digest)
+        h = hashlib.blake2b(b"l", digest_size=16)
+        for _, node in items:
+            h.update(node.digest)
+        return [item for item, _ in items], _Node(
+            h.digest(), [node for _, node in items]
+        )
+
+    encoded = json.dumps(value).encode("utf-8", "surrogatepass")
+    return value, _Node(hashlib.blake2b(encoded, digest_size=16).digest())
+
+
+def _diff(expected, expected_node, actual, actual_node, path, out, limit):
+    """Collect (path, expected, actual) of the differing leaves of two hash trees."""
+    if len(out) >= limit or expected_node.digest == actual_node.digest:
+        return
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            child = f"{path}.{key}" if path else key
+            if key not in actual:
+                out.append((child, expected[key], _MISSING))
+            elif key not in expected:
+                out.append((child, _MISSING, actual[key]))
+            else:
+                _diff(
+                    expected[key],
+                    expected_node.children[key],
+                    actual[key],
+                    actual_node.children[key],
+                    child,
+                    out,
+                    limit,
+                )
+            if len(out) >= limit:
+                return
+        return
+    if (
+        isinstance(expected, list)
+        and isinstance(actual, list)
+        and len(expected) == len(actual)
+    ):
+        for index, (a, b) in enumerate(zip(expected, actual)):
+            _diff(
+                a,
+                expected_node.children[index],
+                b,
+                actual_node.children[index],
+                f"{path}[{index}]",
+                out,
+                limit,
+            )
+        return
+    out.append((path, expected, actual))
+
+
+class _Entry:
+    """Cached normalized result of one check on one device."""
+
+    __slots__ = ("value", "node", "timestamp")
+
+    def __init__(self, value, node, timestamp):
+        self.value = value
+        self.node = node
+        self.timestamp = timestamp
+
+
+class ONVIFDriftDetector:
+    """Configuration drift detection across a fleet.
+
+    Pulls a declared set of Get* operations from every device in parallel,
+    normalizes the results (serialize(), the same converter used by
+    ONVIFInventory) and hashes them bottom-up, so that:
+
+        - Devices with identical configurations are grouped by comparing one
+          digest per device instead of whole result trees
+        - Deviations from the baseline (the largest cluster, or a given
+          baseline device) are found by descending only into subtrees whose
+          digests differ, and reported as dotted paths
+        - Results are cached per device and check; a re-check only pulls
+          entries older than max_age (or the devices asked for), and reports
+          which devices changed since the previous run
+
+    A check is declared as an operation name ("service.Operation") or a
+    dictionary with:
+        operation: "service.Operation", e.g. "devicemgmt.GetNTP"
+        params: Operation arguments (default: none)
+        ignore: Field names dropped at any depth, for values that are expected
+            to differ per device (e.g. "UseCount", addresses)
+        unordered: Ignore the order of the returned list (default: False)
+
+    Example:
+        >>> from onvif.utils import ONVIFDriftDetector
+        >>> detector = ONVIFDriftDetector(workers=32)
+        >>> reports = detector.check(clients)
+        >>> for name, report in reports.items():
+        ...     print(name, [len(c.devices) for c in report.clusters])
+        ...     for device, paths in report.deviations.items():
+        ...         print(" ", device, paths[:3])
+
+        >>> # Later: only re-pull results older than 10 minutes
+        >>> reports = detector.check(clients, max_age=600)
+    """
+
+    def __init__(
+        self,
+        checks: Optional[Dict[str, Union[str, Dict[str, Any]]]] = None,
+        workers: int = 16,
+        baseline: Optional[str] = None,
+        max_deviations: int = 50,
+    ):
+        """Initialize the detector.
+
+        Args:
+            checks: {name: operation or check dictionary} (default: NTP, DNS,
+                users and video encoder configurations)
+            workers: Devices pulled concurrently (default: 16)
+            baseline: Device name whose configuration is the expected one
+                (default: the largest cluster of each check)
+            max_deviations: Deviating paths reported per device and check
+                (default: 50)
+
+        Raises:
+            ValueError: A check has no "service.Operation" operation
+        """
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        for name, spec in (checks or DEFAULT_CHECKS).items():
+            if isinstance(spec, str):
+                spec = {"operation": spec}
+            service, _, operation = spec.get("operation", "").partition(".")
+            if not service or not operation:
+                raise ValueError(
+                    f"Check {name!r} needs an operation like 'devicemgmt.GetNTP'"
+                )
+            self.checks[name] = {
+                "service": service,
+                "operation": operation,
+                "params": dict(spec.get("params") or {}),
+                "ignore": frozenset(spec.get("ignore") or ()),
+                "unordered": bool(spec.get("unordered", False)),
+            }
+        self.workers = workers
+        self.baseline = baseline
+        self.max_deviations = max_deviations
+
+        self._cache: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+
+    def check(
+        self,
+        clients: Union[Iterable, Dict[str, Any]],
+        max_age: Optional[float] = None,
+        devices: Optional[Iterable[str]] = None,
+    ) -> Dict[str, DriftReport]:
+        """Pull the checks from the fleet and report clusters and deviations.
+
+        Args:
+            clients: ONVIFClient instances (named "host:port"), or a
+                {name: client} dictionary
+            max_age: Reuse cached results younger than this many seconds
+                (default: pull everything)
+            devices: Only re-pull these device names; the others use their
+                cached results when available
+
+        Returns:
+            dict: {check name: DriftReport}
+        """
+        if not isinstance(clients, dict):
+            clients = {self._name(client): client for client in clients}
+        only = set(devices) if devices is not None else None
+        now = time.monotonic()
+
+        tasks = []
+        for name in clients:
+            for check in self.checks:
+                entry = self._cache.get((name, check))
+                if entry is not None and (
+                    (only is not None and name not in only)
+                    or (max_age is not None and now - entry.timestamp < max_age)
+                ):
+                    continue
+                tasks.append((name, check))
+
+        errors: Dict[str, Dict[str, str]] = {check: {} for check in self.checks}
+        changed: Dict[str, List[str]] = {check: [] for check in self.checks}
+
+        def pull(name, check):
+            spec = self.checks[check]
+            try:
+                service = getattr(clients[name], spec["service"])()
+                result = getattr(service, spec["operation"])(**spec["params"])
+                value, node = _hash_tree(
+                    serialize(result), spec["ignore"], spec["unordered"]
+                )
+            except Exception as e:
+                logger.debug(f"Drift {name} {check} failed: {e}")
+                with self._lock:
+                    self._cache.pop((name, check), None)
+                    errors[check][name] = str(e)
+                return
+            with self._lock:
+                previous = self._cache.get((name, check))
+                if previous is not None and previous.node.digest != node.digest:
+                    changed[check].append(name)
+                self._cache[(name, check)] = _Entry(value, node, time.monotonic())
+
+        if tasks:
+            # Checks of one device run on the same worker, one after the other
+            by_device: Dict[str, List[str]] = {}
+            for name, check in tasks:
+                by_device.setdefault(name, []).append(check)
+
+            def pull_device(name):
+                for check in by_device[name]:
+                    pull(name, check)
+
+            with ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="onvif-drift"
+            ) as pool:
+                list(pool.map(pull_device, by_device))
+
+        return {
+            check: self._report(check, clients, changed[check], errors[check])
+            for check in self.checks
+        }
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop cached results of a device (all devices if name is None)."""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == name]:
+                    del self._cache[key]
+
+    def digests(self) -> Dict[str, Dict[str, str]]:
+        """Cached result digests, {device: {check: hex digest}}."""
+        result: Dict[str, Dict[str, str]] = {}
+        with self._lock:
+            for (name, check), entry in self._cache.items():
+                result.setdefault(name, {})[check] = entry.node.digest.hex()
+        return result
+
+    def _report(self, check, clients, changed, errors) -> DriftReport:
+        entries: Dict[str, _Entry] = {}
+        with self._lock:
+            for name in clients:
+                entry = self._cache.get((name, check))
+                if entry is not None:
+                    entries[name] = entry
+
+        groups: Dict[bytes, List[str]] = {}
+        for name, entry in entries.items():
+            groups.setdefault(entry.node.digest, []).append(name)
+        clusters = sorted(
+            (
+                DriftCluster(digest.hex(), sorted(names), entries[min(names)].value)
+                for digest, names in groups.items()
+            ),
+            key=lambda cluster: (-len(cluster.devices), cluster.devices[0]),
+        )
+
+        baseline = None
+        deviations: Dict[str, List[Tuple[str, Any, Any]]] = {}
+        if self.baseline in entries:
+            reference = entries[self.baseline]
+        elif clusters:
+            reference = entries[clusters[0].devices[0]]
+        else:
+            reference = None
+        if reference is not None:
+            baseline = reference.node.digest.hex()
+            for name, entry in sorted(entries.items()):
+                if entry.node.digest == reference.node.digest:
+                    continue
+                paths: List[Tuple[str, Any, Any]] = []
+                _diff(
+                    reference.value,
+                    reference.node,
+                    entry.value,
+                    entry.node,
+                    "",
+                    paths,
+                    self.max_deviations,
+                )
+                deviations[name] = paths
+
+        return DriftReport(
+            check, baseline, clusters, deviations, sorted(changed), dict(errors)
+        )
+
+    @staticmethod
+    def _name(client) -> str:
+        return f"{client.common_args['host']}:{client.common_args['port']}"
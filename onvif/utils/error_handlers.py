@@ -71,6 +71,36 @@ class ONVIFErrorHandler:
 
         return False
 
+    @staticmethod
+    def is_not_authorized(exception):
+        """Check if an exception is caused by rejected credentials (NotAuthorized fault or HTTP 401)."""
+        try:
+            if isinstance(exception, ONVIFOperationException):
+                original = exception.original_exception
+            else:
+                original = exception
+
+            if isinstance(original, Fault):
+                for subcode in getattr(original, "subcodes", None) or []:
+                    name = getattr(subcode, "localname", None) or str(subcode)
+                    if name.split(":")[-1] in ("NotAuthorized", "FailedAuthentication"):
+                        logger.debug("Detected NotAuthorized fault")
+                        return True
+
+            # zeep.exceptions.TransportError and requests.HTTPError
+            status = getattr(original, "status_code", None)
+            if status is None:
+                status = getattr(
+                    getattr(original, "response", None), "status_code", None
+                )
+            if status == 401:
+                logger.debug("Detected HTTP 401 Unauthorized")
+                return True
+        except Exception as e:
+            logger.debug(f"Error checking NotAuthorized: {e}")
+
+        return False
+
     @staticmethod
     def safe_call(func, default=None, ignore_unsupported=True, log_error=True):
         """Safely call an ONVIF operation with graceful error handling."""
@@ -0,0 +1,450 @@
+# onvif/utils/event_aggregator.py
+
+import time
+import heapq
+import queue
+import asyncio
+import logging
+import itertools
+import threading
+from collections import namedtuple
+from typing import Any, Dict, Iterator, Optional
+
+from .event_stream import ONVIFEventStream
+from .renewal_manager import ONVIFRenewalManager
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+# One merged event: device name, NotificationMessage and local receive time
+AggregatedEvent = namedtuple("AggregatedEvent", ["device", "message", "received"])
+
+
+class _DeviceState:
+    """Scheduling and metrics state of one device in the aggregator."""
+
+    __slots__ = (
+        "name",
+        "stream",
+        "pending",
+        "parked",
+        "scheduled",
+        "removed",
+        "backoff",
+        "added",
+        "events",
+        "errors",
+        "lag",
+        "max_lag",
+        "last_event",
+        "last_error",
+    )
+
+    def __init__(self, name, stream):
+        self.name = name
+        self.stream = stream
+        self.pending = 0  # Messages in the output queue not yet consumed
+        self.parked = False  # Waiting for the consumer to drain (backpressure)
+        self.scheduled = False
+        self.removed = False
+        self.backoff = 0.0
+        self.added = time.monotonic()
+        self.events = 0
+        self.errors = 0
+        self.lag = 0.0  # Last queue latency (enqueue -> consumer)
+        self.max_lag = 0.0
+        self.last_event = None
+        self.last_error = None
+
+
+class ONVIFEventAggregator:
+    """Multiplex PullPoint event streams of many devices into one queue.
+
+    Instead of one thread per camera, a small pool of worker threads drives the
+    PullPoint subscriptions of all registered devices. Each unit of work is one
+    ONVIFEventStream.pull_once() call (subscribe when needed, then a short
+    PullMessages long-poll), and the results of all devices are merged into a
+    single bounded output queue.
+
+    Renewals don't go through the pull path: every stream is registered with
+    one ONVIFRenewalManager shared by the aggregator, which renews (and, on
+    failure, recreates) the subscriptions on its own schedule. A device can
+    therefore wait longer than its subscription lifetime between two pulls
+    without its subscription expiring.
+
+    Scheduling:
+        - Devices are kept in a heap ordered by their next due time. A device that
+          returned messages is re-queued behind every other due device, so a busy
+          camera can't starve quiet ones (round-robin fairness)
+        - MessageLimit bounds the burst a single device contributes per pull
+        - Failed devices back off exponentially without blocking the others
+
+    Backpressure:
+        - The output queue is bounded; workers block while it is full
+        - A device with more than per_device_limit unconsumed messages is parked
+          until the consumer has drained half of them
+
+    Sizing:
+        A worker is busy for up to pull_timeout seconds per pull, so a device is
+        pulled about every devices * pull_timeout / workers seconds. Size the
+        workers for the event latency you accept (the pull timeout default is
+        1 second); the subscription lifetime doesn't constrain it, since
+        renewals run on the renewal manager's own workers (renewal_workers).
+
+    Example:
+        >>> from onvif import ONVIFClient
+        >>> from onvif.utils import ONVIFEventAggregator
+        >>>
+        >>> aggregator = ONVIFEventAggregator(workers=16)
+        >>> for host in hosts:
+        ...     aggregator.add(ONVIFClient(host, 80, "admin", "admin123"), name=host)
+        >>>
+        >>> with aggregator:
+        ...     for event in aggregator:
+        ...         print(event.device, event.message)
+        >>>
+        >>> aggregator.metrics()["192.168.1.17"]["lag"]
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        max_queue: int = 10000,
+        per_device_limit: int = 1000,
+        pull_timeout: float = 1,
+        message_limit: int = 100,
+        idle_interval: float = 0,
+        max_backoff: float = 60,
+        renewal_workers: int = 4,
+        **stream_kwargs,
+    ):
+        """Initialize the aggregator.
+
+        Args:
+            workers: Number of worker threads (default: 8)
+            max_queue: Maximum number of buffered events overall (default: 10000)
+            per_device_limit: Maximum unconsumed events per device (default: 1000)
+            pull_timeout: PullMessages Timeout in seconds (default: 1)
+            message_limit: PullMessages MessageLimit per pull (default: 100)
+            idle_interval: Delay before re-polling a device that had no events (default: 0)
+            max_backoff: Maximum retry delay for failing devices (default: 60)
+            renewal_workers: Worker threads of the aggregator's renewal manager
+                (default: 4); ignored when a renewal_manager is passed
+            **stream_kwargs: Default ONVIFEventStream options (Filter,
+                subscription_lifetime, renew_margin, renewal_manager, ...)
+        """
+        self.workers = workers
+        self.per_device_limit = per_device_limit
+        self.idle_interval = idle_interval
+        self.max_backoff = max_backoff
+        self.stream_kwargs = dict(
+            stream_kwargs, pull_timeout=pull_timeout, message_limit=message_limit
+        )
+
+        # Renew at renew_margin (plus up to as much jitter) before expiry
+        self._owns_renewals = stream_kwargs.get("renewal_manager") is None
+        if self._owns_renewals:
+            margin = stream_kwargs.get("renew_margin", 10)
+            self.stream_kwargs["renewal_manager"] = ONVIFRenewalManager(
+                workers=renewal_workers,
+                lifetime=stream_kwargs.get("subscription_lifetime", 300),
+                renew_margin=margin,
+                jitter=margin,
+            )
+        self.renewal_manager = self.stream_kwargs["renewal_manager"]
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._devices: Dict[str, _DeviceState] = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    # Device registration
+
+    def add(self, client, name: str = None, **kwargs) -> str:
+        """Register a device.
+
+        Args:
+            client: ONVIFClient instance
+            name: Device name used in events and metrics (default: "host:port")
+            **kwargs: ONVIFEventStream options overriding the aggregator defaults
+
+        Returns:
+            str: The device name
+        """
+        options = dict(self.stream_kwargs, **kwargs)
+        stream = ONVIFEventStream(client, name=name, **options)
+        name = stream.name
+
+        with self._cond:
+            if name in self._devices and not self._devices[name].removed:
+                raise ValueError(f"Device '{name}' is already registered")
+            state = _DeviceState(name, stream)
+            self._devices[name] = state
+            self._schedule(state, 0)
+
+        logger.debug(f"Added device {name} to event aggregator")
+        return name
+
+    def remove(self, name: str):
+        """Unregister a device and unsubscribe its PullPoint.
+
+        Args:
+            name: Device name returned by add()
+        """
+        with self._cond:
+            state = self._devices.pop(name, None)
+            if state is None:
+                return
+            state.removed = True
+        # close() rather than unsubscribe(): a worker may be subscribing it
+        state.stream.close()
+
+    @property
+    def devices(self):
+        """Names of the registered devices."""
+        return list(self._devices)
+
+    # Scheduling
+
+    def _schedule(self, state: _DeviceState, delay: float):
+        """Push a device on the heap (caller holds the condition)."""
+        if state.removed or state.scheduled:
+            return
+        state.scheduled = True
+        heapq.heappush(
+            self._heap, (time.monotonic() + delay, next(self._seq), state.name)
+        )
+        self._cond.notify()
+
+    def _next_due(self) -> Optional[_DeviceState]:
+        """Block until a device is due; None when stopping."""
+        with self._cond:
+            while not self._stop.is_set():
+                if not self._heap:
+                    self._cond.wait(0.5)
+                    continue
+
+                due, _, name = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(min(delay, 0.5))
+                    continue
+
+                heapq.heappop(self._heap)
+                state = self._devices.get(name)
+                if state is None or state.removed:
+                    continue
+                state.scheduled = False
+
+                if state.pending >= self.per_device_limit:
+                    state.parked = True
+                    continue
+                return state
+        return None
+
+    def _worker(self):
+        """Worker thread: pull the next due device and reschedule it."""
+        while True:
+            state = self._next_due()
+            if state is None:
+                break
+
+            try:
+                messages = state.stream.pull_once()
+            except Exception as e:
+                with self._cond:
+                    state.errors += 1
+                    state.last_error = str(e)
+                    state.backoff = min(max(state.backoff * 2, 1.0), self.max_backoff)
+                    self._schedule(state, state.backoff)
+                logger.warning(
+                    f"[{state.name}] Event pull failed, retrying in "
+                    f"{state.backoff:.0f}s: {e}"
+                )
+                continue
+
+            now = time.monotonic()
+            with self._cond:
+                state.backoff = 0.0
+                state.pending += len(messages)
+                state.events += len(messages)
+                if messages:
+                    state.last_event = now
+
+            for message in messages:
+                if not self._put(AggregatedEvent(state.name, message, now)):
+                    return
+
+            with self._cond:
+                self._schedule(state, 0 if messages else self.idle_interval)
+
+    def _put(self, event: AggregatedEvent) -> bool:
+        """Put an event on the output queue, blocking while it is full."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(event, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _consumed(self, event: AggregatedEvent):
+        """Update metrics and unpark the device after the consumer got an event."""
+        lag = time.monotonic() - event.received
+        with self._cond:
+            state = self._devices.get(event.device)
+            if state is None:
+                return
+            state.pending -= 1
+            state.lag = lag
+            state.max_lag = max(state.max_lag, lag)
+            if state.parked and state.pending <= self.per_device_limit // 2:
+                state.parked = False
+                self._schedule(state, 0)
+
+    # Lifecycle
+
+    def start(self):
+        """Start the worker threads (idempotent).
+
+        Returns:
+            self
+        """
+        if self.running:
+            return self
+
+        if self._owns_renewals:
+            self.renewal_manager.start()
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._worker, name=f"onvif-aggregator-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def close(self, timeout: float = 5):
+        """Stop the workers and unsubscribe every device.
+
+        Args:
+            timeout: Seconds to wait for each worker thread to exit
+        """
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+            states = list(self._devices.values())
+
+        for thread in self._threads:
+            thread.join(timeout)
+
+        for state in states:
+            state.stream.unsubscribe()
+        if self._owns_renewals:
+            self.renewal_manager.close()
+
+    @property
+    def running(self) -> bool:
+        """Whether any worker thread is alive."""
+        return any(thread.is_alive() for thread in self._threads)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    # Consumption
+
+    def get(self, timeout: Optional[float] = None) -> AggregatedEvent:
+        """Get the next event of any device.
+
+        Args:
+            timeout: Seconds to wait (None blocks until an event arrives)
+
+        Returns:
+            AggregatedEvent: (device, message, received)
+
+        Raises:
+            queue.Empty: If no event arrived within timeout
+        """
+        event = self._queue.get(timeout=timeout)
+        self._consumed(event)
+        return event
+
+    def __iter__(self) -> Iterator[AggregatedEvent]:
+        """Iterate over events until the aggregator is closed and drained."""
+        while True:
+            try:
+                yield self.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set() or not self.running:
+                    return
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> AggregatedEvent:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                return self.get(timeout=0)
+            except queue.Empty:
+                if self._stop.is_set() or not self.running:
+                    raise StopAsyncIteration
+            try:
+                return await loop.run_in_executor(None, self.get, 0.5)
+            except queue.Empty:
+                continue
+
+    # Metrics
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-device lag and throughput metrics.
+
+        Returns:
+            dict: {device: {"events", "pulls", "errors", "pending", "parked",
+                "lag", "max_lag", "throughput", "last_event_age",
+                "subscriptions", "renewals", "last_error"}}
+
+            lag is the latest queue latency in seconds (time between the pull
+            returning an event and the consumer taking it) and throughput is the
+            average events per second since the device was added.
+        """
+        now = time.monotonic()
+        result = {}
+        with self._cond:
+            for name, state in self._devices.items():
+                stream_stats = state.stream.stats
+                handle = state.stream._renewal
+                elapsed = max(now - state.added, 1e-9)
+                result[name] = {
+                    "events": state.events,
+                    "pulls": stream_stats["pulls"],
+                    "errors": state.errors,
+                    "pending": state.pending,
+                    "parked": state.parked,
+                    "lag": state.lag,
+                    "max_lag": state.max_lag,
+                    "throughput": state.events / elapsed,
+                    "last_event_age": (
+                        None if state.last_event is None else now - state.last_event
+                    ),
+                    "subscriptions": stream_stats["subscriptions"],
+                    "renewals": stream_stats["renewals"]
+                    + (handle.stats["renewals"] if handle is not None else 0),
+                    "last_error": state.last_error,
+                }
+        return result
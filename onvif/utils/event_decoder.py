@@ -0,0 +1,220 @@
+# onvif/utils/event_decoder.py
+
+import re
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional, Union
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+WSNT_NS = "http://docs.oasis-open.org/wsn/b-2"
+WSA_NS = "http://www.w3.org/2005/08/addressing"
+TT_NS = "http://www.onvif.org/ver10/schema"
+TEV_NS = "http://www.onvif.org/ver10/events/wsdl"
+
+_NOTIFICATION_MESSAGE = f"{{{WSNT_NS}}}NotificationMessage"
+_SUBSCRIPTION_REFERENCE = f"{{{WSNT_NS}}}SubscriptionReference"
+_TOPIC = f"{{{WSNT_NS}}}Topic"
+_ADDRESS = f"{{{WSA_NS}}}Address"
+_MESSAGE = f"{{{TT_NS}}}Message"
+_SOURCE = f"{{{TT_NS}}}Source"
+_DATA = f"{{{TT_NS}}}Data"
+_KEY = f"{{{TT_NS}}}Key"
+_SIMPLE_ITEM = f"{{{TT_NS}}}SimpleItem"
+_ELEMENT_ITEM = f"{{{TT_NS}}}ElementItem"
+_CURRENT_TIME = f"{{{TEV_NS}}}CurrentTime"
+_TERMINATION_TIME = f"{{{TEV_NS}}}TerminationTime"
+
+# Every tag the decoder cares about, visited in document order by one iter()
+_TAGS = (
+    _NOTIFICATION_MESSAGE,
+    _ADDRESS,
+    _TOPIC,
+    _MESSAGE,
+    _SIMPLE_ITEM,
+    _ELEMENT_ITEM,
+    _CURRENT_TIME,
+    _TERMINATION_TIME,
+)
+
+# Module-level secure parser (no entity expansion, no network access)
+_PARSER = etree.XMLParser(
+    resolve_entities=False, no_network=True, remove_blank_text=True
+)
+
+_DATETIME_RE = re.compile(
+    r"\s*(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:\.(\d+))?"
+    r"(Z|[+-]\d\d:?\d\d)?\s*$"
+)
+
+
+# Compact event record.
+#   topic:       Topic expression text (e.g., "tns1:VideoSource/MotionAlarm")
+#   utc_time:    Message UtcTime as an aware UTC datetime (None if missing)
+#   operation:   PropertyOperation ("Initialized", "Changed", "Deleted" or None)
+#   source:      {Name: Value} of tt:Source/tt:SimpleItem
+#   data:        {Name: Value} of tt:Data/tt:SimpleItem (ElementItem -> lxml element)
+#   key:         {Name: Value} of tt:Key/tt:SimpleItem
+#   subscription: SubscriptionReference address (None if not sent by the device)
+EventRecord = namedtuple(
+    "EventRecord",
+    ["topic", "utc_time", "operation", "source", "data", "key", "subscription"],
+)
+
+# Decoded PullMessagesResponse. Field names follow the zeep response, so code
+# written against PullPoint.PullMessages() works with either.
+PullMessagesResult = namedtuple(
+    "PullMessagesResult", ["CurrentTime", "TerminationTime", "NotificationMessage"]
+)
+
+
+@lru_cache(maxsize=1024)
+def parse_utc(value: Optional[str]) -> Optional[datetime]:
+    """Parse an xs:dateTime into an aware UTC datetime.
+
+    Values without an offset are taken as UTC (ONVIF UtcTime). Fractions beyond
+    microseconds are truncated. Returns None for empty or malformed values.
+    """
+    if not value:
+        return None
+
+    match = _DATETIME_RE.match(value)
+    if match is None:
+        logger.debug(f"Malformed event time: {value!r}")
+        return None
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    try:
+        result = datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hour),
+            int(minute),
+            int(second),
+            int(fraction[:6].ljust(6, "0")) if fraction else 0,
+            tzinfo=timezone.utc,
+        )
+    except ValueError:
+        logger.debug(f"Malformed event time: {value!r}")
+        return None
+
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        digits = offset[1:].replace(":", "")
+        result -= sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+    return result
+
+
+def _root(payload: Union[bytes, str, etree._Element]) -> etree._Element:
+    if isinstance(payload, etree._Element):
+        return payload
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return etree.fromstring(payload, _PARSER)
+
+
+def _decode(root: etree._Element):
+    """Single pass over the tree collecting records and response times."""
+    records = []
+    current_time = termination_time = None
+
+    message = None  # [topic, utc_time, operation, source, data, key, subscription]
+    for element in root.iter(*_TAGS):
+        tag = element.tag
+
+        if tag == _SIMPLE_ITEM:
+            if message is None:
+                continue
+            parent = element.getparent().tag
+            if parent == _DATA:
+                message[4][element.get("Name")] = element.get("Value")
+            elif parent == _SOURCE:
+                message[3][element.get("Name")] = element.get("Value")
+            elif parent == _KEY:
+                message[5][element.get("Name")] = element.get("Value")
+
+        elif tag == _NOTIFICATION_MESSAGE:
+            if message is not None:
+                records.append(EventRecord(*message))
+            message = [None, None, None, {}, {}, {}, None]
+
+        elif tag == _TOPIC:
+            if message is not None and element.text:
+                message[0] = element.text.strip()
+
+        elif tag == _MESSAGE:
+            if message is not None:
+                message[1] = parse_utc(element.get("UtcTime"))
+                message[2] = element.get("PropertyOperation")
+
+        elif tag == _ELEMENT_ITEM:
+            if message is not None and element.getparent().tag == _DATA:
+                message[4][element.get("Name")] = element[0] if len(element) else None
+
+        elif tag == _ADDRESS:
+            if (
+                message is not None
+                and element.text
+                and element.getparent().tag == _SUBSCRIPTION_REFERENCE
+            ):
+                message[6] = element.text.strip()
+
+        elif tag == _CURRENT_TIME:
+            current_time = parse_utc(element.text)
+
+        elif tag == _TERMINATION_TIME:
+            termination_time = parse_utc(element.text)
+
+    if message is not None:
+        records.append(EventRecord(*message))
+
+    return records, current_time, termination_time
+
+
+def decode_events(payload: Union[bytes, str, etree._Element]) -> List[EventRecord]:
+    """Decode every NotificationMessage of a PullMessagesResponse or Notify.
+
+    Args:
+        payload: SOAP envelope (bytes/str) or an already parsed lxml element
+
+    Returns:
+        list: EventRecord per NotificationMessage, in document order
+
+    Raises:
+        lxml.etree.XMLSyntaxError: If the payload is not well-formed XML
+    """
+    return _decode(_root(payload))[0]
+
+
+def decode_notify(payload: Union[bytes, str, etree._Element]) -> List[EventRecord]:
+    """Decode a wsnt:Notify envelope (push notifications).
+
+    Alias of decode_events(); the subscription field of each record carries the
+    SubscriptionReference address used for routing.
+    """
+    return decode_events(payload)
+
+
+def decode_pull_messages(
+    payload: Union[bytes, str, etree._Element],
+) -> PullMessagesResult:
+    """Decode a PullMessagesResponse envelope.
+
+    Args:
+        payload: SOAP envelope (bytes/str) or an already parsed lxml element
+
+    Returns:
+        PullMessagesResult: (CurrentTime, TerminationTime, NotificationMessage),
+            where NotificationMessage is a list of EventRecord
+
+    Raises:
+        lxml.etree.XMLSyntaxError: If the payload is not well-formed XML
+    """
+    records, current_time, termination_time = _decode(_root(payload))
+    return PullMessagesResult(current_time, termination_time, records)
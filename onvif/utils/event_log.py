@@ -0,0 +1,418 @@
+# onvif/utils/event_log.py
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Union
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+# One stored event, as returned by ONVIFEventLog.query()
+LoggedEvent = namedtuple(
+    "LoggedEvent",
+    ["device", "topic", "utc_time", "operation", "source", "data", "key", "received"],
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    device TEXT NOT NULL,
+    topic TEXT,
+    utc_time REAL,
+    operation TEXT,
+    source TEXT,
+    data TEXT,
+    key TEXT,
+    received REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_device_topic_time ON events (device, topic, utc_time);
+CREATE INDEX IF NOT EXISTS events_topic_time ON events (topic, utc_time);
+CREATE INDEX IF NOT EXISTS events_time ON events (utc_time);
+"""
+
+_INSERT = (
+    "INSERT INTO events (device, topic, utc_time, operation, source, data, key, "
+    "received) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+_SEGMENT_PREFIX = "events-"
+_SEGMENT_SUFFIX = ".db"
+
+_FLUSH = object()
+_STOP = object()
+
+
+def _json_default(value):
+    """JSON fallback for ElementItem values (lxml elements) and other objects."""
+    if etree.iselement(value):
+        return etree.tostring(value, encoding="unicode")
+    return str(value)
+
+
+def _dumps(items) -> Optional[str]:
+    if not items:
+        return None
+    return json.dumps(items, default=_json_default, separators=(",", ":"))
+
+
+def _timestamp(value: Union[datetime, float, int, None]) -> Optional[float]:
+    """Convert a datetime (naive = UTC) or epoch seconds to epoch seconds."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ONVIFEventLog:
+    """Durable, append-only event log on segmented SQLite (WAL) files.
+
+    Decoded events (EventRecord from utils.event_decoder) are queued and written
+    by a background thread in batches: a batch is committed in one transaction
+    when batch_size events are pending or flush_interval seconds have passed,
+    whichever comes first. Each segment is a separate SQLite database in WAL mode
+    with indexes on (device, topic, time), (topic, time) and time; segments rotate
+    by row count or age and the oldest are removed beyond max_segments.
+
+    The log attaches directly to event streaming as a sink:
+
+        >>> from onvif.utils import ONVIFEventLog
+        >>> log = ONVIFEventLog("/var/lib/onvif/events")
+        >>>
+        >>> # Pull (one device)
+        >>> stream = client.event_stream(sink=log).start()
+        >>>
+        >>> # Pull (many devices)
+        >>> aggregator = ONVIFEventAggregator(sink=log)
+        >>>
+        >>> # Push
+        >>> consumer = ONVIFNotificationConsumer(sink=log)
+        >>>
+        >>> # Indexed query by device, topic and time range
+        >>> log.query(device="192.168.1.17:80", topic="tns1:RuleEngine//.",
+        ...           start=datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+    Notes:
+        - write() only enqueues; use flush() to wait until events are on disk
+        - When more than max_pending events are queued, write() blocks
+          (backpressure) instead of dropping events
+        - Queries open their own read-only connections and can run concurrently
+          with writes (WAL)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        segment_rows: int = 1_000_000,
+        segment_age: float = 24 * 3600,
+        max_segments: int = None,
+        max_pending: int = 100_000,
+    ):
+        """Initialize the event log and start the writer thread.
+
+        Args:
+            directory: Directory holding the segment files (created if missing)
+            batch_size: Events per write transaction (default: 500)
+            flush_interval: Maximum seconds an event waits before being written (default: 1)
+            segment_rows: Rotate the segment after this many rows (default: 1,000,000)
+            segment_age: Rotate the segment after this many seconds (default: 1 day)
+            max_segments: Number of segments to keep (default: None, keep all)
+            max_pending: Maximum number of queued events (default: 100,000)
+        """
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_rows = segment_rows
+        self.segment_age = segment_age
+        self.max_segments = max_segments
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._conn = None
+        self._segment = None
+        self._segment_rows = 0
+        self._segment_started = None
+        self._closed = False
+
+        self.stats = {"written": 0, "batches": 0, "segments": 0, "errors": 0}
+
+        self._open_segment(resume=True)
+        self._thread = threading.Thread(
+            target=self._run, name="onvif-event-log", daemon=True
+        )
+        self._thread.start()
+
+    # Segments
+
+    @property
+    def segments(self) -> List[str]:
+        """Segment file paths, oldest first."""
+        names = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _open_segment(self, resume: bool = False):
+        """Open the newest segment (resume) or start a new one."""
+        path = None
+        if resume and self.segments:
+            path = self.segments[-1]
+            started = self._segment_time(path)
+            if time.time() - started >= self.segment_age:
+                path = None
+
+        if path is None:
+            # Millisecond names collide when segments rotate quickly (or the
+            # clock steps back): bump past the newest existing segment
+            started = time.time()
+            stamp = int(started * 1000)
+            existing = self.segments
+            if existing:
+                stamp = max(stamp, round(self._segment_time(existing[-1]) * 1000) + 1)
+            name = f"{_SEGMENT_PREFIX}{stamp:015d}{_SEGMENT_SUFFIX}"
+            path = os.path.join(self.directory, name)
+            self.stats["segments"] += 1
+
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+
+        self._conn = conn
+        self._segment = path
+        self._segment_started = started
+        self._segment_rows = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        logger.debug(f"Event log segment: {path} ({self._segment_rows} rows)")
+
+    @staticmethod
+    def _segment_time(path: str) -> float:
+        name = os.path.basename(path)
+        return (
+            int(name.removeprefix(_SEGMENT_PREFIX).removesuffix(_SEGMENT_SUFFIX)) / 1000
+        )
+
+    def _rotate_if_needed(self):
+        if (
+            self._segment_rows < self.segment_rows
+            and time.time() - self._segment_started < self.segment_age
+        ):
+            return
+
+        self._conn.close()
+        self._open_segment()
+
+        if self.max_segments:
+            for path in self.segments[: -self.max_segments]:
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(path + suffix)
+                    except FileNotFoundError:
+                        pass
+                logger.debug(f"Removed event log segment: {path}")
+
+    # Writing
+
+    def write(self, device: str, records: Iterable):
+        """Queue decoded events of a device for writing.
+
+        Args:
+            device: Device name (e.g., "192.168.1.17:80")
+            records: EventRecord objects (utils.event_decoder)
+
+        Raises:
+            RuntimeError: If the log is closed
+        """
+        if self._closed:
+            raise RuntimeError("Event log is closed")
+
+        received = time.time()
+        for record in records:
+            self._queue.put(
+                (
+                    device,
+                    record.topic,
+                    _timestamp(record.utc_time),
+                    record.operation,
+                    _dumps(record.source),
+                    _dumps(record.data),
+                    _dumps(record.key),
+                    received,
+                )
+            )
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until every event queued so far is committed.
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if the flush completed within timeout
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def _run(self):
+        """Writer thread: batch queued events into transactions."""
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._commit(batch)
+                break
+
+            if isinstance(item, tuple) and item[0] is _FLUSH:
+                self._commit(batch)
+                batch, deadline = [], None
+                item[1].set()
+                continue
+
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if len(batch) >= self.batch_size or (
+                deadline is not None and time.monotonic() >= deadline
+            ):
+                self._commit(batch)
+                batch, deadline = [], None
+
+        self._conn.close()
+
+    def _commit(self, batch: list):
+        if not batch:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(_INSERT, batch)
+            self._segment_rows += len(batch)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+            self._rotate_if_needed()
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            logger.error(f"Failed to write {len(batch)} events: {e}")
+
+    def close(self, timeout: float = 10):
+        """Flush pending events and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Reading
+
+    def query(
+        self,
+        device: str = None,
+        topic: str = None,
+        start: Union[datetime, float] = None,
+        end: Union[datetime, float] = None,
+        limit: int = None,
+    ) -> List[LoggedEvent]:
+        """Query stored events (committed events only).
+
+        Args:
+            device: Device name
+            topic: Exact topic, "path//." for a subtree or a GLOB pattern ("*", "?")
+            start: Earliest event UtcTime (inclusive), datetime or epoch seconds
+            end: Latest event UtcTime (exclusive), datetime or epoch seconds
+            limit: Maximum number of events
+
+        Returns:
+            list: LoggedEvent objects ordered by segment, then UtcTime
+        """
+        where, params = [], []
+        if device is not None:
+            where.append("device = ?")
+            params.append(device)
+        if topic is not None:
+            if topic.endswith("//."):
+                where.append("(topic = ? OR topic GLOB ?)")
+                params += [topic[:-3], f"{topic[:-3]}/*"]
+            elif "*" in topic or "?" in topic:
+                where.append("topic GLOB ?")
+                params.append(topic)
+            else:
+                where.append("topic = ?")
+                params.append(topic)
+        if start is not None:
+            where.append("utc_time >= ?")
+            params.append(_timestamp(start))
+        if end is not None:
+            where.append("utc_time < ?")
+            params.append(_timestamp(end))
+
+        sql = (
+            "SELECT device, topic, utc_time, operation, source, data, key, received "
+            "FROM events"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY utc_time, rowid"
+
+        results = []
+        for path in self.segments:
+            remaining = None if limit is None else limit - len(results)
+            if remaining is not None and remaining <= 0:
+                break
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(
+                    sql + ("" if remaining is None else f" LIMIT {int(remaining)}"),
+                    params,
+                ).fetchall()
+            finally:
+                conn.close()
+            results.extend(self._row(row) for row in rows)
+        return results
+
+    @staticmethod
+    def _row(row) -> LoggedEvent:
+        device, topic, utc_time, operation, source, data, key, received = row
+        return LoggedEvent(
+            device,
+            topic,
+            (
+                None
+                if utc_time is None
+                else datetime.fromtimestamp(utc_time, tz=timezone.utc)
+            ),
+            operation,
+            json.loads(source) if source else {},
+            json.loads(data) if data else {},
+            json.loads(key) if key else {},
+            datetime.fromtimestamp(received, tz=timezone.utc),
+        )
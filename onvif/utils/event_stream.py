@@ -0,0 +1,584 @@
+# onvif/utils/event_stream.py
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def _as_duration(seconds: float) -> str:
+    """Format seconds as an xs:duration string (e.g., 60 -> "PT60S")."""
+    return f"PT{max(int(seconds), 1)}S"
+
+
+# Marker yielded in place of events that may have been lost while the stream
+# had no working subscription (resync=True). start is the time of the last
+# successful pull, end the time the subscription was re-established (UTC).
+EventGap = namedtuple("EventGap", ["name", "start", "end", "reason"])
+
+
+def _freeze(items) -> tuple:
+    """Hashable, comparable form of a Source/Data/Key item dict."""
+    if not items:
+        return ()
+    return tuple(
+        sorted(
+            (name, etree.tostring(value) if etree.iselement(value) else value)
+            for name, value in items.items()
+        )
+    )
+
+
+def _as_list(value) -> list:
+    """Normalize a zeep "maxOccurs=unbounded" value into a list."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+class ONVIFEventStream:
+    """Background event stream on top of an auto-renewing PullPoint subscription.
+
+    This class wraps the manual CreatePullPointSubscription / PullMessages loop
+    into a first-class stream. A dedicated daemon thread long-polls the device and
+    pushes every NotificationMessage into a bounded queue that is consumed through
+    an iterator or async iterator.
+
+    Subscription lifecycle:
+        1. CreatePullPointSubscription with a relative InitialTerminationTime
+        2. PullMessages long-polls (returns as soon as one message is available)
+        3. Renew before TerminationTime (timed against the device clock, so
+           clock skew between host and camera doesn't matter)
+        4. Transparent re-subscription when the subscription has expired or a
+           pull/renew fails, with exponential backoff
+        5. Unsubscribe on close()
+
+    Resynchronization (resync=True):
+        Events raised while the subscription was gone are lost, and property
+        states (motion active, relay state, ...) may have changed meanwhile.
+        After every re-subscription the stream yields an EventGap marker, calls
+        SetSynchronizationPoint so the device re-sends all property states, and
+        drops "Initialized" messages whose Data equals the last known state of
+        their (topic, Source). Only real changes reach consumers, and
+        property_states() holds the current state without re-polling the device.
+
+    Long-poll tuning:
+        The defaults favor throughput: a long pull timeout avoids round trips on
+        quiet cameras, and a large MessageLimit drains bursts in one response.
+        ONVIF requires devices to support a PullMessages Timeout of at least one
+        minute, so the defaults stay well within the specification.
+
+    Attributes:
+        client: ONVIFClient instance used to create services
+        stats (dict): Counters (pulls, events, renewals, subscriptions, errors,
+            gaps, deduplicated)
+
+    Example:
+        >>> from onvif import ONVIFClient
+        >>> client = ONVIFClient("192.168.1.17", 80, "admin", "admin123")
+        >>> with client.event_stream() as stream:
+        ...     for message in stream:
+        ...         print(message)
+
+        >>> # asyncio
+        >>> async with client.event_stream() as stream:
+        ...     async for message in stream:
+        ...         print(message)
+
+    Notes:
+        - Messages are the NotificationMessage objects returned by PullMessages,
+          or EventRecord objects with decode=True (see utils.event_decoder)
+        - The queue is bounded; when it is full the puller blocks (backpressure)
+        - pull_once() and the subscription helpers can be driven by an external
+          scheduler instead of the built-in thread
+    """
+
+    def __init__(
+        self,
+        client,
+        Filter=None,
+        pull_timeout: float = 30,
+        message_limit: int = 1000,
+        subscription_lifetime: float = 300,
+        renew_margin: float = 10,
+        max_queue: int = 10000,
+        max_backoff: float = 30,
+        decode: bool = False,
+        adaptive: bool = False,
+        resync: bool = False,
+        sink=None,
+        renewal_manager=None,
+        name: str = None,
+    ):
+        """Initialize the event stream.
+
+        Args:
+            client: ONVIFClient instance
+            Filter: Optional CreatePullPointSubscription filter
+            pull_timeout: PullMessages Timeout in seconds (default: 30)
+            message_limit: PullMessages MessageLimit (default: 1000)
+            subscription_lifetime: Requested subscription lifetime in seconds (default: 300)
+            renew_margin: Seconds of slack kept before TerminationTime (default: 10)
+            max_queue: Maximum number of buffered messages (default: 10000)
+            max_backoff: Maximum retry delay in seconds after failures (default: 30)
+            decode: Yield compact EventRecord objects decoded from the raw
+                response instead of zeep NotificationMessage objects (default: False)
+            adaptive: Tune Timeout/MessageLimit per pull with ONVIFPullTuner;
+                pull_timeout and message_limit become upper bounds (default: False)
+            resync: Mark gaps and resynchronize property states after
+                re-subscribing; implies decode=True (default: False)
+            sink: Optional event sink (e.g., ONVIFEventLog) receiving every pulled
+                batch via sink.write(name, records); implies decode=True
+            renewal_manager: Optional ONVIFRenewalManager that renews (and, on
+                failure, recreates) the subscription instead of this stream
+            name: Optional stream name used for the thread name and logging
+        """
+        self.client = client
+        self.filter = Filter
+        self.pull_timeout = pull_timeout
+        self.message_limit = message_limit
+        self.subscription_lifetime = subscription_lifetime
+        self.renew_margin = renew_margin
+        self.max_backoff = max_backoff
+        self.resync = resync
+        self.decode = decode or resync or sink is not None
+        self.sink = sink
+        self.renewal_manager = renewal_manager
+        self.tuner = None
+        if adaptive:
+            from .pull_tuner import ONVIFPullTuner
+
+            self.tuner = ONVIFPullTuner(
+                max_timeout=pull_timeout, max_limit=message_limit
+            )
+        self.name = name or f"{client.common_args['host']}:{client.common_args['port']}"
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.RLock()
+
+        self._subscription_ref = None
+        self._pullpoint = None
+        self._manager = None
+        self._expires_at = None  # time.monotonic() deadline
+        self._renewal = None  # RenewalHandle when renewal_manager is used
+
+        self._last_pull = None  # UTC time of the last successful pull
+        self._gap_reason = None  # Set when the subscription was lost
+        self._gap_pending = None  # Reason of a gap to report on the next pull
+        self._states = {}  # (topic, source) -> (frozen data, data)
+
+        self.stats = {
+            "pulls": 0,
+            "events": 0,
+            "renewals": 0,
+            "subscriptions": 0,
+            "errors": 0,
+            "gaps": 0,
+            "deduplicated": 0,
+        }
+
+    # Subscription management
+
+    @property
+    def subscribed(self) -> bool:
+        """Whether a PullPoint subscription is currently active."""
+        return self._pullpoint is not None
+
+    def subscribe(self):
+        """Create a new PullPoint subscription.
+
+        Returns:
+            The CreatePullPointSubscription response, or None if the stream is
+            closed
+        """
+        with self._lock:
+            # close() sets _stop before unsubscribing, so once it is set no new
+            # subscription can be created behind its back
+            if self._stop.is_set():
+                return None
+            response = self._create_subscription()
+            self._attach(response)
+
+            if self.renewal_manager is not None:
+                if self._renewal is not None:
+                    self.renewal_manager.unregister(self._renewal)
+                self._renewal = self.renewal_manager.register(
+                    self.client,
+                    response,
+                    lifetime=self.subscription_lifetime,
+                    name=self.name,
+                    resubscribe=self._create_subscription,
+                    on_resubscribe=self._attach,
+                )
+            return response
+
+    def _create_subscription(self):
+        return self.client.events().CreatePullPointSubscription(
+            Filter=self.filter,
+            InitialTerminationTime=_as_duration(self.subscription_lifetime),
+        )
+
+    def _attach(self, response):
+        """Point the stream at a (new) CreatePullPointSubscription response."""
+        with self._lock:
+            if self._stop.is_set():
+                # Re-created by the renewal manager while closing
+                try:
+                    self.client.subscription(response).Unsubscribe()
+                except Exception as e:
+                    logger.debug(f"[{self.name}] Unsubscribe failed: {e}")
+                return
+            self._subscription_ref = response
+            self._pullpoint = self.client.pullpoint(response)
+            self._pullpoint.decode_events = self.decode
+            self._manager = self.client.subscription(response)
+            self._update_termination(response)
+            self.stats["subscriptions"] += 1
+            if self.resync and self._last_pull is not None:
+                self._gap_pending = self._gap_reason or "resubscribed"
+            self._gap_reason = None
+            logger.info(f"[{self.name}] PullPoint subscription created")
+
+    def renew(self):
+        """Renew the current subscription.
+
+        Returns:
+            The Renew response
+        """
+        with self._lock:
+            response = self._manager.Renew(
+                TerminationTime=_as_duration(self.subscription_lifetime)
+            )
+            self._update_termination(response)
+            self.stats["renewals"] += 1
+            logger.debug(f"[{self.name}] Subscription renewed")
+            return response
+
+    def unsubscribe(self):
+        """Unsubscribe (best effort) and forget the current subscription."""
+        with self._lock:
+            manager = self._manager
+            self._drop_subscription()
+            if self._renewal is not None:
+                self.renewal_manager.unregister(self._renewal)
+                self._renewal = None
+
+        if manager is not None:
+            try:
+                manager.Unsubscribe()
+                logger.info(f"[{self.name}] Unsubscribed")
+            except Exception as e:
+                logger.debug(f"[{self.name}] Unsubscribe failed: {e}")
+
+    def needs_renewal(self) -> bool:
+        """Check whether the subscription expires before the next pull completes."""
+        if self._expires_at is None or self._renewal is not None:
+            return False
+        remaining = self._expires_at - time.monotonic()
+        return remaining <= self.pull_timeout + self.renew_margin
+
+    def _drop_subscription(self):
+        """Forget the current subscription without contacting the device."""
+        self._subscription_ref = None
+        self._pullpoint = None
+        self._manager = None
+        self._expires_at = None
+
+    def _update_termination(self, response):
+        """Update the local expiry deadline from CurrentTime/TerminationTime.
+
+        The remaining lifetime is computed on the device clock and then applied to
+        the local monotonic clock.
+        """
+        current = getattr(response, "CurrentTime", None)
+        termination = getattr(response, "TerminationTime", None)
+
+        if isinstance(current, datetime) and isinstance(termination, datetime):
+            try:
+                remaining = (termination - current).total_seconds()
+            except TypeError:
+                # Mixed naive/aware datetimes
+                remaining = self.subscription_lifetime
+        elif termination is None and self._expires_at is not None:
+            # Response without termination info keeps the current deadline
+            return
+        else:
+            remaining = self.subscription_lifetime
+
+        self._expires_at = time.monotonic() + remaining
+
+    # Pulling
+
+    def pull_once(self) -> List[Any]:
+        """Perform one unit of work: (re)subscribe or renew if needed, then pull.
+
+        Returns:
+            list: NotificationMessage (or EventRecord) objects (may be empty,
+                and always empty once the stream is closed)
+
+        Raises:
+            ONVIFOperationException: If subscribing or pulling fails. The
+                subscription is dropped so the next call re-subscribes.
+        """
+        with self._lock:
+            if self._stop.is_set():
+                return []
+            if not self.subscribed:
+                self.subscribe()
+            elif self.needs_renewal():
+                try:
+                    self.renew()
+                except Exception as e:
+                    logger.warning(f"[{self.name}] Renew failed, re-subscribing: {e}")
+                    self.stats["errors"] += 1
+                    self._drop_subscription()
+                    self._gap_reason = f"renew failed: {e}"
+                    self.subscribe()
+
+        markers = [self._resynchronize()] if self._gap_pending else []
+
+        if self.tuner is not None:
+            timeout, limit = self.tuner.next_request()
+        else:
+            timeout, limit = self.pull_timeout, self.message_limit
+
+        pullpoint = self._pullpoint
+        start = time.monotonic()
+        try:
+            response = pullpoint.PullMessages(
+                Timeout=_as_duration(timeout), MessageLimit=limit
+            )
+        except Exception as e:
+            if self._pullpoint is not pullpoint:
+                # Re-pointed by the renewal manager while pulling
+                return []
+            if self.tuner is not None and self.tuner.apply_fault(e):
+                # Out-of-range Timeout/MessageLimit; retry within device limits
+                return []
+            # Most likely the subscription expired or the device restarted
+            self._drop_subscription()
+            self._gap_reason = f"pull failed: {e}"
+            raise
+
+        self._update_termination(response)
+        messages = _as_list(getattr(response, "NotificationMessage", None))
+        if self.tuner is not None:
+            self.tuner.observe(len(messages), time.monotonic() - start)
+        self._last_pull = datetime.now(timezone.utc)
+        if self.resync:
+            messages = self._deduplicate(messages)
+        self.stats["pulls"] += 1
+        self.stats["events"] += len(messages)
+
+        if self.sink is not None and messages:
+            self.sink.write(self.name, messages)
+        return markers + messages if markers else messages
+
+    # Resynchronization
+
+    def _resynchronize(self) -> EventGap:
+        """Report a gap and ask the device to re-send all property states."""
+        gap = EventGap(
+            self.name, self._last_pull, datetime.now(timezone.utc), self._gap_pending
+        )
+        self._gap_pending = None
+        self.stats["gaps"] += 1
+        logger.warning(f"[{self.name}] Event gap since {gap.start}: {gap.reason}")
+
+        try:
+            self._pullpoint.SetSynchronizationPoint()
+        except Exception as e:
+            # Devices still send "Initialized" states for a new subscription
+            logger.debug(f"[{self.name}] SetSynchronizationPoint failed: {e}")
+        return gap
+
+    def _deduplicate(self, records: list) -> list:
+        """Track property states; drop re-sent states that didn't change."""
+        result = []
+        for record in records:
+            if record.operation is None:
+                result.append(record)
+                continue
+
+            key = (record.topic, _freeze(record.source))
+            if record.operation == "Deleted":
+                self._states.pop(key, None)
+            else:
+                data = _freeze(record.data)
+                known = self._states.get(key)
+                if (
+                    record.operation == "Initialized"
+                    and known is not None
+                    and known[0] == data
+                ):
+                    self.stats["deduplicated"] += 1
+                    continue
+                self._states[key] = (data, record.data)
+            result.append(record)
+        return result
+
+    def property_states(self) -> Dict[Tuple[str, tuple], dict]:
+        """Last known property states (resync=True).
+
+        Returns:
+            dict: {(topic, ((source name, value), ...)): data dict}
+        """
+        return {key: data for key, (_, data) in self._states.items()}
+
+    def _run(self):
+        """Background thread: pull until stopped, retrying with backoff."""
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                messages = self.pull_once()
+                backoff = 1.0
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self.stats["errors"] += 1
+                logger.warning(
+                    f"[{self.name}] Event pull failed, retrying in {backoff:.0f}s: {e}"
+                )
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            for message in messages:
+                if not self._put(message):
+                    break
+
+        logger.debug(f"[{self.name}] Event stream thread stopped")
+
+    def _put(self, message) -> bool:
+        """Put a message on the queue, blocking while it is full (backpressure)."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(message, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # Lifecycle
+
+    def start(self):
+        """Start the background puller thread (idempotent).
+
+        Returns:
+            self
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"onvif-events-{self.name}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop the puller thread and unsubscribe.
+
+        Args:
+            timeout: Seconds to wait for the puller thread to exit (default:
+                pull_timeout plus 5 seconds, the longest a pull can take)
+        """
+        self._stop.set()
+        self.unsubscribe()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self.pull_timeout + 5 if timeout is None else timeout)
+        # Release anything attached while the puller was still finishing
+        self.unsubscribe()
+
+    @property
+    def running(self) -> bool:
+        """Whether the background puller thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    # Consumption
+
+    def get(self, timeout: Optional[float] = None):
+        """Get the next message.
+
+        Args:
+            timeout: Seconds to wait (None blocks until a message arrives)
+
+        Returns:
+            The next NotificationMessage
+
+        Raises:
+            queue.Empty: If no message arrived within timeout
+        """
+        return self._queue.get(timeout=timeout)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over messages until the stream is closed and drained."""
+        while True:
+            try:
+                yield self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set() or not self.running:
+                    return
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                return self._queue.get_nowait()
+            except queue.Empty:
+                if self._stop.is_set() or not self.running:
+                    raise StopAsyncIteration
+            try:
+                return await loop.run_in_executor(None, self._queue.get, True, 0.5)
+            except queue.Empty:
+                continue
+
+    def subscribe_callback(self, callback: Callable[[Any], None]) -> threading.Thread:
+        """Dispatch messages to a callback from a separate consumer thread.
+
+        Args:
+            callback: Function called with each NotificationMessage
+
+        Returns:
+            threading.Thread: The started consumer thread
+        """
+
+        def consume():
+            for message in self:
+                try:
+                    callback(message)
+                except Exception as e:
+                    logger.error(f"[{self.name}] Event callback failed: {e}")
+
+        thread = threading.Thread(
+            target=consume, name=f"onvif-events-cb-{self.name}", daemon=True
+        )
+        thread.start()
+        return thread
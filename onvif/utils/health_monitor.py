@@ -0,0 +1,414 @@
+# onvif/utils/health_monitor.py
+
+import time
+import heapq
+import random
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .scanner import (
+    DEVICE_SERVICE_PATH,
+    _connection,
+    _request_system_date_and_time,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Result of one health check. state is the device state after the check
+# ("up", "degraded", "down"); stage is where a failed check failed
+# ("connect" or "soap", None if ok); latency is the check's duration in seconds
+# and device_time the device UTC clock (None if not reported).
+HealthCheck = namedtuple(
+    "HealthCheck",
+    ["name", "state", "ok", "stage", "latency", "device_time", "error", "timestamp"],
+)
+
+
+class _Device:
+    """Per-device monitor state."""
+
+    def __init__(self, name, host, port, use_https, path):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.use_https = use_https
+        self.path = path
+
+        self.state = ONVIFHealthMonitor.UNKNOWN
+        self.since = time.time()
+        self.consecutive_failures = 0
+        self.checks = 0
+        self.failures = 0
+        self.latency = None
+        self.latency_avg = None
+        self.latency_min = None
+        self.latency_max = None
+        self.last_check: Optional[HealthCheck] = None
+
+        self.interval = 0.0
+        self.due = 0.0
+        self.connection = None  # Kept open between checks (HTTP keep-alive)
+        self.lock = threading.Lock()  # One check at a time per device
+
+
+class ONVIFHealthMonitor:
+    """Scheduled health checks for many devices from one scheduler thread.
+
+    Each check is a TCP (or TLS) connect followed by an unauthenticated
+    GetSystemDateAndTime, so it reflects whether the ONVIF device service
+    answers, not just whether the port is open. Checks never load the SOAP
+    stack and reuse one keep-alive connection per device, so a check of a
+    healthy device is a single request on an open socket.
+
+    A single thread keeps every device on a timer heap and hands due checks
+    to a small worker pool. Intervals adapt to the device state:
+
+        - up: every interval seconds
+        - failing, not yet confirmed: re-checked after min_interval seconds
+          (a device goes degraded or down after `failures` consecutive failed
+          checks, so one lost packet doesn't flap the state)
+        - degraded (port open, ONVIF service not answering) or down: backs off
+          exponentially from interval up to max_interval
+
+    on_change(check, previous_state) is called on every state change
+    (including the first check, from "unknown"), on_check(check) after every
+    check. Per-device latency statistics are available from metrics().
+
+    Example:
+        >>> from onvif.utils import ONVIFHealthMonitor
+        >>> def changed(check, previous):
+        ...     print(f"{check.name}: {previous} -> {check.state} ({check.error})")
+        >>> monitor = ONVIFHealthMonitor(interval=30, on_change=changed)
+        >>> monitor.add("192.168.1.17", 80)
+        >>> monitor.add("192.168.1.18", 443, use_https=True, name="lobby")
+        >>> monitor.start()
+        >>> monitor.metrics()["lobby"]["latency_avg"]
+        >>> monitor.stop()
+    """
+
+    UNKNOWN = "unknown"
+    UP = "up"
+    DEGRADED = "degraded"
+    DOWN = "down"
+
+    def __init__(
+        self,
+        interval: float = 30,
+        min_interval: Optional[float] = None,
+        max_interval: float = 300,
+        timeout: float = 5.0,
+        failures: int = 2,
+        workers: int = 8,
+        verify_ssl: bool = False,
+        on_change: Optional[Callable[[HealthCheck, str], Any]] = None,
+        on_check: Optional[Callable[[HealthCheck], Any]] = None,
+    ):
+        """Initialize the monitor.
+
+        Args:
+            interval: Check interval of healthy devices in seconds (default: 30)
+            min_interval: Re-check interval after a failure that isn't yet
+                confirmed (default: interval / 5)
+            max_interval: Longest back-off interval of failed devices (default: 300)
+            timeout: Connect/read timeout per check in seconds (default: 5)
+            failures: Consecutive failed checks before a device that was up is
+                reported degraded or down (default: 2)
+            workers: Concurrent checks (default: 8)
+            verify_ssl: Verify certificates of HTTPS devices (default: False)
+            on_change: Called with (check, previous_state) on state changes
+            on_check: Called with the check after every check
+        """
+        self.interval = interval
+        self.min_interval = interval / 5 if min_interval is None else min_interval
+        self.max_interval = max(max_interval, interval)
+        self.timeout = timeout
+        self.failures = max(1, failures)
+        self.workers = workers
+        self.verify_ssl = verify_ssl
+        self.on_change = on_change
+        self.on_check = on_check
+
+        self._devices: Dict[str, _Device] = {}
+        self._heap: List = []  # (due, sequence, name)
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._stopping = False
+
+    def add(
+        self,
+        host: str,
+        port: int = 80,
+        use_https: bool = False,
+        path: str = DEVICE_SERVICE_PATH,
+        name: Optional[str] = None,
+        delay: float = 0.0,
+    ) -> str:
+        """Start monitoring a device.
+
+        Args:
+            host: Device IP address or hostname
+            port: Device port (default: 80)
+            use_https: Use HTTPS (default: False)
+            path: Device service path (default: /onvif/device_service)
+            name: Name used in checks and metrics (default: "host:port")
+            delay: Seconds before the first check (default: 0)
+
+        Returns:
+            str: The device name
+        """
+        name = name or f"{host}:{port}"
+        device = _Device(name, host, port, use_https, path)
+        with self._condition:
+            previous = self._devices.pop(name, None)
+            self._devices[name] = device
+            self._schedule(device, delay)
+        if previous is not None:
+            self._close(previous)
+        return name
+
+    def remove(self, name: str):
+        """Stop monitoring a device."""
+        with self._condition:
+            device = self._devices.pop(name, None)
+            self._condition.notify()
+        if device is not None:
+            self._close(device)
+
+    def start(self):
+        """Start the scheduler thread (no-op if running)."""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="onvif-health"
+            )
+            self._thread = threading.Thread(
+                target=self._run, name="onvif-health-monitor", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the scheduler and close pooled connections."""
+        with self._condition:
+            thread, pool = self._thread, self._pool
+            self._thread = self._pool = None
+            self._stopping = True
+            self._condition.notify()
+        if thread is not None:
+            thread.join(timeout)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        for device in list(self._devices.values()):
+            self._close(device)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def check(self, name: str) -> HealthCheck:
+        """Check a device now (blocking), updating its state and schedule."""
+        with self._condition:
+            device = self._devices[name]
+        return self._check(device)
+
+    def state(self, name: str) -> str:
+        """Current state of a device."""
+        return self._devices[name].state
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-device state and latency statistics.
+
+        Returns:
+            dict: {name: {host, port, state, since, checks, failures,
+            consecutive_failures, latency, latency_avg, latency_min,
+            latency_max, interval, next_check, last_error}}
+        """
+        now = time.monotonic()
+        with self._condition:
+            devices = list(self._devices.values())
+        return {
+            device.name: {
+                "host": device.host,
+                "port": device.port,
+                "state": device.state,
+                "since": device.since,
+                "checks": device.checks,
+                "failures": device.failures,
+                "consecutive_failures": device.consecutive_failures,
+                "latency": device.latency,
+                "latency_avg": device.latency_avg,
+                "latency_min": device.latency_min,
+                "latency_max": device.latency_max,
+                "interval": device.interval,
+                "next_check": max(0.0, device.due - now),
+                "last_error": device.last_check.error if device.last_check else None,
+            }
+            for device in devices
+        }
+
+    def _schedule(self, device: _Device, delay: float):
+        """Put the device's next check on the heap (caller holds the condition)."""
+        device.interval = delay
+        device.due = time.monotonic() + delay
+        self._sequence += 1
+        heapq.heappush(self._heap, (device.due, self._sequence, device.name))
+        self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopping:
+                        return
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+
+                due, _, name = heapq.heappop(self._heap)
+                device = self._devices.get(name)
+                # Removed, re-added or rescheduled by check(): a stale heap entry
+                if device is None or device.due != due:
+                    continue
+                pool = self._pool
+            try:
+                pool.submit(self._check, device)
+            except RuntimeError:
+                return  # Stopped
+
+    def _check(self, device: _Device) -> HealthCheck:
+        with device.lock:
+            start = time.monotonic()
+            stage, error, device_time = self._probe(device)
+            latency = time.monotonic() - start
+        return self._record(device, stage, error, device_time, latency)
+
+    def _probe(self, device: _Device):
+        """Connect (unless the pooled connection is open) and call GetSystemDateAndTime.
+
+        Returns:
+            (stage, error, device_time): stage and error are None on success
+        """
+        for attempt in range(2):
+            connection = device.connection
+            reused = connection is not None and connection.sock is not None
+            if not reused:
+                connection = device.connection = _connection(
+                    device.host,
+                    device.port,
+                    device.use_https,
+                    self.timeout,
+                    self.verify_ssl,
+                )
+                try:
+                    connection.connect()
+                except OSError as e:
+                    self._close(device)
+                    return "connect", str(e) or type(e).__name__, None
+
+            try:
+                device_time = _request_system_date_and_time(connection, device.path)
+                return None, None, device_time
+            except (OSError, ValueError) as e:
+                self._close(device)
+                if reused and attempt == 0:
+                    # The device closed the idle keep-alive connection: retry fresh
+                    continue
+                return "soap", str(e) or type(e).__name__, None
+
+    def _record(self, device, stage, error, device_time, latency) -> HealthCheck:
+        with self._condition:
+            previous = device.state
+            device.checks += 1
+            device.latency = latency
+            if stage is None:
+                device.consecutive_failures = 0
+                state = self.UP
+                device.latency_avg = (
+                    latency
+                    if device.latency_avg is None
+                    else 0.8 * device.latency_avg + 0.2 * latency
+                )
+                if device.latency_min is None or latency < device.latency_min:
+                    device.latency_min = latency
+                if device.latency_max is None or latency > device.latency_max:
+                    device.latency_max = latency
+            else:
+                device.failures += 1
+                device.consecutive_failures += 1
+                failed = self.DOWN if stage == "connect" else self.DEGRADED
+                if (
+                    previous in (self.UNKNOWN, self.DEGRADED, self.DOWN)
+                    or device.consecutive_failures >= self.failures
+                ):
+                    state = failed
+                else:
+                    state = previous  # Not confirmed yet
+
+            if state != previous:
+                device.state = state
+                device.since = time.time()
+
+            check = HealthCheck(
+                device.name,
+                state,
+                stage is None,
+                stage,
+                latency,
+                device_time,
+                error,
+                datetime.now(),
+            )
+            device.last_check = check
+
+            monitored = self._devices.get(device.name) is device
+            if monitored:
+                self._schedule(device, self._next_interval(device))
+
+        if not monitored:
+            return check  # Removed while being checked
+        if state != previous:
+            logger.info(f"Health: {device.name} {previous} -> {state}")
+            self._callback(self.on_change, check, previous)
+        self._callback(self.on_check, check)
+        return check
+
+    def _next_interval(self, device: _Device) -> float:
+        if device.state == self.UP and device.consecutive_failures == 0:
+            interval = self.interval
+        elif device.state == self.UP:
+            interval = self.min_interval  # Confirm the failure quickly
+        else:
+            backoff = max(0, device.consecutive_failures - self.failures)
+            interval = min(self.max_interval, self.interval * 2 ** min(backoff, 16))
+        # Spread checks of devices added together
+        return interval * random.uniform(0.9, 1.0)
+
+    @staticmethod
+    def _callback(callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Health monitor callback failed: {e}")
+
+    @staticmethod
+    def _close(device: _Device):
+        connection, device.connection = device.connection, None
+        if connection is not None:
+            connection.close()
@@ -0,0 +1,376 @@
+# onvif/utils/inventory.py
+
+import time
+import base64
+import logging
+import threading
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+import isodate
+from lxml import etree
+from zeep.xsd.valueobjects import CompoundValue
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Service namespaces used to skip services a device doesn't advertise
+_NAMESPACES = {
+    "media": "http://www.onvif.org/ver10/media/wsdl",
+    "imaging": "http://www.onvif.org/ver20/imaging/wsdl",
+    "ptz": "http://www.onvif.org/ver20/ptz/wsdl",
+}
+_CAPABILITIES = {"media": "Media", "imaging": "Imaging", "ptz": "PTZ"}
+
+SECTIONS = ("device", "media", "imaging", "ptz")
+
+
+def _is_any_content(value: Any) -> bool:
+    """Whether a _value_N field holds xsd:any content rather than a scalar."""
+    if value is None or isinstance(value, (etree._Element, dict, CompoundValue)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(
+            isinstance(item, (etree._Element, dict, CompoundValue)) for item in value
+        )
+    return False
+
+
+def serialize(obj: Any) -> Any:
+    """Convert an operation result into JSON-serializable builtins.
+
+    Walks zeep objects through their value dictionaries directly (no
+    per-object type introspection, unlike zeep.helpers.serialize_object), and
+    converts leaves: datetimes and durations to ISO 8601 strings, Decimal to
+    float, bytes to base64. Raw xsd:any content in _value_N (lxml elements or
+    parsed dictionaries) is dropped: with ZeepPatcher applied (the default) it
+    is already flattened into the object's fields. Scalar _value_N fields
+    (simpleContent or mixed text) are kept.
+
+    Args:
+        obj: Operation result (zeep object, list, or builtin)
+
+    Returns:
+        dict, list, str, int, float, bool or None
+    """
+    if obj is None or isinstance(obj, (str, bool, int, float)):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [serialize(item) for item in obj]
+
+    if isinstance(obj, CompoundValue):
+        values = obj.__values__
+    elif isinstance(obj, dict):
+        values = obj
+    else:
+        values = None
+    if values is not None:
+        result = {}
+        for key, value in values.items():
+            key = str(key)
+            if key.startswith("__") or isinstance(value, etree._Element):
+                continue
+            if key.startswith("_value_") and _is_any_content(value):
+                continue
+            result[key] = serialize(value)
+        return result
+
+    if isinstance(obj, (datetime, date, dt_time)):
+        return obj.isoformat()
+    if isinstance(obj, (timedelta, isodate.Duration)):
+        return isodate.duration_isoformat(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode("ascii")
+    if isinstance(obj, etree._Element):
+        return None
+    if hasattr(obj, "__dict__"):
+        return {
+            key: serialize(value)
+            for key, value in vars(obj).items()
+            if not key.startswith("_")
+        }
+    return str(obj)
+
+
+class ONVIFInventory:
+    """Concurrent collection of a structured inventory record per device.
+
+    An inventory record takes about 15 calls (device information, scopes,
+    network settings, media profiles, video sources, a stream and snapshot URI
+    per profile, imaging settings and options per video source, PTZ nodes, ...).
+    Instead of making them one after the other, independent calls run
+    concurrently on a small per-device pool (max_concurrency requests in
+    flight, so devices aren't overwhelmed), and dependent calls fan out as
+    soon as their input arrives: GetStreamUri and GetSnapshotUri as soon as
+    GetProfiles returns, imaging calls as soon as GetVideoSources returns.
+
+    Services the device doesn't advertise (GetServices or GetCapabilities)
+    are skipped. A failing call doesn't fail the record; it is reported in
+    the "errors" section. Records only contain JSON-serializable builtins.
+
+    Record layout:
+        host, port, collected_at (ISO 8601), elapsed (seconds),
+        device: {information, hostname, scopes, system_date_and_time, ntp, dns,
+                 network_interfaces, network_protocols, services}
+        media: {profiles, video_sources, stream_uris: {profile: uri},
+                snapshot_uris: {profile: uri}}
+        imaging: {video source: {settings, options}}
+        ptz: {nodes}
+        errors: {"media.GetProfiles": "message", ...}
+
+    Example:
+        >>> from onvif import ONVIFClient
+        >>> client = ONVIFClient("192.168.1.17", 80, "admin", "admin123")
+        >>> record = client.inventory()
+        >>> record["media"]["stream_uris"]
+        {'Profile_1': 'rtsp://192.168.1.17:554/stream1', ...}
+
+        >>> # Whole fleet, records yielded as devices complete
+        >>> from onvif.utils import ONVIFInventory
+        >>> for record in ONVIFInventory.fleet(clients, workers=16):
+        ...     print(record["host"], len(record["errors"]))
+    """
+
+    STREAM_SETUP = {"Stream": "RTP-Unicast", "Transport": {"Protocol": "RTSP"}}
+
+    def __init__(
+        self,
+        client,
+        max_concurrency: int = 4,
+        sections: Iterable[str] = SECTIONS,
+    ):
+        """Initialize the collector.
+
+        Args:
+            client: ONVIFClient of the device
+            max_concurrency: Requests in flight to the device (default: 4)
+            sections: Record sections to collect (default: device, media,
+                imaging, ptz)
+        """
+        self.client = client
+        self.max_concurrency = max(1, max_concurrency)
+        self.sections = tuple(sections)
+        unknown = set(self.sections) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown inventory sections: {sorted(unknown)}")
+
+    def collect(self) -> Dict[str, Any]:
+        """Collect the inventory record (blocking).
+
+        Returns:
+            dict: Inventory record (see class docstring)
+        """
+        start = time.monotonic()
+        client = self.client
+        record = {
+            "host": client.common_args["host"],
+            "port": client.common_args["port"],
+            "collected_at": datetime.now().isoformat(),
+            "elapsed": None,
+        }
+        for section in self.sections:
+            record[section] = {}
+        record["errors"] = {}
+
+        lock = threading.Lock()
+        pending = [0]
+        finished = threading.Event()
+
+        def release():
+            with lock:
+                pending[0] -= 1
+                if pending[0] == 0:
+                    finished.set()
+
+        def run(path: Tuple[str, ...], operation: str, call: Callable, then=None):
+            with lock:
+                pending[0] += 1
+            pool.submit(task, path, operation, call, then)
+
+        def task(path, operation, call, then):
+            try:
+                try:
+                    result = call()
+                except Exception as e:
+                    logger.debug(f"Inventory {operation} failed: {e}")
+                    with lock:
+                        record["errors"][operation] = str(e)
+                    return
+                value = serialize(result)
+                with lock:
+                    target = record
+                    for key in path[:-1]:
+                        target = target.setdefault(key, {})
+                    target[path[-1]] = value
+                if then is not None:
+                    then(result)  # Fan out before this task is released
+            finally:
+                release()
+
+        pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="onvif-inventory"
+        )
+        try:
+            with lock:
+                pending[0] += 1  # Until every root call is submitted
+            self._plan(record, run)
+            release()
+            finished.wait()
+        finally:
+            pool.shutdown(wait=False)
+
+        record["elapsed"] = time.monotonic() - start
+        return record
+
+    def _plan(self, record: Dict[str, Any], run: Callable):
+        """Submit the root calls; dependent calls are submitted on completion.
+
+        Service operators are created here, on the calling thread, before any
+        call that uses them is submitted: the client's lazy accessors aren't
+        synchronized, and concurrent first calls would each compile the WSDL.
+        """
+        client = self.client
+
+        def service(name):
+            try:
+                return getattr(client, name)()
+            except Exception as e:
+                logger.debug(f"Inventory {name} service failed: {e}")
+                record["errors"][name] = str(e)
+                return None
+
+        if "device" in self.sections:
+            if client.services is not None:
+                record["device"]["services"] = serialize(client.services)
+            devicemgmt = service("devicemgmt")
+            for key, operation in (
+                ("information", "GetDeviceInformation"),
+                ("hostname", "GetHostname"),
+                ("scopes", "GetScopes"),
+                ("system_date_and_time", "GetSystemDateAndTime"),
+                ("ntp", "GetNTP"),
+                ("dns", "GetDNS"),
+                ("network_interfaces", "GetNetworkInterfaces"),
+                ("network_protocols", "GetNetworkProtocols"),
+            ):
+                if devicemgmt is None:
+                    break
+                run(
+                    ("device", key),
+                    f"devicemgmt.{operation}",
+                    lambda op=operation: getattr(devicemgmt, op)(),
+                )
+
+        imaging = None
+        if "imaging" in self.sections and self._supports("imaging"):
+            imaging = service("imaging")
+        media = None
+        if ("media" in self.sections or imaging) and self._supports("media"):
+            media = service("media")
+
+        def profiles_loaded(profiles):
+            for profile in profiles or []:
+                token = profile.token
+                run(
+                    ("media", "stream_uris", token),
+                    f"media.GetStreamUri[{token}]",
+                    lambda t=token: media.GetStreamUri(
+                        StreamSetup=self.STREAM_SETUP, ProfileToken=t
+                    ).Uri,
+                )
+                run(
+                    ("media", "snapshot_uris", token),
+                    f"media.GetSnapshotUri[{token}]",
+                    lambda t=token: media.GetSnapshotUri(ProfileToken=t).Uri,
+                )
+
+        def sources_loaded(sources):
+            if imaging is None:
+                return
+            for source in sources or []:
+                token = source.token
+                run(
+                    ("imaging", token, "settings"),
+                    f"imaging.GetImagingSettings[{token}]",
+                    lambda t=token: imaging.GetImagingSettings(VideoSourceToken=t),
+                )
+                run(
+                    ("imaging", token, "options"),
+                    f"imaging.GetOptions[{token}]",
+                    lambda t=token: imaging.GetOptions(VideoSourceToken=t),
+                )
+
+        if media is not None:
+            if "media" in self.sections:
+                run(
+                    ("media", "profiles"),
+                    "media.GetProfiles",
+                    media.GetProfiles,
+                    profiles_loaded,
+                )
+            run(
+                ("media", "video_sources"),
+                "media.GetVideoSources",
+                media.GetVideoSources,
+                sources_loaded,
+            )
+
+        if "ptz" in self.sections and self._supports("ptz"):
+            ptz = service("ptz")
+            if ptz is not None:
+                run(("ptz", "nodes"), "ptz.GetNodes", ptz.GetNodes)
+
+    def _supports(self, service: str) -> bool:
+        """Whether the device advertises a service (True if it can't be told)."""
+        client = self.client
+        if client.services:
+            return _NAMESPACES[service] in client._service_map
+        if client.capabilities:
+            return (
+                getattr(client.capabilities, _CAPABILITIES[service], None) is not None
+            )
+        return True
+
+    @classmethod
+    def fleet(
+        cls,
+        clients: Iterable,
+        workers: int = 16,
+        max_concurrency: int = 4,
+        sections: Iterable[str] = SECTIONS,
+    ) -> Iterator[Dict[str, Any]]:
+        """Collect inventory records of many devices, yielding them as they complete.
+
+        Args:
+            clients: ONVIFClient instances (e.g. from ONVIFOnboarding results)
+            workers: Devices collected concurrently (default: 16)
+            max_concurrency: Requests in flight per device (default: 4)
+            sections: Record sections to collect
+
+        Yields:
+            dict: Inventory record per device; a device whose collection fails
+            entirely yields a record with only host, port and errors
+        """
+        sections = tuple(sections)
+
+        def collect(client):
+            try:
+                return cls(client, max_concurrency, sections).collect()
+            except Exception as e:
+                return {
+                    "host": client.common_args["host"],
+                    "port": client.common_args["port"],
+                    "errors": {"inventory": str(e)},
+                }
+
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [pool.submit(collect, client) for client in clients]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,501 @@
+# onvif/utils/notification_consumer.py
+
+import time
+import uuid
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from queue import Full, Queue
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from lxml import etree
+
+from .event_decoder import decode_notify
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def _as_duration(seconds: float) -> str:
+    return f"PT{max(int(seconds), 1)}S"
+
+
+class NotificationSubscription:
+    """Handle of one push subscription managed by ONVIFNotificationConsumer.
+
+    Attributes:
+        name: Subscription name (used in logs)
+        token: Unique path token of the consumer endpoint
+        consumer_address: ConsumerReference address given to the device
+        manager_address: SubscriptionReference address returned by the device
+        queue: Queue receiving messages (None when a callback is used)
+        callback: Callback receiving messages (None when a queue is used)
+        stats (dict): Counters (messages, renewals, subscriptions, errors)
+    """
+
+    def __init__(self, consumer, client, token, callback, queue, Filter, name):
+        self.consumer = consumer
+        self.client = client
+        self.token = token
+        self.callback = callback
+        self.queue = queue
+        self.filter = Filter
+        self.name = name
+        self.consumer_address = None
+        self.manager_address = None
+        self._manager = None
+        self._expires_at = None
+        self._stats_lock = threading.Lock()
+        self.stats = {"messages": 0, "renewals": 0, "subscriptions": 0, "errors": 0}
+
+    def _count(self, key: str):
+        """Increment a counter (server workers and renewals update them concurrently)."""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    @property
+    def active(self) -> bool:
+        """Whether the device-side subscription is believed to be alive."""
+        return self._manager is not None
+
+    def expires_in(self) -> Optional[float]:
+        """Seconds until TerminationTime (None if unknown)."""
+        if self._expires_at is None:
+            return None
+        return self._expires_at - time.monotonic()
+
+    def subscribe(self):
+        """Create the subscription on the device (Notification.Subscribe)."""
+        self.consumer_address = self.consumer.consumer_address(self)
+        response = self.client.notification().Subscribe(
+            ConsumerReference={"Address": self.consumer_address},
+            Filter=self.filter,
+            InitialTerminationTime=_as_duration(self.consumer.subscription_lifetime),
+        )
+        self._manager = self.client.subscription(response)
+        address = response["SubscriptionReference"]["Address"]
+        self.manager_address = getattr(address, "_value_1", None) or (
+            address.get("_value_1") if isinstance(address, dict) else None
+        )
+        self._update_termination(response)
+        self._count("subscriptions")
+        logger.info(f"[{self.name}] Push subscription created")
+        return response
+
+    def renew(self):
+        """Renew the subscription (Subscription.Renew)."""
+        response = self._manager.Renew(
+            TerminationTime=_as_duration(self.consumer.subscription_lifetime)
+        )
+        self._update_termination(response)
+        self._count("renewals")
+        logger.debug(f"[{self.name}] Push subscription renewed")
+        return response
+
+    def unsubscribe(self):
+        """Unsubscribe on the device (best effort)."""
+        manager, self._manager = self._manager, None
+        self._expires_at = None
+        if manager is None:
+            return
+        try:
+            manager.Unsubscribe()
+            logger.info(f"[{self.name}] Unsubscribed")
+        except Exception as e:
+            logger.debug(f"[{self.name}] Unsubscribe failed: {e}")
+
+    def _update_termination(self, response):
+        current = getattr(response, "CurrentTime", None)
+        termination = getattr(response, "TerminationTime", None)
+        remaining = self.consumer.subscription_lifetime
+        if isinstance(current, datetime) and isinstance(termination, datetime):
+            try:
+                remaining = (termination - current).total_seconds()
+            except TypeError:
+                pass
+        self._expires_at = time.monotonic() + remaining
+
+    def deliver(self, message):
+        """Hand one message to the callback or queue."""
+        self._count("messages")
+        if self.callback is not None:
+            self.callback(message)
+        else:
+            try:
+                self.queue.put_nowait(message)
+            except Full:
+                self._count("errors")
+                logger.warning(f"[{self.name}] Notification queue full, dropping")
+
+
+class _NotifyHandler(BaseHTTPRequestHandler):
+    """HTTP handler accepting wsnt:Notify POSTs."""
+
+    protocol_version = "HTTP/1.1"
+    timeout = 10  # Don't let idle keep-alive connections pin a worker
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.server.consumer.max_body_size:
+            self._reply(413)
+            self.close_connection = True
+            return
+
+        body = self.rfile.read(length)
+        status = self.server.consumer._handle(self.path, body)
+        self._reply(status)
+
+    def _reply(self, status):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        logger.debug(f"Notify {self.client_address[0]}: {format % args}")
+
+
+class _NotifyServer(HTTPServer):
+    """HTTPServer dispatching requests to a bounded thread pool."""
+
+    allow_reuse_address = True
+
+    def __init__(self, address, consumer, workers):
+        super().__init__(address, _NotifyHandler)
+        self.consumer = consumer
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="onvif-notify"
+        )
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+class ONVIFNotificationConsumer:
+    """Embeddable WS-BaseNotification consumer (push events).
+
+    Runs a small HTTP server that receives wsnt:Notify messages pushed by devices
+    after Notification.Subscribe, so no request is made while nothing happens
+    (unlike PullPoint polling). Requests are handled by a bounded thread pool.
+
+    Each subscription gets its own endpoint path (/onvif/notify/<token>), which is
+    the primary routing key. Notifications posted to the base path are routed by
+    their wsnt:SubscriptionReference address instead.
+
+    A single renewal thread keeps all subscriptions alive: it hands those close
+    to TerminationTime to a small renewal pool, which renews them and
+    re-subscribes (same endpoint) when renewing fails, so a slow or
+    unreachable device doesn't hold back the renewals of the others.
+
+    Example:
+        >>> from onvif import ONVIFClient
+        >>> from onvif.utils import ONVIFNotificationConsumer
+        >>>
+        >>> consumer = ONVIFNotificationConsumer(port=8080).start()
+        >>> client = ONVIFClient("192.168.1.17", 80, "admin", "admin123")
+        >>>
+        >>> # Deliver to a callback
+        >>> consumer.subscribe(client, callback=lambda msg: print(msg))
+        >>>
+        >>> # Or to a queue
+        >>> sub = consumer.subscribe(client)
+        >>> message = sub.queue.get()
+        >>>
+        >>> consumer.close()  # Unsubscribes everything
+
+    Notes:
+        - The device must be able to reach the consumer address; set public_host
+          when the local address differs from the one seen by the device (NAT)
+        - Callbacks run on the server's worker threads and must be thread-safe
+        - Delivered messages are EventRecord objects (see utils.event_decoder)
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 0,
+        public_host: str = None,
+        path: str = "/onvif/notify",
+        workers: int = 8,
+        renew_workers: int = 4,
+        subscription_lifetime: float = 300,
+        renew_margin: float = 30,
+        max_queue: int = 10000,
+        max_body_size: int = 1024 * 1024,
+        sink=None,
+    ):
+        """Initialize the consumer.
+
+        Args:
+            host: Address to bind (default: all interfaces)
+            port: Port to bind (default: 0, any free port)
+            public_host: Host used in ConsumerReference (default: auto-detect per device)
+            path: Base URL path of the endpoint (default: /onvif/notify)
+            workers: HTTP handler threads (default: 8)
+            renew_workers: Threads renewing subscriptions (default: 4)
+            subscription_lifetime: Requested subscription lifetime in seconds (default: 300)
+            renew_margin: Renew this many seconds before TerminationTime (default: 30)
+            max_queue: Size of per-subscription queues (default: 10000)
+            max_body_size: Maximum accepted Notify body in bytes (default: 1 MiB)
+            sink: Optional event sink (e.g., ONVIFEventLog) receiving every routed
+                event via sink.write(subscription_name, records)
+        """
+        self.host = host
+        self.port = port
+        self.public_host = public_host
+        self.path = "/" + path.strip("/")
+        self.workers = workers
+        self.renew_workers = renew_workers
+        self.subscription_lifetime = subscription_lifetime
+        self.renew_margin = renew_margin
+        self.max_queue = max_queue
+        self.max_body_size = max_body_size
+        self.sink = sink
+
+        self._server = None
+        self._server_thread = None
+        self._renew_thread = None
+        self._renew_executor = None
+        self._refreshing = set()  # Tokens with a renewal in flight
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._by_token: Dict[str, NotificationSubscription] = {}
+        self._by_address: Dict[str, NotificationSubscription] = {}
+
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "messages": 0, "unrouted": 0, "errors": 0}
+
+    # Server lifecycle
+
+    def start(self):
+        """Start the HTTP server and the renewal thread (idempotent).
+
+        Returns:
+            self
+        """
+        if self._server is not None:
+            return self
+
+        self._stop.clear()
+        self._server = _NotifyServer((self.host, self.port), self, self.workers)
+        self.port = self._server.server_address[1]
+        self._server_thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.5},
+            name="onvif-notify-server",
+            daemon=True,
+        )
+        self._server_thread.start()
+        self._renew_executor = ThreadPoolExecutor(
+            max_workers=self.renew_workers, thread_name_prefix="onvif-notify-renew"
+        )
+        self._renew_thread = threading.Thread(
+            target=self._renew_loop, name="onvif-notify-renew", daemon=True
+        )
+        self._renew_thread.start()
+        logger.info(f"Notification consumer listening on {self.host}:{self.port}")
+        return self
+
+    def close(self):
+        """Unsubscribe everything and stop the server."""
+        self._stop.set()
+        if self._renew_thread is not None:
+            self._renew_thread.join(5)
+        if self._renew_executor is not None:
+            # Let in-flight renewals finish so none re-subscribes afterwards
+            self._renew_executor.shutdown(wait=True)
+            self._renew_executor = None
+        for subscription in self.subscriptions:
+            subscription.unsubscribe()
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Subscriptions
+
+    @property
+    def subscriptions(self) -> List[NotificationSubscription]:
+        with self._lock:
+            return list(self._by_token.values())
+
+    def consumer_address(self, subscription: NotificationSubscription) -> str:
+        """ConsumerReference address for a subscription."""
+        host = self.public_host
+        if not host:
+            host = self.host
+            if host in ("", "0.0.0.0", "::"):
+                host = self._local_ip_for(subscription.client.common_args["host"])
+        if ":" in host:
+            host = f"[{host}]"
+        return f"http://{host}:{self.port}{self.path}/{subscription.token}"
+
+    @staticmethod
+    def _local_ip_for(remote_host: str) -> str:
+        """Local address of the interface routing to remote_host."""
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect((remote_host, 9))
+                return s.getsockname()[0]
+        except OSError as e:
+            logger.debug(f"Failed to detect local IP for {remote_host}: {e}")
+            return socket.gethostbyname(socket.gethostname())
+
+    def subscribe(
+        self,
+        client,
+        callback: Callable = None,
+        queue: Queue = None,
+        Filter=None,
+        name: str = None,
+    ) -> NotificationSubscription:
+        """Subscribe a device to push notifications into this consumer.
+
+        Args:
+            client: ONVIFClient instance
+            callback: Called with each message (runs on a server worker thread)
+            queue: Queue receiving messages (default: new bounded queue)
+            Filter: Optional Subscribe filter (e.g., TopicExpression)
+            name: Subscription name for logs (default: "host:port")
+
+        Returns:
+            NotificationSubscription: Subscription handle
+        """
+        if self._server is None:
+            self.start()
+
+        if callback is None and queue is None:
+            queue = Queue(maxsize=self.max_queue)
+
+        name = name or f"{client.common_args['host']}:{client.common_args['port']}"
+        subscription = NotificationSubscription(
+            self, client, uuid.uuid4().hex, callback, queue, Filter, name
+        )
+        subscription.subscribe()
+
+        with self._lock:
+            self._by_token[subscription.token] = subscription
+            if subscription.manager_address:
+                self._by_address[subscription.manager_address] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: NotificationSubscription):
+        """Unsubscribe and forget a subscription."""
+        with self._lock:
+            self._by_token.pop(subscription.token, None)
+            self._by_address.pop(subscription.manager_address, None)
+        subscription.unsubscribe()
+
+    def _renew_loop(self):
+        """Renewal thread: hand subscriptions close to expiry to the renewal pool."""
+        while not self._stop.wait(1.0):
+            for subscription in self.subscriptions:
+                remaining = subscription.expires_in()
+                if remaining is not None and remaining > self.renew_margin:
+                    continue
+                with self._lock:
+                    if subscription.token in self._refreshing:
+                        continue
+                    self._refreshing.add(subscription.token)
+                self._renew_executor.submit(self._refresh_task, subscription)
+
+    def _refresh_task(self, subscription: NotificationSubscription):
+        try:
+            if not self._stop.is_set():
+                self._refresh(subscription)
+        finally:
+            with self._lock:
+                self._refreshing.discard(subscription.token)
+
+    def _refresh(self, subscription: NotificationSubscription):
+        """Renew a subscription, falling back to a new Subscribe."""
+        try:
+            if subscription.active:
+                subscription.renew()
+                return
+        except Exception as e:
+            subscription._count("errors")
+            logger.warning(f"[{subscription.name}] Renew failed, re-subscribing: {e}")
+
+        old_address = subscription.manager_address
+        try:
+            subscription.subscribe()
+        except Exception as e:
+            subscription._count("errors")
+            subscription._manager = None
+            subscription._expires_at = time.monotonic() + self.renew_margin
+            logger.warning(f"[{subscription.name}] Re-subscribe failed: {e}")
+            return
+
+        with self._lock:
+            self._by_address.pop(old_address, None)
+            if subscription.manager_address:
+                self._by_address[subscription.manager_address] = subscription
+
+    # Request handling
+
+    def _count(self, key: str):
+        """Increment a counter (requests are handled on several threads)."""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _route(self, path: str, address: Optional[str]):
+        """Find the subscription for a request path or SubscriptionReference."""
+        token = urlparse(path).path.rstrip("/").rsplit("/", 1)[-1]
+        with self._lock:
+            subscription = self._by_token.get(token)
+            if subscription is None and address:
+                subscription = self._by_address.get(address)
+        return subscription
+
+    def _handle(self, path: str, body: bytes) -> int:
+        """Handle one Notify POST and return the HTTP status code."""
+        self._count("requests")
+        try:
+            records = decode_notify(body)
+        except etree.XMLSyntaxError as e:
+            self._count("errors")
+            logger.warning(f"Invalid Notify body: {e}")
+            return 400
+
+        routed = 0
+        for record in records:
+            subscription = self._route(path, record.subscription)
+            if subscription is None:
+                self._count("unrouted")
+                logger.debug(
+                    f"Unrouted notification (path={path}, ref={record.subscription})"
+                )
+                continue
+            routed += 1
+            self._count("messages")
+            try:
+                if self.sink is not None:
+                    self.sink.write(subscription.name, (record,))
+                subscription.deliver(record)
+            except Exception as e:
+                self._count("errors")
+                logger.error(f"[{subscription.name}] Notification callback failed: {e}")
+        return 202 if routed or not records else 404
@@ -0,0 +1,256 @@
+# onvif/utils/onboarding.py
+
+import time
+import queue
+import socket
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from ..client import ONVIFClient
+from ..services.devicemgmt import Device
+from .error_handlers import ONVIFErrorHandler
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# ONVIFClient arguments that also apply to the credential check
+_OPERATOR_ARGS = ("cache", "verify_ssl", "apply_patch", "plugins")
+
+# Result of onboarding one device. On success client is a ready ONVIFClient,
+# username the credential that was accepted and info the GetDeviceInformation
+# response; on failure client is None and error says why. elapsed is the time
+# spent on the device in seconds.
+OnboardingResult = namedtuple(
+    "OnboardingResult", ["device", "client", "username", "info", "error", "elapsed"]
+)
+
+Credential = Union[Tuple[str, str], Dict[str, str]]
+
+_DONE = object()
+
+
+class ONVIFOnboarding:
+    """Concurrent pipeline from discovered devices to authenticated clients.
+
+    Turning discovery results into usable clients one device at a time is slow:
+    every ONVIFClient compiles its WSDLs and makes several round trips, and a
+    device with unknown credentials may have to be tried with several accounts.
+    The pipeline does this for many devices at once:
+
+        - Devices are consumed as they stream in (e.g. from
+          ONVIFDiscovery.iter_discover() or ONVIFScanner.iter_scan()), so the
+          first clients are ready before discovery ends
+        - Each device gets a cheap TCP connect check, then the credentials are
+          tried in order with a single GetDeviceInformation call each; a
+          rejected credential (NotAuthorized fault or HTTP 401) moves on to the
+          next one, and the ONVIFClient is only built for the accepted one
+        - Devices are onboarded concurrently on a worker pool; credentials of
+          one device are tried sequentially to avoid account lockouts
+        - Clients share compiled WSDL documents (share_wsdl=True), and each
+          client keeps its own keep-alive HTTP session
+
+    Results are yielded as OnboardingResult(device, client, username, info,
+    error, elapsed) in completion order, one per host:port.
+
+    Example:
+        >>> from onvif.utils import ONVIFDiscovery, ONVIFOnboarding
+        >>> onboarding = ONVIFOnboarding(
+        ...     [("admin", "admin123"), ("operator", "secret")], workers=16
+        ... )
+        >>> discovery = ONVIFDiscovery(timeout=4)
+        >>> for result in onboarding.run(discovery.iter_discover()):
+        ...     if result.client:
+        ...         print(result.device["host"], result.info.Model, result.username)
+        ...     else:
+        ...         print(result.device["host"], "failed:", result.error)
+
+        >>> result = onboarding.onboard({"host": "192.168.1.17", "port": 80})
+    """
+
+    def __init__(
+        self,
+        credentials: Iterable[Credential],
+        workers: int = 16,
+        timeout: int = 10,
+        connect_timeout: float = 2.0,
+        share_wsdl: bool = True,
+        **client_kwargs,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            credentials: (username, password) pairs or {"username", "password"}
+                dictionaries, tried in order
+            workers: Devices onboarded concurrently (default: 16)
+            timeout: ONVIFClient request timeout in seconds (default: 10)
+            connect_timeout: TCP reachability check timeout in seconds (default: 2)
+            share_wsdl: Share compiled WSDL documents between clients (default: True)
+            **client_kwargs: Other ONVIFClient arguments (cache, verify_ssl, ...)
+
+        Raises:
+            ValueError: No credentials given
+        """
+        self.credentials: List[Tuple[str, str]] = [
+            (c["username"], c["password"]) if isinstance(c, dict) else tuple(c)
+            for c in credentials
+        ]
+        if not self.credentials:
+            raise ValueError("At least one credential is required")
+
+        self.workers = workers
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.share_wsdl = share_wsdl
+        self.client_kwargs = client_kwargs
+
+    def run(
+        self, devices: Iterable[Union[Dict[str, Any], Tuple[str, int]]]
+    ) -> Iterator[OnboardingResult]:
+        """Onboard devices as they arrive, yielding results as they complete.
+
+        The devices iterable is consumed on a background thread, so a blocking
+        generator (a discovery in progress) doesn't hold back finished results.
+        Closing the iterator early cancels devices that haven't started.
+
+        Args:
+            devices: Device dictionaries (host, port, use_https; as returned by
+                discovery or a scan) or (host, port) tuples
+
+        Yields:
+            OnboardingResult: One per distinct host:port
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        pending = [1]  # Outstanding devices, plus one until the source is exhausted
+        lock = threading.Lock()
+
+        def release():
+            with lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished:
+                results.put(_DONE)
+
+        def task(device):
+            try:
+                results.put(self.onboard(device))
+            finally:
+                release()
+
+        def feed():
+            seen = set()
+            try:
+                for device in devices:
+                    if stop.is_set():
+                        return
+                    device = self._device(device)
+                    key = (device["host"], device["port"])
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    with lock:
+                        pending[0] += 1
+                    pool.submit(task, device)
+            except Exception as e:
+                if not stop.is_set():
+                    logger.warning(f"Onboarding device source failed: {e}")
+            finally:
+                release()
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        threading.Thread(target=feed, name="onvif-onboarding", daemon=True).start()
+        try:
+            while True:
+                result = results.get()
+                if result is _DONE:
+                    break
+                yield result
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def onboard(
+        self, device: Union[Dict[str, Any], Tuple[str, int]]
+    ) -> OnboardingResult:
+        """Onboard a single device (blocking).
+
+        Args:
+            device: Device dictionary or (host, port) tuple
+
+        Returns:
+            OnboardingResult: Ready client, or the reason it failed
+        """
+        start = time.monotonic()
+        device = self._device(device)
+        host, port = device["host"], device["port"]
+
+        def result(client=None, username=None, info=None, error=None):
+            return OnboardingResult(
+                device, client, username, info, error, time.monotonic() - start
+            )
+
+        # Fail fast on dead hosts instead of waiting out every SOAP timeout
+        try:
+            socket.create_connection((host, port), timeout=self.connect_timeout).close()
+        except OSError as e:
+            logger.debug(f"Onboarding {host}:{port}: unreachable: {e}")
+            return result(error=f"unreachable: {e}")
+
+        use_https = device.get("use_https", False)
+        operator_args = {
+            key: value
+            for key, value in self.client_kwargs.items()
+            if key in _OPERATOR_ARGS
+        }
+        for username, password in self.credentials:
+            # One call per credential; the client (GetServices and the rest of
+            # its setup) is only built once a credential is accepted
+            try:
+                info = Device(
+                    host=host,
+                    port=port,
+                    username=username,
+                    password=password,
+                    timeout=self.timeout,
+                    use_https=use_https,
+                    share_wsdl=self.share_wsdl,
+                    **operator_args,
+                ).GetDeviceInformation()
+            except Exception as e:
+                if ONVIFErrorHandler.is_not_authorized(e):
+                    logger.debug(f"Onboarding {host}:{port}: {username} rejected")
+                    continue
+                logger.debug(f"Onboarding {host}:{port} failed: {e}")
+                return result(username=username, error=str(e))
+
+            try:
+                client = ONVIFClient(
+                    host,
+                    port,
+                    username,
+                    password,
+                    timeout=self.timeout,
+                    use_https=use_https,
+                    share_wsdl=self.share_wsdl,
+                    **self.client_kwargs,
+                )
+            except Exception as e:
+                logger.debug(f"Onboarding {host}:{port} failed: {e}")
+                return result(username=username, info=info, error=str(e))
+
+            logger.info(f"Onboarded {host}:{port} as {username}")
+            return result(client, username, info)
+
+        return result(
+            error=f"not authorized ({len(self.credentials)} credentials tried)"
+        )
+
+    @staticmethod
+    def _device(device: Union[Dict[str, Any], Tuple[str, int]]) -> Dict[str, Any]:
+        if isinstance(device, dict):
+            return device
+        host, port = device
+        return {"host": host, "port": int(port), "use_https": False}
@@ -0,0 +1,233 @@
+# onvif/utils/pull_tuner.py
+
+import math
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import isodate
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def _fault_limits(exception) -> Tuple[Optional[float], Optional[int]]:
+    """Extract MaxTimeout/MaxMessageLimit from a PullMessagesFaultResponse.
+
+    Accepts an ONVIFOperationException, a zeep Fault or the fault detail element.
+    """
+    detail = getattr(exception, "original_exception", exception)
+    detail = getattr(detail, "detail", detail)
+    if not etree.iselement(detail):
+        return None, None
+
+    max_timeout = max_limit = None
+    for element in detail.iter("{*}MaxTimeout"):
+        try:
+            max_timeout = isodate.parse_duration(element.text.strip()).total_seconds()
+        except Exception:
+            pass
+    for element in detail.iter("{*}MaxMessageLimit"):
+        try:
+            max_limit = int(element.text)
+        except (TypeError, ValueError):
+            pass
+    return max_timeout, max_limit
+
+
+class ONVIFPullTuner:
+    """Adaptive Timeout/MessageLimit for PullMessages long-polling.
+
+    Fixed values are a trade-off: a short Timeout costs a round trip per quiet
+    interval, and a small MessageLimit makes busy cameras fall behind. The tuner
+    observes every pull and picks the values that minimize requests per
+    delivered event while keeping delivery latency within target_latency:
+
+        - Timeout starts at target_latency and doubles per pull up to
+          max_timeout for devices that answer as soon as a message is available
+          (latency doesn't depend on it, quiet periods cost one request per
+          Timeout)
+        - Devices that hold the response until Timeout (observed when a pull
+          returns some messages only after the full Timeout, or a full batch
+          only after a delay) are kept at Timeout = target_latency
+        - MessageLimit doubles while pulls come back full (backlog) and otherwise
+          follows the smoothed event rate, so one response drains a burst
+          without oversizing quiet streams
+
+    Device limits are learned from PullMessagesFaultResponse (MaxTimeout,
+    MaxMessageLimit): the Events GetServiceCapabilities response has no pull
+    limits, so the fault a device returns for out-of-range values is the
+    authoritative source. ONVIF requires support for a Timeout of at least one
+    minute, so max_timeout defaults to 60 seconds.
+
+    Example:
+        >>> from onvif.utils import ONVIFPullTuner
+        >>> tuner = ONVIFPullTuner(target_latency=1.0)
+        >>> while True:
+        ...     timeout, limit = tuner.next_request()
+        ...     start = time.monotonic()
+        ...     try:
+        ...         response = pullpoint.PullMessages(Timeout=f"PT{timeout}S", MessageLimit=limit)
+        ...     except ONVIFOperationException as e:
+        ...         if tuner.apply_fault(e):
+        ...             continue
+        ...         raise
+        ...     tuner.observe(len(response.NotificationMessage), time.monotonic() - start)
+
+        >>> # Or let the event stream drive it
+        >>> stream = client.event_stream(adaptive=True)
+    """
+
+    def __init__(
+        self,
+        target_latency: float = 1.0,
+        min_timeout: float = 1,
+        max_timeout: float = 60,
+        min_limit: int = 10,
+        max_limit: int = 1000,
+        smoothing: float = 0.3,
+    ):
+        """Initialize the tuner.
+
+        Args:
+            target_latency: Maximum acceptable delivery delay in seconds (default: 1)
+            min_timeout: Lower bound for Timeout in seconds (default: 1)
+            max_timeout: Upper bound for Timeout in seconds (default: 60)
+            min_limit: Lower bound for MessageLimit (default: 10)
+            max_limit: Upper bound for MessageLimit (default: 1000)
+            smoothing: EWMA weight of the newest rate sample (default: 0.3)
+        """
+        self.target_latency = target_latency
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+
+        self.timeout = max(min_timeout, min(target_latency, max_timeout))
+        self.message_limit = max(min_limit, min(100, max_limit))
+        self.rate = 0.0  # Smoothed events per second
+        self.holding = False  # Device waits for Timeout before answering
+
+        self._last = None
+        self.stats = {"pulls": 0, "events": 0, "full": 0, "empty": 0, "faults": 0}
+
+    def next_request(self) -> Tuple[int, int]:
+        """Timeout (whole seconds) and MessageLimit for the next PullMessages."""
+        return max(int(self.timeout), 1), self.message_limit
+
+    def observe(self, count: int, elapsed: float, now: float = None):
+        """Record the outcome of a pull and retune.
+
+        Args:
+            count: Number of messages returned
+            elapsed: Seconds the PullMessages request took
+            now: Monotonic timestamp of the response (default: time.monotonic())
+        """
+        now = time.monotonic() if now is None else now
+        timeout, limit = self.next_request()
+
+        self.stats["pulls"] += 1
+        self.stats["events"] += count
+
+        # Event rate over wall-clock time (pull plus consumer time)
+        if self._last is not None and now > self._last:
+            sample = count / (now - self._last)
+            self.rate += self.smoothing * (sample - self.rate)
+        self._last = now
+
+        if count >= limit:
+            # Backlog: more messages are waiting on the device
+            self.stats["full"] += 1
+            self.message_limit = min(limit * 2, self.max_limit)
+            if elapsed > self.target_latency / 2:
+                # A responsive device answers a backlog right away
+                self.holding = True
+        elif count == 0:
+            self.stats["empty"] += 1
+        elif elapsed >= 0.95 * timeout and timeout > self.min_timeout:
+            # Messages were available, yet the device waited for the Timeout
+            if not self.holding:
+                logger.debug("Device holds PullMessages responses until Timeout")
+            self.holding = True
+        elif elapsed < 0.5 * timeout:
+            self.holding = False
+
+        if self.holding:
+            self.timeout = max(
+                self.min_timeout, min(self.target_latency, self.max_timeout)
+            )
+        else:
+            # Probe upwards: long polls only pay off once the device is known
+            # to answer as soon as a message is available
+            self.timeout = min(self.timeout * 2, self.max_timeout)
+
+        if count >= limit:
+            return
+
+        # Room for twice the events expected within one latency window; shrink
+        # gradually so a single quiet pull doesn't undo a burst adjustment
+        window = max(self.target_latency, 1.0)
+        wanted = max(self.min_limit, math.ceil(self.rate * window * 2))
+        wanted = max(wanted, self.message_limit // 2)
+        self.message_limit = min(wanted, self.max_limit)
+
+    def apply_fault(self, exception) -> bool:
+        """Learn device limits from a PullMessagesFaultResponse.
+
+        Args:
+            exception: ONVIFOperationException (or zeep Fault) raised by PullMessages
+
+        Returns:
+            bool: True if the limits changed the request (retry the pull);
+            False if the fault carries no limits or the request already was
+            within them, so retrying would fail the same way
+        """
+        max_timeout, max_limit = _fault_limits(exception)
+        if max_timeout is None and max_limit is None:
+            return False
+
+        self.stats["faults"] += 1
+        before = self._limits()
+        if max_timeout:
+            self.max_timeout = max(min(self.max_timeout, max_timeout), 1)
+            self.min_timeout = min(self.min_timeout, self.max_timeout)
+            self.timeout = min(self.timeout, self.max_timeout)
+        if max_limit:
+            self.max_limit = max(min(self.max_limit, max_limit), 1)
+            self.min_limit = min(self.min_limit, self.max_limit)
+            self.message_limit = min(self.message_limit, self.max_limit)
+        if self._limits() == before:
+            logger.warning(
+                f"PullMessages fault with limits already applied: "
+                f"MaxTimeout={max_timeout}, MaxMessageLimit={max_limit}"
+            )
+            return False
+        logger.info(
+            f"PullMessages limits from device: MaxTimeout={max_timeout}, "
+            f"MaxMessageLimit={max_limit}"
+        )
+        return True
+
+    def _limits(self):
+        return (
+            self.timeout,
+            self.message_limit,
+            self.min_timeout,
+            self.max_timeout,
+            self.min_limit,
+            self.max_limit,
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current settings, smoothed rate and requests per delivered event."""
+        events = self.stats["events"]
+        return dict(
+            self.stats,
+            timeout=self.next_request()[0],
+            message_limit=self.message_limit,
+            rate=self.rate,
+            holding=self.holding,
+            requests_per_event=(self.stats["pulls"] / events) if events else None,
+        )
@@ -0,0 +1,393 @@
+# onvif/utils/renewal_manager.py
+
+import time
+import heapq
+import random
+import logging
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .service_cache import remaining_lifetime as _remaining
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def _as_duration(seconds: float) -> str:
+    return f"PT{max(int(seconds), 1)}S"
+
+
+class RenewalHandle:
+    """A subscription registered with ONVIFRenewalManager.
+
+    Attributes:
+        name: Name used in logs and metrics
+        client: ONVIFClient owning the subscription
+        reference: Current subscription response (SubscriptionReference, ...)
+        manager: Current Subscription/PausableSubscription service
+        pausable: Whether the subscription is a PausableSubscription
+        active: False once unregistered or expired
+        consecutive_failures: Failed renewals/resubscribes since the last success
+        stats (dict): Counters (renewals, failures, resubscribes)
+    """
+
+    def __init__(
+        self, client, reference, pausable, lifetime, name, resubscribe, on_resubscribe
+    ):
+        self.client = client
+        self.pausable = pausable
+        self.lifetime = lifetime
+        self.name = name
+        self.resubscribe = resubscribe
+        self.on_resubscribe = on_resubscribe
+        self.active = True
+        self.expires_at = None
+        self.generation = 0
+        self.consecutive_failures = 0
+        self.stats = {"renewals": 0, "failures": 0, "resubscribes": 0}
+        self.reference = None
+        self.manager = None
+        self._point(reference)
+
+    def _point(self, reference):
+        """Point the handle at a (new) subscription reference."""
+        self.reference = reference
+        if self.pausable:
+            self.manager = self.client.pausable_subscription(reference)
+        else:
+            self.manager = self.client.subscription(reference)
+        self.expires_at = time.monotonic() + _remaining(reference, self.lifetime)
+
+    def expires_in(self) -> float:
+        """Seconds until TerminationTime."""
+        return self.expires_at - time.monotonic()
+
+
+class ONVIFRenewalManager:
+    """Central renewal scheduler for Subscription/PausableSubscription.
+
+    Instead of one sleep loop per subscription, all registered subscriptions are
+    kept in a min-heap keyed by their renewal time (TerminationTime minus a
+    margin and random jitter, so renewals of subscriptions created together
+    spread out). A single scheduler thread pops due entries and hands them to a
+    small worker pool that sends Renew.
+
+    When Renew fails, the subscription is recreated through the resubscribe
+    callable given at registration, and on_resubscribe is called with the new
+    reference so consumers (e.g., a PullPoint reader) can re-point to it.
+    Without a resubscribe callable, Renew is retried with backoff until the
+    subscription expires.
+
+    Example:
+        >>> from onvif.utils import ONVIFRenewalManager
+        >>> renewals = ONVIFRenewalManager(workers=4).start()
+        >>>
+        >>> def create():
+        ...     return client.events().CreatePullPointSubscription(InitialTerminationTime="PT300S")
+        >>>
+        >>> ref = create()
+        >>> handle = renewals.register(
+        ...     client, ref, resubscribe=create,
+        ...     on_resubscribe=lambda new_ref: print("re-pointed", new_ref),
+        ... )
+        >>> renewals.metrics()["latency"]["avg"]
+
+        >>> # Event streams can delegate their renewals
+        >>> stream = client.event_stream(renewal_manager=renewals)
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        lifetime: float = 300,
+        renew_margin: float = 30,
+        jitter: float = 10,
+        retry_interval: float = 5,
+        latency_window: int = 1000,
+    ):
+        """Initialize the renewal manager.
+
+        Args:
+            workers: Worker threads sending Renew (default: 4)
+            lifetime: Requested lifetime per Renew in seconds (default: 300)
+            renew_margin: Renew at least this many seconds before expiry (default: 30)
+            jitter: Renew up to this many seconds earlier, at random (default: 10)
+            retry_interval: Base delay before retrying a failed renewal (default: 5)
+            latency_window: Number of recent renew latencies kept for metrics (default: 1000)
+        """
+        self.workers = workers
+        self.lifetime = lifetime
+        self.renew_margin = renew_margin
+        self.jitter = jitter
+        self.retry_interval = retry_interval
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._handles: Dict[int, RenewalHandle] = {}
+        self._executor = None
+        self._thread = None
+
+        self._latencies = deque(maxlen=latency_window)
+        self.stats = {
+            "renewals": 0,
+            "failures": 0,
+            "resubscribes": 0,
+            "expired": 0,
+        }
+
+    # Registration
+
+    def register(
+        self,
+        client,
+        reference,
+        pausable: bool = False,
+        lifetime: float = None,
+        name: str = None,
+        resubscribe: Callable[[], Any] = None,
+        on_resubscribe: Callable[[Any], None] = None,
+    ) -> RenewalHandle:
+        """Register a subscription for automatic renewal.
+
+        Args:
+            client: ONVIFClient owning the subscription
+            reference: Subscribe/CreatePullPointSubscription response
+            pausable: Use PausableSubscription instead of Subscription
+            lifetime: Requested lifetime per Renew (default: manager lifetime)
+            name: Name used in logs (default: "host:port")
+            resubscribe: Called without arguments to create a replacement
+                subscription when Renew fails; returns the new response
+            on_resubscribe: Called with the new response after resubscribing
+
+        Returns:
+            RenewalHandle: Handle for unregister() and per-subscription stats
+        """
+        handle = RenewalHandle(
+            client,
+            reference,
+            pausable,
+            lifetime or self.lifetime,
+            name or f"{client.common_args['host']}:{client.common_args['port']}",
+            resubscribe,
+            on_resubscribe,
+        )
+        with self._cond:
+            self._handles[id(handle)] = handle
+            self._schedule(handle)
+        return handle
+
+    def unregister(self, handle: RenewalHandle, unsubscribe: bool = False):
+        """Stop renewing a subscription.
+
+        Args:
+            handle: Handle returned by register()
+            unsubscribe: Also send Unsubscribe to the device (best effort)
+        """
+        with self._cond:
+            handle.active = False
+            self._handles.pop(id(handle), None)
+
+        if unsubscribe:
+            try:
+                handle.manager.Unsubscribe()
+            except Exception as e:
+                logger.debug(f"[{handle.name}] Unsubscribe failed: {e}")
+
+    @property
+    def handles(self) -> List[RenewalHandle]:
+        with self._cond:
+            return list(self._handles.values())
+
+    # Scheduling
+
+    def _schedule(self, handle: RenewalHandle, delay: Optional[float] = None):
+        """Push a handle on the heap (caller holds the condition)."""
+        if delay is None:
+            margin = self.renew_margin + random.uniform(0, self.jitter)
+            delay = max(handle.expires_in() - margin, 0)
+        handle.generation += 1
+        heapq.heappush(
+            self._heap,
+            (time.monotonic() + delay, next(self._seq), handle.generation, handle),
+        )
+        self._cond.notify()
+
+    def next_renewal(self) -> Optional[float]:
+        """Seconds until the next scheduled renewal (None if nothing is scheduled)."""
+        with self._cond:
+            due = [
+                entry[0]
+                for entry in self._heap
+                if entry[3].active and entry[2] == entry[3].generation
+            ]
+        return max(min(due) - time.monotonic(), 0) if due else None
+
+    def _run(self):
+        """Scheduler thread: hand due renewals to the worker pool."""
+        with self._cond:
+            while not self._stop.is_set():
+                if not self._heap:
+                    self._cond.wait(1.0)
+                    continue
+
+                due, _, generation, handle = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(min(delay, 1.0))
+                    continue
+
+                heapq.heappop(self._heap)
+                if not handle.active or generation != handle.generation:
+                    continue  # Unregistered or rescheduled
+                self._executor.submit(self._renew, handle)
+
+    def _renew(self, handle: RenewalHandle):
+        """Worker: renew one subscription, resubscribing on failure."""
+        if not handle.active:
+            return
+
+        start = time.monotonic()
+        try:
+            response = handle.manager.Renew(
+                TerminationTime=_as_duration(handle.lifetime)
+            )
+            latency = time.monotonic() - start
+            handle.expires_at = time.monotonic() + _remaining(response, handle.lifetime)
+            with self._cond:
+                self._latencies.append(latency)
+                self.stats["renewals"] += 1
+                handle.stats["renewals"] += 1
+                handle.consecutive_failures = 0
+                if handle.active:
+                    self._schedule(handle)
+            logger.debug(f"[{handle.name}] Renewed in {latency * 1000:.0f} ms")
+            return
+        except Exception as e:
+            with self._cond:
+                self.stats["failures"] += 1
+                handle.stats["failures"] += 1
+                handle.consecutive_failures += 1
+            logger.warning(f"[{handle.name}] Renew failed: {e}")
+
+        if handle.resubscribe is not None:
+            self._resubscribe(handle)
+        else:
+            self._retry_or_expire(handle)
+
+    def _resubscribe(self, handle: RenewalHandle):
+        try:
+            reference = handle.resubscribe()
+            handle._point(reference)
+        except Exception as e:
+            with self._cond:
+                self.stats["failures"] += 1
+                handle.stats["failures"] += 1
+                handle.consecutive_failures += 1
+            logger.warning(f"[{handle.name}] Resubscribe failed: {e}")
+            with self._cond:
+                if handle.active:
+                    self._schedule(handle, self._backoff(handle))
+            return
+
+        with self._cond:
+            self.stats["resubscribes"] += 1
+            handle.stats["resubscribes"] += 1
+            handle.consecutive_failures = 0
+            if handle.active:
+                self._schedule(handle)
+        logger.info(f"[{handle.name}] Resubscribed after failed renewal")
+
+        if handle.on_resubscribe is not None:
+            try:
+                handle.on_resubscribe(reference)
+            except Exception as e:
+                logger.error(f"[{handle.name}] on_resubscribe callback failed: {e}")
+
+    def _retry_or_expire(self, handle: RenewalHandle):
+        with self._cond:
+            if handle.expires_in() <= 0:
+                handle.active = False
+                self._handles.pop(id(handle), None)
+                self.stats["expired"] += 1
+                logger.warning(f"[{handle.name}] Subscription expired")
+            elif handle.active:
+                self._schedule(handle, self._backoff(handle))
+
+    def _backoff(self, handle: RenewalHandle) -> float:
+        """Retry delay: grows with consecutive failures, capped by expiry."""
+        failures = max(handle.consecutive_failures, 1)
+        delay = self.retry_interval * min(2 ** (failures - 1), 16)
+        delay *= random.uniform(0.5, 1.0)
+        remaining = handle.expires_in()
+        return min(delay, remaining / 2) if remaining > 0 else delay
+
+    # Lifecycle
+
+    def start(self):
+        """Start the scheduler thread and worker pool (idempotent).
+
+        Returns:
+            self
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="onvif-renew"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="onvif-renewal-scheduler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def close(self, unsubscribe: bool = False):
+        """Stop renewing.
+
+        Args:
+            unsubscribe: Also send Unsubscribe for every registered subscription
+        """
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+        for handle in self.handles:
+            self.unregister(handle, unsubscribe=unsubscribe)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Metrics
+
+    def metrics(self) -> Dict[str, Any]:
+        """Renewal counters and latency statistics.
+
+        Returns:
+            dict: {"active", "renewals", "failures", "resubscribes", "expired",
+                "latency": {"avg", "p95", "max"} in seconds (None if no renewals)}
+        """
+        with self._cond:
+            latencies = sorted(self._latencies)
+            result = dict(self.stats, active=len(self._handles))
+
+        if latencies:
+            result["latency"] = {
+                "avg": sum(latencies) / len(latencies),
+                "p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+                "max": latencies[-1],
+            }
+        else:
+            result["latency"] = {"avg": None, "p95": None, "max": None}
+        return result
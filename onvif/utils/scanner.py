@@ -0,0 +1,422 @@
+# onvif/utils/scanner.py
+
+import ssl
+import time
+import queue
+import socket
+import logging
+import selectors
+import ipaddress
+import http.client
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from lxml import etree
+
+from .discovery import ONVIFDiscovery
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+DEVICE_SERVICE_PATH = "/onvif/device_service"
+
+GET_SYSTEM_DATE_AND_TIME = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope" '
+    b'xmlns:tds="http://www.onvif.org/ver10/device/wsdl">'
+    b"<s:Body><tds:GetSystemDateAndTime/></s:Body>"
+    b"</s:Envelope>"
+)
+
+
+def get_system_date_and_time(
+    host: str,
+    port: int,
+    use_https: bool = False,
+    timeout: float = 2.0,
+    path: str = DEVICE_SERVICE_PATH,
+    verify_ssl: bool = False,
+) -> Optional[datetime]:
+    """Call GetSystemDateAndTime without authentication.
+
+    ONVIF requires devices to answer GetSystemDateAndTime unauthenticated (so
+    clients can compensate clock skew before WS-UsernameToken), which makes it
+    the cheapest way to confirm an ONVIF device service. Uses http.client
+    directly so scanning and health checks don't load the SOAP stack.
+
+    Args:
+        host: Device IP address or hostname
+        port: Device port
+        use_https: Use HTTPS
+        timeout: Connect/read timeout in seconds (default: 2)
+        path: Device service path (default: /onvif/device_service)
+        verify_ssl: Verify the device certificate (default: False)
+
+    Returns:
+        datetime: Device UTC time (None if the device doesn't report it)
+
+    Raises:
+        OSError: Connection failed or timed out
+        ValueError: The response is not a GetSystemDateAndTimeResponse
+    """
+    connection = _connection(host, port, use_https, timeout, verify_ssl)
+    try:
+        return _request_system_date_and_time(connection, path)
+    finally:
+        connection.close()
+
+
+def _connection(
+    host: str, port: int, use_https: bool, timeout: float, verify_ssl: bool
+) -> http.client.HTTPConnection:
+    """Create an (unconnected) HTTP(S) connection to a device."""
+    if use_https:
+        context = ssl.create_default_context()
+        if not verify_ssl:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        return http.client.HTTPSConnection(host, port, timeout=timeout, context=context)
+    return http.client.HTTPConnection(host, port, timeout=timeout)
+
+
+def _request_system_date_and_time(
+    connection: http.client.HTTPConnection, path: str = DEVICE_SERVICE_PATH
+) -> Optional[datetime]:
+    """Send GetSystemDateAndTime on connection, which is left open for reuse."""
+    try:
+        connection.request(
+            "POST",
+            path,
+            body=GET_SYSTEM_DATE_AND_TIME,
+            headers={"Content-Type": "application/soap+xml; charset=utf-8"},
+        )
+        response = connection.getresponse()
+        body = response.read()
+    except http.client.HTTPException as e:
+        raise ValueError(f"Invalid HTTP response: {e}") from e
+
+    if response.status != 200 or b"GetSystemDateAndTimeResponse" not in body:
+        raise ValueError(f"Not an ONVIF device service (HTTP {response.status})")
+    return _utc_datetime(body)
+
+
+def _utc_datetime(body: bytes) -> Optional[datetime]:
+    """Parse UTCDateTime from a GetSystemDateAndTimeResponse."""
+    try:
+        root = ONVIFDiscovery._parse_xml(body)
+        utc = root.find(".//{*}UTCDateTime")
+        if utc is None:
+            return None
+
+        def number(name):
+            return int(utc.find(f".//{{*}}{name}").text)
+
+        return datetime(
+            number("Year"),
+            number("Month"),
+            number("Day"),
+            number("Hour"),
+            number("Minute"),
+            number("Second"),
+            tzinfo=timezone.utc,
+        )
+    except (etree.XMLSyntaxError, AttributeError, TypeError, ValueError):
+        return None
+
+
+class ONVIFScanner:
+    """Unicast ONVIF scanner for networks where multicast is blocked.
+
+    WS-Discovery relies on multicast, which routed networks and many managed
+    switches drop. The scanner finds devices by unicast instead, all concurrently
+    on a thread pool:
+
+        - TCP connect checks on common ONVIF ports of every host
+        - A unicast WS-Discovery Probe to every host's UDP 3702
+        - Every candidate is verified with an unauthenticated GetSystemDateAndTime
+
+    Results are streamed as soon as a device is verified. Each result is a
+    dictionary compatible with ONVIFDiscovery.discover() (host, port, use_https,
+    epr, types, scopes, xaddrs; the WS-Discovery fields are empty for devices
+    found by TCP only), plus:
+
+        - source (str): "probe" or "tcp"
+        - latency (float): GetSystemDateAndTime round trip in seconds
+        - device_time (datetime): Device UTC clock (None if not reported)
+
+    Example:
+        >>> from onvif.utils import ONVIFScanner
+        >>> scanner = ONVIFScanner(timeout=1.0)
+        >>> for device in scanner.iter_scan("192.168.1.0/24"):
+        ...     print(f"{device['host']}:{device['port']} ({device['source']})")
+
+        >>> devices = scanner.scan(["10.0.5.20", "10.0.5.21"])
+    """
+
+    DEFAULT_PORTS = (80, 8000, 8080, 8899, 2020, 8081, 10080, 443, 8443)
+    HTTPS_PORTS = (443, 8443)
+    WS_DISCOVERY_PORT = ONVIFDiscovery.WS_DISCOVERY_PORT
+
+    def __init__(
+        self,
+        ports: Iterable[int] = DEFAULT_PORTS,
+        timeout: float = 1.0,
+        workers: int = 128,
+        probe: bool = True,
+        verify: bool = True,
+        verify_ssl: bool = False,
+    ):
+        """Initialize the scanner.
+
+        Args:
+            ports: TCP ports to check on every host (default: common ONVIF ports)
+            timeout: Per-connection and WS-Discovery reply timeout in seconds (default: 1)
+            workers: Concurrent connection checks (default: 128)
+            probe: Also send a unicast WS-Discovery Probe to each host (default: True)
+            verify: Confirm candidates with GetSystemDateAndTime; if False,
+                every open port is reported (default: True)
+            verify_ssl: Verify certificates on HTTPS ports (default: False)
+        """
+        self.ports = tuple(ports)
+        self.timeout = timeout
+        self.workers = workers
+        self.probe = probe
+        self.verify = verify
+        self.verify_ssl = verify_ssl
+
+    @staticmethod
+    def _hosts(network: Union[str, Iterable[str]]) -> List[str]:
+        """Expand a CIDR network, single address or iterable of hosts."""
+        if isinstance(network, str):
+            try:
+                parsed = ipaddress.ip_network(network, strict=False)
+            except ValueError:
+                return [network]  # Hostname
+            if parsed.num_addresses == 1:
+                return [str(parsed.network_address)]
+            return [str(host) for host in parsed.hosts()]
+        return [str(host) for host in network]
+
+    def scan(self, network: Union[str, Iterable[str]]) -> List[Dict[str, Any]]:
+        """Scan and return all verified devices.
+
+        Args:
+            network: CIDR network ("192.168.1.0/24"), address, or iterable of hosts
+
+        Returns:
+            List of device dictionaries (see class docstring)
+        """
+        devices = list(self.iter_scan(network))
+        logger.info(f"Scan completed: found {len(devices)} ONVIF devices")
+        return devices
+
+    def probe_hosts(self, hosts: Iterable[str]) -> List[Dict[str, Any]]:
+        """Send a directed WS-Discovery Probe to each host and collect the answers.
+
+        Unlike scan(), no TCP ports are checked: only devices answering the
+        Probe on UDP 3702 within timeout are returned (as parsed by
+        ONVIFDiscovery, with source "probe").
+
+        Args:
+            hosts: Host addresses to probe
+
+        Returns:
+            List of device dictionaries, one per answering device
+        """
+        devices = []
+        self._unicast_probe(list(hosts), devices.append)
+        return devices
+
+    def iter_scan(self, network: Union[str, Iterable[str]]) -> Iterator[Dict[str, Any]]:
+        """Scan, yielding each device as soon as it is verified.
+
+        Args:
+            network: CIDR network ("192.168.1.0/24"), address, or iterable of hosts
+
+        Yields:
+            dict: Device dictionary (see class docstring); one per host:port
+        """
+        hosts = self._hosts(network)
+        logger.info(
+            f"Scanning {len(hosts)} hosts on ports {list(self.ports)} "
+            f"(timeout: {self.timeout}s, workers: {self.workers})"
+        )
+
+        results = queue.Queue()
+        pending = [1]  # Outstanding tasks, plus one until everything is submitted
+        lock = threading.Lock()
+        claimed = set()  # host:port already verified (or being verified)
+
+        def claim(host, port):
+            with lock:
+                if (host, port) in claimed:
+                    return False
+                claimed.add((host, port))
+                return True
+
+        def submit(function, *args):
+            with lock:
+                pending[0] += 1
+            future = pool.submit(function, *args)
+            future.add_done_callback(done)
+
+        def done(future):
+            if not future.cancelled() and future.exception() is not None:
+                logger.debug(f"Scan task failed: {future.exception()}")
+            release()
+
+        def release():
+            with lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished:
+                results.put(None)
+
+        def check_port(host, port):
+            if not self._connect(host, port):
+                return
+            if claim(host, port):
+                self._verify(self._device(host, port, "tcp"), results)
+
+        def on_match(device):
+            if claim(device["host"], device["port"]):
+                submit(self._verify, device, results)
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            if self.probe:
+                submit(self._unicast_probe, hosts, on_match)
+            for host in hosts:
+                for port in self.ports:
+                    submit(check_port, host, port)
+            release()
+
+            while True:
+                device = results.get()
+                if device is None:
+                    break
+                yield device
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _device(self, host: str, port: int, source: str) -> Dict[str, Any]:
+        use_https = port in self.HTTPS_PORTS
+        scheme = "https" if use_https else "http"
+        return {
+            "host": host,
+            "port": port,
+            "use_https": use_https,
+            "epr": "",
+            "types": [],
+            "scopes": [],
+            "xaddrs": [f"{scheme}://{host}:{port}{DEVICE_SERVICE_PATH}"],
+            "source": source,
+            "latency": None,
+            "device_time": None,
+        }
+
+    def _connect(self, host: str, port: int) -> bool:
+        try:
+            with socket.create_connection((host, port), timeout=self.timeout):
+                return True
+        except OSError:
+            return False
+
+    def _verify(self, device: Dict[str, Any], results: queue.Queue):
+        """Confirm a candidate with GetSystemDateAndTime and report it."""
+        if self.verify:
+            # Probe matches may advertise a non-default device service path
+            path = DEVICE_SERVICE_PATH
+            for xaddr in device["xaddrs"]:
+                url = urlsplit(xaddr)
+                if url.hostname == device["host"] and url.path:
+                    path = url.path
+                    break
+
+            start = time.monotonic()
+            try:
+                device["device_time"] = get_system_date_and_time(
+                    device["host"],
+                    device["port"],
+                    device["use_https"],
+                    timeout=max(self.timeout, 2.0),
+                    path=path,
+                    verify_ssl=self.verify_ssl,
+                )
+            except (OSError, ValueError) as e:
+                logger.debug(
+                    f"{device['host']}:{device['port']} is not an ONVIF device: {e}"
+                )
+                return
+            device["latency"] = time.monotonic() - start
+
+        logger.debug(
+            f"Found ONVIF device at {device['host']}:{device['port']} ({device['source']})"
+        )
+        results.put(device)
+
+    def _unicast_probe(self, hosts: List[str], on_match):
+        """Send a WS-Discovery Probe to every host's UDP 3702 and collect matches."""
+        discovery = ONVIFDiscovery(timeout=self.timeout)
+        message = discovery._probe_message()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        selector = selectors.DefaultSelector()
+        selector.register(sock, selectors.EVENT_READ)
+
+        seen = set()
+
+        def receive():
+            while True:
+                try:
+                    data, addr = sock.recvfrom(8192)
+                except (BlockingIOError, InterruptedError):
+                    return
+                except OSError:
+                    continue  # ICMP port unreachable from a previous send
+                device = discovery._accept(data, addr, seen, False, None)
+                if device is not None:
+                    device.update(source="probe", latency=None, device_time=None)
+                    on_match(device)
+
+        def send(host, deadline):
+            # A full send buffer isn't a failure: wait until the socket is
+            # writable (reading replies meanwhile) and send to the same host
+            while True:
+                try:
+                    sock.sendto(message, (host, self.WS_DISCOVERY_PORT))
+                    return
+                except BlockingIOError:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        logger.debug(f"Send buffer full, no probe sent to {host}")
+                        return
+                    selector.modify(sock, selectors.EVENT_READ | selectors.EVENT_WRITE)
+                    try:
+                        selector.select(min(remaining, 0.1))
+                    finally:
+                        selector.modify(sock, selectors.EVENT_READ)
+                    receive()
+                except OSError as e:
+                    logger.debug(f"Failed to send probe to {host}: {e}")
+                    return
+
+        try:
+            send_deadline = time.monotonic() + self.timeout
+            for host in hosts:
+                send(host, send_deadline)
+                receive()
+
+            deadline = time.monotonic() + self.timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if selector.select(remaining):
+                    receive()
+        finally:
+            selector.close()
+            sock.close()
@@ -0,0 +1,190 @@
+# onvif/utils/service_cache.py
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+def remaining_lifetime(response, default: Optional[float] = None) -> Optional[float]:
+    """Remaining subscription lifetime in seconds from CurrentTime/TerminationTime.
+
+    Computed on the device clock, so host/camera clock skew doesn't matter.
+    Works with zeep objects and dicts; returns default if either time is missing.
+    """
+    if isinstance(response, dict):
+        current = response.get("CurrentTime")
+        termination = response.get("TerminationTime")
+    else:
+        current = getattr(response, "CurrentTime", None)
+        termination = getattr(response, "TerminationTime", None)
+    if isinstance(current, datetime) and isinstance(termination, datetime):
+        try:
+            return (termination - current).total_seconds()
+        except TypeError:
+            pass  # Mixed naive/aware datetimes
+    return default
+
+
+def close_service(service):
+    """Close the HTTP session behind a service's ONVIFOperator (best effort)."""
+    try:
+        service.operator.client.transport.session.close()
+    except Exception as e:
+        logger.debug(f"Failed to close service session: {e}")
+
+
+class ServiceCache:
+    """Bounded LRU cache for per-subscription services (PullPoint, Subscription, ...).
+
+    Every CreatePullPointSubscription/Subscribe response has its own XAddr, and each
+    cached service holds a full ONVIFOperator (zeep client + HTTP session). This
+    cache keeps them from accumulating in long-running processes:
+
+        - Entries expire at TerminationTime plus a grace period (extended on Renew)
+        - At most max_entries are kept; the least recently used entry is evicted
+        - Evicted services have their HTTP session closed
+
+    Services still held elsewhere keep working after eviction (requests reopens
+    connections on demand); the cache only stops owning them.
+
+    The cache supports the read-only dict protocol (in, [], len, iteration) so it
+    can replace the plain dicts previously used by ONVIFClient.
+    """
+
+    def __init__(self, max_entries: int = 64, grace: float = 60):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached services (default: 64)
+            grace: Seconds an entry is kept past its TerminationTime (default: 60)
+        """
+        self.max_entries = max_entries
+        self.grace = grace
+
+        self._entries = OrderedDict()  # key -> [service, expires_at or None]
+        self._lock = threading.RLock()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evicted_lru": 0,
+            "evicted_expired": 0,
+            "evicted_unsubscribed": 0,
+        }
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached service (marking it recently used), or None."""
+        with self._lock:
+            self.purge_expired()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key: str, service, expires_in: float = None):
+        """Cache a service, evicting the least recently used entries if full.
+
+        Args:
+            key: Service XAddr
+            service: Service instance
+            expires_in: Seconds until the subscription's TerminationTime (None: no expiry)
+        """
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None and previous[0] is not service:
+                close_service(previous[0])
+            self._entries[key] = [service, self._deadline(expires_in)]
+
+            while len(self._entries) > self.max_entries:
+                old_key, (old_service, _) = self._entries.popitem(last=False)
+                self.stats["evicted_lru"] += 1
+                logger.debug(f"Evicted least recently used service: {old_key}")
+                close_service(old_service)
+
+    def extend(self, key: str, expires_in: float = None):
+        """Move an entry's expiry (e.g., after Renew)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = self._deadline(expires_in)
+
+    def evict(self, key: str, reason: str = "unsubscribed") -> bool:
+        """Remove an entry and close its session.
+
+        Args:
+            key: Service XAddr
+            reason: Counter suffix ("unsubscribed" or "expired")
+
+        Returns:
+            bool: True if the entry was cached
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self.stats[f"evicted_{reason}"] += 1
+        logger.debug(f"Evicted {reason} service: {key}")
+        close_service(entry[0])
+        return True
+
+    def purge_expired(self) -> int:
+        """Evict all entries past their deadline.
+
+        Returns:
+            int: Number of evicted entries
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key
+                for key, (_, deadline) in self._entries.items()
+                if deadline is not None and deadline <= now
+            ]
+            for key in expired:
+                self.evict(key, reason="expired")
+        return len(expired)
+
+    def clear(self):
+        """Evict everything (closing sessions) without counting evictions."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for service, _ in entries:
+            close_service(service)
+
+    def metrics(self) -> Dict[str, int]:
+        """Counters plus the current number of entries."""
+        with self._lock:
+            return dict(self.stats, size=len(self._entries))
+
+    def _deadline(self, expires_in: Optional[float]) -> Optional[float]:
+        if expires_in is None:
+            return None
+        return time.monotonic() + expires_in + self.grace
+
+    # Read-only dict protocol
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key):
+        return self._entries[key][0]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self.keys())
@@ -0,0 +1,472 @@
+# onvif/utils/snapshot.py
+
+import os
+import time
+import base64
+import hashlib
+import logging
+import threading
+import http.client
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.request import parse_http_list, parse_keqv_list
+
+import requests
+
+from .exceptions import ONVIFOperationException
+from .scanner import _connection
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Result of fetching one snapshot. size is the number of bytes received; data
+# holds them when no target was given (None otherwise); error says why the
+# fetch failed (None on success); elapsed is the fetch time in seconds.
+SnapshotResult = namedtuple(
+    "SnapshotResult", ["name", "profile", "size", "data", "error", "elapsed"]
+)
+
+_MEDIA2_NAMESPACE = "http://www.onvif.org/ver20/media/wsdl"
+
+_DIGEST_HASHES = {
+    "MD5": hashlib.md5,
+    "MD5-SESS": hashlib.md5,
+    "SHA-256": hashlib.sha256,
+    "SHA-256-SESS": hashlib.sha256,
+}
+
+
+class _Device:
+    """Per-device fetcher state: snapshot URIs, credentials and connections."""
+
+    def __init__(self, username, password, verify_ssl):
+        self.username = username
+        self.password = password
+        self.verify_ssl = verify_ssl
+        self.profile = None  # Default profile token (first media profile)
+        self.uris: Dict[str, str] = {}  # Profile token -> snapshot URI
+        self.scheme = None  # "digest" or "basic" once negotiated
+        self.challenge: Dict[str, str] = {}
+        self.nonce_count = 0
+        self.connections: Dict[Tuple[str, str, int], http.client.HTTPConnection] = {}
+        self.scratch = None  # Reused chunk buffer for file targets
+        self.lock = threading.Lock()  # One fetch at a time per device
+
+    def authorization(self, method: str, path: str) -> Optional[str]:
+        """Authorization header value for a request (None if not needed)."""
+        if self.scheme == "basic":
+            credentials = f"{self.username}:{self.password}".encode("utf-8")
+            return "Basic " + base64.b64encode(credentials).decode("ascii")
+        if self.scheme != "digest":
+            return None
+
+        challenge = self.challenge
+        algorithm = challenge.get("algorithm", "MD5").upper()
+        digest = _DIGEST_HASHES.get(algorithm, hashlib.md5)
+
+        def h(value: str) -> str:
+            return digest(value.encode("utf-8")).hexdigest()
+
+        realm, nonce = challenge.get("realm", ""), challenge.get("nonce", "")
+        cnonce = os.urandom(8).hex()
+        ha1 = h(f"{self.username}:{realm}:{self.password}")
+        if algorithm.endswith("-SESS"):
+            ha1 = h(f"{ha1}:{nonce}:{cnonce}")
+        ha2 = h(f"{method}:{path}")
+
+        qop = [q.strip() for q in challenge.get("qop", "").split(",")]
+        fields = [
+            f'username="{self.username}"',
+            f'realm="{realm}"',
+            f'nonce="{nonce}"',
+            f'uri="{path}"',
+        ]
+        if "auth" in qop:
+            # The nonce count lets the device accept the nonce again
+            self.nonce_count += 1
+            nc = f"{self.nonce_count:08x}"
+            response = h(f"{ha1}:{nonce}:{nc}:{cnonce}:auth:{ha2}")
+            fields += ["qop=auth", f"nc={nc}", f'cnonce="{cnonce}"']
+        else:
+            response = h(f"{ha1}:{nonce}:{ha2}")
+        fields.append(f'response="{response}"')
+        if "algorithm" in challenge:
+            fields.append(f"algorithm={challenge['algorithm']}")
+        if "opaque" in challenge:
+            fields.append(f'opaque="{challenge["opaque"]}"')
+        return "Digest " + ", ".join(fields)
+
+    def negotiate(self, headers: http.client.HTTPMessage) -> bool:
+        """Pick the scheme from a 401 response; False if nothing can be tried."""
+        if not self.username:
+            return False
+        challenges = headers.get_all("WWW-Authenticate") or []
+        for challenge in challenges:
+            scheme, _, params = challenge.strip().partition(" ")
+            if scheme.lower() == "digest":
+                self.scheme = "digest"
+                self.challenge = parse_keqv_list(parse_http_list(params))
+                self.nonce_count = 0
+                return True
+        if any(c.strip().lower().startswith("basic") for c in challenges):
+            self.scheme = "basic"
+            return True
+        return False
+
+    def close(self):
+        connections, self.connections = self.connections, {}
+        for connection in connections.values():
+            connection.close()
+
+
+class ONVIFSnapshotFetcher:
+    """Authenticated JPEG snapshot fetching for one or many devices.
+
+    GetSnapshotUri only returns a URI; fetching it needs HTTP authentication
+    that is separate from the SOAP WS-Security used by the services. The
+    fetcher keeps per-device state so that repeated fetches are one request
+    on an open connection:
+
+        - The snapshot URI is requested once per profile (Media2 when the
+          device advertises it, Media otherwise) and cached; the default
+          profile is the first one from GetProfiles
+        - HTTP Digest (MD5, SHA-256, -sess) or Basic is negotiated from the
+          first 401 response, then sent with every request; a stale nonce is
+          renegotiated from the device's new challenge
+        - Connections are kept open between fetches (HTTP keep-alive) and
+          reopened transparently when the device closes them
+        - Bodies are read with readinto(): straight into a caller-provided
+          buffer, or through one reused chunk buffer into a file
+
+    Fetches of one device are serialized (cameras serve snapshots slowly and
+    often allow few connections); different devices are fetched
+    concurrently by fetch_many().
+
+    Example:
+        >>> from onvif import ONVIFClient
+        >>> from onvif.utils import ONVIFSnapshotFetcher
+        >>> client = ONVIFClient("192.168.1.17", 80, "admin", "admin123")
+        >>> fetcher = ONVIFSnapshotFetcher()
+        >>> jpeg = fetcher.fetch(client)
+        >>> buffer = bytearray(2 * 1024 * 1024)
+        >>> size = fetcher.fetch_into(client, buffer)
+        >>> fetcher.fetch_to_file(client, "front-door.jpg")
+
+        >>> # Many devices, files named after the device
+        >>> for result in fetcher.fetch_many(
+        ...     clients, target=lambda name: f"{name.replace(':', '_')}.jpg"
+        ... ):
+        ...     print(result.name, result.size, result.error)
+        >>> fetcher.close()
+    """
+
+    def __init__(
+        self, timeout: float = 10.0, workers: int = 16, chunk_size: int = 65536
+    ):
+        """Initialize the fetcher.
+
+        Args:
+            timeout: Connect/read timeout of snapshot requests in seconds
+                (default: 10)
+            workers: Devices fetched concurrently by fetch_many() (default: 16)
+            chunk_size: Chunk buffer size for file targets (default: 64 KiB)
+        """
+        self.timeout = timeout
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._devices: Dict[str, _Device] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close all kept-alive connections (cached URIs and auth are kept)."""
+        with self._lock:
+            devices = list(self._devices.values())
+        for device in devices:
+            with device.lock:
+                device.close()
+
+    def invalidate(self, client=None):
+        """Forget cached snapshot URIs and auth of a device (all if client is None)."""
+        with self._lock:
+            if client is None:
+                devices, self._devices = list(self._devices.values()), {}
+            else:
+                device = self._devices.pop(self._name(client), None)
+                devices = [device] if device is not None else []
+        for device in devices:
+            with device.lock:
+                device.close()
+
+    def snapshot_uri(self, client, profile: Optional[str] = None) -> str:
+        """Snapshot URI of a profile (cached after the first call).
+
+        Args:
+            client: ONVIFClient of the device
+            profile: Media profile token (default: first profile)
+
+        Returns:
+            str: Snapshot URI
+        """
+        device = self._device(client)
+        with device.lock:
+            return self._snapshot_uri(client, device, profile)[1]
+
+    def fetch(self, client, profile: Optional[str] = None) -> bytes:
+        """Fetch a snapshot.
+
+        Args:
+            client: ONVIFClient of the device
+            profile: Media profile token (default: first profile)
+
+        Returns:
+            bytes: Image data
+
+        Raises:
+            ONVIFOperationException: The snapshot couldn't be fetched
+        """
+        return self._fetch(client, profile, None)[1]
+
+    def fetch_into(self, client, buffer, profile: Optional[str] = None) -> int:
+        """Fetch a snapshot into a writable buffer, without intermediate copies.
+
+        Args:
+            client: ONVIFClient of the device
+            buffer: Writable bytes-like object (bytearray, memoryview, mmap,
+                numpy array, ...) large enough for the image
+            profile: Media profile token (default: first profile)
+
+        Returns:
+            int: Number of bytes written to the start of the buffer
+
+        Raises:
+            ONVIFOperationException: The snapshot couldn't be fetched or is
+                larger than the buffer
+        """
+        return self._fetch(client, profile, memoryview(buffer).cast("B"))[0]
+
+    def fetch_to_file(self, client, file, profile: Optional[str] = None) -> int:
+        """Fetch a snapshot into a file.
+
+        Args:
+            client: ONVIFClient of the device
+            file: Path, or binary file object opened for writing
+            profile: Media profile token (default: first profile)
+
+        Returns:
+            int: Number of bytes written
+
+        Raises:
+            ONVIFOperationException: The snapshot couldn't be fetched
+        """
+        if hasattr(file, "write"):
+            return self._fetch(client, profile, file)[0]
+        with open(file, "wb") as f:
+            return self._fetch(client, profile, f)[0]
+
+    def fetch_many(
+        self,
+        clients: Iterable,
+        profile: Optional[str] = None,
+        target: Optional[Callable[[str], Any]] = None,
+    ) -> Iterator[SnapshotResult]:
+        """Fetch snapshots of many devices concurrently, yielding them as they complete.
+
+        Args:
+            clients: ONVIFClient instances (named "host:port")
+            profile: Media profile token (default: first profile of each device)
+            target: Called with the device name, returns where to put the
+                image: a writable buffer, a binary file object or a path
+                (default: return the bytes in the result's data)
+
+        Yields:
+            SnapshotResult: One per client, in completion order
+        """
+
+        def fetch(client):
+            start = time.monotonic()
+            name = self._name(client)
+            size = data = error = None
+            try:
+                destination = target(name) if target is not None else None
+                if destination is None:
+                    data = self.fetch(client, profile)
+                    size = len(data)
+                elif isinstance(destination, (str, os.PathLike)) or hasattr(
+                    destination, "write"
+                ):
+                    size = self.fetch_to_file(client, destination, profile)
+                else:
+                    size = self.fetch_into(client, destination, profile)
+            except Exception as e:
+                logger.debug(f"Snapshot {name} failed: {e}")
+                error = str(e)
+            return SnapshotResult(
+                name, profile, size, data, error, time.monotonic() - start
+            )
+
+        pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="onvif-snapshot"
+        )
+        try:
+            futures = [pool.submit(fetch, client) for client in clients]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, client, profile, sink):
+        """Fetch into sink (buffer view, file or None for bytes).
+
+        Returns:
+            (size, data): data is the image when sink is None
+        """
+        device = self._device(client)
+        with device.lock:
+            try:
+                token, uri = self._snapshot_uri(client, device, profile)
+            except ONVIFOperationException:
+                raise
+            except Exception as e:
+                raise ONVIFOperationException("GetSnapshotUri", e) from e
+            try:
+                return self._get(device, uri, sink)
+            except Exception as e:
+                # The URI may carry a session token that expired
+                device.uris.pop(token, None)
+                raise ONVIFOperationException("GetSnapshot", e) from e
+
+    def _snapshot_uri(self, client, device: _Device, profile):
+        """(profile token, URI), calling GetProfiles/GetSnapshotUri if not cached."""
+        media2 = bool(client.services) and _MEDIA2_NAMESPACE in client._service_map
+        media = client.media2() if media2 else client.media()
+        if profile is None:
+            if device.profile is None:
+                profiles = media.GetProfiles()
+                if not profiles:
+                    raise ValueError("Device has no media profiles")
+                device.profile = profiles[0].token
+            profile = device.profile
+        uri = device.uris.get(profile)
+        if uri is None:
+            result = media.GetSnapshotUri(ProfileToken=profile)
+            # The Media2 response has a single anyURI child, which zeep
+            # unwraps to a plain string; Media (ver10) returns a MediaUri
+            uri = device.uris[profile] = result if media2 else result.Uri
+        return profile, uri
+
+    def _get(self, device: _Device, uri: str, sink):
+        parts = urlsplit(uri)
+        https = parts.scheme == "https"
+        host, port = parts.hostname, parts.port or (443 if https else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        key = (parts.scheme, host, port)
+
+        negotiated = False
+        retried = False
+        while True:
+            connection = device.connections.get(key)
+            reused = connection is not None and connection.sock is not None
+            if connection is None:
+                connection = device.connections[key] = _connection(
+                    host, port, https, self.timeout, device.verify_ssl
+                )
+
+            headers = {"Accept": "image/jpeg, image/*"}
+            authorization = device.authorization("GET", path)
+            if authorization:
+                headers["Authorization"] = authorization
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                del device.connections[key]
+                if reused and not retried:
+                    # The device closed the idle keep-alive connection
+                    retried = True
+                    continue
+                raise
+
+            if response.status == 401 and not negotiated:
+                response.read()  # Drain so the connection can be reused
+                negotiated = True
+                if device.negotiate(response.msg):
+                    logger.debug(f"Snapshot {host}:{port}: using {device.scheme} auth")
+                    continue
+
+            try:
+                if response.status != 200:
+                    response.read()
+                    error = requests.Response()
+                    error.status_code = response.status
+                    error.reason = response.reason
+                    error.url = uri
+                    raise requests.HTTPError(
+                        f"{response.status} {response.reason} for url: {uri}",
+                        response=error,
+                    )
+                return self._read(device, response, sink)
+            finally:
+                if response.will_close or not response.isclosed():
+                    connection.close()
+                    device.connections.pop(key, None)
+
+    def _read(self, device: _Device, response: http.client.HTTPResponse, sink):
+        length = response.length  # None for chunked or close-delimited bodies
+
+        if sink is None:
+            data = response.read()
+            return len(data), data
+
+        if isinstance(sink, memoryview):
+            if length is not None and length > len(sink):
+                raise ValueError(
+                    f"Snapshot of {length} bytes doesn't fit a {len(sink)} byte buffer"
+                )
+            size = 0
+            while size < len(sink):
+                count = response.readinto(sink[size:])
+                if not count:
+                    return size, None
+                size += count
+            if response.read(1):
+                raise ValueError(f"Snapshot doesn't fit a {len(sink)} byte buffer")
+            return size, None
+
+        if device.scratch is None or len(device.scratch) != self.chunk_size:
+            device.scratch = bytearray(self.chunk_size)
+        view = memoryview(device.scratch)
+        size = 0
+        while True:
+            count = response.readinto(view)
+            if not count:
+                return size, None
+            sink.write(view[:count])
+            size += count
+
+    def _device(self, client) -> _Device:
+        name = self._name(client)
+        with self._lock:
+            device = self._devices.get(name)
+            if device is None:
+                args = client.common_args
+                device = self._devices[name] = _Device(
+                    args.get("username"),
+                    args.get("password"),
+                    args.get("verify_ssl", False),
+                )
+            return device
+
+    @staticmethod
+    def _name(client) -> str:
+        return f"{client.common_args['host']}:{client.common_args['port']}"
@@ -0,0 +1,340 @@
+# onvif/utils/topic_index.py
+
+import re
+import logging
+from collections import namedtuple
+from typing import Dict, Iterator, List, Optional, Union
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+WSNT_NS = "http://docs.oasis-open.org/wsn/b-2"
+WSTOP_NS = "http://docs.oasis-open.org/wsn/t-1"
+TT_NS = "http://www.onvif.org/ver10/schema"
+TEV_NS = "http://www.onvif.org/ver10/events/wsdl"
+ONVIF_TOPICS_NS = "http://www.onvif.org/ver10/topics"
+
+CONCRETE_SET_DIALECT = "http://www.onvif.org/ver10/tev/topicExpression/ConcreteSet"
+
+_TOPIC_ATTR = f"{{{WSTOP_NS}}}topic"
+_MESSAGE_DESCRIPTION = f"{{{TT_NS}}}MessageDescription"
+
+# Module-level secure parser (no entity expansion, no network access)
+_PARSER = etree.XMLParser(
+    resolve_entities=False, no_network=True, remove_blank_text=True
+)
+
+
+# One topic of the device TopicSet.
+#   path:        Topic path (e.g., "tns1:RuleEngine/CellMotionDetector/Motion")
+#   is_property: Whether the topic carries property events (IsProperty)
+#   source:      {Name: Type} of the Source SimpleItemDescriptions
+#   data:        {Name: Type} of the Data Simple/ElementItemDescriptions
+#   key:         {Name: Type} of the Key SimpleItemDescriptions
+TopicInfo = namedtuple("TopicInfo", ["path", "is_property", "source", "data", "key"])
+
+
+def _compile_pattern(pattern: str):
+    """Compile a topic pattern into a regex.
+
+    Segments are separated by "/" and support "*" and "?" wildcards within one
+    level; "**" matches any number of levels and a trailing "//."
+    (ConcreteSet syntax) matches the topic and all of its descendants.
+    """
+    if pattern.endswith("//."):
+        base = pattern[:-3]
+        return re.compile(f"{_segments_regex(base)}(?:/.*)?\\Z")
+    return re.compile(f"{_segments_regex(pattern)}\\Z")
+
+
+def _segments_regex(pattern: str) -> str:
+    parts = []
+    for segment in pattern.strip("/").split("/"):
+        if segment == "**":
+            parts.append(".*")
+            continue
+        # Wildcards never cross topic levels
+        parts.append(
+            "".join(
+                "[^/]*" if ch == "*" else "[^/]" if ch == "?" else re.escape(ch)
+                for ch in segment
+            )
+        )
+    return "/".join(parts).replace(".*/", "(?:.*/)?")
+
+
+class _Node:
+    __slots__ = ("path", "info", "children")
+
+    def __init__(self, path):
+        self.path = path
+        self.info = None
+        self.children = []
+
+
+class ONVIFTopicIndex:
+    """Parsed topic tree of a device (Events.GetEventProperties).
+
+    GetEventProperties returns the device TopicSet as a nested XML tree (xsd:any
+    content that zeep leaves unparsed). This index parses it once into a flat
+    path -> TopicInfo map with the message description of every topic, so
+    consumers can look topics up, match wildcards and build server-side
+    subscription filters without re-walking the tree.
+
+    Example:
+        >>> from onvif import ONVIFClient
+        >>> client = ONVIFClient("192.168.1.17", 80, "admin", "admin123")
+        >>> index = client.topic_index()  # Cached per client
+        >>>
+        >>> index["tns1:VideoSource/MotionAlarm"].data
+        {'State': 'xs:boolean'}
+        >>> [t.path for t in index.match("tns1:RuleEngine/**")]
+        ['tns1:RuleEngine/CellMotionDetector/Motion', ...]
+        >>>
+        >>> # Only receive the events that are consumed
+        >>> events = client.events()
+        >>> events.CreatePullPointSubscription(
+        ...     Filter=index.build_filter("tns1:VideoSource/MotionAlarm", "tns1:RuleEngine//.")
+        ... )
+
+    Attributes:
+        topics (dict): {path: TopicInfo} of every topic (wstop:topic="true")
+        namespaces (dict): {prefix: namespace} used in topic paths
+        fixed (bool): FixedTopicSet flag of the device
+        topic_dialects (list): Supported TopicExpressionDialect values
+        content_dialects (list): Supported MessageContentFilterDialect values
+    """
+
+    def __init__(
+        self,
+        topic_set: Optional[etree._Element] = None,
+        fixed: bool = True,
+        topic_dialects: List[str] = None,
+        content_dialects: List[str] = None,
+    ):
+        """Initialize the index from a wstop:TopicSet element.
+
+        Args:
+            topic_set: wstop:TopicSet element (None for an empty index)
+            fixed: FixedTopicSet flag
+            topic_dialects: Supported TopicExpressionDialect values
+            content_dialects: Supported MessageContentFilterDialect values
+        """
+        self.fixed = fixed
+        self.topic_dialects = topic_dialects or []
+        self.content_dialects = content_dialects or []
+        self.topics: Dict[str, TopicInfo] = {}
+        self.namespaces: Dict[str, str] = {}
+        self._roots: List[_Node] = []
+
+        if topic_set is not None:
+            for element in topic_set:
+                if isinstance(element.tag, str):
+                    prefix = self._prefix_for(element)
+                    self._roots.append(
+                        self._walk(
+                            element, f"{prefix}:{etree.QName(element).localname}"
+                        )
+                    )
+
+        logger.debug(f"Topic index built with {len(self.topics)} topics")
+
+    # Construction
+
+    @classmethod
+    def from_xml(cls, payload: Union[bytes, str, etree._Element]) -> "ONVIFTopicIndex":
+        """Build the index from a raw GetEventPropertiesResponse envelope.
+
+        Args:
+            payload: SOAP envelope (bytes/str) or parsed lxml element
+
+        Returns:
+            ONVIFTopicIndex: Parsed index
+        """
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        root = (
+            payload
+            if isinstance(payload, etree._Element)
+            else etree.fromstring(payload, _PARSER)
+        )
+
+        topic_set = next(root.iter(f"{{{WSTOP_NS}}}TopicSet"), None)
+        fixed = root.findtext(f".//{{{WSNT_NS}}}FixedTopicSet")
+        return cls(
+            topic_set,
+            fixed=(fixed or "true").strip().lower() in ("true", "1"),
+            topic_dialects=[
+                (e.text or "").strip()
+                for e in root.iter(f"{{{WSNT_NS}}}TopicExpressionDialect")
+            ],
+            content_dialects=[
+                (e.text or "").strip()
+                for e in root.iter(f"{{{TEV_NS}}}MessageContentFilterDialect")
+            ],
+        )
+
+    @classmethod
+    def from_client(cls, client) -> "ONVIFTopicIndex":
+        """Fetch GetEventProperties from a device and build the index.
+
+        The raw response is parsed directly, since zeep leaves the TopicSet as
+        unparsed xsd:any content.
+
+        Args:
+            client: ONVIFClient instance
+
+        Returns:
+            ONVIFTopicIndex: Parsed index
+        """
+        return cls.from_xml(client.events().operator.call_raw("GetEventProperties"))
+
+    def _prefix_for(self, element) -> str:
+        """Prefix used in topic paths for the namespace of a root topic."""
+        namespace = etree.QName(element).namespace
+        if namespace == ONVIF_TOPICS_NS:
+            prefix = "tns1"
+        else:
+            prefix = element.prefix or f"ns{len(self.namespaces)}"
+        while self.namespaces.get(prefix, namespace) != namespace:
+            prefix = f"{prefix}_"
+        self.namespaces[prefix] = namespace
+        return prefix
+
+    def _walk(self, element, path: str) -> _Node:
+        """Recursively index one topic element."""
+        node = _Node(path)
+
+        description = element.find(_MESSAGE_DESCRIPTION)
+        if element.get(_TOPIC_ATTR, "").lower() == "true" or description is not None:
+            node.info = self._describe(path, description)
+            self.topics[path] = node.info
+
+        for child in element:
+            if not isinstance(child.tag, str) or child.tag == _MESSAGE_DESCRIPTION:
+                continue
+            node.children.append(
+                self._walk(child, f"{path}/{etree.QName(child).localname}")
+            )
+        return node
+
+    @staticmethod
+    def _describe(path: str, description) -> TopicInfo:
+        """Build TopicInfo from a tt:MessageDescription element."""
+        items = {"Source": {}, "Data": {}, "Key": {}}
+        is_property = False
+        if description is not None:
+            is_property = description.get("IsProperty", "").lower() == "true"
+            for part, values in items.items():
+                container = description.find(f"{{{TT_NS}}}{part}")
+                if container is None:
+                    continue
+                for item in container:
+                    if isinstance(item.tag, str) and item.get("Name"):
+                        values[item.get("Name")] = item.get("Type")
+        return TopicInfo(
+            path, is_property, items["Source"], items["Data"], items["Key"]
+        )
+
+    # Lookup
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def __iter__(self) -> Iterator[TopicInfo]:
+        return iter(self.topics.values())
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.topics
+
+    def __getitem__(self, path: str) -> TopicInfo:
+        return self.topics[path]
+
+    def get(self, path: str) -> Optional[TopicInfo]:
+        """Look up a topic by path (None if unknown)."""
+        return self.topics.get(path)
+
+    def match(self, pattern: str) -> List[TopicInfo]:
+        """Topics matching a wildcard pattern.
+
+        Args:
+            pattern: Topic path with wildcards, e.g. "tns1:RuleEngine/*/Motion",
+                "tns1:RuleEngine/**", "tns1:VideoSource//." or "*:Device/**"
+
+        Returns:
+            list: Matching TopicInfo objects, in TopicSet order
+        """
+        regex = _compile_pattern(pattern)
+        return [info for path, info in self.topics.items() if regex.match(path)]
+
+    # Filters
+
+    def topic_expression(self, *patterns: str) -> str:
+        """Compile wanted topics into a ConcreteSet topic expression.
+
+        Patterns are expanded against the index; subtrees whose topics are all
+        wanted collapse into "path//.", and the rest are joined with "|".
+
+        Args:
+            *patterns: Topic paths or wildcard patterns (see match())
+
+        Returns:
+            str: Topic expression, e.g. "tns1:VideoSource/MotionAlarm|tns1:RuleEngine//."
+
+        Raises:
+            ValueError: If a pattern matches no topic of the device
+        """
+        wanted = set()
+        for pattern in patterns:
+            matches = self.match(pattern)
+            if not matches:
+                raise ValueError(f"No topic of the device matches '{pattern}'")
+            wanted.update(info.path for info in matches)
+
+        expressions = []
+        for root in self._roots:
+            self._collapse(root, wanted, expressions)
+        return "|".join(expressions)
+
+    def _collapse(self, node: _Node, wanted: set, out: list) -> None:
+        topics = self._subtree_topics(node)
+        if len(topics) > 1 and topics <= wanted:
+            out.append(f"{node.path}//.")
+            return
+        if node.path in wanted:
+            out.append(node.path)
+        for child in node.children:
+            self._collapse(child, wanted, out)
+
+    def _subtree_topics(self, node: _Node) -> set:
+        result = {node.path} if node.info is not None else set()
+        for child in node.children:
+            result |= self._subtree_topics(child)
+        return result
+
+    def build_filter(self, *patterns: str) -> dict:
+        """Build a subscription Filter for CreatePullPointSubscription/Subscribe.
+
+        Args:
+            *patterns: Topic paths or wildcard patterns (see match())
+
+        Returns:
+            dict: Filter value with a wsnt:TopicExpression (ConcreteSet dialect)
+
+        Raises:
+            ValueError: If a pattern matches no topic of the device
+        """
+        expression = self.topic_expression(*patterns)
+        used = {path.split(":", 1)[0] for path in expression.split("|")}
+        nsmap = {p: ns for p, ns in self.namespaces.items() if p in used}
+        nsmap["wsnt"] = WSNT_NS
+
+        element = etree.Element(
+            f"{{{WSNT_NS}}}TopicExpression",
+            Dialect=CONCRETE_SET_DIALECT,
+            nsmap=nsmap,
+        )
+        element.text = expression
+        return {"_value_1": [element]}
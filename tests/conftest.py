@@ -1,8 +1,15 @@
 # tests/conftest.py
 
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
 import pytest
 from unittest.mock import Mock, patch
 from onvif import ONVIFClient, CacheMode
+from onvif.utils import ONVIFOperationException
 
 
 @pytest.fixture
@@ -123,3 +130,174 @@ def test_client_params():
         "timeout": 5,
         "cache": CacheMode.NONE,
     }
+
+
+SOAP_ENVELOPE = """<?xml version="1.0" encoding="UTF-8"?>
+<env:Envelope xmlns:env="http://www.w3.org/2003/05/soap-envelope"
+              xmlns:ter="http://www.onvif.org/ver10/error"
+              xmlns:tds="http://www.onvif.org/ver10/device/wsdl">
+  <env:Body>{}</env:Body>
+</env:Envelope>"""
+
+DEVICE_INFORMATION_RESPONSE = """<tds:GetDeviceInformationResponse>
+  <tds:Manufacturer>Acme</tds:Manufacturer>
+  <tds:Model>{model}</tds:Model>
+  <tds:FirmwareVersion>1.0</tds:FirmwareVersion>
+  <tds:SerialNumber>{port}</tds:SerialNumber>
+  <tds:HardwareId>1</tds:HardwareId>
+</tds:GetDeviceInformationResponse>"""
+
+SOAP_FAULT = """<env:Fault>
+  <env:Code>
+    <env:Value>env:{code}</env:Value>
+    <env:Subcode><env:Value>ter:{subcode}</env:Value></env:Subcode>
+  </env:Code>
+  <env:Reason><env:Text xml:lang="en">{subcode}</env:Text></env:Reason>
+</env:Fault>"""
+
+
+class CameraHandler(BaseHTTPRequestHandler):
+    """Device service stand-in: accepts the server's username only.
+
+    Usernames in server.basic_auth are rejected with a bare HTTP 401 (as
+    devices behind HTTP authentication do), others with a NotAuthorized fault.
+    Everything but GetDeviceInformation is ActionNotSupported. Requests are
+    recorded in server.requests as (username, operation).
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        username = re.search(r"Username>([^<]*)<", body)
+        username = username.group(1) if username else None
+        operation = re.search(r"Body[^>]*>\s*<(?:\w+:)?(\w+)", body)
+        self.server.requests.append((username, operation and operation.group(1)))
+        time.sleep(self.server.delay)
+
+        if "GetDeviceInformation" not in body:
+            self.reply(
+                500, SOAP_FAULT.format(code="Receiver", subcode="ActionNotSupported")
+            )
+        elif username == self.server.username:
+            port = self.server.server_address[1]
+            self.reply(200, DEVICE_INFORMATION_RESPONSE.format(model="Cam", port=port))
+        elif username in self.server.basic_auth:
+            self.send_response(401)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.reply(400, SOAP_FAULT.format(code="Sender", subcode="NotAuthorized"))
+
+    def reply(self, status, body):
+        payload = SOAP_ENVELOPE.format(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/soap+xml")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def cameras():
+    """Start local device service stand-ins: cameras(username) -> port"""
+    servers = []
+
+    def start(username, delay=0.0, basic_auth=()):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), CameraHandler)
+        server.username = username
+        server.delay = delay
+        server.basic_auth = set(basic_auth)
+        server.requests = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        start.servers[server.server_address[1]] = server
+        return server.server_address[1]
+
+    start.servers = {}
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeService:
+    """Service stand-in: every operation takes the client's delay and is recorded"""
+
+    def __init__(self, client, name):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, operation):
+        def call(**kwargs):
+            client = self._client
+            with client.lock:
+                client.in_flight += 1
+                client.max_in_flight = max(client.max_in_flight, client.in_flight)
+                client.calls.append((time.monotonic(), self._name, operation, kwargs))
+            try:
+                time.sleep(client.delay)
+                result = client.results.get(f"{self._name}.{operation}")
+                if result is None:
+                    raise ONVIFOperationException(operation, Exception("not here"))
+                return result(**kwargs) if callable(result) else result
+            finally:
+                with client.lock:
+                    client.in_flight -= 1
+
+        return call
+
+
+class FakeONVIFClient:
+    """ONVIFClient stand-in serving configurable results.
+
+    results maps "service.Operation" to a result, or to a callable receiving the
+    operation arguments; other operations raise ONVIFOperationException. Calls
+    are recorded in calls as (start, service, operation, kwargs), concurrency in
+    in_flight/max_in_flight and service accessor calls in accessors as (service,
+    thread). namespaces lists the advertised service namespaces (default: no
+    GetServices result, so every service counts as available).
+    """
+
+    def __init__(self, host="10.0.0.1", results=None, delay=0.0, namespaces=None):
+        self.common_args = {"host": host, "port": 80}
+        self.results = dict(results or {})
+        self.delay = delay
+        self.services = (
+            None
+            if namespaces is None
+            else [SimpleNamespace(Namespace=namespace) for namespace in namespaces]
+        )
+        self._service_map = {
+            namespace: f"http://{host}/onvif" for namespace in namespaces or ()
+        }
+        self.capabilities = None
+
+        self.lock = threading.Lock()
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+        self.accessors = []
+
+    def _service(self, name):
+        self.accessors.append((name, threading.current_thread()))
+        return FakeService(self, name)
+
+    def devicemgmt(self):
+        return self._service("devicemgmt")
+
+    def media(self):
+        return self._service("media")
+
+    def imaging(self):
+        return self._service("imaging")
+
+    def ptz(self):
+        return self._service("ptz")
+
+
+@pytest.fixture
+def fake_client():
+    """Fake ONVIFClient factory: fake_client(host, results, delay, namespaces)"""
+    return FakeONVIFClient
@@ -0,0 +1,276 @@
+# tests/helpers.py
+#
+# Local device stand-ins shared by several test modules. Imported explicitly
+# (from helpers import ...); tests/ is on the pytest pythonpath, so this works
+# with any import mode.
+
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from onvif.utils import ONVIFDiscovery
+
+# WS-Discovery
+
+ENVELOPE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://www.w3.org/2003/05/soap-envelope" '
+    'xmlns:wsa="http://schemas.xmlsoap.org/ws/2004/08/addressing" '
+    'xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery" '
+    'xmlns:dn="http://www.onvif.org/ver10/network/wsdl">'
+    "<SOAP-ENV:Header>"
+    "<wsa:Action>http://schemas.xmlsoap.org/ws/2005/04/discovery/{action}</wsa:Action>"
+    "</SOAP-ENV:Header>"
+    "<SOAP-ENV:Body>{body}</SOAP-ENV:Body>"
+    "</SOAP-ENV:Envelope>"
+)
+
+MATCH = (
+    "<d:{element}>"
+    "<wsa:EndpointReference><wsa:Address>urn:uuid:{epr}</wsa:Address></wsa:EndpointReference>"
+    "<d:Types>dn:NetworkVideoTransmitter</d:Types>"
+    "<d:Scopes>onvif://www.onvif.org/name/{name} onvif://www.onvif.org/hardware/PTZ-100</d:Scopes>"
+    "<d:XAddrs>http://{host}:{port}/onvif/device_service</d:XAddrs>"
+    "<d:MetadataVersion>1</d:MetadataVersion>"
+    "</d:{element}>"
+)
+
+
+def probe_match(epr, host="192.168.1.10", port=80, name="Camera"):
+    body = "<d:ProbeMatches>{}</d:ProbeMatches>".format(
+        MATCH.format(element="ProbeMatch", epr=epr, host=host, port=port, name=name)
+    )
+    return ENVELOPE.format(action="ProbeMatches", body=body).encode()
+
+
+def hello(epr, host="192.168.1.10", port=80, name="Camera"):
+    body = MATCH.format(element="Hello", epr=epr, host=host, port=port, name=name)
+    return ENVELOPE.format(action="Hello", body=body).encode()
+
+
+def bye(epr):
+    body = (
+        "<d:Bye><wsa:EndpointReference><wsa:Address>urn:uuid:{}</wsa:Address>"
+        "</wsa:EndpointReference></d:Bye>"
+    ).format(epr)
+    return ENVELOPE.format(action="Bye", body=body).encode()
+
+
+class Responder:
+    """Local WS-Discovery stand-in answering each Probe with scheduled ProbeMatches.
+
+    replies is a list of (delay, payload); payloads are sent to the prober's
+    address after their delay. Like a real device, a retransmitted probe (same
+    MessageID) is answered only once; the first drop probes are "lost".
+    """
+
+    def __init__(self, replies, family=socket.AF_INET, drop=0):
+        self.replies = replies
+        self.drop = drop
+        self.probes = []
+        self._answered = set()
+        self.sock = socket.socket(family, socket.SOCK_DGRAM)
+        self.sock.bind(("::1" if family == socket.AF_INET6 else "127.0.0.1", 0))
+        self.sock.settimeout(0.2)
+        self.port = self.sock.getsockname()[1]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(8192)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.probes.append((time.monotonic(), data, addr))
+            message_id = re.search(rb"MessageID>([^<]+)<", data).group(1)
+            if len(self.probes) <= self.drop or (message_id, addr) in self._answered:
+                continue
+            self._answered.add((message_id, addr))
+            threading.Thread(target=self._reply, args=(addr,), daemon=True).start()
+
+    def _reply(self, addr):
+        start = time.monotonic()
+        for delay, payload in self.replies:
+            time.sleep(max(start + delay - time.monotonic(), 0))
+            try:
+                self.sock.sendto(payload, addr)
+            except OSError:
+                return
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(1)
+        self.sock.close()
+
+
+def local_discovery(responder, timeout=1.0, **kwargs):
+    discovery = ONVIFDiscovery(timeout=timeout, interface="127.0.0.1", **kwargs)
+    discovery.WS_DISCOVERY_ADDRESS_IPv4 = "127.0.0.1"
+    discovery.WS_DISCOVERY_PORT = responder.port
+    return discovery
+
+
+# Device service (GetSystemDateAndTime)
+
+DATE_AND_TIME_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<env:Envelope xmlns:env="http://www.w3.org/2003/05/soap-envelope"
+              xmlns:tds="http://www.onvif.org/ver10/device/wsdl"
+              xmlns:tt="http://www.onvif.org/ver10/schema">
+  <env:Body>
+    <tds:GetSystemDateAndTimeResponse>
+      <tds:SystemDateAndTime>
+        <tt:DateTimeType>NTP</tt:DateTimeType>
+        <tt:UTCDateTime>
+          <tt:Time><tt:Hour>8</tt:Hour><tt:Minute>30</tt:Minute><tt:Second>5</tt:Second></tt:Time>
+          <tt:Date><tt:Year>2025</tt:Year><tt:Month>3</tt:Month><tt:Day>14</tt:Day></tt:Date>
+        </tt:UTCDateTime>
+      </tds:SystemDateAndTime>
+    </tds:GetSystemDateAndTimeResponse>
+  </env:Body>
+</env:Envelope>"""
+
+
+class DeviceServiceHandler(BaseHTTPRequestHandler):
+    """Answers GetSystemDateAndTime on the server's device_path"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == self.server.device_path and b"GetSystemDateAndTime" in body:
+            status, payload = 200, DATE_AND_TIME_RESPONSE
+        else:
+            status, payload = 404, b"Not found"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/soap+xml")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(device_path="/onvif/device_service"):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DeviceServiceHandler)
+    server.device_path = device_path
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def closed_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+# PullPoint events
+
+
+def subscription_times(lifetime=60):
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return now, now + timedelta(seconds=lifetime)
+
+
+def subscription_response(address="http://cam/onvif/Subscription?Idx=1"):
+    current, termination = subscription_times()
+    return {
+        "SubscriptionReference": {"Address": {"_value_1": address}},
+        "CurrentTime": current,
+        "TerminationTime": termination,
+    }
+
+
+class FakeDevice:
+    """Minimal ONVIFClient stand-in serving a PullPoint subscription"""
+
+    def __init__(self, batches=None):
+        self.common_args = {"host": "cam", "port": 80}
+        self.batches = list(batches or [])
+        self.events_service = Mock()
+        self.events_service.CreatePullPointSubscription.side_effect = (
+            lambda **kwargs: SimpleNamespace(**subscription_response())
+        )
+        self.pullpoint_service = Mock()
+        self.pullpoint_service.PullMessages.side_effect = self._pull
+        self.manager = Mock()
+        self.manager.Renew.side_effect = lambda **kwargs: SimpleNamespace(
+            CurrentTime=subscription_times()[0], TerminationTime=subscription_times()[1]
+        )
+
+    def _pull(self, **kwargs):
+        if self.batches:
+            batch = self.batches.pop(0)
+            if isinstance(batch, Exception):
+                raise batch
+        else:
+            time.sleep(0.01)
+            batch = []
+        current, termination = subscription_times()
+        return SimpleNamespace(
+            CurrentTime=current, TerminationTime=termination, NotificationMessage=batch
+        )
+
+    def events(self):
+        return self.events_service
+
+    def pullpoint(self, ref):
+        return self.pullpoint_service
+
+    def subscription(self, ref):
+        return self.manager
+
+
+# Push notifications (wsnt:Notify)
+
+NOTIFY_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope"
+            xmlns:wsa="http://www.w3.org/2005/08/addressing"
+            xmlns:wsnt="http://docs.oasis-open.org/wsn/b-2"
+            xmlns:tns1="http://www.onvif.org/ver10/topics"
+            xmlns:tt="http://www.onvif.org/ver10/schema">
+  <s:Header>
+    <wsa:Action>http://docs.oasis-open.org/wsn/bw-2/NotificationConsumer/Notify</wsa:Action>
+  </s:Header>
+  <s:Body>
+    <wsnt:Notify>{messages}</wsnt:Notify>
+  </s:Body>
+</s:Envelope>"""
+
+MESSAGE_TEMPLATE = """
+      <wsnt:NotificationMessage>
+        <wsnt:SubscriptionReference>
+          <wsa:Address>{reference}</wsa:Address>
+        </wsnt:SubscriptionReference>
+        <wsnt:Topic Dialect="http://www.onvif.org/ver10/tev/topicExpression/ConcreteSet">{topic}</wsnt:Topic>
+        <wsnt:Message>
+          <tt:Message UtcTime="2025-01-01T12:00:00Z" PropertyOperation="Changed">
+            <tt:Source>
+              <tt:SimpleItem Name="VideoSourceConfigurationToken" Value="VideoSource_1"/>
+              <tt:SimpleItem Name="Rule" Value="MyMotionDetectorRule"/>
+            </tt:Source>
+            <tt:Data>
+              <tt:SimpleItem Name="IsMotion" Value="{value}"/>
+            </tt:Data>
+          </tt:Message>
+        </wsnt:Message>
+      </wsnt:NotificationMessage>"""
+
+
+def notify_body(*messages):
+    """Build a wsnt:Notify envelope from (reference, topic, value) tuples"""
+    return NOTIFY_TEMPLATE.format(
+        messages="".join(
+            MESSAGE_TEMPLATE.format(reference=r, topic=t, value=v)
+            for r, t, v in messages
+        )
+    ).encode()
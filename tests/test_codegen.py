@@ -0,0 +1,165 @@
+# tests/test_codegen.py
+
+import inspect
+from unittest.mock import Mock
+
+import pytest
+
+from onvif.operator import ONVIFOperator, CacheMode
+from onvif.services import Imaging, PullPoint
+from onvif.utils import ONVIFWSDL, ONVIFOperationException
+from onvif.utils.codegen import (
+    ONVIFCodeGenerator,
+    format_documentation,
+    get_operation_metadata,
+    load_metadata,
+)
+from lxml import etree
+
+IMAGING_BINDING = "{http://www.onvif.org/ver20/imaging/wsdl}ImagingBinding"
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return ONVIFCodeGenerator()
+
+
+class TestCodeGenerator:
+    """Test WSDL-driven code generation"""
+
+    def test_parse_binding_signatures(self, generator):
+        """Parsed operations expose parameter names, types and docs"""
+        ops = generator.parse_binding("imaging", "ver20")
+
+        params = {p["name"]: p for p in ops["SetImagingSettings"]["params"]}
+        assert list(params) == [
+            "VideoSourceToken",
+            "ImagingSettings",
+            "ForcePersistence",
+        ]
+        assert params["VideoSourceToken"]["annotation"] == "str"
+        assert params["VideoSourceToken"]["required"] is True
+        assert params["ForcePersistence"]["annotation"] == "bool"
+        assert params["ForcePersistence"]["required"] is False
+        assert ops["GetImagingSettings"]["doc"]
+
+    def test_documentation_from_imported_port_type(self, generator):
+        """Docs are read from the WSDL that defines the portType"""
+        ops = generator.parse_binding("pullpoint")
+        assert "PullPoint" in ops["PullMessages"]["doc"]
+
+    def test_render_service_matches_handwritten(self, generator):
+        """Generated class exposes the same operations and parameters"""
+        source = generator.render_service(
+            "imaging", "ver20", class_name="Imaging", service_path="Imaging"
+        )
+        namespace = {
+            "__name__": "onvif.services.imaging",
+            "__package__": "onvif.services",
+        }
+        exec(compile(source, "onvif/services/imaging.py", "exec"), namespace)
+        generated = namespace["Imaging"]
+
+        for name, method in inspect.getmembers(Imaging, inspect.isfunction):
+            if name.startswith("_") or not name[0].isupper():
+                continue
+            expected = set(inspect.signature(method).parameters)
+            actual = set(inspect.signature(getattr(generated, name)).parameters)
+            assert expected == actual, name
+
+        sig = inspect.signature(generated.SetImagingSettings)
+        assert sig.parameters["ForcePersistence"].default is None
+        assert generated.GetImagingSettings.__doc__
+
+    def test_render_nested_module_imports(self, generator):
+        """Relative imports follow the module depth"""
+        source = generator.render_service(
+            "pullpoint",
+            class_name="PullPoint",
+            module_path="services/events/pullpoint.py",
+        )
+        assert "from ...operator import ONVIFOperator" in source
+        compile(source, "pullpoint.py", "exec")
+
+
+class TestMetadata:
+    """Test prebuilt operation metadata"""
+
+    def test_bundled_metadata_in_sync(self, generator):
+        """Bundled metadata matches the WSDL (regenerate with codegen metadata)"""
+        bundled = load_metadata()[IMAGING_BINDING]["operations"]
+        parsed = generator.parse_binding("imaging", "ver20")
+        assert bundled == {name: {"doc": op["doc"]} for name, op in parsed.items()}
+
+    def test_bundled_metadata_covers_all_services(self):
+        """Every WSDL_MAP binding has metadata"""
+        ONVIFWSDL._ensure_wsdl_map_initialized()
+        metadata = load_metadata()
+        for versions in ONVIFWSDL.WSDL_MAP.values():
+            for definition in versions.values():
+                qname = f"{{{definition['namespace']}}}{definition['binding']}"
+                assert qname in metadata
+
+    def test_get_operation_metadata(self):
+        """Lookup checks the WSDL path the metadata was built from"""
+        path = ONVIFWSDL.get_definition("imaging", "ver20")["path"]
+        assert get_operation_metadata(IMAGING_BINDING, "GetOptions", path)
+        assert get_operation_metadata(IMAGING_BINDING, "GetOptions", "/x.wsdl") is None
+        assert get_operation_metadata("{urn:unknown}Binding", "GetOptions") is None
+
+    def test_format_documentation(self):
+        """Lists and line breaks are preserved"""
+        doc = etree.fromstring(
+            "<documentation>First line.<br/>Second:<ul><li>one</li>"
+            "<li>two</li></ul>end</documentation>"
+        )
+        assert format_documentation(doc) == (
+            "First line.\n\nSecond:\n\n- one\n- two\n\nend"
+        )
+        assert format_documentation(None) is None
+
+
+class TestPrecomputedOperations:
+    """Test ONVIFOperator operation handle precomputation"""
+
+    def _operator(self):
+        definition = ONVIFWSDL.get_definition("pullpoint")
+        return ONVIFOperator(
+            definition["path"],
+            host="127.0.0.1",
+            port=80,
+            binding=f"{{{definition['namespace']}}}{definition['binding']}",
+            xaddr="http://127.0.0.1/onvif/Events",
+            cache=CacheMode.NONE,
+            apply_patch=False,
+        )
+
+    def test_handles_bound_at_init(self):
+        operator = self._operator()
+        assert set(operator._operations) == {
+            "PullMessages",
+            "Seek",
+            "SetSynchronizationPoint",
+            "Unsubscribe",
+        }
+        assert operator.binding.endswith("PullPointSubscriptionBinding")
+
+    def test_call_uses_handle(self):
+        operator = self._operator()
+        handle = Mock(return_value="ok")
+        operator._operations["Unsubscribe"] = handle
+
+        assert operator.call("Unsubscribe") == "ok"
+        handle.assert_called_once_with()
+
+    def test_unknown_operation(self):
+        operator = self._operator()
+        with pytest.raises(ONVIFOperationException):
+            operator.call("DoesNotExist")
+
+    def test_service_desc_uses_metadata(self):
+        pullpoint = PullPoint.__new__(PullPoint)
+        pullpoint.operator = self._operator()
+        info = pullpoint.desc("PullMessages")
+        assert info["required"] == ["Timeout", "MessageLimit"]
+        assert "PullPoint" in info["doc"]
@@ -376,3 +376,123 @@ class TestErrorHandlingInCore:
 
             result = plugin.ingress(mock_envelope, {}, mock_operation)
             assert result == (mock_envelope, {})
+
+
+class TestTypeFactoryCache:
+    """Test memoized create_type() in ONVIFOperator"""
+
+    @staticmethod
+    def _operator():
+        from onvif.operator import ONVIFOperator
+
+        definition = ONVIFWSDL.get_definition("devicemgmt")
+        return ONVIFOperator(
+            definition["path"],
+            host="127.0.0.1",
+            port=80,
+            binding=f"{{{definition['namespace']}}}{definition['binding']}",
+            cache=CacheMode.NONE,
+        )
+
+    def test_nested_types_initialized(self):
+        """Nested complex types are instantiated, simple fields stay None"""
+        operator = self._operator()
+        params = operator.create_type("SetSystemDateAndTime")
+
+        assert params.TimeZone is not None
+        assert params.UTCDateTime.Date is not None
+        assert params.UTCDateTime.Time.Hour is None
+
+    def test_cached_instances_are_independent(self):
+        """Cached factories return fresh instances on every call"""
+        operator = self._operator()
+        first = operator.create_type("SetSystemDateAndTime")
+        first.TimeZone.TZ = "UTC+02:00"
+
+        second = operator.create_type("SetSystemDateAndTime")
+        assert second.TimeZone.TZ is None
+        assert second.TimeZone is not first.TimeZone
+
+    def test_lookup_memoized(self):
+        """Namespace resolution runs only once per type name"""
+        operator = self._operator()
+        operator.create_type("SetHostname")
+
+        with patch.object(operator.client, "get_element") as get_element:
+            with patch.object(operator.client, "get_type") as get_type:
+                operator.create_type("SetHostname")
+                get_element.assert_not_called()
+                get_type.assert_not_called()
+
+    def test_missing_type_memoized(self):
+        """Unknown types raise AttributeError without repeating lookups"""
+        operator = self._operator()
+        with pytest.raises(AttributeError):
+            operator.create_type("DoesNotExist")
+
+        with patch.object(operator.client, "get_element") as get_element:
+            with pytest.raises(AttributeError):
+                operator.create_type("DoesNotExist")
+            get_element.assert_not_called()
+
+    def test_lookups_shared_between_operators(self):
+        """Operators of one WSDL share resolved type names, each compiling its own Document"""
+        first = self._operator()
+        second = self._operator()
+        assert second.client.wsdl is not first.client.wsdl
+        assert second._get_type_names() is first._get_type_names()
+
+        first.create_type("SetHostname")
+        with patch.object(
+            second.client, "get_element", wraps=second.client.get_element
+        ) as get_element:
+            with patch.object(second.client, "get_type") as get_type:
+                second.create_type("SetHostname")
+                # One lookup of the already-resolved name, no namespace probing
+                get_element.assert_called_once_with("ns0:SetHostname")
+                get_type.assert_not_called()
+
+    def test_factories_bound_to_own_document(self):
+        """Instances are built from the operator's own Document (no xsi:type on the wire)"""
+        first = self._operator()
+        second = self._operator()
+        first.create_type("SetSystemDateAndTime")
+        params = second.create_type("SetSystemDateAndTime")
+        element = second.client.get_element("ns0:SetSystemDateAndTime")
+        assert params.TimeZone._xsd_type is dict(element.type.elements)["TimeZone"].type
+
+
+class TestSharedDocument:
+    """Test process-wide sharing of compiled WSDL documents"""
+
+    @staticmethod
+    def _operator():
+        from onvif.operator import ONVIFOperator
+
+        definition = ONVIFWSDL.get_definition("devicemgmt")
+        return ONVIFOperator(
+            definition["path"],
+            host="127.0.0.1",
+            port=80,
+            binding=f"{{{definition['namespace']}}}{definition['binding']}",
+            cache=CacheMode.NONE,
+            share_wsdl=True,
+        )
+
+    def test_shared_while_in_use_then_released(self):
+        import gc
+
+        from onvif.operator import _DOCUMENT_CACHE
+
+        first = self._operator()
+        second = self._operator()
+        document = first.client.wsdl
+        path = first.wsdl_path
+
+        assert second.client.wsdl is document
+        # The document doesn't hold on to the first operator's session
+        assert document.transport.session is not first.client.transport.session
+
+        del first, second, document
+        gc.collect()
+        assert path not in _DOCUMENT_CACHE
@@ -0,0 +1,336 @@
+# tests/test_discovery.py
+
+import asyncio
+import os
+import re
+import socket
+import time
+
+import pytest
+from lxml import etree
+
+import onvif.utils.discovery as discovery_module
+from onvif.utils import ONVIFDiscovery, ONVIFDiscoveryListener
+from helpers import Responder, bye, hello, local_discovery, probe_match
+
+
+@pytest.fixture
+def responder():
+    responder = Responder(
+        [
+            (0.0, probe_match("cam-1", "192.168.1.10")),
+            (0.05, probe_match("cam-1", "192.168.1.10")),  # Duplicate
+            (0.1, b"not xml"),
+            (0.3, probe_match("cam-2", "192.168.1.11", 8080, name="PTZ")),
+        ]
+    )
+    yield responder
+    responder.close()
+
+
+class TestDiscoveryStreaming:
+    """Test streaming WS-Discovery"""
+
+    def test_discover(self, responder):
+        devices = local_discovery(responder, timeout=0.6).discover()
+
+        assert [d["epr"] for d in devices] == ["urn:uuid:cam-1", "urn:uuid:cam-2"]
+        assert devices[1]["host"] == "192.168.1.11"
+        assert devices[1]["port"] == 8080
+        assert devices[1]["types"] == ["dn:NetworkVideoTransmitter"]
+
+    def test_iter_discover_yields_early(self, responder):
+        start = time.monotonic()
+        generator = local_discovery(responder, timeout=5).iter_discover()
+        first = next(generator)
+        generator.close()
+
+        assert first["host"] == "192.168.1.10"
+        assert time.monotonic() - start < 1
+
+    def test_search_filter(self, responder):
+        devices = local_discovery(responder, timeout=0.6).discover(search="ptz")
+        # "PTZ-100" hardware scope is on both; the name scope only on cam-2
+        assert len(devices) == 2
+        devices = local_discovery(responder, timeout=0.6).discover(search="name/PTZ")
+        assert [d["epr"] for d in devices] == ["urn:uuid:cam-2"]
+
+    def test_aiter_discover(self, responder):
+        async def collect():
+            discovery = local_discovery(responder, timeout=0.6)
+            return [device["epr"] async for device in discovery.aiter_discover()]
+
+        assert asyncio.run(collect()) == ["urn:uuid:cam-1", "urn:uuid:cam-2"]
+
+
+class TestDiscoveryListener:
+    """Test Hello/Bye tracking"""
+
+    def test_hello_and_bye(self):
+        joined, left = [], []
+        listener = ONVIFDiscoveryListener(
+            on_hello=joined.append, on_bye=left.append, seed=False
+        )
+
+        assert listener._handle(hello("cam-1"), ("192.168.1.10", 3702)) == "hello"
+        assert listener._handle(probe_match("cam-2"), ("192.168.1.11", 3702)) == (
+            "match"
+        )
+        assert set(listener.devices) == {"urn:uuid:cam-1", "urn:uuid:cam-2"}
+        assert joined[0]["host"] == "192.168.1.10"
+        assert joined[0]["last_seen"] > 0
+
+        assert listener._handle(bye("cam-1"), ("192.168.1.10", 3702)) == "bye"
+        assert set(listener.devices) == {"urn:uuid:cam-2"}
+        assert left[0]["host"] == "192.168.1.10"
+
+    def test_listens_on_socket(self):
+        joined = []
+        with ONVIFDiscoveryListener(
+            interface="127.0.0.1", on_hello=joined.append, seed=False, port=0
+        ) as listener:
+            sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sender.sendto(hello("cam-9", "10.0.0.9"), ("127.0.0.1", listener.port))
+            sender.close()
+
+            deadline = time.monotonic() + 2
+            while not joined and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert joined[0]["host"] == "10.0.0.9"
+        assert "urn:uuid:cam-9" in listener.devices
+
+
+class TestMultiInterfaceDiscovery:
+    """Test concurrent probing across interfaces and IPv6"""
+
+    def test_interfaces_probed_concurrently(self, responder):
+        discovery = local_discovery(responder, timeout=0.6)
+        discovery.interfaces = ["127.0.0.1", "127.0.0.2"]
+
+        start = time.monotonic()
+        devices = discovery.discover()
+        elapsed = time.monotonic() - start
+
+        # One probe per interface, results merged by EPR, one timeout in total
+        assert sorted({probe[2][0] for probe in responder.probes}) == [
+            "127.0.0.1",
+            "127.0.0.2",
+        ]
+        assert [d["epr"] for d in devices] == ["urn:uuid:cam-1", "urn:uuid:cam-2"]
+        assert elapsed < 0.9
+
+    def test_interface_selection(self, monkeypatch):
+        monkeypatch.setattr(
+            ONVIFDiscovery,
+            "list_interfaces",
+            staticmethod(
+                lambda: [
+                    {"name": "eth0", "index": 2, "ipv4": "192.168.1.2"},
+                    {"name": "vlan20", "index": 3, "ipv4": "10.20.0.2"},
+                    {"name": "wg0", "index": 4, "ipv4": None},
+                ]
+            ),
+        )
+
+        targets = ONVIFDiscovery(interfaces=["vlan20", "172.16.0.2", "nope"])
+        assert [t[:2] for t in targets._probe_targets()] == [
+            ("vlan20", "10.20.0.2"),
+            ("172.16.0.2", "172.16.0.2"),
+        ]
+
+        targets = ONVIFDiscovery(interfaces="all", ipv6=True)._probe_targets()
+        assert [t[0] for t in targets] == [
+            "eth0",
+            "eth0 (IPv6)",
+            "vlan20",
+            "vlan20 (IPv6)",
+            "wg0 (IPv6)",
+        ]
+        assert targets[1][2] == ("ff02::c", 3702, 0, 2)
+
+    def test_all_interfaces_without_ipv4_falls_back(self, monkeypatch, caplog):
+        # As on Windows/macOS, where interface addresses can't be read
+        monkeypatch.setattr(discovery_module, "_interface_ipv4", lambda name: None)
+        monkeypatch.setattr(
+            discovery_module.socket,
+            "if_nameindex",
+            lambda: [(1, "lo"), (2, "eth0")],
+            raising=False,
+        )
+        monkeypatch.setattr(
+            ONVIFDiscovery, "_get_local_ip", lambda self: "192.168.1.50"
+        )
+
+        with caplog.at_level("WARNING", logger="onvif.utils.discovery"):
+            targets = ONVIFDiscovery(interfaces="all", ipv6=True)._probe_targets()
+        assert [t[:2] for t in targets] == [
+            ("default", "192.168.1.50"),
+            ("eth0 (IPv6)", 2),
+        ]
+        assert "No IPv4 address found" in caplog.text
+
+    def test_ipv6_probe(self, monkeypatch):
+        if not socket.has_ipv6:
+            pytest.skip("IPv6 not available")
+        try:
+            responder = Responder(
+                [(0.0, probe_match("cam-6", "[fe80::1]", 8080))],
+                family=socket.AF_INET6,
+            )
+        except OSError:
+            pytest.skip("IPv6 loopback not available")
+
+        index = socket.if_nametoindex("lo")
+        monkeypatch.setattr(
+            ONVIFDiscovery,
+            "list_interfaces",
+            staticmethod(lambda: [{"name": "lo", "index": index, "ipv4": None}]),
+        )
+        discovery = ONVIFDiscovery(timeout=0.5, interfaces=["lo"], ipv6=True)
+        discovery.WS_DISCOVERY_ADDRESS_IPv6 = "::1"
+        discovery.WS_DISCOVERY_PORT = responder.port
+        try:
+            devices = discovery.discover()
+        finally:
+            responder.close()
+
+        assert devices[0]["host"] == "fe80::1"
+        assert devices[0]["port"] == 8080
+
+
+class TestProbeRetransmission:
+    """Test probe repeats and early termination"""
+
+    def test_lost_probe_is_retransmitted(self):
+        responder = Responder([(0.0, probe_match("cam-1"))], drop=1)
+        try:
+            single = local_discovery(responder, timeout=0.8, repeat=0).discover()
+            responder.probes.clear()
+            repeated = local_discovery(responder, timeout=0.8).discover()
+        finally:
+            responder.close()
+
+        assert single == []
+        assert [d["epr"] for d in repeated] == ["urn:uuid:cam-1"]
+
+        # Repeats keep the MessageID and back off with jitter
+        times = [probe[0] for probe in responder.probes]
+        message_ids = {
+            re.search(rb"MessageID>([^<]+)<", p[1]).group(1) for p in responder.probes
+        }
+        assert len(times) == 3
+        assert len(message_ids) == 1
+        assert 0.04 <= times[1] - times[0] <= 0.3
+        assert times[2] - times[1] >= times[1] - times[0] - 0.01
+
+    def test_expected_count(self, responder):
+        start = time.monotonic()
+        devices = local_discovery(responder, timeout=5).discover(expected=2)
+        elapsed = time.monotonic() - start
+
+        assert len(devices) == 2
+        assert elapsed < 1
+
+    def test_expected_eprs(self, responder):
+        start = time.monotonic()
+        devices = local_discovery(responder, timeout=5).discover(
+            expected=["urn:uuid:cam-1"]
+        )
+
+        assert [d["epr"] for d in devices] == ["urn:uuid:cam-1"]
+        assert time.monotonic() - start < 0.3
+
+    def test_quiet_interval(self, responder):
+        start = time.monotonic()
+        devices = local_discovery(responder, timeout=5).discover(quiet=0.5)
+        elapsed = time.monotonic() - start
+
+        # Last device at 0.3s, last repeat by ~0.75s, then half a second of quiet
+        assert len(devices) == 2
+        assert 0.8 <= elapsed < 1.6
+
+    def test_aiter_early_exit(self, responder):
+        async def collect():
+            discovery = local_discovery(responder, timeout=5)
+            return [d async for d in discovery.aiter_discover(expected=1)]
+
+        start = time.monotonic()
+        assert len(asyncio.run(collect())) == 1
+        assert time.monotonic() - start < 0.5
+
+
+def _reference_parse(xml_data):
+    """Per-packet parsing as previously done: fresh parser, str round trip, .// finds"""
+    namespaces = ONVIFDiscovery.NAMESPACES
+    parser = etree.XMLParser(
+        resolve_entities=False, no_network=True, remove_blank_text=True
+    )
+    root = etree.fromstring(xml_data.decode("utf-8").encode("utf-8"), parser)
+    match = root.find(".//d:ProbeMatch", namespaces)
+    if match is None:
+        match = root.find(".//wsd:ProbeMatch", namespaces)
+    device = {}
+    for key, path in (
+        ("epr", ".//wsa:EndpointReference/wsa:Address"),
+        ("types", ".//d:Types"),
+        ("scopes", ".//d:Scopes"),
+        ("xaddrs", ".//d:XAddrs"),
+    ):
+        element = match.find(path, namespaces)
+        if element is None:
+            element = match.find(path.replace("d:", "wsd:"), namespaces)
+        device[key] = element.text.split() if element is not None else []
+    parts = device["xaddrs"][0].split("://")[1].split("/")[0]
+    device["host"], device["port"] = parts.split(":")[0], int(parts.split(":")[1])
+    return device
+
+
+class TestDiscoveryParsingBenchmark:
+    """Parse 10k recorded ProbeMatch payloads"""
+
+    PAYLOADS = [
+        probe_match(f"cam-{i}", f"10.{i // 65536}.{i // 256 % 256}.{i % 256}")
+        for i in range(10000)
+    ]
+
+    def test_parse_10k(self):
+        discovery = ONVIFDiscovery()
+        devices = [discovery._parse_single_response(p) for p in self.PAYLOADS]
+
+        reference = _reference_parse(self.PAYLOADS[9999])
+        for key in ("types", "scopes", "xaddrs", "host", "port"):
+            assert devices[9999][key] == reference[key]
+        assert devices[9999]["host"] == "10.0.39.15"
+        assert devices[9999]["epr"] == "urn:uuid:cam-9999"
+        assert not discovery._search_index  # Built on the first search only
+
+    @pytest.mark.skipif(
+        not os.environ.get("ONVIF_BENCHMARK"),
+        reason="timing benchmark, set ONVIF_BENCHMARK=1 to run",
+    )
+    def test_parse_10k_faster_than_reference(self):
+        discovery = ONVIFDiscovery()
+
+        start = time.perf_counter()
+        for payload in self.PAYLOADS:
+            _reference_parse(payload)
+        reference = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for payload in self.PAYLOADS:
+            discovery._parse_single_response(payload)
+        parsed = time.perf_counter() - start
+
+        assert parsed < reference
+
+    def test_search_10k(self):
+        discovery = ONVIFDiscovery()
+        devices = [discovery._parse_single_response(p) for p in self.PAYLOADS]
+
+        for _ in range(10):
+            assert len(discovery._filter_devices(devices, "PTZ-100")) == 10000
+            assert discovery._filter_devices(devices, "name/none") == []
+
+        # A search term never matches across two scopes
+        assert discovery._filter_devices(devices[:1], "camera\nonvif") == []
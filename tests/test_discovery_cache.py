@@ -0,0 +1,182 @@
+# tests/test_discovery_cache.py
+
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from onvif.utils import ONVIFDiscoveryCache, ONVIFScanner
+from helpers import (
+    DeviceServiceHandler,
+    Responder,
+    closed_port,
+    local_discovery,
+    probe_match,
+)
+
+
+def _device(epr, host="192.168.1.10", port=80):
+    return {
+        "epr": f"urn:uuid:{epr}",
+        "host": host,
+        "port": port,
+        "use_https": False,
+        "xaddrs": [f"http://{host}:{port}/onvif/device_service"],
+        "scopes": ["onvif://www.onvif.org/name/Camera"],
+        "types": ["dn:NetworkVideoTransmitter"],
+    }
+
+
+@pytest.fixture
+def device_on_127_0_0_2():
+    server = ThreadingHTTPServer(("127.0.0.2", 0), DeviceServiceHandler)
+    server.device_path = "/onvif/device_service"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+class TestDiscoveryCacheUpdate:
+    """Test merging and diffs"""
+
+    def test_new_changed_gone(self):
+        cache = ONVIFDiscoveryCache()
+        diff = cache.update([_device("a"), _device("b", "192.168.1.11")], now=100)
+        assert [d["epr"] for d in diff.new] == ["urn:uuid:a", "urn:uuid:b"]
+        assert diff.gone == [] and diff.changed == []
+
+        diff = cache.update(
+            [_device("a", port=8080), _device("b", "192.168.1.11")],
+            gone=["urn:uuid:x"],
+            now=200,
+        )
+        assert diff.new == [] and diff.gone == []
+        [(before, after)] = diff.changed
+        assert before["port"] == 80 and after["port"] == 8080
+        assert cache.entries["urn:uuid:a"]["first_seen"] == 100
+        assert cache.entries["urn:uuid:a"]["last_seen"] == 200
+
+        diff = cache.update([], gone=["urn:uuid:b"])
+        assert [d["epr"] for d in diff.gone] == ["urn:uuid:b"]
+        assert "urn:uuid:b" not in cache
+
+    def test_hello_without_xaddrs_keeps_address(self):
+        cache = ONVIFDiscoveryCache()
+        cache.update([_device("a")])
+        diff = cache.update([{"epr": "urn:uuid:a", "host": None, "xaddrs": []}])
+        assert diff.changed == []
+        assert cache.entries["urn:uuid:a"]["host"] == "192.168.1.10"
+
+    def test_stale(self):
+        cache = ONVIFDiscoveryCache(ttl=60)
+        cache.update([_device("old")], now=time.time() - 120)
+        cache.update([_device("fresh")])
+        assert [e["epr"] for e in cache.stale()] == ["urn:uuid:old"]
+        assert len(cache.devices(max_age=60)) == 1
+
+    def test_persistence(self, tmp_path):
+        path = str(tmp_path / "cache" / "discovery.json")
+        cache = ONVIFDiscoveryCache(path)
+        cache.update([_device("a")])
+        cache.last_sweep = 1234.0
+        cache.save()
+
+        loaded = ONVIFDiscoveryCache(path)
+        assert loaded.entries == cache.entries
+        assert loaded.last_sweep == 1234.0
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        path = tmp_path / "discovery.json"
+        path.write_text("{not json")
+        assert len(ONVIFDiscoveryCache(str(path))) == 0
+
+
+class TestDiscoveryCacheRefresh:
+    """Test sweeps and incremental revalidation against local stand-ins"""
+
+    def test_sweep_then_nothing_to_do(self):
+        responder = Responder([(0.0, probe_match("cam-1"))])
+        try:
+            discovery = local_discovery(responder, timeout=0.3, repeat=0)
+            cache = ONVIFDiscoveryCache(discovery=discovery, ttl=60)
+
+            diff = cache.refresh()
+            assert [d["epr"] for d in diff.new] == ["urn:uuid:cam-1"]
+            probes = len(responder.probes)
+
+            # Nothing is stale and the sweep interval hasn't passed: no traffic
+            start = time.monotonic()
+            diff = cache.refresh()
+            assert diff == ([], [], [])
+            assert len(responder.probes) == probes
+            assert time.monotonic() - start < 0.1
+        finally:
+            responder.close()
+
+    def test_revalidates_only_stale_entries(self, monkeypatch, device_on_127_0_0_2):
+        # cam-1 answers a directed probe with a new XAddr, cam-2 ignores probes
+        # but its device service answers, cam-3 is gone, cam-4 is fresh
+        responder = Responder([(0.0, probe_match("cam-1", "127.0.0.1", 8081))])
+        monkeypatch.setattr(ONVIFScanner, "WS_DISCOVERY_PORT", responder.port)
+
+        cache = ONVIFDiscoveryCache(ttl=60, timeout=0.5)
+        cache.last_sweep = time.time()
+        old = time.time() - 120
+        cache.update([_device("cam-1", "127.0.0.1", 80)], now=old)
+        cache.update([_device("cam-2", "127.0.0.2", device_on_127_0_0_2)], now=old)
+        cache.update([_device("cam-3", "127.0.0.3", closed_port())], now=old)
+        cache.update([_device("cam-4", "127.0.0.4")])
+        try:
+            diff = cache.refresh()
+        finally:
+            responder.close()
+
+        assert [(b["port"], a["port"]) for b, a in diff.changed] == [(80, 8081)]
+        assert [d["epr"] for d in diff.gone] == ["urn:uuid:cam-3"]
+        assert diff.new == []
+        assert sorted(cache.entries) == [
+            "urn:uuid:cam-1",
+            "urn:uuid:cam-2",
+            "urn:uuid:cam-4",
+        ]
+        assert cache.stale() == []
+        # Only stale hosts were probed
+        assert {probe[2][0] for probe in responder.probes} == {"127.0.0.1"}
+
+    def test_replaced_device_is_gone(self, monkeypatch):
+        responder = Responder([(0.0, probe_match("new-cam", "127.0.0.1"))])
+        monkeypatch.setattr(ONVIFScanner, "WS_DISCOVERY_PORT", responder.port)
+
+        cache = ONVIFDiscoveryCache(ttl=60, timeout=0.5)
+        cache.last_sweep = time.time()
+        cache.update([_device("old-cam", "127.0.0.1")], now=time.time() - 120)
+        try:
+            diff = cache.refresh()
+        finally:
+            responder.close()
+
+        assert [d["epr"] for d in diff.new] == ["urn:uuid:new-cam"]
+        assert [d["epr"] for d in diff.gone] == ["urn:uuid:old-cam"]
+
+    def test_responders_without_epr_are_kept_apart(self, monkeypatch):
+        # Two services on one host answer without an EPR: keyed by XAddr
+        devices = [_device("a", "127.0.0.1", 80), _device("b", "127.0.0.1", 8080)]
+        for device in devices:
+            device["epr"] = None
+        monkeypatch.setattr(
+            ONVIFScanner, "probe_hosts", lambda self, hosts: [dict(d) for d in devices]
+        )
+
+        cache = ONVIFDiscoveryCache(ttl=60, timeout=0.5)
+        cache.last_sweep = time.time()
+        cache.update(devices, now=time.time() - 120)
+        diff = cache.refresh()
+
+        assert diff == ([], [], [])
+        assert sorted(cache.entries) == [
+            "http://127.0.0.1:80/onvif/device_service",
+            "http://127.0.0.1:8080/onvif/device_service",
+        ]
+        assert cache.stale() == []
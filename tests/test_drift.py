@@ -0,0 +1,122 @@
+# tests/test_drift.py
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from onvif.utils import ONVIFDriftDetector
+
+
+def fleet(fake_client, count=5, delay=0, ntp="10.0.0.250", users=("admin", "viewer")):
+    """Fake clients sharing NTP servers, users and encoder settings"""
+    clients = []
+    for i in range(1, count + 1):
+        results = {
+            "devicemgmt.GetNTP": SimpleNamespace(
+                FromDHCP=False,
+                NTPManual=[SimpleNamespace(Type="IPv4", IPv4Address=ntp)],
+            ),
+            "devicemgmt.GetUsers": [
+                SimpleNamespace(Username=name, UserLevel="User") for name in users
+            ],
+            "media.GetVideoEncoderConfigurations": [
+                SimpleNamespace(token="enc0", Encoding="H264", UseCount=i)
+            ],
+        }
+        clients.append(fake_client(f"10.0.0.{i}", results, delay))
+    return clients
+
+
+class TestDriftDetection:
+    """Test clustering and deviation reporting"""
+
+    def test_clusters_and_deviations(self, fake_client):
+        clients = fleet(fake_client)
+        clients[3].results["devicemgmt.GetNTP"].NTPManual[0].IPv4Address = "1.2.3.4"
+        clients[4].results["devicemgmt.GetUsers"].append(
+            SimpleNamespace(Username="guest", UserLevel="Anonymous")
+        )
+        clients[2].results["devicemgmt.GetUsers"].reverse()  # Order doesn't count
+
+        reports = ONVIFDriftDetector().check(clients)
+
+        ntp = reports["ntp"]
+        assert [c.devices for c in ntp.clusters] == [
+            ["10.0.0.1:80", "10.0.0.2:80", "10.0.0.3:80", "10.0.0.5:80"],
+            ["10.0.0.4:80"],
+        ]
+        assert ntp.baseline == ntp.clusters[0].digest
+        assert ntp.deviations == {
+            "10.0.0.4:80": [("NTPManual[0].IPv4Address", "10.0.0.250", "1.2.3.4")]
+        }
+
+        users = reports["users"]
+        assert [len(c.devices) for c in users.clusters] == [4, 1]
+        assert users.deviations["10.0.0.5:80"][0][0] == ""  # Different lengths
+
+        # UseCount is ignored, so encoders agree
+        assert len(reports["video_encoders"].clusters) == 1
+        assert reports["video_encoders"].deviations == {}
+
+        # GetDNS isn't supported
+        assert reports["dns"].clusters == []
+        assert reports["dns"].baseline is None
+        assert len(reports["dns"].errors) == 5
+
+    def test_baseline_device(self, fake_client):
+        clients = fleet(fake_client, 3)
+        clients[0].results["devicemgmt.GetNTP"].FromDHCP = True
+        detector = ONVIFDriftDetector(
+            {"ntp": "devicemgmt.GetNTP"}, baseline="10.0.0.1:80"
+        )
+        report = detector.check(clients)["ntp"]
+
+        assert report.baseline == report.clusters[1].digest
+        assert sorted(report.deviations) == ["10.0.0.2:80", "10.0.0.3:80"]
+        assert report.deviations["10.0.0.2:80"] == [("FromDHCP", True, False)]
+
+    def test_parallel_pull(self, fake_client):
+        clients = fleet(fake_client, 8, delay=0.05)
+        detector = ONVIFDriftDetector({"ntp": "devicemgmt.GetNTP"}, workers=8)
+        start = time.monotonic()
+        detector.check(clients)
+        assert time.monotonic() - start < 0.3
+
+    def test_invalid_check(self):
+        with pytest.raises(ValueError):
+            ONVIFDriftDetector({"ntp": "GetNTP"})
+
+
+class TestIncrementalChecks:
+    """Test re-checks against cached hashes"""
+
+    def test_max_age_reuses_cache(self, fake_client):
+        clients = fleet(fake_client, 3)
+        detector = ONVIFDriftDetector({"ntp": "devicemgmt.GetNTP"})
+        detector.check(clients)
+        detector.check(clients, max_age=60)
+        assert all(len(client.calls) == 1 for client in clients)
+
+        detector.check(clients, max_age=0)
+        assert all(len(client.calls) == 2 for client in clients)
+
+    def test_recheck_devices_reports_changes(self, fake_client):
+        clients = fleet(fake_client, 3)
+        detector = ONVIFDriftDetector({"ntp": "devicemgmt.GetNTP"})
+        first = detector.check(clients)["ntp"]
+        assert first.changed == [] and len(first.clusters) == 1
+        digests = detector.digests()
+
+        clients[1].results["devicemgmt.GetNTP"].FromDHCP = True
+        report = detector.check(clients, devices=["10.0.0.2:80"])["ntp"]
+
+        assert [len(client.calls) for client in clients] == [1, 2, 1]
+        assert report.changed == ["10.0.0.2:80"]
+        assert list(report.deviations) == ["10.0.0.2:80"]
+        assert detector.digests()["10.0.0.1:80"] == digests["10.0.0.1:80"]
+        assert detector.digests()["10.0.0.2:80"] != digests["10.0.0.2:80"]
+
+        detector.invalidate("10.0.0.1:80")
+        detector.check(clients, max_age=60)
+        assert [len(client.calls) for client in clients] == [2, 2, 1]
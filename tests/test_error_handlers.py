@@ -7,7 +7,7 @@ from onvif.utils.exceptions import ONVIFOperationException
 
 # Try to import zeep, use mock if not available
 try:
-    from zeep.exceptions import Fault
+    from zeep.exceptions import Fault, TransportError
 
     ZEEP_AVAILABLE = True
 except ImportError:
@@ -20,6 +20,11 @@ except ImportError:
             self.subcodes = subcodes
             super().__init__(message or "Mock SOAP Fault")
 
+    class TransportError(Exception):
+        def __init__(self, message="", status_code=0, content=None):
+            self.status_code = status_code
+            super().__init__(message)
+
     ZEEP_AVAILABLE = False
 
 
@@ -342,3 +347,28 @@ class TestErrorHandlerIntegration:
 
         result = outer_function()
         assert result == "inner_default"
+
+
+class TestIsNotAuthorized:
+    """Test NotAuthorized / HTTP 401 detection"""
+
+    def test_fault_subcode(self):
+        subcode = Mock()
+        subcode.localname = "NotAuthorized"
+        fault = Mock(spec=Fault)
+        fault.subcodes = [subcode]
+        assert ONVIFErrorHandler.is_not_authorized(
+            ONVIFOperationException("GetDeviceInformation", fault)
+        )
+
+    def test_http_401(self):
+        assert ONVIFErrorHandler.is_not_authorized(TransportError(status_code=401))
+        assert not ONVIFErrorHandler.is_not_authorized(TransportError(status_code=500))
+
+    def test_other_errors(self):
+        subcode = Mock()
+        subcode.localname = "ActionNotSupported"
+        fault = Mock(spec=Fault)
+        fault.subcodes = [subcode]
+        assert not ONVIFErrorHandler.is_not_authorized(fault)
+        assert not ONVIFErrorHandler.is_not_authorized(ValueError("boom"))
@@ -0,0 +1,201 @@
+# tests/test_event_aggregator.py
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from onvif.utils import ONVIFEventAggregator
+from helpers import FakeDevice
+
+
+def _device(host, batches):
+    device = FakeDevice(batches=batches)
+    device.common_args = {"host": host, "port": 80}
+    return device
+
+
+class ExpiringDevice:
+    """Device whose subscriptions really expire after their lifetime"""
+
+    def __init__(self, host, lifetime):
+        self.common_args = {"host": host, "port": 80}
+        self.lifetime = lifetime
+        self.lock = threading.Lock()
+        self.expires = None
+        self.created = self.renewed = self.expired = 0
+
+    def _times(self):
+        now = datetime.now(timezone.utc)
+        return now, now + timedelta(seconds=self.lifetime)
+
+    def _extend(self):
+        with self.lock:
+            if self.expires is not None and time.monotonic() > self.expires:
+                self.expired += 1
+                raise RuntimeError("subscription expired")
+            self.expires = time.monotonic() + self.lifetime
+        current, termination = self._times()
+        return SimpleNamespace(CurrentTime=current, TerminationTime=termination)
+
+    def events(self):
+        def create(**kwargs):
+            with self.lock:
+                self.created += 1
+                self.expires = time.monotonic() + self.lifetime
+            current, termination = self._times()
+            return SimpleNamespace(
+                SubscriptionReference={"Address": {"_value_1": "http://cam/sub"}},
+                CurrentTime=current,
+                TerminationTime=termination,
+            )
+
+        return SimpleNamespace(CreatePullPointSubscription=create)
+
+    def pullpoint(self, ref):
+        def pull(Timeout, MessageLimit):
+            time.sleep(int(Timeout[2:-1]) / 10)  # "PT{n}S", scaled down
+            return self._extend()
+
+        return SimpleNamespace(PullMessages=pull)
+
+    def subscription(self, ref):
+        def renew(TerminationTime):
+            with self.lock:
+                self.renewed += 1
+            return self._extend()
+
+        return SimpleNamespace(Renew=renew, Unsubscribe=lambda: None)
+
+
+def _collect(aggregator, count, timeout=5):
+    events = []
+    deadline = time.monotonic() + timeout
+    while len(events) < count and time.monotonic() < deadline:
+        events.append(aggregator.get(timeout=timeout))
+    return events
+
+
+class TestEventAggregator:
+    """Test ONVIFEventAggregator multiplexing"""
+
+    def test_merges_devices_with_small_pool(self):
+        devices = [
+            _device(f"cam{i}", [[f"cam{i}-a"], [f"cam{i}-b"]]) for i in range(20)
+        ]
+        aggregator = ONVIFEventAggregator(workers=2)
+        for device in devices:
+            aggregator.add(device)
+
+        with aggregator:
+            events = _collect(aggregator, 40)
+
+        assert len(events) == 40
+        assert {e.device for e in events} == {f"cam{i}:80" for i in range(20)}
+        for device in devices:
+            device.manager.Unsubscribe.assert_called_once_with()
+        assert len(aggregator._threads) == 2
+
+    def test_fairness_busy_device_does_not_starve_quiet_one(self):
+        busy = _device("busy", [["busy"] * 5 for _ in range(50)])
+        quiet = _device("quiet", [["quiet"]])
+        aggregator = ONVIFEventAggregator(workers=1)
+        aggregator.add(busy)
+        aggregator.add(quiet)
+
+        with aggregator:
+            events = _collect(aggregator, 15)
+
+        devices = [e.device for e in events]
+        assert "quiet:80" in devices[:10]
+
+    def test_per_device_backpressure_parks_device(self):
+        device = _device("cam", [["x"] * 10 for _ in range(10)])
+        aggregator = ONVIFEventAggregator(workers=1, per_device_limit=10)
+        aggregator.add(device)
+
+        with aggregator:
+            time.sleep(0.2)
+            assert aggregator.metrics()["cam:80"]["parked"]
+            assert device.pullpoint_service.PullMessages.call_count == 1
+
+            _collect(aggregator, 6)
+            time.sleep(0.2)
+            assert device.pullpoint_service.PullMessages.call_count >= 2
+
+    def test_failing_device_backs_off(self):
+        bad = _device("bad", [RuntimeError("offline")] * 10)
+        good = _device("good", [["ok"]])
+        aggregator = ONVIFEventAggregator(workers=1)
+        aggregator.add(bad)
+        aggregator.add(good)
+
+        with aggregator:
+            assert aggregator.get(timeout=5).device == "good:80"
+            metrics = aggregator.metrics()
+
+        assert metrics["bad:80"]["errors"] == 1
+        assert metrics["bad:80"]["last_error"] == "offline"
+        assert metrics["good:80"]["events"] == 1
+
+    def test_metrics(self):
+        aggregator = ONVIFEventAggregator(workers=1)
+        aggregator.add(_device("cam", [["a", "b"]]), name="front-door")
+
+        with aggregator:
+            _collect(aggregator, 2)
+            metrics = aggregator.metrics()["front-door"]
+
+        assert metrics["events"] == 2
+        assert metrics["pending"] == 0
+        assert metrics["subscriptions"] == 1
+        assert metrics["lag"] >= 0
+        assert metrics["throughput"] > 0
+
+    def test_remove_device(self):
+        device = _device("cam", [])
+        aggregator = ONVIFEventAggregator(workers=1)
+        name = aggregator.add(device)
+
+        with aggregator:
+            time.sleep(0.1)
+            aggregator.remove(name)
+            assert aggregator.devices == []
+
+        device.manager.Unsubscribe.assert_called_once_with()
+
+    def test_renewals_independent_of_pulls(self):
+        # One worker, 0.1 s per pull and 0.5 s lifetimes: with 30 devices each
+        # is pulled every ~3 s, six times workers * lifetime / pull_timeout. The
+        # renewal manager keeps the subscriptions alive between pulls anyway.
+        devices = [ExpiringDevice(f"cam{i}", lifetime=0.5) for i in range(30)]
+        aggregator = ONVIFEventAggregator(workers=1, renew_margin=0.15)
+        for device in devices:
+            aggregator.add(device)
+
+        with aggregator:
+            time.sleep(3.5)
+            metrics = aggregator.metrics()
+
+        # cam0 was pulled again after many lifetimes, on its first subscription
+        assert metrics["cam0:80"]["pulls"] >= 2
+        assert all(d.created == 1 for d in devices if d.created)
+        assert not any(d.expired for d in devices)
+        assert metrics["cam0:80"]["renewals"] >= 4
+
+    def test_async_iteration(self):
+        aggregator = ONVIFEventAggregator(workers=2)
+        aggregator.add(_device("a", [["a1"]]))
+        aggregator.add(_device("b", [["b1"]]))
+
+        async def consume():
+            received = set()
+            async with aggregator:
+                async for event in aggregator:
+                    received.add(event.message)
+                    if len(received) == 2:
+                        break
+            return received
+
+        assert asyncio.run(consume()) == {"a1", "b1"}
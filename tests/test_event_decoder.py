@@ -0,0 +1,216 @@
+# tests/test_event_decoder.py
+
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from lxml import etree
+
+from onvif.services import PullPoint
+from onvif.utils import ONVIFEventStream
+from onvif.utils.event_decoder import (
+    EventRecord,
+    decode_events,
+    decode_notify,
+    decode_pull_messages,
+    parse_utc,
+)
+from helpers import MESSAGE_TEMPLATE, notify_body
+
+PULL_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<env:Envelope xmlns:env="http://www.w3.org/2003/05/soap-envelope"
+              xmlns:wsa="http://www.w3.org/2005/08/addressing"
+              xmlns:wsnt="http://docs.oasis-open.org/wsn/b-2"
+              xmlns:tev="http://www.onvif.org/ver10/events/wsdl"
+              xmlns:tt="http://www.onvif.org/ver10/schema">
+  <env:Header>
+    <wsa:To>http://www.w3.org/2005/08/addressing/anonymous</wsa:To>
+  </env:Header>
+  <env:Body>
+    <tev:PullMessagesResponse>
+      <tev:CurrentTime>2025-01-01T12:00:05Z</tev:CurrentTime>
+      <tev:TerminationTime>2025-01-01T12:01:05Z</tev:TerminationTime>{messages}
+    </tev:PullMessagesResponse>
+  </env:Body>
+</env:Envelope>"""
+
+
+def pull_body(*messages):
+    """Build a PullMessagesResponse envelope from (reference, topic, value) tuples"""
+    return PULL_TEMPLATE.format(
+        messages="".join(
+            MESSAGE_TEMPLATE.format(reference=r, topic=t, value=v)
+            for r, t, v in messages
+        )
+    ).encode()
+
+
+SUB = "http://cam/onvif/Subscription?Idx=1"
+
+
+class TestEventDecoder:
+    """Test the single-pass event decoder"""
+
+    def test_decode_pull_messages(self):
+        result = decode_pull_messages(
+            pull_body(
+                (SUB, "tns1:VideoSource/MotionAlarm", "true"),
+                (SUB, "tns1:RuleEngine/CellMotionDetector/Motion", "false"),
+            )
+        )
+
+        assert result.CurrentTime == datetime(2025, 1, 1, 12, 0, 5, tzinfo=timezone.utc)
+        assert result.TerminationTime == datetime(
+            2025, 1, 1, 12, 1, 5, tzinfo=timezone.utc
+        )
+        assert len(result.NotificationMessage) == 2
+
+        event = result.NotificationMessage[0]
+        assert isinstance(event, EventRecord)
+        assert event.topic == "tns1:VideoSource/MotionAlarm"
+        assert event.utc_time == datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+        assert event.operation == "Changed"
+        assert event.source == {
+            "VideoSourceConfigurationToken": "VideoSource_1",
+            "Rule": "MyMotionDetectorRule",
+        }
+        assert event.data == {"IsMotion": "true"}
+        assert event.key == {}
+        assert event.subscription == SUB
+        assert result.NotificationMessage[1].data == {"IsMotion": "false"}
+
+    def test_decode_notify(self):
+        events = decode_notify(notify_body((SUB, "tns1:Device/Trigger", "1")))
+        assert [e.topic for e in events] == ["tns1:Device/Trigger"]
+
+    def test_empty_response(self):
+        result = decode_pull_messages(pull_body())
+        assert result.NotificationMessage == []
+        assert result.CurrentTime is not None
+
+    def test_element_items_and_keys(self):
+        body = b"""<wsnt:Notify xmlns:wsnt="http://docs.oasis-open.org/wsn/b-2"
+                               xmlns:tt="http://www.onvif.org/ver10/schema">
+          <wsnt:NotificationMessage>
+            <wsnt:Topic>tns1:Custom</wsnt:Topic>
+            <wsnt:Message>
+              <tt:Message UtcTime="2025-01-01T14:00:00.123456789+02:00">
+                <tt:Key><tt:SimpleItem Name="Id" Value="42"/></tt:Key>
+                <tt:Data>
+                  <tt:ElementItem Name="Shape"><Box left="1"/></tt:ElementItem>
+                </tt:Data>
+              </tt:Message>
+            </wsnt:Message>
+          </wsnt:NotificationMessage>
+        </wsnt:Notify>"""
+        (event,) = decode_events(body)
+
+        assert event.key == {"Id": "42"}
+        assert event.data["Shape"].tag == "Box"
+        assert event.utc_time == datetime(
+            2025, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc
+        )
+        assert event.operation is None
+        assert event.subscription is None
+
+    def test_parse_utc(self):
+        assert parse_utc("2025-01-01T12:00:00") == datetime(
+            2025, 1, 1, 12, tzinfo=timezone.utc
+        )
+        assert parse_utc("2025-01-01T12:00:00-0130") == datetime(
+            2025, 1, 1, 13, 30, tzinfo=timezone.utc
+        )
+        assert parse_utc("garbage") is None
+        assert parse_utc(None) is None
+
+    def test_rejects_entities(self):
+        body = b"""<?xml version="1.0"?>
+        <!DOCTYPE x [<!ENTITY e SYSTEM "file:///etc/passwd">]>
+        <wsnt:Notify xmlns:wsnt="http://docs.oasis-open.org/wsn/b-2">
+          <wsnt:NotificationMessage><wsnt:Topic>&e;</wsnt:Topic></wsnt:NotificationMessage>
+        </wsnt:Notify>"""
+        (event,) = decode_events(body)
+        assert not event.topic
+
+    def test_invalid_xml(self):
+        with pytest.raises(etree.XMLSyntaxError):
+            decode_events(b"<broken")
+
+    def test_decode_throughput(self):
+        """Decoding stays well above the event rate of busy cameras"""
+        count = 1000
+        body = pull_body(*[(SUB, f"tns1:Topic/{i}", str(i)) for i in range(count)])
+
+        start = time.perf_counter()
+        result = decode_pull_messages(body)
+        elapsed = time.perf_counter() - start
+
+        assert len(result.NotificationMessage) == count
+        print(f"\ndecoded {count} events in {elapsed * 1000:.1f} ms")
+        assert elapsed < 1.0
+
+
+class TestPullPointDecodeMode:
+    """Test PullPoint raw response mode"""
+
+    def test_pull_messages_decoded(self):
+        with patch("onvif.services.events.pullpoint.ONVIFOperator") as operator_class:
+            operator = operator_class.return_value
+            operator.call_raw.return_value = pull_body((SUB, "tns1:A", "true"))
+
+            pullpoint = PullPoint(xaddr="http://cam/onvif/Subscription?Idx=1")
+            pullpoint.decode_events = True
+            result = pullpoint.PullMessages(Timeout="PT5S", MessageLimit=10)
+
+        operator.call_raw.assert_called_once_with(
+            "PullMessages", Timeout="PT5S", MessageLimit=10
+        )
+        operator.call.assert_not_called()
+        assert result.NotificationMessage[0].topic == "tns1:A"
+
+    def test_event_stream_decode(self):
+        pullpoint = Mock()
+        pullpoint.PullMessages.return_value = decode_pull_messages(
+            pull_body((SUB, "tns1:A", "true"))
+        )
+        client = Mock()
+        client.common_args = {"host": "cam", "port": 80}
+        client.events.return_value.CreatePullPointSubscription.return_value = Mock(
+            CurrentTime=None, TerminationTime=None
+        )
+        client.pullpoint.return_value = pullpoint
+
+        stream = ONVIFEventStream(client, decode=True)
+        (event,) = stream.pull_once()
+
+        assert pullpoint.decode_events is True
+        assert event.topic == "tns1:A"
+
+
+class TestCallRaw:
+    """Test ONVIFOperator.call_raw"""
+
+    def _operator(self, response):
+        from onvif.operator import ONVIFOperator
+
+        operator = ONVIFOperator.__new__(ONVIFOperator)
+        operator.service_name = "PullPointSubscription"
+        operator.client = MagicMock()
+        operator.service = Mock()
+        operator._operations = {"PullMessages": Mock(return_value=response)}
+        return operator
+
+    def test_returns_content(self):
+        operator = self._operator(Mock(status_code=200, content=b"<xml/>"))
+        assert operator.call_raw("PullMessages", Timeout="PT1S") == b"<xml/>"
+        operator.client.settings.assert_called_once_with(raw_response=True)
+
+    def test_fault_raises(self):
+        from onvif.utils import ONVIFOperationException
+
+        operator = self._operator(Mock(status_code=500, content=b"<fault/>"))
+        operator.service._binding.process_reply.side_effect = RuntimeError("fault")
+
+        with pytest.raises(ONVIFOperationException):
+            operator.call_raw("PullMessages")
@@ -0,0 +1,174 @@
+# tests/test_event_log.py
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from lxml import etree
+
+from onvif.utils import ONVIFEventLog, ONVIFEventStream
+from onvif.utils.event_decoder import EventRecord
+from helpers import FakeDevice
+
+T0 = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def record(topic="tns1:VideoSource/MotionAlarm", seconds=0, **data):
+    return EventRecord(
+        topic,
+        T0 + timedelta(seconds=seconds),
+        "Changed",
+        {"Source": "VideoSource_1"},
+        data or {"State": "true"},
+        {},
+        None,
+    )
+
+
+def _topics(events):
+    return [event.topic for event in events]
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = ONVIFEventLog(str(tmp_path), batch_size=100, flush_interval=0.05)
+    yield log
+    log.close()
+
+
+class TestEventLog:
+    """Test the batched SQLite event log"""
+
+    def test_write_and_query(self, log):
+        log.write("cam1", [record(seconds=i) for i in range(3)])
+        log.write("cam2", [record("tns1:RuleEngine/CellMotionDetector/Motion")])
+        assert log.flush(5)
+
+        events = log.query(device="cam1")
+        assert len(events) == 3
+        assert events[0].device == "cam1"
+        assert events[0].topic == "tns1:VideoSource/MotionAlarm"
+        assert events[0].utc_time == T0
+        assert events[0].operation == "Changed"
+        assert events[0].source == {"Source": "VideoSource_1"}
+        assert events[0].data == {"State": "true"}
+
+        assert len(log.query()) == 4
+
+    def test_query_filters(self, log):
+        log.write(
+            "cam1",
+            [
+                record("tns1:VideoSource/MotionAlarm", 0),
+                record("tns1:RuleEngine/CellMotionDetector/Motion", 10),
+                record("tns1:RuleEngine/TamperDetector/Tamper", 20),
+                record("tns1:RuleEngineX", 30),
+            ],
+        )
+        log.flush(5)
+
+        assert _topics(log.query(topic="tns1:RuleEngine//.")) == [
+            "tns1:RuleEngine/CellMotionDetector/Motion",
+            "tns1:RuleEngine/TamperDetector/Tamper",
+        ]
+        assert _topics(log.query(topic="*/Tamper")) == [
+            "tns1:RuleEngine/TamperDetector/Tamper"
+        ]
+        assert len(log.query(start=T0 + timedelta(seconds=10))) == 3
+        assert len(log.query(start=T0, end=T0 + timedelta(seconds=20))) == 2
+        assert len(log.query(start=T0.timestamp(), limit=2)) == 2
+        assert log.query(device="other") == []
+
+    def test_batches_by_size(self, tmp_path):
+        with ONVIFEventLog(str(tmp_path), batch_size=10, flush_interval=60) as log:
+            log.write("cam", [record(seconds=i) for i in range(25)])
+            deadline = time.monotonic() + 5
+            while log.stats["written"] < 20 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            # Two full batches are written without waiting for the interval
+            assert log.stats["written"] == 20
+            assert log.stats["batches"] == 2
+
+        # close() flushes the remainder
+        assert log.stats["written"] == 25
+
+    def test_flushes_by_time(self, log):
+        log.write("cam", [record()])
+        time.sleep(0.3)
+        assert log.stats["written"] == 1
+        assert log.stats["batches"] == 1
+
+    def test_rotation_and_retention(self, tmp_path):
+        log = ONVIFEventLog(str(tmp_path), batch_size=5, segment_rows=5, max_segments=2)
+        for i in range(4):
+            log.write("cam", [record(seconds=i * 10 + j) for j in range(5)])
+            log.flush(5)
+        log.close()
+
+        assert len(log.segments) == 2
+        assert log.stats["segments"] == 5
+        # The newest full segment is kept; older ones are removed
+        assert [e.utc_time for e in log.query()][0] == T0 + timedelta(seconds=30)
+
+    def test_rotation_within_one_millisecond(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("onvif.utils.event_log.time.time", lambda: 1.7e9)
+        log = ONVIFEventLog(str(tmp_path), batch_size=5, segment_rows=5)
+        for i in range(4):
+            log.write("cam", [record(seconds=i * 10 + j) for j in range(5)])
+            log.flush(5)
+        log.close()
+
+        assert len(log.segments) == 5
+        assert len(log.query()) == 20
+
+    def test_resume_existing_segment(self, tmp_path):
+        with ONVIFEventLog(str(tmp_path)) as log:
+            log.write("cam", [record()])
+        with ONVIFEventLog(str(tmp_path)) as log:
+            log.write("cam", [record(seconds=1)])
+            log.flush(5)
+            assert len(log.segments) == 1
+            assert len(log.query()) == 2
+
+    def test_element_items_are_serialized(self, log):
+        shape = etree.fromstring('<Box left="1"/>')
+        log.write("cam", [record(Shape=shape)])
+        log.flush(5)
+        assert log.query()[0].data == {"Shape": '<Box left="1"/>'}
+
+    def test_write_after_close(self, tmp_path):
+        log = ONVIFEventLog(str(tmp_path))
+        log.close()
+        with pytest.raises(RuntimeError):
+            log.write("cam", [record()])
+
+
+class TestEventLogSink:
+    """Test attaching the event log to event streaming"""
+
+    def test_event_stream_sink(self, log):
+        device = FakeDevice(batches=[[record(), record(seconds=1)]])
+        stream = ONVIFEventStream(device, sink=log)
+        stream.pull_once()
+        log.flush(5)
+
+        assert stream.decode is True
+        assert [e.device for e in log.query()] == ["cam:80", "cam:80"]
+
+    def test_notification_consumer_sink(self, log):
+        from onvif.utils import ONVIFNotificationConsumer
+        from test_notification_consumer import StandInDevice
+
+        consumer = ONVIFNotificationConsumer(host="127.0.0.1", sink=log).start()
+        try:
+            device = StandInDevice()
+            consumer.subscribe(device, name="door")
+            assert device.push(("tns1:Device/Trigger", "1")) == 202
+        finally:
+            consumer.close()
+
+        log.flush(5)
+        (event,) = log.query(device="door")
+        assert event.topic == "tns1:Device/Trigger"
+        assert event.data == {"IsMotion": "1"}
@@ -0,0 +1,214 @@
+# tests/test_event_stream.py
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from onvif.utils import ONVIFEventStream
+from onvif.utils.event_stream import EventGap
+from helpers import FakeDevice, subscription_response
+
+
+class TestEventStream:
+    """Test ONVIFEventStream subscription handling"""
+
+    def test_pull_once_subscribes_and_pulls(self):
+        device = FakeDevice(batches=[["a", "b"]])
+        stream = ONVIFEventStream(device, pull_timeout=5, subscription_lifetime=60)
+
+        assert stream.pull_once() == ["a", "b"]
+
+        device.events_service.CreatePullPointSubscription.assert_called_once_with(
+            Filter=None, InitialTerminationTime="PT60S"
+        )
+        device.pullpoint_service.PullMessages.assert_called_once_with(
+            Timeout="PT5S", MessageLimit=1000
+        )
+        assert stream.stats["events"] == 2
+
+    def test_renews_before_termination(self):
+        device = FakeDevice(batches=[[], []])
+        stream = ONVIFEventStream(device, pull_timeout=5, renew_margin=5)
+        stream.pull_once()
+        assert not stream.needs_renewal()
+
+        # Pretend the device clock says 8 seconds remain
+        stream._expires_at = time.monotonic() + 8
+        assert stream.needs_renewal()
+        stream.pull_once()
+
+        device.manager.Renew.assert_called_once_with(TerminationTime="PT300S")
+        assert stream.stats["renewals"] == 1
+
+    def test_single_message_is_listified(self):
+        device = FakeDevice(batches=["only"])
+        stream = ONVIFEventStream(device)
+        assert stream.pull_once() == ["only"]
+
+    def test_failed_renew_resubscribes(self):
+        device = FakeDevice(batches=[[], []])
+        device.manager.Renew.side_effect = RuntimeError("expired")
+        stream = ONVIFEventStream(device)
+        stream.pull_once()
+        stream._expires_at = time.monotonic()
+
+        stream.pull_once()
+        assert device.events_service.CreatePullPointSubscription.call_count == 2
+
+    def test_failed_pull_drops_subscription(self):
+        device = FakeDevice(batches=[RuntimeError("gone"), ["x"]])
+        stream = ONVIFEventStream(device)
+
+        with pytest.raises(RuntimeError):
+            stream.pull_once()
+        assert not stream.subscribed
+
+        assert stream.pull_once() == ["x"]
+        assert stream.stats["subscriptions"] == 2
+
+    def test_background_iteration_and_close(self):
+        device = FakeDevice(batches=[["a"], ["b", "c"]])
+        received = []
+
+        with ONVIFEventStream(device) as stream:
+            for message in stream:
+                received.append(message)
+                if len(received) == 3:
+                    break
+            assert stream.running
+
+        assert received == ["a", "b", "c"]
+        assert not stream.running
+        device.manager.Unsubscribe.assert_called_once_with()
+
+    def test_close_during_subscribe(self):
+        device = FakeDevice()
+        created = threading.Event()
+
+        def create(**kwargs):
+            created.set()
+            time.sleep(0.2)
+            return SimpleNamespace(**subscription_response())
+
+        device.events_service.CreatePullPointSubscription.side_effect = create
+        stream = ONVIFEventStream(device, pull_timeout=0.5).start()
+        assert created.wait(1)
+
+        start = time.monotonic()
+        stream.close()
+        assert time.monotonic() - start < 1
+        assert not stream.running
+        # The subscription created while closing is not leaked
+        assert not stream.subscribed
+        device.manager.Unsubscribe.assert_called_once_with()
+
+        # A closed stream doesn't subscribe again
+        assert stream.pull_once() == []
+        assert stream.subscribe() is None
+        assert device.events_service.CreatePullPointSubscription.call_count == 1
+
+    def test_backpressure(self):
+        device = FakeDevice(batches=[["a", "b", "c"]])
+        stream = ONVIFEventStream(device, max_queue=1).start()
+        time.sleep(0.1)
+
+        # Puller is blocked on the full queue instead of dropping messages
+        assert stream._queue.qsize() == 1
+        assert [stream.get(1), stream.get(1), stream.get(1)] == ["a", "b", "c"]
+        stream.close()
+
+    def test_async_iteration(self):
+        device = FakeDevice(batches=[["a"], ["b"]])
+
+        async def consume():
+            received = []
+            async with ONVIFEventStream(device) as stream:
+                async for message in stream:
+                    received.append(message)
+                    if len(received) == 2:
+                        break
+            return received
+
+        assert asyncio.run(consume()) == ["a", "b"]
+
+    def test_client_accessor(self, mock_onvif_client):
+        stream = mock_onvif_client.event_stream(pull_timeout=10)
+        assert isinstance(stream, ONVIFEventStream)
+        assert stream.client is mock_onvif_client
+        assert not stream.running
+
+
+def _state(value, operation="Initialized", topic="tns1:Device/Trigger/Relay"):
+    from onvif.utils.event_decoder import EventRecord
+
+    return EventRecord(
+        topic,
+        None,
+        operation,
+        {"RelayToken": "relay1"},
+        {"LogicalState": value},
+        {},
+        None,
+    )
+
+
+class TestEventStreamResync:
+    """Test gap markers and property state resynchronization"""
+
+    def test_gap_marker_and_dedupe_after_reconnect(self):
+        motion = _state("true", topic="tns1:VideoSource/MotionAlarm")
+        device = FakeDevice(
+            batches=[
+                [_state("active"), motion],
+                RuntimeError("subscription expired"),
+                # Device re-sends all property states after the resync
+                [_state("active"), _state("false", topic=motion.topic)],
+            ]
+        )
+        stream = ONVIFEventStream(device, resync=True)
+
+        assert stream.pull_once() == [_state("active"), motion]
+        with pytest.raises(RuntimeError):
+            stream.pull_once()
+        gap, changed = stream.pull_once()
+
+        assert isinstance(gap, EventGap)
+        assert gap.name == "cam:80"
+        assert gap.start < gap.end
+        assert gap.reason == "pull failed: subscription expired"
+        device.pullpoint_service.SetSynchronizationPoint.assert_called_once_with()
+
+        # The unchanged relay state was dropped, the motion change passed
+        assert changed.topic == motion.topic
+        assert changed.data == {"LogicalState": "false"}
+        assert stream.stats["deduplicated"] == 1
+        assert stream.stats["gaps"] == 1
+        assert stream.property_states()[
+            (motion.topic, (("RelayToken", "relay1"),))
+        ] == {"LogicalState": "false"}
+
+    def test_no_gap_on_first_subscription(self):
+        device = FakeDevice(batches=[[_state("active")]])
+        stream = ONVIFEventStream(device, resync=True)
+
+        assert stream.pull_once() == [_state("active")]
+        device.pullpoint_service.SetSynchronizationPoint.assert_not_called()
+        assert stream.decode is True
+
+    def test_changed_and_deleted_states(self):
+        device = FakeDevice(
+            batches=[
+                [_state("active")],
+                [_state("active", "Changed")],
+                [_state("active", "Deleted")],
+                [_state("active")],
+            ]
+        )
+        stream = ONVIFEventStream(device, resync=True)
+
+        # "Changed" always passes; after "Deleted" the state is new again
+        assert [len(stream.pull_once()) for _ in range(4)] == [1, 1, 1, 1]
+        assert stream.stats["deduplicated"] == 0
@@ -0,0 +1,147 @@
+# tests/test_fleet.py
+
+import csv
+import io
+import json
+
+import pytest
+
+from onvif import CacheMode
+from onvif.cli.main import load_fleet, run_fleet
+from helpers import closed_port
+
+
+class TestLoadFleet:
+    """Test reading fleet files"""
+
+    def test_hosts_file(self, tmp_path):
+        path = tmp_path / "hosts.txt"
+        path.write_text("# cameras\n10.0.0.1\n10.0.0.2:8080\n\n[fe80::1]:8000\n")
+        devices = load_fleet(str(path), default_port=80)
+        assert [(d["host"], d["port"]) for d in devices] == [
+            ("10.0.0.1", 80),
+            ("10.0.0.2", 8080),
+            ("fe80::1", 8000),
+        ]
+        assert devices[0]["username"] is None
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / "fleet.csv"
+        path.write_text(
+            "host,port,use_https,username,password\n"
+            "10.0.0.1,443,true,admin,secret\n"
+            "10.0.0.2,,,,\n"
+        )
+        first, second = load_fleet(str(path))
+        assert first == {
+            "host": "10.0.0.1",
+            "port": 443,
+            "use_https": True,
+            "username": "admin",
+            "password": "secret",
+        }
+        assert (second["port"], second["use_https"], second["password"]) == (
+            80,
+            False,
+            None,
+        )
+
+    def test_discovery_json_and_ndjson(self, tmp_path):
+        devices = [
+            {"host": "10.0.0.1", "port": 80, "use_https": False, "epr": "a"},
+            {"host": "10.0.0.2", "port": 8443, "use_https": True, "epr": "b"},
+        ]
+        listing = tmp_path / "devices.json"
+        listing.write_text(json.dumps(devices, indent=2))
+        cache = tmp_path / "cache.json"
+        cache.write_text(json.dumps({"last_sweep": 1.0, "devices": devices}))
+        ndjson = tmp_path / "results.ndjson"
+        ndjson.write_text("\n".join(json.dumps(d) for d in devices))
+
+        for path in (listing, cache, ndjson):
+            assert [
+                (d["host"], d["port"], d["use_https"]) for d in load_fleet(str(path))
+            ] == [("10.0.0.1", 80, False), ("10.0.0.2", 8443, True)]
+
+    def test_invalid(self, tmp_path):
+        path = tmp_path / "fleet.csv"
+        path.write_text("address,port\n10.0.0.1,80\n")
+        with pytest.raises(ValueError):
+            load_fleet(str(path))
+        path.write_text("# nothing\n")
+        with pytest.raises(ValueError):
+            load_fleet(str(path))
+
+
+class TestRunFleet:
+    """Test fleet execution against local device stand-ins"""
+
+    def _devices(self, cameras):
+        return [
+            {"host": "127.0.0.1", "port": cameras("admin"), "username": None},
+            {"host": "127.0.0.1", "port": cameras("admin"), "username": None},
+            {"host": "127.0.0.1", "port": cameras("root"), "username": None},
+            {"host": "127.0.0.1", "port": closed_port(), "username": None},
+        ]
+
+    def test_ndjson(self, cameras):
+        devices = self._devices(cameras)
+        output = io.StringIO()
+        ok, failed = run_fleet(
+            devices,
+            "devicemgmt",
+            "GetDeviceInformation",
+            username="admin",
+            password="a",
+            output=output,
+            timeout=5,
+            cache=CacheMode.MEM,
+        )
+
+        assert (ok, failed) == (2, 2)
+        records = {
+            r["port"]: r for r in map(json.loads, output.getvalue().splitlines())
+        }
+        good = records[devices[0]["port"]]
+        assert good["status"] == "ok"
+        assert good["result"]["Model"] == "Cam"
+        assert 0 < good["latency"] <= good["elapsed"]
+        assert records[devices[2]["port"]]["status"] == "error"
+        assert records[devices[3]["port"]]["error"].startswith("unreachable")
+
+    def test_csv_and_per_device_credentials(self, cameras):
+        devices = self._devices(cameras)[2:3]
+        devices[0]["username"], devices[0]["password"] = "root", "r"
+        output = io.StringIO()
+        run_fleet(
+            devices,
+            "devicemgmt",
+            "GetDeviceInformation",
+            username="admin",
+            password="a",
+            output_format="csv",
+            output=output,
+            timeout=5,
+            cache=CacheMode.MEM,
+        )
+
+        [row] = list(csv.DictReader(io.StringIO(output.getvalue())))
+        assert row["status"] == "ok"
+        assert json.loads(row["result"])["SerialNumber"] == str(devices[0]["port"])
+
+    def test_unknown_method_is_reported_per_device(self, cameras):
+        output = io.StringIO()
+        ok, failed = run_fleet(
+            self._devices(cameras)[:1],
+            "devicemgmt",
+            "NoSuchMethod",
+            username="admin",
+            password="a",
+            output=output,
+            timeout=5,
+            cache=CacheMode.MEM,
+        )
+        assert (ok, failed) == (0, 1)
+        record = json.loads(output.getvalue())
+        assert "NoSuchMethod" in record["error"]
+        assert "\x1b[" not in record["error"]
@@ -0,0 +1,157 @@
+# tests/test_health_monitor.py
+
+import socket
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from onvif.utils import ONVIFHealthMonitor
+from helpers import DeviceServiceHandler, closed_port, serve
+
+
+class KeepAliveHandler(DeviceServiceHandler):
+    """DeviceServiceHandler that keeps connections open and records them"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections.append(self.connection)
+
+
+@pytest.fixture
+def keep_alive_device():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.device_path = "/onvif/device_service"
+    server.connections = []
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def device():
+    server = serve()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def web_server():
+    server = serve(device_path="/nothing-here")
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+class TestHealthChecks:
+    """Test checks and state transitions against local stand-ins"""
+
+    def test_up_reuses_connection(self, keep_alive_device):
+        port = keep_alive_device.server_address[1]
+        monitor = ONVIFHealthMonitor()
+        name = monitor.add("127.0.0.1", port)
+
+        checks = [monitor.check(name) for _ in range(3)]
+        assert [c.state for c in checks] == ["up"] * 3
+        assert checks[0].device_time.year == 2025
+        assert len(keep_alive_device.connections) == 1
+
+        metrics = monitor.metrics()[name]
+        assert metrics["checks"] == 3 and metrics["failures"] == 0
+        assert 0 < metrics["latency_min"] <= metrics["latency_avg"]
+        assert metrics["latency_avg"] <= metrics["latency_max"]
+        monitor.stop()
+
+    def test_reconnects_when_idle_connection_closed(self, keep_alive_device):
+        port = keep_alive_device.server_address[1]
+        monitor = ONVIFHealthMonitor()
+        name = monitor.add("127.0.0.1", port)
+
+        assert monitor.check(name).ok
+        keep_alive_device.connections[0].shutdown(socket.SHUT_RDWR)
+        check = monitor.check(name)
+        assert check.ok and monitor.metrics()[name]["failures"] == 0
+        assert len(keep_alive_device.connections) == 2
+        monitor.stop()
+
+    def test_failures_are_confirmed_before_down(self):
+        server = serve()
+        port = server.server_address[1]
+        changes = []
+        monitor = ONVIFHealthMonitor(
+            interval=10, failures=2, on_change=lambda c, p: changes.append((p, c.state))
+        )
+        name = monitor.add("127.0.0.1", port)
+        assert monitor.check(name).state == "up"
+
+        server.shutdown()
+        server.server_close()
+        first = monitor.check(name)
+        assert (first.ok, first.stage, first.state) == (False, "connect", "up")
+        assert monitor.metrics()[name]["interval"] <= monitor.min_interval
+
+        assert monitor.check(name).state == "down"
+        assert changes == [("unknown", "up"), ("up", "down")]
+
+        # Backs off while down
+        intervals = []
+        for _ in range(3):
+            monitor.check(name)
+            intervals.append(monitor.metrics()[name]["interval"])
+        assert intervals[0] < intervals[1] < intervals[2] <= monitor.max_interval
+
+    def test_degraded_when_port_open_but_not_onvif(self, web_server):
+        monitor = ONVIFHealthMonitor()
+        check = monitor.check(monitor.add("127.0.0.1", web_server))
+        assert (check.state, check.stage) == ("degraded", "soap")
+
+    def test_down_from_unknown_immediately(self):
+        monitor = ONVIFHealthMonitor(timeout=0.5)
+        check = monitor.check(monitor.add("127.0.0.1", closed_port()))
+        assert check.state == "down"
+        assert check.error
+
+
+class TestHealthScheduler:
+    """Test the shared scheduler"""
+
+    def test_schedules_many_devices(self, device):
+        checked = {}
+        done = threading.Event()
+
+        def on_check(check):
+            checked[check.name] = checked.get(check.name, 0) + 1
+            if len(checked) == 5 and min(checked.values()) >= 3:
+                done.set()
+
+        monitor = ONVIFHealthMonitor(interval=0.1, timeout=0.5, on_check=on_check)
+        monitor.add("127.0.0.1", device)
+        for i in range(4):
+            monitor.add("127.0.0.1", closed_port(), name=f"dead-{i}")
+
+        threads = threading.active_count()
+        with monitor:
+            assert done.wait(5)
+            # One scheduler thread plus the worker pool
+            assert threading.active_count() <= threads + 1 + monitor.workers
+
+        states = {m["state"] for m in monitor.metrics().values()}
+        assert states == {"up", "down"}
+
+    def test_remove_and_stop(self, device):
+        seen = []
+        monitor = ONVIFHealthMonitor(interval=0.05, on_check=seen.append)
+        name = monitor.add("127.0.0.1", device)
+        monitor.start()
+        monitor.remove(name)
+        monitor.stop()
+        count = len(seen)
+        time.sleep(0.2)
+        assert name not in monitor.metrics()
+        assert len(seen) == count
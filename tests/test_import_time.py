@@ -0,0 +1,110 @@
+# tests/test_import_time.py
+
+import subprocess
+import sys
+
+import pytest
+
+import onvif
+import onvif.services
+import onvif.utils
+
+# Upper bound for the cumulative import time of the `onvif` package itself
+# (excluding the interpreter's own startup). The eager import of zeep,
+# requests and every service module took ~250 ms; the lazy package should
+# stay far below that.
+IMPORT_BUDGET_US = 100_000
+
+# Modules that must not be loaded by `import onvif` / discovery-only usage
+HEAVY_MODULES = ["zeep", "requests", "onvif.client", "onvif.operator"]
+
+
+def _importtime(code: str) -> dict:
+    """Run code with `python -X importtime` and return {module: cumulative_us}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def _loaded_modules(code: str) -> set:
+    """Run code in a fresh interpreter and return the names in sys.modules."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+class TestImportTime:
+    """Import-time benchmark for lazy loading"""
+
+    def test_import_onvif_is_lightweight(self):
+        """`import onvif` doesn't pull in zeep, requests or service modules"""
+        modules = _importtime("import onvif")
+
+        loaded = _loaded_modules("import onvif")
+        for heavy in HEAVY_MODULES:
+            assert heavy not in loaded, f"{heavy} imported by `import onvif`"
+        assert not [m for m in loaded if m.startswith("onvif.services")]
+
+        print(f"\nimport onvif: {modules['onvif']} us")
+        assert modules["onvif"] < IMPORT_BUDGET_US
+
+    def test_discovery_only_import(self):
+        """ONVIFDiscovery can be used without the SOAP stack"""
+        modules = _loaded_modules("from onvif import ONVIFDiscovery")
+
+        assert "onvif.utils.discovery" in modules
+        for heavy in HEAVY_MODULES:
+            assert heavy not in modules, f"{heavy} imported by ONVIFDiscovery"
+
+    def test_client_import_defers_services(self):
+        """Importing ONVIFClient doesn't import any service module"""
+        modules = _loaded_modules("from onvif import ONVIFClient")
+
+        assert "onvif.client" in modules
+        assert not [m for m in modules if m.startswith("onvif.services.")]
+
+
+class TestLazyAttributes:
+    """Test module-level __getattr__ behavior"""
+
+    def test_public_names_resolve(self):
+        for name in onvif.__all__:
+            assert getattr(onvif, name) is not None
+        for name in onvif.services.__all__:
+            assert getattr(onvif.services, name).__name__ == name
+        for name in onvif.utils.__all__:
+            assert getattr(onvif.utils, name).__name__ == name
+
+    def test_unknown_name_raises(self):
+        with pytest.raises(AttributeError):
+            onvif.DoesNotExist
+        with pytest.raises(AttributeError):
+            onvif.services.DoesNotExist
+        with pytest.raises(AttributeError):
+            onvif.utils.DoesNotExist
+
+    def test_dir_lists_lazy_names(self):
+        assert "ONVIFClient" in dir(onvif)
+        assert "Media2" in dir(onvif.services)
+
+    def test_client_accessor_imports_service(self, mock_onvif_client):
+        """Service accessors resolve classes at call time"""
+        from unittest.mock import patch
+
+        with patch("onvif.client.Imaging") as mock_imaging:
+            imaging = mock_onvif_client.imaging()
+            assert imaging is mock_imaging.return_value
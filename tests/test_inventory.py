@@ -0,0 +1,205 @@
+# tests/test_inventory.py
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from lxml import etree
+from zeep import xsd
+
+from onvif.utils import ONVIFInventory
+from onvif.utils.inventory import serialize
+
+MEDIA = "http://www.onvif.org/ver10/media/wsdl"
+IMAGING = "http://www.onvif.org/ver20/imaging/wsdl"
+PTZ = "http://www.onvif.org/ver20/ptz/wsdl"
+
+
+def camera(fake_client, host="10.0.0.1", delay=0.05, ptz=True):
+    """Fake client with two profiles and one video source"""
+    profiles = [SimpleNamespace(token="main"), SimpleNamespace(token="sub")]
+    results = {
+        "devicemgmt.GetDeviceInformation": SimpleNamespace(
+            Model="Cam", SerialNumber=host
+        ),
+        "devicemgmt.GetHostname": SimpleNamespace(Name="cam", FromDHCP=False),
+        "devicemgmt.GetScopes": [SimpleNamespace(ScopeItem="onvif://x/name/cam")],
+        "devicemgmt.GetSystemDateAndTime": SimpleNamespace(DateTimeType="NTP"),
+        "devicemgmt.GetNTP": SimpleNamespace(FromDHCP=False),
+        "devicemgmt.GetDNS": SimpleNamespace(FromDHCP=True),
+        "devicemgmt.GetNetworkInterfaces": [SimpleNamespace(token="eth0")],
+        # GetNetworkProtocols is not supported
+        "media.GetProfiles": profiles,
+        "media.GetVideoSources": [SimpleNamespace(token="vs0", Framerate=25.0)],
+        "media.GetStreamUri": lambda StreamSetup, ProfileToken: SimpleNamespace(
+            Uri=f"rtsp://{host}/{ProfileToken}"
+        ),
+        "media.GetSnapshotUri": lambda ProfileToken: SimpleNamespace(
+            Uri=f"http://{host}/snap/{ProfileToken}"
+        ),
+        "imaging.GetImagingSettings": lambda VideoSourceToken: SimpleNamespace(
+            Brightness=50.0
+        ),
+        "imaging.GetOptions": lambda VideoSourceToken: SimpleNamespace(
+            Brightness=SimpleNamespace(Min=0.0, Max=100.0)
+        ),
+        "ptz.GetNodes": [SimpleNamespace(token="ptz0")],
+    }
+    namespaces = [MEDIA, IMAGING] + ([PTZ] if ptz else [])
+    return fake_client(host, results, delay, namespaces)
+
+
+class TestSerialize:
+    """Test conversion of results into builtins"""
+
+    def test_zeep_objects_and_leaves(self):
+        element = xsd.Element(
+            "Settings",
+            xsd.ComplexType(
+                [
+                    xsd.Element("Name", xsd.String()),
+                    xsd.Element("Level", xsd.Decimal()),
+                    xsd.Element("When", xsd.DateTime()),
+                    xsd.Element("Every", xsd.Duration()),
+                    xsd.Element("Raw", xsd.Base64Binary()),
+                ]
+            ),
+        )
+        value = element(
+            Name="cam",
+            Level=Decimal("0.5"),
+            When=datetime(2025, 3, 14, 8, 30),
+            Every=timedelta(seconds=90),
+            Raw=b"\x00\x01",
+        )
+        result = serialize([value, {"__original_elements__": [], "x": (1, 2)}])
+
+        assert result == [
+            {
+                "Name": "cam",
+                "Level": 0.5,
+                "When": "2025-03-14T08:30:00",
+                "Every": "PT1M30S",
+                "Raw": "AAE=",
+            },
+            {"x": [1, 2]},
+        ]
+        json.dumps(result)
+
+    def test_simple_content_kept_any_dropped(self):
+        schema = xsd.Schema(etree.fromstring(b"""
+            <xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+                targetNamespace="urn:t" xmlns:t="urn:t"
+                elementFormDefault="qualified">
+              <xs:complexType name="Item">
+                <xs:simpleContent>
+                  <xs:extension base="xs:string">
+                    <xs:attribute name="Name" type="xs:string"/>
+                  </xs:extension>
+                </xs:simpleContent>
+              </xs:complexType>
+              <xs:element name="Config">
+                <xs:complexType>
+                  <xs:sequence>
+                    <xs:element name="Item" type="t:Item" maxOccurs="unbounded"/>
+                    <xs:any namespace="##other" processContents="lax"
+                        minOccurs="0" maxOccurs="unbounded"/>
+                  </xs:sequence>
+                </xs:complexType>
+              </xs:element>
+            </xs:schema>"""))
+        value = schema.get_element("{urn:t}Config").parse(
+            etree.fromstring(
+                b'<Config xmlns="urn:t"><Item Name="a">on</Item>'
+                b'<Item Name="b">off</Item><x:Ext xmlns:x="urn:x">1</x:Ext></Config>'
+            ),
+            schema,
+        )
+        # _value_1 holds the raw element, or a flattened dict once ZeepPatcher
+        # is applied; dropped either way
+
+        assert serialize(value) == {
+            "Item": [
+                {"_value_1": "on", "Name": "a"},
+                {"_value_1": "off", "Name": "b"},
+            ]
+        }
+        assert serialize({"_value_1": [{"Flattened": 1}], "_value_2": 0}) == {
+            "_value_2": 0
+        }
+
+
+class TestONVIFInventory:
+    """Test concurrent collection against a fake client"""
+
+    def test_record(self, fake_client):
+        client = camera(fake_client)
+        record = ONVIFInventory(client).collect()
+
+        assert record["host"] == "10.0.0.1"
+        assert record["device"]["information"] == {
+            "Model": "Cam",
+            "SerialNumber": "10.0.0.1",
+        }
+        assert record["media"]["stream_uris"] == {
+            "main": "rtsp://10.0.0.1/main",
+            "sub": "rtsp://10.0.0.1/sub",
+        }
+        assert record["media"]["snapshot_uris"]["sub"] == "http://10.0.0.1/snap/sub"
+        assert record["imaging"]["vs0"]["options"]["Brightness"]["Max"] == 100.0
+        assert record["ptz"]["nodes"] == [{"token": "ptz0"}]
+        assert list(record["errors"]) == ["devicemgmt.GetNetworkProtocols"]
+        json.dumps(record)
+
+    def test_concurrency_cap_and_fan_out(self, fake_client):
+        # 17 calls of 50ms each: ~0.85s serially, ~5 rounds with 4 in flight
+        client = camera(fake_client, delay=0.05)
+        start = time.monotonic()
+        record = ONVIFInventory(client, max_concurrency=4).collect()
+        elapsed = time.monotonic() - start
+
+        assert len(client.calls) == 17
+        assert client.max_in_flight == 4
+        assert elapsed < 0.5
+        assert record["elapsed"] == pytest.approx(elapsed, abs=0.05)
+
+        # Stream URIs were requested right after GetProfiles returned, not
+        # after all root calls
+        started = {(s, op, kw.get("ProfileToken")): t for t, s, op, kw in client.calls}
+        profiles_done = started[("media", "GetProfiles", None)] + client.delay
+        assert started[("media", "GetStreamUri", "main")] < profiles_done + 0.1
+
+    def test_services_created_once_before_fan_out(self, fake_client):
+        client = camera(fake_client)
+        ONVIFInventory(client).collect()
+
+        names = [name for name, _ in client.accessors]
+        assert sorted(names) == ["devicemgmt", "imaging", "media", "ptz"]
+        assert {thread for _, thread in client.accessors} == {
+            threading.current_thread()
+        }
+
+    def test_skips_unadvertised_services_and_sections(self, fake_client):
+        client = camera(fake_client, ptz=False)
+        record = ONVIFInventory(client, sections=["media", "ptz"]).collect()
+        assert "device" not in record
+        assert record["ptz"] == {}
+        assert {service for _, service, _, _ in client.calls} == {"media"}
+
+        with pytest.raises(ValueError):
+            ONVIFInventory(client, sections=["firmware"])
+
+    def test_fleet(self, fake_client):
+        clients = [camera(fake_client, f"10.0.0.{i}") for i in range(1, 7)]
+        start = time.monotonic()
+        records = list(ONVIFInventory.fleet(clients, workers=6))
+        elapsed = time.monotonic() - start
+
+        assert sorted(r["host"] for r in records) == [
+            c.common_args["host"] for c in clients
+        ]
+        assert elapsed < 0.5
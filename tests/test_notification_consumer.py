@@ -0,0 +1,186 @@
+# tests/test_notification_consumer.py
+
+import queue
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from onvif.utils import ONVIFNotificationConsumer
+from helpers import notify_body
+
+
+def _post(url, body):
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/soap+xml"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+class StandInDevice:
+    """Device stand-in: accepts Subscribe and POSTs notifications back"""
+
+    def __init__(self, reference="http://127.0.0.1/onvif/Subscription?Idx=7"):
+        self.common_args = {"host": "127.0.0.1", "port": 80}
+        self.reference = reference
+        self.consumer_address = None
+        self.notification_service = Mock()
+        self.notification_service.Subscribe.side_effect = self._subscribe
+        self.manager = Mock()
+        self.manager.Renew.side_effect = lambda **kwargs: self._times()
+
+    @staticmethod
+    def _times(lifetime=60):
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        return SimpleNamespace(
+            CurrentTime=now, TerminationTime=now + timedelta(seconds=lifetime)
+        )
+
+    def _subscribe(self, ConsumerReference, **kwargs):
+        self.consumer_address = ConsumerReference["Address"]
+        times = self._times()
+        return {
+            "SubscriptionReference": {"Address": {"_value_1": self.reference}},
+            "CurrentTime": times.CurrentTime,
+            "TerminationTime": times.TerminationTime,
+        }
+
+    def notification(self):
+        return self.notification_service
+
+    def subscription(self, ref):
+        return self.manager
+
+    def push(self, *messages, url=None):
+        body = notify_body(
+            *[(self.reference, topic, value) for topic, value in messages]
+        )
+        return _post(url or self.consumer_address, body)
+
+
+@pytest.fixture
+def consumer():
+    consumer = ONVIFNotificationConsumer(host="127.0.0.1", workers=2).start()
+    yield consumer
+    consumer.close()
+
+
+class TestNotificationConsumer:
+    """Test the push notification endpoint"""
+
+    def test_subscribe_sends_consumer_reference(self, consumer):
+        device = StandInDevice()
+        subscription = consumer.subscribe(device)
+
+        kwargs = device.notification_service.Subscribe.call_args.kwargs
+        assert kwargs["InitialTerminationTime"] == "PT300S"
+        assert device.consumer_address == (
+            f"http://127.0.0.1:{consumer.port}/onvif/notify/{subscription.token}"
+        )
+        assert subscription.manager_address == device.reference
+
+    def test_push_to_queue(self, consumer):
+        device = StandInDevice()
+        subscription = consumer.subscribe(device)
+
+        status = device.push(("tns1:VideoSource/MotionAlarm", "true"))
+        assert status == 202
+
+        event = subscription.queue.get(timeout=5)
+        assert event.topic == "tns1:VideoSource/MotionAlarm"
+        assert event.data == {"IsMotion": "true"}
+        assert event.subscription == device.reference
+        assert consumer.stats["messages"] == 1
+
+    def test_push_to_callback(self, consumer):
+        received = []
+        done = threading.Event()
+
+        def callback(message):
+            received.append(message)
+            if len(received) == 2:
+                done.set()
+
+        device = StandInDevice()
+        consumer.subscribe(device, callback=callback)
+        device.push(("tns1:A", "true"), ("tns1:B", "false"))
+
+        assert done.wait(5)
+        assert len(consumer.subscriptions) == 1
+
+    def test_routes_by_subscription_reference(self, consumer):
+        first = StandInDevice("http://10.0.0.1/onvif/Subscription?Idx=1")
+        second = StandInDevice("http://10.0.0.2/onvif/Subscription?Idx=2")
+        sub_first = consumer.subscribe(first)
+        sub_second = consumer.subscribe(second)
+
+        base = f"http://127.0.0.1:{consumer.port}/onvif/notify"
+        assert second.push(("tns1:B", "true"), url=base) == 202
+
+        assert sub_second.queue.get(timeout=5) is not None
+        assert sub_first.queue.empty()
+
+    def test_unknown_and_invalid_requests(self, consumer):
+        base = f"http://127.0.0.1:{consumer.port}/onvif/notify"
+        body = notify_body(("http://unknown/sub", "tns1:A", "true"))
+
+        assert _post(f"{base}/nope", body) == 404
+        assert _post(base, b"<not-xml") == 400
+        assert consumer.stats["unrouted"] == 1
+
+    def test_renew_and_resubscribe(self, consumer):
+        device = StandInDevice()
+        subscription = consumer.subscribe(device)
+
+        consumer._refresh(subscription)
+        device.manager.Renew.assert_called_once_with(TerminationTime="PT300S")
+
+        device.manager.Renew.side_effect = RuntimeError("expired")
+        consumer._refresh(subscription)
+        assert device.notification_service.Subscribe.call_count == 2
+        assert subscription.stats["errors"] == 1
+
+    def test_slow_renewal_does_not_delay_others(self):
+        consumer = ONVIFNotificationConsumer(host="127.0.0.1", renew_margin=1000)
+        slow, fast = StandInDevice(), StandInDevice()
+        release = threading.Event()
+        slow.manager.Renew.side_effect = lambda **kwargs: (
+            release.wait(5),
+            slow._times(),
+        )[1]
+
+        with consumer:
+            consumer.subscribe(slow)
+            consumer.subscribe(fast)
+            # Both are due on every pass of the renewal thread; the slow device
+            # stays blocked in Renew while the fast one keeps being renewed
+            deadline = time.monotonic() + 5
+            while fast.manager.Renew.call_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert fast.manager.Renew.call_count >= 2
+            assert slow.manager.Renew.call_count == 1
+            release.set()
+
+    def test_close_unsubscribes(self):
+        consumer = ONVIFNotificationConsumer(host="127.0.0.1").start()
+        device = StandInDevice()
+        consumer.subscribe(device)
+        consumer.close()
+
+        device.manager.Unsubscribe.assert_called_once_with()
+
+    def test_full_queue_drops(self, consumer):
+        device = StandInDevice()
+        subscription = consumer.subscribe(device, queue=queue.Queue(maxsize=1))
+        device.push(("tns1:A", "1"), ("tns1:A", "2"))
+
+        assert subscription.queue.qsize() == 1
+        assert subscription.stats["errors"] == 1
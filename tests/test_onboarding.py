@@ -0,0 +1,100 @@
+# tests/test_onboarding.py
+
+import time
+
+import pytest
+
+from onvif import CacheMode
+from onvif.utils import ONVIFOnboarding
+from helpers import closed_port
+
+
+def _onboarding(credentials, **kwargs):
+    return ONVIFOnboarding(credentials, timeout=5, cache=CacheMode.MEM, **kwargs)
+
+
+class TestONVIFOnboarding:
+    """Test the onboarding pipeline against local device stand-ins"""
+
+    def test_tries_credentials_in_order(self, cameras):
+        admin = cameras("admin")
+        operator = cameras("operator", basic_auth=["admin"])
+        nobody = cameras("root")
+        onboarding = _onboarding([("admin", "a"), ("operator", "b")])
+
+        results = {
+            r.device["port"]: r
+            for r in onboarding.run(
+                [("127.0.0.1", p) for p in (admin, operator, nobody)]
+            )
+        }
+
+        assert results[admin].username == "admin"
+        assert results[admin].info.SerialNumber == str(admin)
+        assert results[admin].client is not None
+        # Rejected by HTTP 401, accepted with the second credential
+        assert results[operator].username == "operator"
+        assert results[operator].info.Model == "Cam"
+        assert results[nobody].client is None
+        assert results[nobody].error == "not authorized (2 credentials tried)"
+
+        # One call per rejected credential; only the accepted one gets a client,
+        # whose setup (GetServices, then GetCapabilities) follows the check
+        assert cameras.servers[nobody].requests == [
+            ("admin", "GetDeviceInformation"),
+            ("operator", "GetDeviceInformation"),
+        ]
+        assert cameras.servers[operator].requests == [
+            ("admin", "GetDeviceInformation"),
+            ("operator", "GetDeviceInformation"),
+            ("operator", "GetServices"),
+            ("operator", "GetCapabilities"),
+        ]
+
+    def test_unreachable(self):
+        result = _onboarding([("admin", "a")]).onboard(("127.0.0.1", closed_port()))
+        assert result.client is None
+        assert result.error.startswith("unreachable")
+
+    def test_streams_and_parallelizes(self, cameras):
+        # Devices arrive from a slow source; each takes ~0.3s to answer. The first
+        # result comes out while the source is still producing, and all of them
+        # finish in about one device's time
+        ports = [cameras("admin", delay=0.1) for _ in range(6)]
+
+        def source():
+            for port in ports:
+                yield {"host": "127.0.0.1", "port": port, "use_https": False}
+                time.sleep(0.05)
+            yield {"host": "127.0.0.1", "port": ports[0], "use_https": False}
+            time.sleep(1.0)
+
+        onboarding = _onboarding([("admin", "a")], workers=8)
+        onboarding.onboard(("127.0.0.1", ports[0]))  # Compile the shared WSDL
+
+        start = time.monotonic()
+        iterator = onboarding.run(source())
+        first = next(iterator)
+        first_at = time.monotonic() - start
+        results = [first] + list(iterator)
+
+        assert first.client is not None
+        assert first_at < 1.0
+        # Duplicates are onboarded once
+        assert sorted(r.device["port"] for r in results) == sorted(ports)
+        assert all(r.username == "admin" for r in results)
+
+    def test_shares_compiled_wsdl(self, cameras):
+        ports = [cameras("admin"), cameras("admin")]
+        onboarding = _onboarding([("admin", "a")])
+        first, second = (onboarding.onboard(("127.0.0.1", p)) for p in ports)
+
+        wsdl = first.client.devicemgmt().operator.client.wsdl
+        assert second.client.devicemgmt().operator.client.wsdl is wsdl
+        assert first.client.devicemgmt().operator.client.transport is not (
+            second.client.devicemgmt().operator.client.transport
+        )
+
+    def test_requires_credentials(self):
+        with pytest.raises(ValueError):
+            ONVIFOnboarding([])
@@ -0,0 +1,219 @@
+# tests/test_pull_tuner.py
+
+import pytest
+from lxml import etree
+from zeep.exceptions import Fault
+
+from onvif.utils import ONVIFEventStream, ONVIFOperationException, ONVIFPullTuner
+from helpers import FakeDevice
+
+FAULT_DETAIL = b"""<env:Detail xmlns:env="http://www.w3.org/2003/05/soap-envelope"
+                        xmlns:tev="http://www.onvif.org/ver10/events/wsdl">
+  <tev:PullMessagesFaultResponse>
+    <tev:MaxTimeout>PT20S</tev:MaxTimeout>
+    <tev:MaxMessageLimit>50</tev:MaxMessageLimit>
+  </tev:PullMessagesFaultResponse>
+</env:Detail>"""
+
+
+def pull_fault():
+    fault = Fault("Invalid argument", detail=etree.fromstring(FAULT_DETAIL))
+    return ONVIFOperationException("PullMessages", fault)
+
+
+class SimulatedSource:
+    """PullPoint simulation in virtual time with evenly spaced events.
+
+    A responsive device answers as soon as a message is pending; a holding
+    device waits for Timeout (or MessageLimit) before answering.
+    """
+
+    def __init__(self, rate, holding=False, rtt=0.02):
+        self.interval = 1.0 / rate
+        self.holding = holding
+        self.rtt = rtt
+        self.next_event = 1  # Index of the next undelivered event
+        self.latencies = []
+
+    def _arrival(self, index):
+        return index * self.interval
+
+    def pull(self, now, timeout, limit):
+        """Return (count, elapsed) of one PullMessages issued at now."""
+        deadline = now + timeout
+        first = self._arrival(self.next_event)
+
+        if self.holding:
+            # Answer at Timeout, or once MessageLimit messages are pending
+            full_at = self._arrival(self.next_event + limit - 1)
+            answered = max(now, min(deadline, full_at))
+        elif first <= deadline:
+            answered = max(now, first)
+        else:
+            answered = deadline
+
+        count = 0
+        while count < limit and self._arrival(self.next_event) <= answered:
+            self.latencies.append(answered + self.rtt - self._arrival(self.next_event))
+            self.next_event += 1
+            count += 1
+        return count, answered + self.rtt - now
+
+
+def simulate(rate, holding, tuner=None, duration=600.0):
+    """Run a puller for duration virtual seconds; return (requests/event, p95 latency)."""
+    source = SimulatedSource(rate, holding)
+    now = pulls = 0
+    while now < duration:
+        timeout, limit = tuner.next_request() if tuner else (5, 1000)
+        count, elapsed = source.pull(now, timeout, limit)
+        now += elapsed
+        pulls += 1
+        if tuner:
+            tuner.observe(count, elapsed, now)
+
+    latencies = sorted(source.latencies)
+    return (
+        pulls / max(len(latencies), 1),
+        latencies[int(len(latencies) * 0.95)] if latencies else None,
+    )
+
+
+class TestPullTuner:
+    """Test adaptive Timeout/MessageLimit selection"""
+
+    def test_full_pulls_double_limit(self):
+        tuner = ONVIFPullTuner(max_limit=300)
+        assert tuner.next_request() == (1, 100)
+        tuner.observe(100, 0.01, now=1)
+        assert tuner.message_limit == 200
+        tuner.observe(200, 0.01, now=2)
+        assert tuner.message_limit == 300
+
+    def test_holding_device_gets_short_timeout(self):
+        tuner = ONVIFPullTuner(target_latency=2)
+        tuner.observe(3, 2.0, now=2)
+        assert tuner.holding
+        assert tuner.next_request()[0] == 2
+
+        # Early answer with messages: the device is responsive after all
+        tuner.observe(1, 0.1, now=3)
+        assert not tuner.holding
+        assert tuner.next_request()[0] == 4
+        for second in range(4, 10):
+            tuner.observe(0, tuner.timeout, now=second)
+        assert tuner.next_request()[0] == 60
+
+    def test_delayed_full_batch_means_holding(self):
+        tuner = ONVIFPullTuner(target_latency=1)
+        tuner.observe(100, 0.02, now=1)
+        assert not tuner.holding
+        tuner.observe(200, 0.9, now=2)
+        assert tuner.holding
+
+    def test_limit_follows_rate(self):
+        tuner = ONVIFPullTuner(target_latency=1, min_limit=10)
+        for second in range(1, 30):
+            tuner.observe(80, 0.05, now=second)
+        assert 150 <= tuner.message_limit <= 200
+
+        for second in range(30, 60):
+            tuner.observe(0, 60, now=second * 60)
+        assert tuner.message_limit == 10
+
+    def test_apply_fault(self):
+        tuner = ONVIFPullTuner()
+        assert tuner.apply_fault(pull_fault())
+        assert tuner.max_timeout == 20
+        assert tuner.max_limit == 50
+        for second in range(10):
+            tuner.observe(0, tuner.timeout, now=second)
+        assert tuner.next_request() == (20, 10)
+        assert tuner.stats["faults"] == 1
+
+        assert not tuner.apply_fault(ONVIFOperationException("X", Exception("x")))
+
+    def test_repeated_fault_propagates(self):
+        tuner = ONVIFPullTuner()
+        assert tuner.apply_fault(pull_fault())
+        # The same limits again: nothing to adjust, so don't retry
+        assert not tuner.apply_fault(pull_fault())
+        assert tuner.stats["faults"] == 2
+
+    def test_metrics(self):
+        tuner = ONVIFPullTuner()
+        assert tuner.metrics()["requests_per_event"] is None
+        tuner.observe(4, 0.1, now=1)
+        tuner.observe(0, 60, now=61)
+        assert tuner.metrics()["requests_per_event"] == 0.5
+
+
+class TestPullTunerBenchmark:
+    """Compare fixed (PT5S, 1000) and adaptive pulling against simulated sources"""
+
+    @pytest.mark.parametrize("rate", [0.01, 0.2, 5, 200])
+    def test_responsive_device(self, rate):
+        fixed_rpe, _ = simulate(rate, holding=False)
+        adaptive_rpe, adaptive_p95 = simulate(
+            rate, holding=False, tuner=ONVIFPullTuner(target_latency=1)
+        )
+        print(
+            f"\nrate={rate}/s responsive: requests/event {fixed_rpe:.3f} -> {adaptive_rpe:.3f}"
+        )
+
+        # Probing from a short Timeout costs a few requests up front
+        assert adaptive_rpe <= fixed_rpe * 1.05
+        assert adaptive_p95 <= 1
+
+    @pytest.mark.parametrize("rate", [0.2, 5, 200])
+    def test_holding_device(self, rate):
+        fixed_rpe, fixed_p95 = simulate(rate, holding=True)
+        adaptive_rpe, adaptive_p95 = simulate(
+            rate, holding=True, tuner=ONVIFPullTuner(target_latency=1)
+        )
+        print(
+            f"\nrate={rate}/s holding: p95 latency {fixed_p95:.2f}s -> {adaptive_p95:.2f}s, "
+            f"requests/event {fixed_rpe:.3f} -> {adaptive_rpe:.3f}"
+        )
+
+        # Latency target is met (plus one round trip)
+        assert adaptive_p95 <= 1.1
+
+
+class TestAdaptiveEventStream:
+    """Test ONVIFEventStream(adaptive=True)"""
+
+    def test_stream_uses_tuned_values(self):
+        device = FakeDevice(batches=[["a"] * 100])
+        stream = ONVIFEventStream(
+            device, adaptive=True, pull_timeout=30, message_limit=500
+        )
+        stream.pull_once()
+
+        device.pullpoint_service.PullMessages.assert_called_with(
+            Timeout="PT1S", MessageLimit=100
+        )
+        assert stream.tuner.message_limit == 200
+        assert stream.tuner.max_timeout == 30
+        assert stream.tuner.max_limit == 500
+
+    def test_stream_applies_fault_limits(self):
+        device = FakeDevice(batches=[pull_fault(), ["a"]])
+        stream = ONVIFEventStream(device, adaptive=True)
+
+        assert stream.pull_once() == []
+        assert stream.subscribed
+        assert stream.pull_once() == ["a"]
+        device.pullpoint_service.PullMessages.assert_called_with(
+            Timeout="PT1S", MessageLimit=50
+        )
+        assert stream.tuner.max_timeout == 20
+
+    def test_fixed_by_default(self):
+        device = FakeDevice(batches=[["a"]])
+        stream = ONVIFEventStream(device, pull_timeout=5, message_limit=10)
+        stream.pull_once()
+        assert stream.tuner is None
+        device.pullpoint_service.PullMessages.assert_called_with(
+            Timeout="PT5S", MessageLimit=10
+        )
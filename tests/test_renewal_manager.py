@@ -0,0 +1,184 @@
+# tests/test_renewal_manager.py
+
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from onvif.utils import ONVIFEventStream, ONVIFRenewalManager
+from helpers import FakeDevice
+
+
+def _reference(lifetime, address="http://cam/onvif/Subscription?Idx=1"):
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return SimpleNamespace(
+        SubscriptionReference={"Address": {"_value_1": address}},
+        CurrentTime=now,
+        TerminationTime=now + timedelta(seconds=lifetime),
+    )
+
+
+class StandInClient:
+    """ONVIFClient stand-in handing out one Mock manager per subscription address"""
+
+    def __init__(self, lifetime=1.0):
+        self.common_args = {"host": "cam", "port": 80}
+        self.lifetime = lifetime
+        self.managers = {}
+
+    def _manager(self, ref):
+        address = ref.SubscriptionReference["Address"]["_value_1"]
+        if address not in self.managers:
+            manager = Mock()
+            manager.Renew.side_effect = lambda **kwargs: _reference(self.lifetime)
+            self.managers[address] = manager
+        return self.managers[address]
+
+    def subscription(self, ref):
+        return self._manager(ref)
+
+    def pausable_subscription(self, ref):
+        return self._manager(ref)
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def renewals():
+    manager = ONVIFRenewalManager(workers=2, renew_margin=0.9, jitter=0)
+    yield manager.start()
+    manager.close()
+
+
+class TestRenewalManager:
+    """Test heap-scheduled subscription renewal"""
+
+    def test_schedules_by_expiry(self):
+        manager = ONVIFRenewalManager(renew_margin=10, jitter=0)
+        client = StandInClient()
+        late = manager.register(client, _reference(300, "http://cam/late"))
+        manager.register(client, _reference(60, "http://cam/early"))
+
+        assert manager.next_renewal() == pytest.approx(50, abs=1)
+        manager.unregister(late)
+        assert manager.metrics()["active"] == 1
+
+    def test_renews_before_expiry(self, renewals):
+        client = StandInClient(lifetime=1.0)
+        handle = renewals.register(client, _reference(1.0), lifetime=60)
+
+        assert wait_for(lambda: handle.stats["renewals"] >= 3)
+        handle.manager.Renew.assert_called_with(TerminationTime="PT60S")
+
+        metrics = renewals.metrics()
+        assert metrics["renewals"] >= 3
+        assert metrics["failures"] == 0
+        assert metrics["latency"]["avg"] is not None
+        assert metrics["latency"]["max"] >= metrics["latency"]["avg"]
+
+    def test_jitter_spreads_renewals(self):
+        manager = ONVIFRenewalManager(renew_margin=10, jitter=20)
+        client = StandInClient()
+        for i in range(50):
+            manager.register(client, _reference(300, f"http://cam/{i}"))
+
+        due = sorted(entry[0] for entry in manager._heap)
+        assert due[-1] - due[0] > 5
+
+    def test_resubscribes_and_repoints_on_failure(self, renewals):
+        client = StandInClient()
+        first = _reference(1.0, "http://cam/1")
+        second = _reference(60, "http://cam/2")
+        client._manager(first).Renew.side_effect = Exception("Subscription expired")
+
+        repointed = []
+        handle = renewals.register(
+            client,
+            first,
+            resubscribe=lambda: second,
+            on_resubscribe=repointed.append,
+        )
+
+        assert wait_for(lambda: repointed == [second])
+        assert handle.reference is second
+        assert handle.manager is client.managers["http://cam/2"]
+        assert handle.stats == {"renewals": 0, "failures": 1, "resubscribes": 1}
+        assert handle.consecutive_failures == 0
+        assert renewals.metrics()["resubscribes"] == 1
+
+    def test_expires_without_resubscribe(self):
+        manager = ONVIFRenewalManager(renew_margin=0.9, jitter=0, retry_interval=0.05)
+        client = StandInClient()
+        ref = _reference(1.0)
+        client._manager(ref).Renew.side_effect = Exception("Device offline")
+
+        with manager:
+            handle = manager.register(client, ref)
+            assert wait_for(lambda: not handle.active)
+
+        metrics = manager.metrics()
+        assert metrics["expired"] == 1
+        assert metrics["active"] == 0
+        assert metrics["failures"] >= 2
+
+    def test_backoff_uses_consecutive_failures(self):
+        manager = ONVIFRenewalManager(retry_interval=1.0)
+        handle = manager.register(StandInClient(), _reference(300))
+
+        # A long history of failures doesn't inflate the next retry
+        handle.stats["failures"] = 50
+        handle.consecutive_failures = 1
+        assert manager._backoff(handle) <= 1.0
+
+        handle.consecutive_failures = 10
+        assert manager._backoff(handle) >= 8.0
+
+    def test_close_unsubscribes(self):
+        manager = ONVIFRenewalManager().start()
+        client = StandInClient()
+        handle = manager.register(client, _reference(300))
+        manager.close(unsubscribe=True)
+
+        handle.manager.Unsubscribe.assert_called_once()
+        assert not handle.active
+
+
+class TestRenewalManagerEventStream:
+    """Test delegating event stream renewals"""
+
+    def test_event_stream_registers_subscription(self, renewals):
+        device = FakeDevice(batches=[["a"]])
+        stream = ONVIFEventStream(device, renewal_manager=renewals)
+
+        assert stream.pull_once() == ["a"]
+        assert renewals.metrics()["active"] == 1
+        assert stream.needs_renewal() is False
+
+        stream.unsubscribe()
+        assert renewals.metrics()["active"] == 0
+        device.manager.Unsubscribe.assert_called_once()
+
+    def test_event_stream_is_repointed(self, renewals):
+        device = FakeDevice()
+        stream = ONVIFEventStream(device, renewal_manager=renewals)
+        stream.subscribe()
+        device.manager.Renew.side_effect = Exception("Subscription expired")
+
+        new_pullpoint = Mock()
+        device.pullpoint = lambda ref: new_pullpoint
+
+        # Force the renewal now
+        stream._renewal.expires_at = time.monotonic()
+        with renewals._cond:
+            renewals._schedule(stream._renewal, 0)
+
+        assert wait_for(lambda: stream._pullpoint is new_pullpoint)
+        assert stream.stats["subscriptions"] == 2
+        assert device.events_service.CreatePullPointSubscription.call_count == 2
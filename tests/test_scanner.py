@@ -0,0 +1,151 @@
+# tests/test_scanner.py
+
+import socket
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from onvif.utils import ONVIFScanner
+from onvif.utils.scanner import get_system_date_and_time
+from helpers import Responder, closed_port, probe_match, serve
+
+
+@pytest.fixture
+def device():
+    server = serve()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def web_server():
+    server = serve(device_path="/nothing-here")
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+class TestGetSystemDateAndTime:
+    """Test the unauthenticated verification request"""
+
+    def test_returns_device_clock(self, device):
+        assert get_system_date_and_time("127.0.0.1", device) == datetime(
+            2025, 3, 14, 8, 30, 5, tzinfo=timezone.utc
+        )
+
+    def test_rejects_non_onvif(self, web_server):
+        with pytest.raises(ValueError):
+            get_system_date_and_time("127.0.0.1", web_server)
+
+    def test_connection_refused(self):
+        with pytest.raises(OSError):
+            get_system_date_and_time("127.0.0.1", closed_port(), timeout=0.5)
+
+
+class TestONVIFScanner:
+    """Test the unicast scanner against local stand-ins"""
+
+    def test_tcp_scan_verifies(self, device, web_server):
+        scanner = ONVIFScanner(
+            ports=[device, web_server, closed_port()], timeout=0.5, probe=False
+        )
+        devices = scanner.scan("127.0.0.1")
+
+        assert [(d["host"], d["port"], d["source"]) for d in devices] == [
+            ("127.0.0.1", device, "tcp")
+        ]
+        assert devices[0]["device_time"].year == 2025
+        assert devices[0]["latency"] > 0
+        assert devices[0]["xaddrs"] == [
+            f"http://127.0.0.1:{device}/onvif/device_service"
+        ]
+
+    def test_unverified_reports_open_ports(self, device, web_server):
+        scanner = ONVIFScanner(
+            ports=[device, web_server, closed_port()], probe=False, verify=False
+        )
+        assert sorted(d["port"] for d in scanner.scan(["127.0.0.1"])) == sorted(
+            [device, web_server]
+        )
+
+    def test_unicast_probe(self):
+        server = serve(device_path="/onvif/custom_device")
+        port = server.server_address[1]
+        match = probe_match("cam-1", "127.0.0.1", port).replace(
+            b"/onvif/device_service", b"/onvif/custom_device"
+        )
+        responder = Responder([(0.0, match)])
+        try:
+            scanner = ONVIFScanner(ports=[], timeout=0.5)
+            scanner.WS_DISCOVERY_PORT = responder.port
+            devices = scanner.scan("127.0.0.1/32")
+        finally:
+            responder.close()
+            server.shutdown()
+            server.server_close()
+
+        assert len(devices) == 1
+        assert devices[0]["source"] == "probe"
+        assert devices[0]["epr"] == "urn:uuid:cam-1"
+        assert devices[0]["port"] == port
+        assert devices[0]["device_time"] is not None
+
+    def test_probe_hosts(self):
+        responder = Responder([(0.0, probe_match("cam-1", "127.0.0.1", 8080))])
+        try:
+            scanner = ONVIFScanner(ports=[], timeout=0.3)
+            scanner.WS_DISCOVERY_PORT = responder.port
+            devices = scanner.probe_hosts(["127.0.0.1"])
+        finally:
+            responder.close()
+
+        assert [(d["epr"], d["port"]) for d in devices] == [("urn:uuid:cam-1", 8080)]
+        assert devices[0]["source"] == "probe"
+
+    def test_probe_retries_full_send_buffer(self, monkeypatch):
+        responder = Responder([(0.0, probe_match("cam-1", "127.0.0.1", 8080))])
+        sent = []
+
+        class FullBufferSocket(socket.socket):
+            """Reports a full send buffer for the first three sends"""
+
+            def sendto(self, data, address):
+                sent.append(address)
+                if len(sent) <= 3:
+                    raise BlockingIOError
+                return super().sendto(data, address)
+
+        monkeypatch.setattr("onvif.utils.scanner.socket.socket", FullBufferSocket)
+        try:
+            scanner = ONVIFScanner(ports=[], timeout=0.3)
+            scanner.WS_DISCOVERY_PORT = responder.port
+            devices = scanner.probe_hosts(["127.0.0.1"])
+        finally:
+            responder.close()
+
+        assert sent == [("127.0.0.1", responder.port)] * 4
+        assert [d["epr"] for d in devices] == ["urn:uuid:cam-1"]
+
+    def test_streams_and_parallelizes(self, device):
+        # 32 hosts x 2 ports that all time out, plus one real device: the scan
+        # takes about one timeout, and the device is yielded before it ends
+        hosts = ["127.0.0.1"] + [f"10.255.255.{i}" for i in range(1, 33)]
+        scanner = ONVIFScanner(ports=[device, 1], timeout=0.5, probe=False)
+
+        start = time.monotonic()
+        iterator = scanner.iter_scan(hosts)
+        first = next(iterator)
+        first_at = time.monotonic() - start
+        assert list(iterator) == []
+        elapsed = time.monotonic() - start
+
+        assert first["port"] == device
+        assert first_at < 0.4
+        assert elapsed < 2
+
+    def test_hosts(self):
+        assert ONVIFScanner._hosts("192.168.1.0/30") == ["192.168.1.1", "192.168.1.2"]
+        assert ONVIFScanner._hosts("10.0.0.5") == ["10.0.0.5"]
+        assert ONVIFScanner._hosts("camera.local") == ["camera.local"]
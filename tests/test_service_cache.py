@@ -0,0 +1,183 @@
+# tests/test_service_cache.py
+
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import requests
+
+from onvif.services import PullPoint, Subscription
+from onvif.utils.service_cache import ServiceCache, remaining_lifetime
+
+
+def _ref(index=0, lifetime=60):
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return {
+        "SubscriptionReference": {
+            "Address": {"_value_1": f"http://192.168.1.17:8000/onvif/Sub?Idx={index}"}
+        },
+        "CurrentTime": now,
+        "TerminationTime": now + timedelta(seconds=lifetime),
+    }
+
+
+class StandInOperator:
+    """ONVIFOperator stand-in with a real HTTP session and canned responses"""
+
+    closed = 0
+
+    def __init__(self, xaddr, lifetime=60):
+        self.address = xaddr
+        self.lifetime = lifetime
+        session = requests.Session()
+        session.close = self._close
+        self.client = SimpleNamespace(transport=SimpleNamespace(session=session))
+
+    def _close(self):
+        StandInOperator.closed += 1
+
+    def call(self, method, **kwargs):
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        return SimpleNamespace(
+            CurrentTime=now, TerminationTime=now + timedelta(seconds=self.lifetime)
+        )
+
+
+class StandInSubscription(Subscription):
+    def __init__(self, xaddr=None, **kwargs):
+        self.operator = StandInOperator(xaddr)
+
+
+class StandInPullPoint(PullPoint):
+    def __init__(self, xaddr=None, **kwargs):
+        self.operator = StandInOperator(xaddr)
+
+
+def _service():
+    service = Mock()
+    service.operator.client.transport.session.close = Mock()
+    return service
+
+
+class TestServiceCache:
+    """Test the bounded per-subscription service cache"""
+
+    def test_lru_eviction_closes_sessions(self):
+        cache = ServiceCache(max_entries=2)
+        a, b, c = _service(), _service(), _service()
+        cache.put("a", a)
+        cache.put("b", b)
+        assert cache.get("a") is a  # "b" is now least recently used
+        cache.put("c", c)
+
+        assert cache.keys() == ["a", "c"]
+        b.operator.client.transport.session.close.assert_called_once()
+        assert cache.metrics() == {
+            "hits": 1,
+            "misses": 0,
+            "evicted_lru": 1,
+            "evicted_expired": 0,
+            "evicted_unsubscribed": 0,
+            "size": 2,
+        }
+
+    def test_expiry(self):
+        cache = ServiceCache(grace=0)
+        expiring, forever = _service(), _service()
+        cache.put("expiring", expiring, expires_in=0.05)
+        cache.put("forever", forever)
+
+        time.sleep(0.1)
+        assert cache.get("expiring") is None
+        assert "forever" in cache
+        assert cache.stats["evicted_expired"] == 1
+        expiring.operator.client.transport.session.close.assert_called_once()
+
+    def test_extend(self):
+        cache = ServiceCache(grace=0)
+        cache.put("a", _service(), expires_in=0.05)
+        cache.extend("a", 60)
+        time.sleep(0.1)
+        assert cache.purge_expired() == 0
+
+    def test_remaining_lifetime(self):
+        assert remaining_lifetime(_ref(lifetime=30)) == 30
+        assert remaining_lifetime(SimpleNamespace(**_ref(lifetime=30))) == 30
+        assert remaining_lifetime({"SubscriptionReference": {}}, 5) == 5
+
+
+class TestClientSubscriptionCache:
+    """Test ONVIFClient's per-subscription service lifecycle"""
+
+    def test_unsubscribe_evicts_from_all_caches(self, mock_onvif_client):
+        client = mock_onvif_client
+        with (
+            patch("onvif.client.Subscription", StandInSubscription),
+            patch("onvif.client.PullPoint", StandInPullPoint),
+        ):
+            ref = _ref()
+            pullpoint = client.pullpoint(ref)
+            manager = client.subscription(ref)
+            assert client.pullpoint(ref) is pullpoint
+
+            manager.Unsubscribe()
+
+        stats = client.subscription_cache_stats()
+        assert stats["pullpoints"]["size"] == 0
+        assert stats["pullpoints"]["evicted_unsubscribed"] == 1
+        assert stats["pullpoints"]["hits"] == 1
+        assert stats["subscriptions"]["evicted_unsubscribed"] == 1
+
+    def test_renew_extends_expiry(self, mock_onvif_client):
+        client = mock_onvif_client
+        client._subscriptions.grace = 0
+        with patch("onvif.client.Subscription", StandInSubscription):
+            ref = _ref(lifetime=0.05)
+            manager = client.subscription(ref)
+            manager.Renew(TerminationTime="PT60S")
+            time.sleep(0.1)
+
+            assert client.subscription(ref) is manager
+        assert (
+            client.subscription_cache_stats()["subscriptions"]["evicted_expired"] == 0
+        )
+
+    def test_soak_memory_stays_flat(self, mock_onvif_client):
+        """Re-subscribe thousands of times; cache size and memory stay bounded"""
+        client = mock_onvif_client
+        StandInOperator.closed = 0
+
+        def churn(start, count):
+            for i in range(start, start + count):
+                ref = _ref(i)
+                client.pullpoint(ref)
+                manager = client.subscription(ref)
+                if i % 2:
+                    manager.Unsubscribe()
+
+        with (
+            patch("onvif.client.Subscription", StandInSubscription),
+            patch("onvif.client.PullPoint", StandInPullPoint),
+        ):
+            tracemalloc.start()
+            churn(0, 500)  # Warm up: fill the caches
+            gc.collect()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+            churn(500, 5000)
+            gc.collect()
+            growth = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+
+        stats = client.subscription_cache_stats()
+        assert stats["pullpoints"]["size"] <= 64
+        assert stats["subscriptions"]["size"] <= 64
+        # Every service that left a cache had its session closed
+        created = 2 * 5500
+        live = stats["pullpoints"]["size"] + stats["subscriptions"]["size"]
+        assert StandInOperator.closed == created - live
+        # 5000 leaked services would be tens of MB
+        assert growth < 128 * 1024
@@ -0,0 +1,278 @@
+# tests/test_snapshot.py
+
+import base64
+import hashlib
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.request import parse_http_list, parse_keqv_list
+
+import pytest
+
+from onvif.utils import (
+    ONVIFErrorHandler,
+    ONVIFOperationException,
+    ONVIFSnapshotFetcher,
+)
+
+JPEG = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 400 + b"\xff\xd9"
+
+
+def md5(value):
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    """Serves JPEG on /snapshot behind Digest (MD5, qop=auth) or Basic auth"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if not self.path.startswith("/snapshot"):
+            return self.reply(404, b"Not found")
+        if not self.authorized(self.headers.get("Authorization", "")):
+            server.challenges += 1
+            if server.scheme == "digest":
+                challenge = (
+                    f'Digest realm="cam", nonce="{server.nonce}", qop="auth", '
+                    'opaque="xyz"'
+                )
+            else:
+                challenge = 'Basic realm="cam"'
+            return self.reply(401, b"Unauthorized", challenge)
+        delay = server.delay
+        if delay:
+            time.sleep(delay)
+        if server.chunked:
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(JPEG), 10000):
+                chunk = JPEG[start:][:10000]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.reply(200, JPEG)
+
+    def authorized(self, header):
+        server = self.server
+        scheme, _, params = header.partition(" ")
+        if server.scheme == "basic":
+            return header == "Basic " + base64.b64encode(b"admin:secret").decode()
+        if scheme != "Digest":
+            return False
+        fields = parse_keqv_list(parse_http_list(params))
+        if fields.get("nonce") != server.nonce or fields.get("opaque") != "xyz":
+            return False
+        ha1 = md5("admin:cam:secret")
+        ha2 = md5(f"GET:{fields['uri']}")
+        expected = md5(
+            f"{ha1}:{server.nonce}:{fields['nc']}:{fields['cnonce']}:auth:{ha2}"
+        )
+        return fields["response"] == expected
+
+    def reply(self, status, body, challenge=None):
+        self.send_response(status)
+        if challenge:
+            self.send_header("WWW-Authenticate", challenge)
+        self.send_header(
+            "Content-Type", "image/jpeg" if status == 200 else "text/plain"
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(scheme="digest", delay=0, chunked=False):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SnapshotHandler)
+    server.daemon_threads = True
+    server.scheme = scheme
+    server.nonce = "n1"
+    server.delay = delay
+    server.chunked = chunked
+    server.connections = server.requests = server.challenges = 0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+class FakeMedia:
+    def __init__(self, client):
+        self.client = client
+
+    def GetProfiles(self):
+        self.client.calls.append("GetProfiles")
+        return [SimpleNamespace(token="main"), SimpleNamespace(token="sub")]
+
+    def GetSnapshotUri(self, ProfileToken):
+        self.client.calls.append(f"GetSnapshotUri[{ProfileToken}]")
+        return SimpleNamespace(
+            Uri=f"{self.client.base}/snapshot?profile={ProfileToken}"
+        )
+
+
+class FakeMedia2(FakeMedia):
+    def GetSnapshotUri(self, ProfileToken):
+        # zeep unwraps the Media2 response to its single Uri string
+        return super().GetSnapshotUri(ProfileToken).Uri
+
+
+class FakeClient:
+    """ONVIFClient stand-in whose snapshot URIs point at a local server"""
+
+    def __init__(self, server, host="127.0.0.1", password="secret", media2=False):
+        self.common_args = {
+            "host": host,
+            "port": server.server_address[1],
+            "username": "admin",
+            "password": password,
+            "verify_ssl": False,
+        }
+        self.base = f"http://127.0.0.1:{server.server_address[1]}"
+        self.services = None
+        self._service_map = {}
+        if media2:
+            namespace = "http://www.onvif.org/ver20/media/wsdl"
+            self.services = [SimpleNamespace(Namespace=namespace)]
+            self._service_map[namespace] = f"{self.base}/onvif/media2"
+        self.calls = []
+
+    def media(self):
+        return FakeMedia(self)
+
+    def media2(self):
+        return FakeMedia2(self)
+
+
+@pytest.fixture
+def server():
+    server = serve()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestSnapshotFetcher:
+    """Test fetching against a local HTTP stand-in"""
+
+    def test_digest_negotiated_once_and_connection_reused(self, server):
+        client = FakeClient(server)
+        with ONVIFSnapshotFetcher() as fetcher:
+            assert fetcher.fetch(client) == JPEG
+            assert fetcher.fetch(client) == JPEG
+            assert fetcher.fetch(client, profile="sub") == JPEG
+
+        assert client.calls == [
+            "GetProfiles",
+            "GetSnapshotUri[main]",
+            "GetSnapshotUri[sub]",
+        ]
+        assert server.challenges == 1
+        assert server.requests == 4
+        assert server.connections == 1
+
+    def test_media2_snapshot_uri(self, server):
+        client = FakeClient(server, media2=True)
+        with ONVIFSnapshotFetcher() as fetcher:
+            assert fetcher.snapshot_uri(client).endswith("/snapshot?profile=main")
+            assert fetcher.fetch(client) == JPEG
+
+    def test_stale_nonce_renegotiated(self, server):
+        client = FakeClient(server)
+        with ONVIFSnapshotFetcher() as fetcher:
+            fetcher.fetch(client)
+            server.nonce = "n2"
+            assert fetcher.fetch(client) == JPEG
+        assert server.challenges == 2
+
+    def test_basic_auth(self):
+        server = serve(scheme="basic")
+        try:
+            client = FakeClient(server)
+            with ONVIFSnapshotFetcher() as fetcher:
+                assert fetcher.fetch(client) == JPEG
+                assert fetcher.fetch(client) == JPEG
+            assert server.challenges == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_wrong_password(self, server):
+        client = FakeClient(server, password="wrong")
+        with pytest.raises(ONVIFOperationException) as e:
+            ONVIFSnapshotFetcher().fetch(client)
+        assert ONVIFErrorHandler.is_not_authorized(e.value)
+
+    def test_fetch_into_buffer(self, server):
+        client = FakeClient(server)
+        buffer = bytearray(len(JPEG) + 100)
+        fetcher = ONVIFSnapshotFetcher()
+        size = fetcher.fetch_into(client, buffer)
+        assert size == len(JPEG)
+        assert buffer[:size] == JPEG
+
+        with pytest.raises(ONVIFOperationException, match="doesn't fit"):
+            fetcher.fetch_into(client, bytearray(100))
+        # The connection was dropped, the next fetch opens a new one
+        assert fetcher.fetch(client) == JPEG
+        fetcher.close()
+
+    def test_chunked_into_buffer_and_file(self, tmp_path):
+        server = serve(chunked=True)
+        try:
+            client = FakeClient(server)
+            with ONVIFSnapshotFetcher(chunk_size=4096) as fetcher:
+                buffer = bytearray(len(JPEG))
+                assert fetcher.fetch_into(client, buffer) == len(JPEG)
+                assert buffer == JPEG
+
+                path = tmp_path / "snapshot.jpg"
+                assert fetcher.fetch_to_file(client, path) == len(JPEG)
+                assert path.read_bytes() == JPEG
+
+                file = io.BytesIO()
+                fetcher.fetch_to_file(client, file)
+                assert file.getvalue() == JPEG
+            assert server.connections == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_fetch_many(self):
+        servers = [serve(delay=0.1) for _ in range(6)]
+        try:
+            clients = [FakeClient(server) for server in servers]
+            buffers = {}
+
+            def target(name):
+                return buffers.setdefault(name, bytearray(len(JPEG)))
+
+            fetcher = ONVIFSnapshotFetcher(workers=6)
+            start = time.monotonic()
+            results = list(fetcher.fetch_many(clients, target=target))
+            elapsed = time.monotonic() - start
+
+            assert len(results) == 6
+            assert all(r.error is None and r.size == len(JPEG) for r in results)
+            assert all(buffer == JPEG for buffer in buffers.values())
+            assert elapsed < 0.5
+
+            # Without a target the bytes are returned
+            results = list(fetcher.fetch_many(clients[:1]))
+            assert results[0].data == JPEG
+            fetcher.close()
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
@@ -0,0 +1,212 @@
+# tests/test_topic_index.py
+
+from unittest.mock import patch
+
+import pytest
+from lxml import etree
+
+from onvif.utils import ONVIFTopicIndex
+from onvif.utils.topic_index import CONCRETE_SET_DIALECT
+
+EVENT_PROPERTIES = b"""<?xml version="1.0" encoding="UTF-8"?>
+<env:Envelope xmlns:env="http://www.w3.org/2003/05/soap-envelope"
+              xmlns:tev="http://www.onvif.org/ver10/events/wsdl"
+              xmlns:wsnt="http://docs.oasis-open.org/wsn/b-2"
+              xmlns:wstop="http://docs.oasis-open.org/wsn/t-1"
+              xmlns:tt="http://www.onvif.org/ver10/schema"
+              xmlns:tns1="http://www.onvif.org/ver10/topics"
+              xmlns:acme="http://example.com/acme/topics">
+  <env:Body>
+    <tev:GetEventPropertiesResponse>
+      <tev:TopicNamespaceLocation>http://www.onvif.org/onvif/ver10/topics/topicns.xml</tev:TopicNamespaceLocation>
+      <wsnt:FixedTopicSet>true</wsnt:FixedTopicSet>
+      <wstop:TopicSet>
+        <tns1:VideoSource>
+          <MotionAlarm wstop:topic="true">
+            <tt:MessageDescription IsProperty="true">
+              <tt:Source>
+                <tt:SimpleItemDescription Name="Source" Type="tt:ReferenceToken"/>
+              </tt:Source>
+              <tt:Data>
+                <tt:SimpleItemDescription Name="State" Type="xs:boolean"/>
+              </tt:Data>
+            </tt:MessageDescription>
+          </MotionAlarm>
+          <ImageTooBlurry wstop:topic="true">
+            <tt:MessageDescription IsProperty="true">
+              <tt:Data>
+                <tt:SimpleItemDescription Name="State" Type="xs:boolean"/>
+              </tt:Data>
+            </tt:MessageDescription>
+          </ImageTooBlurry>
+        </tns1:VideoSource>
+        <tns1:RuleEngine>
+          <CellMotionDetector>
+            <Motion wstop:topic="true">
+              <tt:MessageDescription IsProperty="true">
+                <tt:Source>
+                  <tt:SimpleItemDescription Name="VideoSourceConfigurationToken" Type="tt:ReferenceToken"/>
+                  <tt:SimpleItemDescription Name="Rule" Type="xs:string"/>
+                </tt:Source>
+                <tt:Data>
+                  <tt:SimpleItemDescription Name="IsMotion" Type="xs:boolean"/>
+                </tt:Data>
+              </tt:MessageDescription>
+            </Motion>
+          </CellMotionDetector>
+          <TamperDetector>
+            <Tamper wstop:topic="true">
+              <tt:MessageDescription>
+                <tt:Data>
+                  <tt:ElementItemDescription Name="Region" Type="tt:Polygon"/>
+                </tt:Data>
+              </tt:MessageDescription>
+            </Tamper>
+          </TamperDetector>
+        </tns1:RuleEngine>
+        <acme:Device>
+          <Heater wstop:topic="true"/>
+        </acme:Device>
+      </wstop:TopicSet>
+      <wsnt:TopicExpressionDialect>http://www.onvif.org/ver10/tev/topicExpression/ConcreteSet</wsnt:TopicExpressionDialect>
+      <tev:MessageContentFilterDialect>http://www.onvif.org/ver10/tev/messageContentFilter/ItemFilter</tev:MessageContentFilterDialect>
+    </tev:GetEventPropertiesResponse>
+  </env:Body>
+</env:Envelope>"""
+
+
+@pytest.fixture
+def index():
+    return ONVIFTopicIndex.from_xml(EVENT_PROPERTIES)
+
+
+class TestTopicIndex:
+    """Test GetEventProperties topic indexing"""
+
+    def test_topics_and_descriptions(self, index):
+        assert len(index) == 5
+        assert list(index.topics) == [
+            "tns1:VideoSource/MotionAlarm",
+            "tns1:VideoSource/ImageTooBlurry",
+            "tns1:RuleEngine/CellMotionDetector/Motion",
+            "tns1:RuleEngine/TamperDetector/Tamper",
+            "acme:Device/Heater",
+        ]
+
+        motion = index["tns1:RuleEngine/CellMotionDetector/Motion"]
+        assert motion.is_property
+        assert motion.source == {
+            "VideoSourceConfigurationToken": "tt:ReferenceToken",
+            "Rule": "xs:string",
+        }
+        assert motion.data == {"IsMotion": "xs:boolean"}
+        assert index["tns1:RuleEngine/TamperDetector/Tamper"].data == {
+            "Region": "tt:Polygon"
+        }
+        assert not index["acme:Device/Heater"].is_property
+
+        assert "tns1:VideoSource" not in index
+        assert index.get("tns1:Nope") is None
+
+    def test_properties(self, index):
+        assert index.fixed is True
+        assert index.topic_dialects == [CONCRETE_SET_DIALECT]
+        assert index.content_dialects[0].endswith("ItemFilter")
+        assert index.namespaces == {
+            "tns1": "http://www.onvif.org/ver10/topics",
+            "acme": "http://example.com/acme/topics",
+        }
+
+    @pytest.mark.parametrize(
+        "pattern, expected",
+        [
+            ("tns1:RuleEngine/*/Motion", ["tns1:RuleEngine/CellMotionDetector/Motion"]),
+            (
+                "tns1:VideoSource/*",
+                ["tns1:VideoSource/MotionAlarm", "tns1:VideoSource/ImageTooBlurry"],
+            ),
+            (
+                "tns1:RuleEngine//.",
+                [
+                    "tns1:RuleEngine/CellMotionDetector/Motion",
+                    "tns1:RuleEngine/TamperDetector/Tamper",
+                ],
+            ),
+            ("**/Tamper", ["tns1:RuleEngine/TamperDetector/Tamper"]),
+            ("*:Device/**", ["acme:Device/Heater"]),
+            ("tns1:Video*/Motion?larm", ["tns1:VideoSource/MotionAlarm"]),
+            ("tns1:VideoSource", []),
+        ],
+    )
+    def test_match(self, index, pattern, expected):
+        assert [t.path for t in index.match(pattern)] == expected
+
+    def test_topic_expression_collapses_subtrees(self, index):
+        assert index.topic_expression("tns1:VideoSource/*") == "tns1:VideoSource//."
+        assert index.topic_expression(
+            "tns1:VideoSource/MotionAlarm", "**/Motion", "**/Tamper"
+        ) == ("tns1:VideoSource/MotionAlarm|tns1:RuleEngine//.")
+
+    def test_topic_expression_unknown_topic(self, index):
+        with pytest.raises(ValueError):
+            index.topic_expression("tns1:Unknown/Topic")
+
+    def test_build_filter(self, index):
+        topic_filter = index.build_filter(
+            "tns1:VideoSource/MotionAlarm", "acme:Device/**"
+        )
+        (element,) = topic_filter["_value_1"]
+
+        assert element.tag == "{http://docs.oasis-open.org/wsn/b-2}TopicExpression"
+        assert element.get("Dialect") == CONCRETE_SET_DIALECT
+        assert element.text == "tns1:VideoSource/MotionAlarm|acme:Device/Heater"
+        assert element.nsmap["acme"] == "http://example.com/acme/topics"
+        assert element.nsmap["tns1"] == "http://www.onvif.org/ver10/topics"
+
+    def test_build_filter_renders_in_request(self, index):
+        from onvif.operator import ONVIFOperator, CacheMode
+        from onvif.utils import ONVIFWSDL
+
+        definition = ONVIFWSDL.get_definition("events")
+        operator = ONVIFOperator(
+            definition["path"],
+            host="127.0.0.1",
+            port=80,
+            binding=f"{{{definition['namespace']}}}{definition['binding']}",
+            xaddr="http://127.0.0.1/onvif/Events",
+            cache=CacheMode.NONE,
+            apply_patch=False,
+        )
+        envelope, _ = operator.service._binding._create(
+            "CreatePullPointSubscription",
+            (),
+            {"Filter": index.build_filter("tns1:RuleEngine//.")},
+            client=operator.client,
+            options={"address": "http://127.0.0.1/onvif/Events"},
+        )
+        expression = envelope.find(
+            ".//{http://docs.oasis-open.org/wsn/b-2}TopicExpression"
+        )
+        assert expression.text == "tns1:RuleEngine//."
+        assert expression.nsmap["tns1"] == "http://www.onvif.org/ver10/topics"
+
+    def test_empty_topic_set(self):
+        index = ONVIFTopicIndex.from_xml(b"<Envelope/>")
+        assert len(index) == 0
+        assert index.match("**") == []
+
+    def test_client_caches_index(self, mock_onvif_client):
+        with patch("onvif.client.Events") as mock_events:
+            operator = mock_events.return_value.operator
+            operator.call_raw.return_value = EVENT_PROPERTIES
+
+            first = mock_onvif_client.topic_index()
+            second = mock_onvif_client.topic_index()
+            refreshed = mock_onvif_client.topic_index(refresh=True)
+
+        assert first is second
+        assert refreshed is not first
+        assert operator.call_raw.call_count == 2
+        operator.call_raw.assert_called_with("GetEventProperties")
+        assert isinstance(first, ONVIFTopicIndex)
+        assert etree.iselement(first.build_filter("**")["_value_1"][0])